@@ -1,6 +1,8 @@
 # Banking/admin.py
 from django.contrib import admin
-from .models import PaymentMethod, Payment, PaymentLine # আপনার মডেলগুলি আমদানি করুন
+from django.contrib import messages
+from .forms import BankStatementImportForm
+from .models import PaymentMethod, Payment, PaymentLine, BankStatement, BankStatementLine # আপনার মডেলগুলি আমদানি করুন
 
 # PaymentMethod মডেল নিবন্ধন করুন
 @admin.register(PaymentMethod)
@@ -38,4 +40,78 @@ class PaymentLineAdmin(admin.ModelAdmin):
     search_fields = ('payment__doc_num', 'account__name', 'description')
     list_filter = ('account', 'created_at', 'updated_at')
     raw_id_fields = ('payment', 'account') # ForeignKey fields for better handling in admin
-    readonly_fields = ('created_at', 'updated_at')
\ No newline at end of file
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(BankStatement)
+class BankStatementAdmin(admin.ModelAdmin):
+    """
+    Adding a statement uploads the file, imports its lines and reconciles them with open payments.
+    """
+    list_display = ('__str__', 'bank_account', 'statement_format', 'line_count', 'matched_count', 'skipped_count', 'uploaded_by', 'created_at')
+    list_filter = ('statement_format', 'bank_account', 'created_at')
+    search_fields = ('file_name', 'statement_reference')
+    actions = ['reconcile_again']
+    readonly_fields = (
+        'bank_account', 'currency', 'statement_format', 'file_name', 'statement_reference', 'opening_balance',
+        'closing_balance', 'line_count', 'skipped_count', 'matched_count', 'uploaded_by', 'import_messages', 'created_at',
+    )
+
+    def get_form(self, request, obj=None, **kwargs):
+        if obj is None:
+            kwargs['form'] = BankStatementImportForm
+            kwargs['fields'] = None
+        return super().get_form(request, obj, **kwargs)
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.readonly_fields if obj else ()
+
+    def get_fields(self, request, obj=None):
+        if obj is None:
+            return ['bank_account', 'statement_format', 'file']
+        return self.readonly_fields
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        from .reconciliation import import_statement
+        from .statement_parsers import StatementImportError
+
+        upload = form.cleaned_data['file']
+        obj.uploaded_by = request.user
+        obj.file_name = upload.name
+        try:
+            reconciled = import_statement(obj, upload, upload.name)
+        except StatementImportError as error:
+            # Nothing was imported; keep the attempt with its error
+            obj.pk = None
+            obj.line_count = obj.skipped_count = obj.matched_count = 0
+            obj.import_messages = str(error)
+            obj.save()
+            self.message_user(request, f"Statement not imported: {error}", messages.ERROR)
+            return
+        self.message_user(
+            request,
+            f"{obj.line_count} lines imported ({obj.skipped_count} already imported), {obj.matched_count} matched, "
+            f"{reconciled} payments reconciled.",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Reconcile unmatched lines again")
+    def reconcile_again(self, request, queryset):
+        from .reconciliation import reconcile_statement
+
+        for statement in queryset:
+            reconciled = reconcile_statement(statement)
+            self.message_user(request, f"{statement}: {reconciled} payments reconciled, {statement.matched_count} of {statement.line_count} lines matched.")
+
+
+@admin.register(BankStatementLine)
+class BankStatementLineAdmin(admin.ModelAdmin):
+    list_display = ('statement', 'line_number', 'booking_date', 'amount', 'reference', 'counterparty', 'status', 'payment', 'difference')
+    list_filter = ('status', 'statement__bank_account', 'booking_date')
+    search_fields = ('reference', 'bank_reference', 'counterparty', 'description', 'payment__doc_num')
+    raw_id_fields = ('statement', 'payment', 'payment_line', 'journal_entry')
+    list_select_related = ('statement__bank_account', 'payment')
+
@@ -4,7 +4,7 @@ from decimal import Decimal
 from django.forms import inlineformset_factory
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from .models import Payment, PaymentLine, PaymentMethod
+from .models import BankStatement, Payment, PaymentLine, PaymentMethod
 from config.forms import BaseFilterForm, CustomTextarea
 from global_settings.models import Currency
 from BusinessPartnerMasterData.models import BusinessPartner
@@ -247,3 +247,21 @@ class PaymentFilterForm(BaseFilterForm):
         # Customize search placeholder
         self.fields['search'].widget.attrs['placeholder'] = 'Search by document number or reference...'
 
+
+class BankStatementImportForm(forms.ModelForm):
+    """Admin add form of BankStatement: uploading a file imports and reconciles it."""
+    file = forms.FileField(help_text="CSV/XLSX (booking_date, amount or credit/debit, reference, ...), MT940 or CAMT.053 XML.")
+
+    class Meta:
+        model = BankStatement
+        fields = ['bank_account', 'statement_format', 'file']
+
+    def __init__(self, *args, **kwargs):
+        from .reconciliation import get_reconciliation_settings
+
+        super().__init__(*args, **kwargs)
+        self.fields['bank_account'].queryset = ChartOfAccounts.objects.filter(is_active=True)
+        default_account = ChartOfAccounts.objects.filter(code=get_reconciliation_settings()['BANK_ACCOUNT']).first()
+        if default_account:
+            self.fields['bank_account'].initial = default_account.pk
+
@@ -0,0 +1,51 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Banking.models import BankStatement
+from Banking.reconciliation import get_reconciliation_settings, import_statement, reconcile_statement
+from Banking.statement_parsers import StatementImportError
+from Finance.models import ChartOfAccounts
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a bank statement (CSV/XLSX, MT940 or CAMT.053) and reconcile its lines with open payments, "
+        "or reconcile the unmatched lines of imported statements again with --statement."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', nargs='?', help="Path to the statement file.")
+        parser.add_argument('--account', help="ChartOfAccounts code of the bank account. Default BANK_RECONCILIATION['BANK_ACCOUNT'].")
+        parser.add_argument('--format', choices=[choice for choice, _ in BankStatement.FORMAT_CHOICES],
+                            help="Statement format; detected from the file when omitted.")
+        parser.add_argument('--statement', type=int, action='append', help="Reconcile this imported statement again.")
+
+    def handle(self, *args, **options):
+        if options['statement']:
+            for statement in BankStatement.objects.filter(pk__in=options['statement']):
+                reconciled = reconcile_statement(statement)
+                self.stdout.write(f"{statement}: {reconciled} payments reconciled, {statement.matched_count}/{statement.line_count} lines matched")
+            return
+        if not options['file']:
+            raise CommandError("A statement file or --statement is required.")
+
+        code = options['account'] or get_reconciliation_settings()['BANK_ACCOUNT']
+        bank_account = ChartOfAccounts.objects.filter(code=code).first()
+        if bank_account is None:
+            raise CommandError(f"Bank account '{code}' does not exist.")
+
+        statement = BankStatement(
+            bank_account=bank_account, statement_format=options['format'] or '', file_name=os.path.basename(options['file']),
+        )
+        start = time.perf_counter()
+        try:
+            with open(options['file'], 'rb') as file:
+                reconciled = import_statement(statement, file, options['file'])
+        except StatementImportError as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            f"Statement #{statement.pk}: {statement.line_count} lines imported ({statement.skipped_count} already imported), "
+            f"{statement.matched_count} matched, {reconciled} payments reconciled in {time.perf_counter() - start:.2f}s"
+        ))
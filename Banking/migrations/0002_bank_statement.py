@@ -0,0 +1,77 @@
+# Generated by Django 4.2.20 on 2026-10-19 14:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Finance', '0003_generalledger_gl_date_id_idx'),
+        ('global_settings', '0002_bulkimportlog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('Banking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Updated At')),
+                ('statement_format', models.CharField(blank=True, choices=[('csv', 'CSV / XLSX'), ('mt940', 'MT940'), ('camt', 'CAMT.053')], help_text='Detected from the file when left blank.', max_length=10, verbose_name='Format')),
+                ('file_name', models.CharField(blank=True, max_length=255, verbose_name='File Name')),
+                ('statement_reference', models.CharField(blank=True, max_length=100, verbose_name='Statement Reference')),
+                ('opening_balance', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True, verbose_name='Opening Balance')),
+                ('closing_balance', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True, verbose_name='Closing Balance')),
+                ('line_count', models.PositiveIntegerField(default=0, verbose_name='Lines')),
+                ('skipped_count', models.PositiveIntegerField(default=0, help_text='Lines whose bank reference was imported before.', verbose_name='Skipped Lines')),
+                ('matched_count', models.PositiveIntegerField(default=0, verbose_name='Matched Lines')),
+                ('import_messages', models.TextField(blank=True, verbose_name='Import Messages')),
+                ('bank_account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='bank_statements', to='Finance.chartofaccounts', verbose_name='Bank Account')),
+                ('currency', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='global_settings.currency', verbose_name='Currency')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bank_statements', to=settings.AUTH_USER_MODEL, verbose_name='Uploaded By')),
+            ],
+            options={
+                'verbose_name': 'Bank Statement',
+                'verbose_name_plural': 'Bank Statements',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BankStatementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Updated At')),
+                ('line_number', models.PositiveIntegerField(verbose_name='Line Number')),
+                ('booking_date', models.DateField(verbose_name='Booking Date')),
+                ('value_date', models.DateField(blank=True, null=True, verbose_name='Value Date')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='Amount')),
+                ('reference', models.CharField(blank=True, max_length=140, verbose_name='Reference')),
+                ('bank_reference', models.CharField(blank=True, max_length=100, verbose_name='Bank Reference')),
+                ('counterparty', models.CharField(blank=True, max_length=140, verbose_name='Counterparty')),
+                ('description', models.TextField(blank=True, verbose_name='Description')),
+                ('status', models.CharField(choices=[('unmatched', 'Unmatched'), ('matched', 'Matched'), ('difference', 'Matched with Difference')], default='unmatched', max_length=10, verbose_name='Status')),
+                ('match_score', models.DecimalField(decimal_places=3, default=0, max_digits=4, verbose_name='Match Score')),
+                ('difference', models.DecimalField(decimal_places=2, default=0, help_text='Booked amount minus payment amount, posted to the GL.', max_digits=15, verbose_name='Difference')),
+                ('journal_entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bank_statement_lines', to='Finance.journalentry', verbose_name='Difference Journal Entry')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='Banking.payment', verbose_name='Payment')),
+                ('payment_line', models.ForeignKey(blank=True, help_text='Set when the booking settles one line of a split payment.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='Banking.paymentline', verbose_name='Payment Line')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='Banking.bankstatement', verbose_name='Statement')),
+            ],
+            options={
+                'verbose_name': 'Bank Statement Line',
+                'verbose_name_plural': 'Bank Statement Lines',
+                'ordering': ['statement', 'line_number'],
+                'indexes': [models.Index(fields=['statement', 'status'], name='bank_statement_line_status_idx'), models.Index(fields=['bank_reference'], name='bank_statement_line_ref_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bankstatementline',
+            constraint=models.UniqueConstraint(fields=('statement', 'line_number'), name='bank_statement_line_unique_number'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 from global_settings.models import Currency
 from BusinessPartnerMasterData.models import BusinessPartner
-from Finance.models import ChartOfAccounts
+from Finance.models import ChartOfAccounts, JournalEntry
+from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 import datetime
@@ -101,3 +102,89 @@ class PaymentLine(BaseModel):
 
     def __str__(self):
         return f"{self.payment.doc_num} - {self.account.name}"
+
+
+class BankStatement(BaseModel):
+    """
+    An imported bank statement (CSV/XLSX, MT940 or CAMT.053) of one bank GL account.
+    Its lines are matched to payments by Banking/reconciliation.py.
+    """
+    FORMAT_CHOICES = [
+        ('csv', _("CSV / XLSX")),
+        ('mt940', _("MT940")),
+        ('camt', _("CAMT.053")),
+    ]
+
+    bank_account = models.ForeignKey(ChartOfAccounts, on_delete=models.PROTECT, related_name='bank_statements',
+                                     verbose_name=_("Bank Account"))
+    currency = models.ForeignKey(Currency, on_delete=models.PROTECT, null=True, blank=True, verbose_name=_("Currency"))
+    statement_format = models.CharField(_("Format"), max_length=10, choices=FORMAT_CHOICES, blank=True,
+                                        help_text=_("Detected from the file when left blank."))
+    file_name = models.CharField(_("File Name"), max_length=255, blank=True)
+    statement_reference = models.CharField(_("Statement Reference"), max_length=100, blank=True)
+    opening_balance = models.DecimalField(_("Opening Balance"), max_digits=15, decimal_places=2, null=True, blank=True)
+    closing_balance = models.DecimalField(_("Closing Balance"), max_digits=15, decimal_places=2, null=True, blank=True)
+    line_count = models.PositiveIntegerField(_("Lines"), default=0)
+    skipped_count = models.PositiveIntegerField(_("Skipped Lines"), default=0,
+                                                help_text=_("Lines whose bank reference was imported before."))
+    matched_count = models.PositiveIntegerField(_("Matched Lines"), default=0)
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='bank_statements', verbose_name=_("Uploaded By"))
+    import_messages = models.TextField(_("Import Messages"), blank=True)
+
+    class Meta:
+        verbose_name = _("Bank Statement")
+        verbose_name_plural = _("Bank Statements")
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.bank_account.code} - {self.statement_reference or self.file_name}"
+
+
+class BankStatementLine(BaseModel):
+    """
+    One booking of a bank statement. The amount is signed: money received is
+    positive, money paid out negative.
+    """
+    STATUS_CHOICES = [
+        ('unmatched', _("Unmatched")),
+        ('matched', _("Matched")),
+        ('difference', _("Matched with Difference")),
+    ]
+
+    statement = models.ForeignKey(BankStatement, on_delete=models.CASCADE, related_name='lines', verbose_name=_("Statement"))
+    line_number = models.PositiveIntegerField(_("Line Number"))
+    booking_date = models.DateField(_("Booking Date"))
+    value_date = models.DateField(_("Value Date"), null=True, blank=True)
+    amount = models.DecimalField(_("Amount"), max_digits=15, decimal_places=2)
+    reference = models.CharField(_("Reference"), max_length=140, blank=True)
+    bank_reference = models.CharField(_("Bank Reference"), max_length=100, blank=True)
+    counterparty = models.CharField(_("Counterparty"), max_length=140, blank=True)
+    description = models.TextField(_("Description"), blank=True)
+    status = models.CharField(_("Status"), max_length=10, choices=STATUS_CHOICES, default='unmatched')
+    payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='statement_lines', verbose_name=_("Payment"))
+    payment_line = models.ForeignKey(PaymentLine, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='statement_lines', verbose_name=_("Payment Line"),
+                                     help_text=_("Set when the booking settles one line of a split payment."))
+    match_score = models.DecimalField(_("Match Score"), max_digits=4, decimal_places=3, default=0)
+    difference = models.DecimalField(_("Difference"), max_digits=15, decimal_places=2, default=0,
+                                     help_text=_("Booked amount minus payment amount, posted to the GL."))
+    journal_entry = models.ForeignKey(JournalEntry, on_delete=models.SET_NULL, null=True, blank=True,
+                                      related_name='bank_statement_lines', verbose_name=_("Difference Journal Entry"))
+
+    class Meta:
+        verbose_name = _("Bank Statement Line")
+        verbose_name_plural = _("Bank Statement Lines")
+        ordering = ['statement', 'line_number']
+        constraints = [
+            models.UniqueConstraint(fields=['statement', 'line_number'], name='bank_statement_line_unique_number'),
+        ]
+        indexes = [
+            models.Index(fields=['statement', 'status'], name='bank_statement_line_status_idx'),
+            models.Index(fields=['bank_reference'], name='bank_statement_line_ref_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.statement} #{self.line_number} {self.amount}"
+
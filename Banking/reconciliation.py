@@ -0,0 +1,477 @@
+"""
+Bank statement import and automatic reconciliation.
+
+Statement lines are paired with unreconciled payments as a hash join rather
+than a nested loop: the open payments of the statement's date range (and the
+lines of split payments) are read once and indexed by signed amount and by
+reference token, so each booking only looks at the few candidates sharing its
+amount or one of its references. Candidates must fall within DATE_WINDOW_DAYS
+of the booking; ties are broken by reference and counterparty similarity and
+date distance, and each payment is used once, best score first.
+
+A booking whose reference names a payment but whose amount differs by at most
+DIFFERENCE_TOLERANCE (bank charges, rounding) is matched with a difference,
+which is posted to the GL against DIFFERENCE_ACCOUNT in one journal entry per
+run. Matched payments are flagged is_reconciled with a queryset update, so the
+per-payment save() and signals do not run.
+"""
+import re
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from config.importers import chunked
+from Finance.models import ChartOfAccounts, JournalEntry, JournalEntryLine
+from Finance.utils import bulk_post_to_general_ledger
+from global_settings.models import Currency
+
+from .models import BankStatementLine, Payment, PaymentLine
+from .statement_parsers import StatementImportError, detect_format, parse_statement
+
+DEFAULT_SETTINGS = {
+    'BANK_ACCOUNT': '1100',            # ChartOfAccounts code used when an import names no account
+    'DATE_WINDOW_DAYS': 3,             # booking date to payment date, either way
+    'MIN_REFERENCE_SCORE': 0.8,        # similarity needed to pick one of several same-amount payments
+    'DIFFERENCE_TOLERANCE': '5.00',    # largest difference a reference match may post to the GL
+    'DIFFERENCE_ACCOUNT': None,        # ChartOfAccounts code for differences; None matches exact amounts only
+    'BATCH_SIZE': 2000,
+}
+
+MATCH_ROUNDS = 5
+
+REFERENCE_TOKEN = re.compile(r'[A-Z0-9]+(?:[-/.][A-Z0-9]+)*')
+
+
+def get_reconciliation_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'BANK_RECONCILIATION', {})}
+
+
+# ------------------------------------------
+# ✅ References
+# ------------------------------------------
+def normalize_reference(text):
+    return re.sub(r'[^A-Z0-9]', '', str(text or '').upper())
+
+
+def get_reference_keys(*texts):
+    """Normalized reference-like tokens (4+ characters with a digit) found in texts."""
+    keys = set()
+    for text in texts:
+        for token in REFERENCE_TOKEN.findall(str(text or '').upper()):
+            key = normalize_reference(token)
+            if len(key) >= 4 and any(character.isdigit() for character in key):
+                keys.add(key)
+    return keys
+
+
+@lru_cache(maxsize=65536)
+def get_similarity(first, second):
+    if not first or not second:
+        return 0.0
+    return SequenceMatcher(None, first, second).ratio()
+
+
+class Candidate:
+    """An open payment, or one open line of a split payment, as the statement would show it."""
+    __slots__ = ('payment_id', 'payment_line_id', 'amount', 'date', 'keys', 'partner')
+
+    def __init__(self, payment_id, payment_line_id, amount, date, keys, partner):
+        self.payment_id = payment_id
+        self.payment_line_id = payment_line_id
+        self.amount = amount
+        self.date = date
+        self.keys = keys
+        self.partner = partner
+
+
+# ------------------------------------------
+# ✅ Candidates
+# ------------------------------------------
+def get_candidates(start_date, end_date, currency_id=None):
+    """
+    Open payments dated start_date..end_date, signed as on the statement
+    (incoming positive), in two queries: whole payments without any matched
+    booking, and the unmatched lines of payments split over several lines.
+    """
+    payments = Payment.objects.filter(is_reconciled=False, payment_date__range=(start_date, end_date))
+    if currency_id:
+        payments = payments.filter(currency_id=currency_id)
+    rows = payments.annotate(
+        line_count=Count('payment_lines', distinct=True),
+        matched_count=Count('statement_lines', distinct=True),
+    ).values_list(
+        'pk', 'payment_type', 'amount', 'payment_date', 'doc_num', 'reference', 'business_partner__name',
+        'line_count', 'matched_count',
+    )
+
+    candidates = []
+    split_payments = {}
+    for pk, payment_type, amount, payment_date, doc_num, reference, partner, line_count, matched_count in rows:
+        sign = 1 if payment_type == 'incoming' else -1
+        keys = get_reference_keys(doc_num, reference)
+        partner = normalize_reference(partner)
+        if not matched_count:
+            candidates.append(Candidate(pk, None, sign * amount, payment_date, keys, partner))
+        if line_count > 1:
+            split_payments[pk] = (sign, payment_date, keys, partner)
+
+    if split_payments:
+        lines = PaymentLine.objects.filter(
+            payment__is_reconciled=False, payment__payment_date__range=(start_date, end_date),
+            payment_id__in=payments.values('pk'), statement_lines__isnull=True,
+        ).values_list('pk', 'payment_id', 'amount', 'description')
+        for pk, payment_id, amount, description in lines:
+            if payment_id not in split_payments:
+                continue
+            sign, payment_date, keys, partner = split_payments[payment_id]
+            candidates.append(Candidate(
+                payment_id, pk, sign * amount, payment_date, keys | get_reference_keys(description), partner,
+            ))
+    return candidates
+
+
+# ------------------------------------------
+# ✅ Matching
+# ------------------------------------------
+def get_reference_score(line_keys, candidate):
+    if line_keys & candidate.keys:
+        return 1.0
+    return max(
+        (get_similarity(line_key, key) for line_key in line_keys for key in candidate.keys),
+        default=0.0,
+    )
+
+
+def get_score(line, line_keys, candidate, options):
+    """0..1: reference similarity first, then counterparty name, then date distance."""
+    window = options['DATE_WINDOW_DAYS']
+    days = abs((line.booking_date - candidate.date).days)
+    reference = get_reference_score(line_keys, candidate)
+    partner = get_similarity(normalize_reference(line.counterparty), candidate.partner)
+    return reference, 0.6 * reference + 0.25 * partner + 0.15 * (1 - days / (window + 1))
+
+
+def is_open(candidate, used):
+    """A split payment is settled either whole or line by line, never both."""
+    if candidate.payment_line_id is None:
+        return ('payment', candidate.payment_id) not in used and ('split', candidate.payment_id) not in used
+    return ('payment', candidate.payment_id) not in used and ('line', candidate.payment_line_id) not in used
+
+
+def assign(proposals, used, matches):
+    """Greedy one-to-one assignment, best score first."""
+    for score, _, line_index, candidate, difference in sorted(proposals, key=lambda proposal: proposal[:2], reverse=True):
+        if line_index in matches or not is_open(candidate, used):
+            continue
+        if candidate.payment_line_id is None:
+            used.add(('payment', candidate.payment_id))
+        else:
+            used.update((('line', candidate.payment_line_id), ('split', candidate.payment_id)))
+        matches[line_index] = (candidate, score, difference)
+
+
+def match_lines(lines, candidates, options):
+    """
+    {index in lines: (candidate, score, difference)}. Exact amounts are matched
+    first, in rounds, since a payment taken in one round can leave a single
+    same-amount candidate for another booking in the next; then reference
+    matches with a difference, only when a difference account is set.
+    """
+    window = timedelta(days=options['DATE_WINDOW_DAYS'])
+    by_amount = defaultdict(list)
+    by_key = defaultdict(list)
+    for candidate in candidates:
+        by_amount[candidate.amount].append(candidate)
+        for key in candidate.keys:
+            by_key[key].append(candidate)
+
+    line_keys = [get_reference_keys(line.reference, line.description) for line in lines]
+    matches = {}
+    used = set()
+
+    for _ in range(MATCH_ROUNDS):
+        proposals = []
+        for index, line in enumerate(lines):
+            if index in matches:
+                continue
+            in_window = [
+                candidate for candidate in by_amount.get(line.amount, ())
+                if abs(line.booking_date - candidate.date) <= window and is_open(candidate, used)
+            ]
+            if not in_window:
+                continue
+            # A reference naming another open payment rules out a match on the amount alone
+            named = {
+                id(candidate) for key in line_keys[index] for candidate in by_key.get(key, ())
+                if is_open(candidate, used)
+            }
+            for candidate in in_window:
+                if named and id(candidate) not in named:
+                    continue
+                reference, score = get_score(line, line_keys[index], candidate, options)
+                # Several payments of the same amount need a reference to tell them apart
+                if len(in_window) == 1 or reference >= options['MIN_REFERENCE_SCORE']:
+                    proposals.append((score, -index, index, candidate, Decimal('0')))
+        matched = len(matches)
+        assign(proposals, used, matches)
+        if len(matches) == matched:
+            break
+
+    if not options['DIFFERENCE_ACCOUNT']:
+        return matches
+    tolerance = Decimal(str(options['DIFFERENCE_TOLERANCE']))
+    proposals = []
+    for index, line in enumerate(lines):
+        if index in matches:
+            continue
+        seen = set()
+        for key in line_keys[index]:
+            for candidate in by_key.get(key, ()):
+                if id(candidate) in seen:
+                    continue
+                seen.add(id(candidate))
+                difference = line.amount - candidate.amount
+                if (
+                    difference and abs(difference) <= tolerance and (line.amount > 0) == (candidate.amount > 0)
+                    and abs(line.booking_date - candidate.date) <= window
+                ):
+                    _, score = get_score(line, line_keys[index], candidate, options)
+                    proposals.append((score, -index, index, candidate, difference))
+    assign(proposals, used, matches)
+    return matches
+
+
+# ------------------------------------------
+# ✅ Applying matches
+# ------------------------------------------
+def post_differences(statement, matched_lines, options):
+    """One journal entry for the differences of matched_lines: bank against the difference account."""
+    difference_lines = [line for line in matched_lines if line.difference]
+    if not difference_lines:
+        return None
+    difference_account = ChartOfAccounts.objects.filter(code=options['DIFFERENCE_ACCOUNT']).first()
+    if difference_account is None:
+        raise StatementImportError(f"Difference account '{options['DIFFERENCE_ACCOUNT']}' does not exist.")
+
+    prefix = f"BR-{statement.pk}-"
+    sequence = JournalEntry.objects.filter(doc_num__startswith=prefix).count() + 1
+    # Created unposted, so the per-entry GL signal has nothing to do yet
+    entry = JournalEntry.objects.create(
+        doc_num=f"{prefix}{sequence:03d}",
+        posting_date=max(line.booking_date for line in difference_lines),
+        reference=f"Bank reconciliation {statement}"[:100],
+        currency_id=statement.currency_id or statement.bank_account.currency_id,
+        is_posted=False,
+    )
+    entry_lines = []
+    for line in difference_lines:
+        amount = abs(line.difference)
+        description = f"Statement line {line.line_number} {line.reference}".strip()[:255]
+        # More received (or less paid out) than booked debits the bank
+        bank_debit = line.difference > 0
+        entry_lines.append(JournalEntryLine(
+            journal_entry=entry, account_id=statement.bank_account_id, description=description,
+            debit_amount=amount if bank_debit else Decimal('0'), credit_amount=Decimal('0') if bank_debit else amount,
+        ))
+        entry_lines.append(JournalEntryLine(
+            journal_entry=entry, account=difference_account, description=description,
+            debit_amount=Decimal('0') if bank_debit else amount, credit_amount=amount if bank_debit else Decimal('0'),
+        ))
+        line.journal_entry = entry
+    JournalEntryLine.objects.bulk_create(entry_lines, batch_size=options['BATCH_SIZE'])
+    return entry
+
+
+def apply_matches(statement, lines, matches, options):
+    """Sets the match on lines, posts differences and returns the ids of the payments now reconciled."""
+    matched_lines = []
+    for index, (candidate, score, difference) in matches.items():
+        line = lines[index]
+        line.payment_id = candidate.payment_id
+        line.payment_line_id = candidate.payment_line_id
+        line.match_score = Decimal(str(round(score, 3)))
+        line.difference = difference
+        line.status = 'difference' if difference else 'matched'
+        matched_lines.append(line)
+    entry = post_differences(statement, matched_lines, options)
+
+    reconciled = {line.payment_id for line in matched_lines if line.payment_line_id is None}
+    return matched_lines, reconciled, entry
+
+
+def reconcile_split_payments(payment_ids):
+    """Payments among payment_ids whose every line now has a matched booking."""
+    if not payment_ids:
+        return set()
+    line_counts = dict(
+        PaymentLine.objects.filter(payment_id__in=payment_ids).values('payment_id').annotate(
+            count=Count('pk')).values_list('payment_id', 'count')
+    )
+    matched_counts = dict(
+        BankStatementLine.objects.filter(payment_line__payment_id__in=payment_ids).values('payment_line__payment_id').annotate(
+            count=Count('payment_line', distinct=True)).values_list('payment_line__payment_id', 'count')
+    )
+    return {payment_id for payment_id, count in line_counts.items() if matched_counts.get(payment_id) == count}
+
+
+def mark_reconciled(payment_ids, batch_size):
+    now = timezone.now()
+    for chunk in chunked(sorted(payment_ids), batch_size):
+        Payment.objects.filter(pk__in=chunk).update(is_reconciled=True, updated_at=now)
+
+
+class StatementRow:
+    """A parsed booking not written yet; matched the same way as a BankStatementLine."""
+    __slots__ = (
+        'line_number', 'booking_date', 'value_date', 'amount', 'reference', 'bank_reference', 'counterparty',
+        'description', 'status', 'payment_id', 'payment_line_id', 'match_score', 'difference', 'journal_entry',
+    )
+
+    def __init__(self, line_number, booking_date, value_date, amount, reference, bank_reference, counterparty, description):
+        self.line_number = line_number
+        self.booking_date = booking_date
+        self.value_date = value_date
+        self.amount = amount
+        self.reference = reference[:140]
+        self.bank_reference = bank_reference[:100]
+        self.counterparty = counterparty[:140]
+        self.description = description
+        self.status = 'unmatched'
+        self.payment_id = None
+        self.payment_line_id = None
+        self.match_score = Decimal('0')
+        self.difference = Decimal('0')
+        self.journal_entry = None
+
+
+def insert_rows(statement, rows, batch_size):
+    """
+    Writes the rows of statement with one executemany per batch. Building a
+    model instance per row and bulk_create's per-row SQL compilation would be
+    most of the time of a large import.
+    """
+    meta = BankStatementLine._meta
+    prepare = {
+        name: (lambda field: lambda value: field.get_db_prep_save(value, connection))(meta.get_field(name))
+        for name in ('booking_date', 'value_date', 'amount', 'match_score', 'difference')
+    }
+    # A statement spans few distinct dates
+    prepare['booking_date'] = lru_cache(maxsize=None)(prepare['booking_date'])
+    prepare['value_date'] = lru_cache(maxsize=None)(prepare['value_date'])
+    zero = prepare['amount'](Decimal('0'))
+    now = meta.get_field('created_at').get_db_prep_save(timezone.now(), connection)
+    columns = [
+        'created_at', 'updated_at', 'statement', 'line_number', 'booking_date', 'value_date', 'amount', 'reference',
+        'bank_reference', 'counterparty', 'description', 'status', 'payment', 'payment_line', 'match_score',
+        'difference', 'journal_entry',
+    ]
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(meta.db_table)} ({', '.join(quote(meta.get_field(name).column) for name in columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    with connection.cursor() as cursor:
+        for chunk in chunked(rows, batch_size):
+            cursor.executemany(sql, [(
+                now, now, statement.pk, row.line_number, prepare['booking_date'](row.booking_date),
+                prepare['value_date'](row.value_date), prepare['amount'](row.amount), row.reference,
+                row.bank_reference, row.counterparty, row.description, row.status, row.payment_id,
+                row.payment_line_id, prepare['match_score'](row.match_score) if row.match_score else zero,
+                prepare['difference'](row.difference) if row.difference else zero,
+                row.journal_entry.pk if row.journal_entry else None,
+            ) for row in chunk])
+
+
+def finish_reconciliation(statement, matched_lines, reconciled, entry, options):
+    split_payment_ids = {line.payment_id for line in matched_lines if line.payment_line_id}
+    reconciled |= reconcile_split_payments(split_payment_ids)
+    mark_reconciled(reconciled, options['BATCH_SIZE'])
+    if entry is not None:
+        bulk_post_to_general_ledger([entry.pk], batch_size=options['BATCH_SIZE'])
+    statement.matched_count = statement.lines.exclude(status='unmatched').count()
+    statement.updated_at = timezone.now()
+    statement.save(update_fields=['matched_count', 'updated_at'])
+    return len(reconciled)
+
+
+def get_candidates_for(lines, statement, options):
+    if not lines:
+        return []
+    window = timedelta(days=options['DATE_WINDOW_DAYS'])
+    dates = [line.booking_date for line in lines]
+    return get_candidates(min(dates) - window, max(dates) + window, statement.currency_id)
+
+
+# ------------------------------------------
+# ✅ Entry points
+# ------------------------------------------
+def import_statement(statement, file, filename=None):
+    """
+    Reads a statement file into statement (an unsaved BankStatement with its bank
+    account set), skips bookings whose bank reference this account imported before,
+    matches the rest and saves everything in one transaction. Raises
+    StatementImportError, with nothing written, when the file cannot be read.
+    Returns the number of payments reconciled.
+    """
+    options = get_reconciliation_settings()
+    filename = filename or statement.file_name
+    statement.file_name = statement.file_name or filename or ''
+    statement.statement_format = statement.statement_format or detect_format(file, filename)
+
+    header = {}
+    lines = []
+    with transaction.atomic():
+        for rows in chunked(parse_statement(file, filename, statement.statement_format, header), options['BATCH_SIZE']):
+            references = {row['bank_reference'] for row in rows if row['bank_reference']}
+            known = set(BankStatementLine.objects.filter(
+                statement__bank_account_id=statement.bank_account_id, bank_reference__in=references,
+            ).values_list('bank_reference', flat=True)) if references else set()
+            for row in rows:
+                if row['bank_reference'] and row['bank_reference'] in known:
+                    statement.skipped_count += 1
+                    continue
+                known.add(row['bank_reference'])
+                lines.append(StatementRow(len(lines) + 1, **row))
+
+        statement.statement_reference = statement.statement_reference or header.get('reference', '')[:100]
+        statement.opening_balance = header.get('opening_balance')
+        statement.closing_balance = header.get('closing_balance')
+        if statement.currency_id is None:
+            currency_code = header.get('currency')
+            statement.currency = (
+                Currency.objects.filter(code=currency_code).first() if currency_code else None
+            ) or statement.bank_account.currency
+        statement.line_count = len(lines)
+        statement.save()
+
+        matches = match_lines(lines, get_candidates_for(lines, statement, options), options)
+        matched_lines, reconciled, entry = apply_matches(statement, lines, matches, options)
+        insert_rows(statement, lines, options['BATCH_SIZE'])
+        return finish_reconciliation(statement, matched_lines, reconciled, entry, options)
+
+
+def reconcile_statement(statement):
+    """
+    Matches the still unmatched bookings of statement again, e.g. after the
+    missing payments were entered. Returns the number of payments reconciled.
+    """
+    options = get_reconciliation_settings()
+    with transaction.atomic():
+        lines = list(statement.lines.filter(status='unmatched').order_by('line_number'))
+        matches = match_lines(lines, get_candidates_for(lines, statement, options), options)
+        matched_lines, reconciled, entry = apply_matches(statement, lines, matches, options)
+        if matched_lines:
+            now = timezone.now()
+            for line in matched_lines:
+                line.updated_at = now
+            BankStatementLine.objects.bulk_update(matched_lines, [
+                'payment', 'payment_line', 'match_score', 'difference', 'status', 'journal_entry', 'updated_at',
+            ], batch_size=options['BATCH_SIZE'])
+        return finish_reconciliation(statement, matched_lines, reconciled, entry, options)
@@ -77,6 +77,9 @@ def register_sales_order_line_signals():
         """
         Update sales order totals when a line item is saved
         """
+        from Sales.utils import in_bulk_line_write
+        if in_bulk_line_write():  # bulk line writes set the totals once per order
+            return
         print(f"[SIGNAL] SalesOrderLine post_save called.")
         print(f"SalesOrderLine ID: {instance.id}, Order ID: {instance.order.id if instance.order else 'None'}")
         
@@ -91,6 +94,9 @@ def register_sales_order_line_signals():
         """
         Update sales order totals when a line item is deleted
         """
+        from Sales.utils import in_bulk_line_write
+        if in_bulk_line_write():  # bulk line writes set the totals once per order
+            return
         print(f"[SIGNAL] SalesOrderLine post_delete called.")
         
         if instance.order:
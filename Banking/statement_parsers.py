@@ -0,0 +1,348 @@
+"""
+Streaming readers for bank statement files.
+
+Each parser is a generator yielding one dict per booking (booking_date,
+value_date, amount, reference, bank_reference, counterparty, description) and
+fills the statement-level values it finds (reference, currency, opening and
+closing balance) into the header dict it is given. Files are read line by line
+(MT940), row by row (CSV/XLSX, through config.importers) or element by element
+(CAMT.053, with every entry cleared once read), so memory does not grow with
+the file beyond the bookings the caller keeps.
+"""
+import datetime
+import io
+import os
+import re
+from decimal import Decimal, InvalidOperation
+from xml.etree.ElementTree import iterparse
+
+from config.importers import BulkImportError, XLSX_EPOCH, read_rows
+
+CSV_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d.%m.%Y', '%d-%m-%Y', '%Y%m%d')
+
+# Column aliases of CSV/XLSX statements, after config.importers.normalize_header
+CSV_COLUMNS = {
+    'booking_date': ('booking_date', 'date', 'transaction_date', 'posting_date'),
+    'value_date': ('value_date', 'valuta'),
+    'amount': ('amount', 'signed_amount'),
+    'credit': ('credit', 'credit_amount', 'deposit', 'paid_in'),
+    'debit': ('debit', 'debit_amount', 'withdrawal', 'paid_out'),
+    'reference': ('reference', 'ref', 'customer_reference', 'payment_reference'),
+    'bank_reference': ('bank_reference', 'transaction_id', 'bank_ref', 'id'),
+    'counterparty': ('counterparty', 'name', 'payee', 'payer', 'beneficiary'),
+    'description': ('description', 'narrative', 'details', 'remarks', 'memo'),
+    'currency': ('currency', 'ccy'),
+}
+
+MT940_TAG = re.compile(r'^:(\d{2}[A-Z]?):(.*)$')
+MT940_BALANCE = re.compile(r'^([CD])(\d{6})([A-Z]{3})(\d+(?:,\d*)?)$')
+MT940_LINE = re.compile(
+    r'^(?P<value_date>\d{6})(?P<entry_date>\d{4})?(?P<mark>R?[CD])(?P<funds>[A-Z])?'
+    r'(?P<amount>\d+(?:,\d*)?)(?P<type>[NSF][A-Z0-9]{3})(?P<reference>.*?)(?://(?P<bank_reference>.*))?$'
+)
+MT940_SUBFIELD = re.compile(r'\?\d{2}')
+
+
+class StatementImportError(BulkImportError):
+    """Raised when a statement file cannot be read; nothing of it is imported."""
+
+
+def detect_format(file, filename):
+    """'csv', 'mt940' or 'camt' from the extension, sniffing the content of ambiguous files."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in ('.csv', '.xlsx'):
+        return 'csv'
+    if extension in ('.sta', '.mt940', '.940', '.swi'):
+        return 'mt940'
+    if extension in ('.xml', '.camt', '.053'):
+        return 'camt'
+    head = file.read(512)
+    file.seek(0)
+    text = head.decode('utf-8', errors='ignore').lstrip('﻿ \r\n')
+    if text.startswith('<'):
+        return 'camt'
+    if ':20:' in text or text.startswith('{1:'):
+        return 'mt940'
+    return 'csv'
+
+
+def parse_statement(file, filename, statement_format, header):
+    parsers = {'csv': parse_csv, 'mt940': parse_mt940, 'camt': parse_camt}
+    if statement_format not in parsers:
+        raise StatementImportError(f"Unsupported statement format '{statement_format}'.")
+    return parsers[statement_format](file, filename, header)
+
+
+# ------------------------------------------
+# ✅ Values
+# ------------------------------------------
+def parse_amount(value, decimal_comma=False):
+    text = str(value).strip().replace(' ', '')
+    text = text.replace('.', '').replace(',', '.') if decimal_comma else text.replace(',', '')
+    negative = text.startswith('(') and text.endswith(')')
+    try:
+        amount = Decimal(text.strip('()'))
+    except InvalidOperation:
+        raise StatementImportError(f"'{value}' is not an amount")
+    return round(-amount if negative else amount, 2)
+
+
+def parse_date(value):
+    text = str(value).strip()
+    if re.fullmatch(r'\d+(\.\d+)?', text) and len(text) < 8:
+        # XLSX stores dates as serial day numbers
+        return XLSX_EPOCH + datetime.timedelta(days=float(text))
+    if len(text) == 10 and text[4] == '-':
+        try:
+            return datetime.date.fromisoformat(text)
+        except ValueError:
+            pass
+    for date_format in CSV_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text[:19], date_format).date()
+        except ValueError:
+            continue
+    try:
+        return datetime.date.fromisoformat(text[:10])
+    except ValueError:
+        raise StatementImportError(f"'{value}' is not a date")
+
+
+def get_column(row, name):
+    for alias in CSV_COLUMNS[name]:
+        value = row.get(alias)
+        if value not in (None, ''):
+            return str(value).strip()
+    return ''
+
+
+# ------------------------------------------
+# ✅ CSV / XLSX
+# ------------------------------------------
+def parse_csv(file, filename, header):
+    """
+    Rows with a booking date and either a signed amount or separate credit/debit
+    columns. A currency column, if any, sets the statement currency.
+    """
+    if os.path.splitext(filename or '')[1].lower() not in ('.csv', '.xlsx'):
+        filename = 'statement.csv'
+    for row_number, row in enumerate(read_rows(file, filename), start=2):
+        try:
+            booking_date = get_column(row, 'booking_date')
+            if not booking_date:
+                raise StatementImportError("a booking date is required")
+            if get_column(row, 'amount'):
+                amount = parse_amount(get_column(row, 'amount'))
+            elif get_column(row, 'credit') or get_column(row, 'debit'):
+                amount = parse_amount(get_column(row, 'credit') or 0) - parse_amount(get_column(row, 'debit') or 0)
+            else:
+                raise StatementImportError("an amount, credit or debit is required")
+            value_date = get_column(row, 'value_date')
+            line = {
+                'booking_date': parse_date(booking_date),
+                'value_date': parse_date(value_date) if value_date else None,
+                'amount': amount,
+                'reference': get_column(row, 'reference'),
+                'bank_reference': get_column(row, 'bank_reference'),
+                'counterparty': get_column(row, 'counterparty'),
+                'description': get_column(row, 'description'),
+            }
+        except StatementImportError as error:
+            raise StatementImportError(f"Row {row_number}: {error}")
+        if not header.get('currency') and get_column(row, 'currency'):
+            header['currency'] = get_column(row, 'currency').upper()
+        yield line
+
+
+# ------------------------------------------
+# ✅ MT940
+# ------------------------------------------
+def mt940_date(text):
+    return datetime.date(2000 + int(text[:2]), int(text[2:4]), int(text[4:6]))
+
+
+def parse_mt940(file, filename, header):
+    """
+    SWIFT MT940: :61: bookings with the :86: information that follows them.
+    Several statements in one file are read as one; the first opening and the
+    last closing balance are kept.
+    """
+    line, tag, line_number = None, None, 0
+    for line_number, raw in enumerate(io.TextIOWrapper(file, encoding='utf-8-sig', errors='replace'), start=1):
+        text = raw.rstrip('\r\n')
+        match = MT940_TAG.match(text)
+        if not match:
+            if text.startswith('-}') or text.startswith('{') or not text.strip():
+                continue
+            # Continuation of the previous field
+            if line is not None and tag in ('61', '86'):
+                line['description'] = f"{line['description']} {clean_mt940_description(text)}".strip()
+            continue
+
+        tag, value = match.groups()
+        if tag == '61':
+            if line is not None:
+                yield line
+            line = parse_mt940_line(value, line_number)
+        elif tag == '86':
+            if line is not None:
+                line['description'] = f"{line['description']} {clean_mt940_description(value)}".strip()
+        elif tag == '20':
+            header.setdefault('reference', value.strip())
+        elif tag in ('60F', '60M', '62F', '62M'):
+            balance = MT940_BALANCE.match(value.strip())
+            if not balance:
+                raise StatementImportError(f"Line {line_number}: unreadable balance '{value}'")
+            mark, _, currency, amount = balance.groups()
+            amount = parse_amount(amount, decimal_comma=True)
+            amount = -amount if mark == 'D' else amount
+            header.setdefault('currency', currency)
+            if tag.startswith('60'):
+                header.setdefault('opening_balance', amount)
+            else:
+                header['closing_balance'] = amount
+    if line is not None:
+        yield line
+    elif not line_number:
+        raise StatementImportError("The MT940 file is empty.")
+
+
+def parse_mt940_line(value, line_number):
+    match = MT940_LINE.match(value.strip())
+    if not match:
+        raise StatementImportError(f"Line {line_number}: unreadable :61: booking '{value}'")
+    value_date = mt940_date(match['value_date'])
+    booking_date = value_date
+    if match['entry_date']:
+        month, day = int(match['entry_date'][:2]), int(match['entry_date'][2:])
+        year = value_date.year
+        # The entry date has no year; it may fall across the turn of the year from the value date
+        if month == 12 and value_date.month == 1:
+            year -= 1
+        elif month == 1 and value_date.month == 12:
+            year += 1
+        booking_date = datetime.date(year, month, day)
+    amount = parse_amount(match['amount'], decimal_comma=True)
+    # C credit, D debit; RC / RD reverse them
+    if match['mark'] in ('D', 'RC'):
+        amount = -amount
+    reference = match['reference'].strip()
+    return {
+        'booking_date': booking_date,
+        'value_date': value_date,
+        'amount': amount,
+        'reference': '' if reference == 'NONREF' else reference,
+        'bank_reference': (match['bank_reference'] or '').strip(),
+        'counterparty': '',
+        'description': '',
+    }
+
+
+def clean_mt940_description(text):
+    return re.sub(r'\s+', ' ', MT940_SUBFIELD.sub(' ', text)).strip()
+
+
+# ------------------------------------------
+# ✅ CAMT.053
+# ------------------------------------------
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def find(element, *path):
+    """Child at path of local names, ignoring namespaces, or None."""
+    for name in path:
+        if element is None:
+            return None
+        element = next((child for child in element if local_name(child.tag) == name), None)
+    return element
+
+
+def find_text(element, *path):
+    found = find(element, *path)
+    return (found.text or '').strip() if found is not None else ''
+
+
+def find_date(element, name):
+    text = find_text(element, name, 'Dt') or find_text(element, name, 'DtTm')[:10]
+    return datetime.date.fromisoformat(text) if text else None
+
+
+def parse_camt(file, filename, header):
+    """ISO 20022 camt.053 statements: one booking per Ntry, balances from Bal (OPBD/CLBD)."""
+    path = []
+    entry_count = 0
+    try:
+        for event, element in iterparse(file, events=('start', 'end')):
+            name = local_name(element.tag)
+            if event == 'start':
+                path.append(name)
+                continue
+            path.pop()
+            parent = path[-1] if path else None
+            if name == 'Ntry':
+                entry_count += 1
+                yield parse_camt_entry(element, entry_count)
+                element.clear()
+            elif name == 'Bal':
+                code = find_text(element, 'Tp', 'CdOrPrtry', 'Cd')
+                amount_element = find(element, 'Amt')
+                if code in ('OPBD', 'CLBD') and amount_element is not None:
+                    amount = parse_amount(amount_element.text)
+                    if find_text(element, 'CdtDbtInd') == 'DBIT':
+                        amount = -amount
+                    header.setdefault('currency', amount_element.get('Ccy'))
+                    if code == 'OPBD':
+                        header.setdefault('opening_balance', amount)
+                    else:
+                        header['closing_balance'] = amount
+                element.clear()
+            elif name == 'Id' and parent == 'Stmt':
+                header.setdefault('reference', (element.text or '').strip())
+            elif name == 'Ccy' and parent == 'Acct':
+                header.setdefault('currency', (element.text or '').strip())
+    except SyntaxError as error:
+        raise StatementImportError(f"The CAMT file is not valid XML: {error}")
+    if not entry_count and 'reference' not in header:
+        raise StatementImportError("The file holds no camt.053 statement.")
+
+
+def parse_camt_entry(entry, entry_number):
+    amount_element = find(entry, 'Amt')
+    if amount_element is None:
+        raise StatementImportError(f"Entry {entry_number}: the amount is missing")
+    amount = parse_amount(amount_element.text)
+    direction = find_text(entry, 'CdtDbtInd')
+    if direction == 'DBIT':
+        amount = -amount
+    if find_text(entry, 'RvslInd').lower() == 'true':
+        amount = -amount
+    booking_date = find_date(entry, 'BookgDt') or find_date(entry, 'ValDt')
+    if booking_date is None:
+        raise StatementImportError(f"Entry {entry_number}: the booking date is missing")
+
+    details = find(entry, 'NtryDtls', 'TxDtls')
+    reference = ''
+    counterparty = ''
+    description = find_text(entry, 'AddtlNtryInf')
+    if details is not None:
+        reference = find_text(details, 'Refs', 'EndToEndId')
+        if reference == 'NOTPROVIDED':
+            reference = ''
+        reference = reference or find_text(details, 'RmtInf', 'Strd', 'CdtrRefInf', 'Ref')
+        party = 'Dbtr' if direction == 'CRDT' else 'Cdtr'
+        counterparty = find_text(details, 'RltdPties', party, 'Nm') or find_text(details, 'RltdPties', party, 'Pty', 'Nm')
+        remittance_info = find(details, 'RmtInf')
+        remittance = ' '.join(
+            (child.text or '').strip() for child in remittance_info if local_name(child.tag) == 'Ustrd'
+        ) if remittance_info is not None else ''
+        description = ' '.join(part for part in (remittance, description) if part)
+    return {
+        'booking_date': booking_date,
+        'value_date': find_date(entry, 'ValDt'),
+        'amount': amount,
+        'reference': reference,
+        'bank_reference': find_text(entry, 'AcctSvcrRef') or (find_text(details, 'Refs', 'AcctSvcrRef') if details is not None else ''),
+        'counterparty': counterparty,
+        'description': description,
+    }
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import BusinessPartner, BusinessPartnerGroup
+from .models import BusinessPartner, BusinessPartnerGroup, OpenItem
 
 # Register BusinessPartner model
 @admin.register(BusinessPartner)
@@ -9,9 +9,25 @@ class BusinessPartnerAdmin(admin.ModelAdmin):
     search_fields = ('code', 'name', 'email', 'phone')
     ordering = ('code',)
     fields = ('code', 'name', 'bp_type', 'group', 'currency', 'active', 'credit_limit', 'balance', 'payment_terms', 'phone', 'mobile', 'email', 'website', 'latitude', 'longitude', 'google_place_id')
+    readonly_fields = ('balance',)  # kept by the open items ledger
 
 # Register BusinessPartnerGroup model if you want to manage groups in the admin
 @admin.register(BusinessPartnerGroup)
 class BusinessPartnerGroupAdmin(admin.ModelAdmin):
     list_display = ('name', 'description')
     search_fields = ('name',)
+
+
+@admin.register(OpenItem)
+class OpenItemAdmin(admin.ModelAdmin):
+    list_display = ('document_number', 'document_type', 'business_partner', 'side', 'document_date', 'due_date', 'amount', 'open_amount', 'is_open')
+    list_filter = ('side', 'document_type', 'is_open')
+    search_fields = ('document_number', 'business_partner__code', 'business_partner__name')
+    list_select_related = ('business_partner',)
+    date_hierarchy = 'due_date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
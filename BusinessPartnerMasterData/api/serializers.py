@@ -6,7 +6,8 @@ from ..models import (
     FinancialInformation,
     ContactInformation,
     Address,
-    ContactPerson
+    ContactPerson,
+    OpenItem
 )
 
 class BusinessPartnerGroupSerializer(serializers.ModelSerializer):
@@ -41,6 +42,7 @@ class FinancialInformationSerializer(serializers.ModelSerializer):
             'id', 'business_partner', 'credit_limit', 'balance', 
             'payment_terms', 'payment_terms_name'
         ]
+        read_only_fields = ['balance']
 
 class ContactInformationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -97,4 +99,15 @@ class BusinessPartnerCreateUpdateSerializer(serializers.ModelSerializer):
             'default_shipping_state', 'default_shipping_zip_code', 'default_shipping_country',
             'default_contact_name', 'default_contact_position', 'default_contact_phone',
             'default_contact_mobile', 'default_contact_email', 'latitude','longitude', 'google_place_id'
-        ]
\ No newline at end of file
+        ]
+        read_only_fields = ['balance']  # kept by the open items ledger
+
+class OpenItemSerializer(serializers.ModelSerializer):
+    document_type_display = serializers.CharField(source='get_document_type_display', read_only=True)
+
+    class Meta:
+        model = OpenItem
+        fields = [
+            'id', 'side', 'document_type', 'document_type_display', 'document_id', 'document_number',
+            'document_date', 'due_date', 'amount', 'open_amount', 'is_open'
+        ]
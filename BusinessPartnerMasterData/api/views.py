@@ -1,13 +1,14 @@
 # BusinessPartnerMasterData/api/views.py
 import random
 import string
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
+from django.utils.dateparse import parse_date
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -27,8 +28,10 @@ from .serializers import (
     FinancialInformationSerializer,
     ContactInformationSerializer,
     AddressSerializer,
-    ContactPersonSerializer
+    ContactPersonSerializer,
+    OpenItemSerializer
 )
+from ..open_items import get_aging
 from .permissions import BusinessPartnerHasDynamicModelPermission
 
 class BusinessPartnerViewSet(viewsets.ModelViewSet):
@@ -145,6 +148,58 @@ class BusinessPartnerViewSet(viewsets.ModelViewSet):
         serializer = ContactPersonSerializer(contact_persons, many=True)
         return Response(serializer.data)
 
+    @swagger_auto_schema(
+        operation_summary="Get business partner open items",
+        operation_description="Returns the open (unsettled) posted documents of a business partner by due date. "
+                              "Pass all=true to include settled ones.",
+        manual_parameters=[
+            openapi.Parameter('all', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, required=False),
+        ],
+        tags=['Business Partner Master']
+    )
+    @action(detail=True, methods=['get'])
+    def open_items(self, request, pk=None):
+        """
+        Retrieve the open items behind a business partner's balance
+        """
+        business_partner = self.get_object()
+        items = business_partner.open_items.all()
+        if request.query_params.get('all', '').lower() not in ('1', 'true', 'yes'):
+            items = items.filter(is_open=True)
+        page = self.paginate_queryset(items)
+        if page is not None:
+            return self.get_paginated_response(OpenItemSerializer(page, many=True).data)
+        return Response(OpenItemSerializer(items, many=True).data)
+
+    @swagger_auto_schema(
+        operation_summary="Get AR/AP aging",
+        operation_description="Returns open amounts per business partner in buckets of days overdue "
+                              "(settings.OPEN_ITEMS AGING_BUCKETS), read from the open items sub-ledger.",
+        manual_parameters=[
+            openapi.Parameter('side', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['AR', 'AP'], required=False),
+            openapi.Parameter('as_of', openapi.IN_QUERY, type=openapi.TYPE_STRING, format='date', required=False),
+        ],
+        tags=['Business Partner Master']
+    )
+    @action(detail=False, methods=['get'])
+    def aging(self, request):
+        """
+        Accounts receivable (side=AR, default) or payable (side=AP) aging per business partner
+        """
+        side = request.query_params.get('side', 'AR').upper()
+        if side not in ('AR', 'AP'):
+            return Response({'side': ['Must be AR or AP.']}, status=status.HTTP_400_BAD_REQUEST)
+        as_of = None
+        if request.query_params.get('as_of'):
+            as_of = parse_date(request.query_params['as_of'])
+            if as_of is None:
+                return Response({'as_of': ['Use the YYYY-MM-DD format.']}, status=status.HTTP_400_BAD_REQUEST)
+        rows = get_aging(side, as_of)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(rows))
+
 class BusinessPartnerGroupViewSet(viewsets.ModelViewSet):
     """
     API endpoint for managing Business Partner Groups.
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BusinesspartnermasterdataConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'BusinessPartnerMasterData'
+
+    def ready(self):
+        import BusinessPartnerMasterData.signals  # Ensure signals are loaded when the app starts
@@ -29,8 +29,9 @@ class BusinessPartnerForm(forms.ModelForm):
     )
     balance = forms.DecimalField(
         required=False, 
+        disabled=True,
         widget=forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
-        help_text="Current balance"
+        help_text="Current balance, kept from posted invoices, returns and payments"
     )
     payment_terms = forms.ModelChoiceField(
         queryset=PaymentTerms.objects.all(),
@@ -326,7 +327,6 @@ class BusinessPartnerForm(forms.ModelForm):
             
             if not created:
                 financial_info.credit_limit = self.cleaned_data.get('credit_limit') or 0
-                financial_info.balance = self.cleaned_data.get('balance') or 0
                 financial_info.payment_terms = self.cleaned_data.get('payment_terms')
                 financial_info.save()
             
@@ -431,6 +431,12 @@ class FinancialInformationForm(forms.ModelForm):
         required=False,
         widget=forms.Select(attrs={'class': 'form-control'})
     )
+    balance = forms.DecimalField(
+        required=False,
+        disabled=True,
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+        help_text="Kept from posted invoices, returns and payments"
+    )
     
     class Meta:
         model = FinancialInformation
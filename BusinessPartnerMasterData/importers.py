@@ -0,0 +1,39 @@
+from config.importers import BulkImporter, register_importer
+from BusinessPartnerMasterData.models import BusinessPartnerGroup, BusinessPartner
+from global_settings.models import Currency, PaymentTerms
+
+
+@register_importer
+class BusinessPartnerGroupImporter(BulkImporter):
+    name = 'business_partner_groups'
+    verbose_name = "Business Partner Groups"
+    model = BusinessPartnerGroup
+    fields = {'name': 'name', 'description': 'description'}
+    required = ('name',)
+    key_field = 'name'
+
+
+@register_importer
+class BusinessPartnerImporter(BulkImporter):
+    """Customers and suppliers; group, currency and payment terms are given by name/code."""
+    name = 'business_partners'
+    verbose_name = "Business Partners"
+    model = BusinessPartner
+    fields = {
+        field: field for field in (
+            'code', 'name', 'bp_type', 'group', 'currency', 'payment_terms', 'active', 'credit_limit',
+            'phone', 'mobile', 'email', 'website', 'federal_tax_id',
+            'default_billing_street', 'default_billing_city', 'default_billing_state',
+            'default_billing_zip_code', 'default_billing_country',
+            'default_shipping_street', 'default_shipping_city', 'default_shipping_state',
+            'default_shipping_zip_code', 'default_shipping_country',
+            'default_contact_name', 'default_contact_position', 'default_contact_phone',
+            'default_contact_mobile', 'default_contact_email',
+        )
+    }
+    required = ('code', 'name')
+    foreign_keys = {
+        'group': (BusinessPartnerGroup, 'name'),
+        'currency': (Currency, 'code'),
+        'payment_terms': (PaymentTerms, 'name'),
+    }
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from BusinessPartnerMasterData.open_items import rebuild_open_items
+
+
+class Command(BaseCommand):
+    help = "Rebuild the business partner open items and balances from invoices, orders, returns and payments"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help="Documents read and items written per batch.")
+
+    def handle(self, *args, **options):
+        written = rebuild_open_items(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} open items and all business partner balances."))
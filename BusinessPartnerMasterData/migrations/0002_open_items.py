@@ -0,0 +1,41 @@
+# Generated by Django 4.2.20 on 2026-10-19 14:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BusinessPartnerMasterData', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpenItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('side', models.CharField(choices=[('AR', 'Receivable'), ('AP', 'Payable')], max_length=2, verbose_name='Side')),
+                ('document_type', models.CharField(choices=[('SO', 'Sales Order'), ('AR', 'AR Invoice'), ('RET', 'Return'), ('AP', 'AP Invoice'), ('GR', 'Goods Return'), ('PAY', 'Payment on Account')], max_length=3, verbose_name='Document Type')),
+                ('document_id', models.PositiveBigIntegerField(verbose_name='Document ID')),
+                ('document_number', models.CharField(blank=True, max_length=50, verbose_name='Document Number')),
+                ('document_date', models.DateField(verbose_name='Document Date')),
+                ('due_date', models.DateField(verbose_name='Due Date')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='Amount')),
+                ('open_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='Open Amount')),
+                ('is_open', models.BooleanField(default=True, verbose_name='Is Open')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('business_partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='open_items', to='BusinessPartnerMasterData.businesspartner', verbose_name='Business Partner')),
+            ],
+            options={
+                'verbose_name': 'Open Item',
+                'verbose_name_plural': 'Open Items',
+                'ordering': ['due_date', 'id'],
+                'indexes': [models.Index(fields=['business_partner', 'is_open', 'due_date'], name='bp_open_item_partner_idx'), models.Index(fields=['side', 'is_open', 'due_date'], name='bp_open_item_aging_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='openitem',
+            constraint=models.UniqueConstraint(fields=('document_type', 'document_id'), name='bp_open_item_unique_document'),
+        ),
+    ]
@@ -9,6 +9,10 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.db.models import Sum
 
+def get_fields_without_balance(instance):
+    return [field.name for field in instance._meta.concrete_fields if not field.primary_key and field.name != 'balance']
+
+
 class BusinessPartnerGroup(models.Model):
     name = models.CharField(_("Name"), max_length=100, unique=True)
     description = models.TextField(_("Description"), blank=True)
@@ -220,6 +224,9 @@ class BusinessPartner(models.Model):
         ).first()
     
     def save(self, *args, **kwargs):
+        # balance is kept by the open items ledger, an update never writes it back
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = get_fields_without_balance(self)
         # Create or update related models if they don't exist
         super().save(*args, **kwargs)
         
@@ -228,7 +235,7 @@ class BusinessPartner(models.Model):
             business_partner=self,
             defaults={
                 'credit_limit': self.credit_limit or 0,
-                'balance': self.balance or 0,
+                'balance': lambda: BusinessPartner.objects.filter(pk=self.pk).values_list('balance', flat=True).first() or 0,
                 'payment_terms': self.payment_terms
             }
         )
@@ -236,7 +243,6 @@ class BusinessPartner(models.Model):
         if not created:
             # Update existing financial info
             financial_info.credit_limit = self.credit_limit or 0
-            financial_info.balance = self.balance or 0
             financial_info.payment_terms = self.payment_terms
             financial_info.save()
         
@@ -347,16 +353,17 @@ class FinancialInformation(models.Model):
         ]
         
     def save(self, *args, **kwargs):
+        # balance is kept by the open items ledger, an update never writes it back
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = get_fields_without_balance(self)
         # Sync with BusinessPartner model
         super().save(*args, **kwargs)
         bp = self.business_partner
         bp.credit_limit = self.credit_limit
-        bp.balance = self.balance
         bp.payment_terms = self.payment_terms
         # Use update to avoid recursive save
         BusinessPartner.objects.filter(pk=bp.pk).update(
             credit_limit=self.credit_limit,
-            balance=self.balance,
             payment_terms=self.payment_terms
         )
 
@@ -499,4 +506,50 @@ def ensure_single_default_contact(sender, instance, **kwargs):
         ContactPerson.objects.filter(
             business_partner=instance.business_partner,
             is_default=True
-        ).exclude(pk=instance.pk).update(is_default=False)
\ No newline at end of file
+        ).exclude(pk=instance.pk).update(is_default=False)
+
+class OpenItem(models.Model):
+    """
+    One posted document in a business partner's open items sub-ledger, kept by
+    BusinessPartnerMasterData/open_items.py. open_amount is signed: invoices and
+    orders add to the balance, returns and payments on account take from it.
+    The sum of a partner's open amounts is BusinessPartner.balance.
+    """
+    SIDE_CHOICES = [
+        ('AR', _('Receivable')),
+        ('AP', _('Payable')),
+    ]
+    DOCUMENT_TYPES = [
+        ('SO', _('Sales Order')),
+        ('AR', _('AR Invoice')),
+        ('RET', _('Return')),
+        ('AP', _('AP Invoice')),
+        ('GR', _('Goods Return')),
+        ('PAY', _('Payment on Account')),
+    ]
+    business_partner = models.ForeignKey(BusinessPartner, on_delete=models.CASCADE, related_name='open_items', verbose_name=_("Business Partner"))
+    side = models.CharField(_("Side"), max_length=2, choices=SIDE_CHOICES)
+    document_type = models.CharField(_("Document Type"), max_length=3, choices=DOCUMENT_TYPES)
+    document_id = models.PositiveBigIntegerField(_("Document ID"))
+    document_number = models.CharField(_("Document Number"), max_length=50, blank=True)
+    document_date = models.DateField(_("Document Date"))
+    due_date = models.DateField(_("Due Date"))
+    amount = models.DecimalField(_("Amount"), max_digits=18, decimal_places=2, default=0)
+    open_amount = models.DecimalField(_("Open Amount"), max_digits=18, decimal_places=2, default=0)
+    is_open = models.BooleanField(_("Is Open"), default=True)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Open Item")
+        verbose_name_plural = _("Open Items")
+        ordering = ['due_date', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['document_type', 'document_id'], name='bp_open_item_unique_document'),
+        ]
+        indexes = [
+            models.Index(fields=['business_partner', 'is_open', 'due_date'], name='bp_open_item_partner_idx'),
+            models.Index(fields=['side', 'is_open', 'due_date'], name='bp_open_item_aging_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_document_type_display()} {self.document_number or self.document_id}: {self.open_amount}"
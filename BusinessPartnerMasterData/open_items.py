@@ -0,0 +1,278 @@
+"""
+Open items sub-ledger.
+
+Every posted receivable or payable document of a business partner has one
+OpenItem holding its signed open amount. The item is rewritten by the document's
+signals (BusinessPartnerMasterData/signals/open_item_signals.py) in the same
+transaction as the document, and the difference is added to
+BusinessPartner.balance and FinancialInformation.balance with F() updates, so
+the balance is always the sum of the partner's open items:
+
+    SO   SalesOrder, payments linked to the order settle it through due_amount
+    AR   ARInvoice not raised from a sales order (those are carried by the order)
+    RET  Return, a credit on the customer's account
+    AP   APInvoice
+    GR   GoodsReturn, a debit on the vendor's account
+    PAY  Payment without a sales order, cash received or paid on account
+
+Draft and cancelled documents are not posted. Credit-limit checks read the
+partner row only, and the aging report groups indexed open items by due date.
+Settings come from settings.OPEN_ITEMS; rebuild_open_items repairs the ledger
+after bulk changes that bypass signals.
+"""
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .models import BusinessPartner, FinancialInformation, OpenItem
+
+DEFAULT_SETTINGS = {
+    'CHECK_CREDIT_LIMIT': True,     # a credit limit of 0 means no limit
+    'AGING_BUCKETS': [30, 60, 90],  # days overdue, the last bucket is open-ended
+}
+
+DOCUMENT_MODELS = {
+    'SO': 'Sales.SalesOrder',
+    'AR': 'Sales.ARInvoice',
+    'RET': 'Sales.Return',
+    'AP': 'Purchase.APInvoice',
+    'GR': 'Purchase.GoodsReturn',
+    'PAY': 'Banking.Payment',
+}
+
+UNPOSTED_STATUSES = ('Draft', 'Cancelled')
+
+CENT = Decimal('0.01')
+
+
+class CreditLimitExceeded(ValidationError):
+    pass
+
+
+def get_open_item_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'OPEN_ITEMS', {})}
+
+
+def get_document_model(document_type):
+    return apps.get_model(DOCUMENT_MODELS[document_type])
+
+
+def to_cents(value):
+    return (value or Decimal('0')).quantize(CENT)
+
+
+# ------------------------------------------
+# Document -> open item
+# ------------------------------------------
+def get_open_item_values(document_type, document, payment_days=None):
+    """
+    Field values of document's open item, or None when it is not posted.
+    payment_days maps partner ids to their payment terms days for sales orders,
+    which carry no due date; it is read per order when not given.
+    """
+    if document_type == 'PAY':
+        if document.sales_order_id:
+            return None
+        return {
+            'business_partner_id': document.business_partner_id,
+            'side': 'AR' if document.payment_type == 'incoming' else 'AP',
+            'document_number': document.doc_num,
+            'document_date': document.payment_date,
+            'due_date': document.payment_date,
+            'amount': -to_cents(document.amount),
+            'open_amount': -to_cents(document.amount),
+        }
+
+    if document.status in UNPOSTED_STATUSES:
+        return None
+    if document_type == 'AR' and document.sales_order_id:
+        return None
+
+    sign = -1 if document_type in ('RET', 'GR') else 1
+    partner_id = document.vendor_id if document_type in ('AP', 'GR') else document.customer_id
+    due_date = getattr(document, 'due_date', None)
+    if document_type == 'SO':
+        if payment_days is None:
+            payment_days = dict(
+                BusinessPartner.objects.filter(pk=partner_id).values_list('pk', 'payment_terms__days')
+            )
+        due_date = document.document_date + datetime.timedelta(days=payment_days.get(partner_id) or 0)
+    payable = to_cents(document.payable_amount)
+    return {
+        'business_partner_id': partner_id,
+        'side': 'AP' if document_type in ('AP', 'GR') else 'AR',
+        'document_number': getattr(document, 'document_no', None) or f"{document_type}-{document.pk}",
+        'document_date': document.document_date,
+        'due_date': due_date or document.document_date,
+        'amount': sign * payable,
+        'open_amount': sign * (payable - to_cents(document.paid_amount)),
+    }
+
+
+# ------------------------------------------
+# Posting
+# ------------------------------------------
+def adjust_balances(deltas):
+    """Adds {partner_id: delta} to the partners' balances with F() updates."""
+    for partner_id, delta in deltas.items():
+        if not delta:
+            continue
+        BusinessPartner.objects.filter(pk=partner_id).update(
+            balance=Coalesce(F('balance'), Value(Decimal('0'))) + delta
+        )
+        FinancialInformation.objects.filter(business_partner_id=partner_id).update(balance=F('balance') + delta)
+
+
+def post_open_item(document_type, document):
+    """
+    Writes document's open item and moves the change of its open amount into the
+    partner balances. Returns the item, or None when the document is not posted.
+    """
+    values = get_open_item_values(document_type, document)
+    with transaction.atomic():
+        item = OpenItem.objects.select_for_update().filter(
+            document_type=document_type, document_id=document.pk,
+        ).first()
+        deltas = defaultdict(Decimal)
+        if item is not None:
+            deltas[item.business_partner_id] -= item.open_amount
+
+        if values is None:
+            if item is not None:
+                item.delete()
+                adjust_balances(deltas)
+            return None
+
+        values['is_open'] = values['open_amount'] != 0
+        if item is None:
+            item = OpenItem.objects.create(document_type=document_type, document_id=document.pk, **values)
+        elif any(getattr(item, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(item, field, value)
+            item.save()
+        else:
+            return item
+        deltas[item.business_partner_id] += item.open_amount
+        adjust_balances(deltas)
+    return item
+
+
+def remove_open_item(document_type, document_id):
+    with transaction.atomic():
+        item = OpenItem.objects.select_for_update().filter(
+            document_type=document_type, document_id=document_id,
+        ).first()
+        if item is not None:
+            item.delete()
+            adjust_balances({item.business_partner_id: -item.open_amount})
+
+
+def rebuild_open_items(batch_size=2000):
+    """
+    Recreates all open items from the documents and sets every partner's balance
+    to the sum of its items. Returns the number of items written.
+    """
+    payment_days = dict(BusinessPartner.objects.values_list('pk', 'payment_terms__days'))
+    written = 0
+    with transaction.atomic():
+        OpenItem.objects.all().delete()
+        for document_type in DOCUMENT_MODELS:
+            items = []
+            for document in get_document_model(document_type).objects.all().iterator(chunk_size=batch_size):
+                values = get_open_item_values(document_type, document, payment_days)
+                if values is None:
+                    continue
+                items.append(OpenItem(
+                    document_type=document_type, document_id=document.pk,
+                    is_open=values['open_amount'] != 0, **values,
+                ))
+                if len(items) >= batch_size:
+                    written += len(OpenItem.objects.bulk_create(items))
+                    items = []
+            written += len(OpenItem.objects.bulk_create(items))
+
+        zero = Value(Decimal('0'))
+        partner_totals = OpenItem.objects.filter(business_partner=OuterRef('pk')).values(
+            'business_partner',
+        ).annotate(total=Sum('open_amount')).values('total')
+        BusinessPartner.objects.update(
+            balance=Coalesce(Subquery(partner_totals, output_field=DecimalField()), zero)
+        )
+        financial_totals = OpenItem.objects.filter(business_partner=OuterRef('business_partner')).values(
+            'business_partner',
+        ).annotate(total=Sum('open_amount')).values('total')
+        FinancialInformation.objects.update(
+            balance=Coalesce(Subquery(financial_totals, output_field=DecimalField()), zero)
+        )
+    return written
+
+
+# ------------------------------------------
+# Credit limit
+# ------------------------------------------
+def check_credit_limit(order):
+    """
+    Raises CreditLimitExceeded when the customer's balance, including order,
+    is above its credit limit. A draft order is not posted yet, so its due
+    amount is added to the balance; a posted one is in it already.
+    """
+    if not get_open_item_settings()['CHECK_CREDIT_LIMIT'] or order.status == 'Cancelled':
+        return
+    partner = BusinessPartner.objects.filter(pk=order.customer_id).values('name', 'credit_limit', 'balance').first()
+    if not partner or not partner['credit_limit'] or partner['credit_limit'] <= 0:
+        return
+    exposure = partner['balance'] or Decimal('0')
+    if order.status == 'Draft':
+        exposure += to_cents(order.due_amount)
+    if exposure > partner['credit_limit']:
+        raise CreditLimitExceeded(
+            _("%(name)s would owe %(exposure)s, above the credit limit of %(limit)s.") % {
+                'name': partner['name'], 'exposure': exposure, 'limit': partner['credit_limit'],
+            },
+            code='credit_limit',
+        )
+
+
+# ------------------------------------------
+# Aging
+# ------------------------------------------
+def get_aging_buckets(as_of, buckets):
+    """[(name, Q on due_date)] for not yet due, each bucket of days overdue and the rest."""
+    result = [('current', Q(due_date__gte=as_of))]
+    previous = 0
+    for days in buckets:
+        result.append((f'days_{previous + 1}_{days}', Q(
+            due_date__lt=as_of - datetime.timedelta(days=previous),
+            due_date__gte=as_of - datetime.timedelta(days=days),
+        )))
+        previous = days
+    result.append((f'over_{previous}', Q(due_date__lt=as_of - datetime.timedelta(days=previous))))
+    return result
+
+
+def get_aging(side='AR', as_of=None, business_partner_ids=None):
+    """
+    Open amounts per business partner of side ('AR' or 'AP') in the aging
+    buckets of settings.OPEN_ITEMS, as of as_of (today by default).
+    """
+    as_of = as_of or timezone.localdate()
+    zero = Value(Decimal('0'))
+    annotations = {
+        name: Coalesce(Sum('open_amount', filter=condition), zero)
+        for name, condition in get_aging_buckets(as_of, get_open_item_settings()['AGING_BUCKETS'])
+    }
+    items = OpenItem.objects.filter(side=side, is_open=True)
+    if business_partner_ids is not None:
+        items = items.filter(business_partner_id__in=business_partner_ids)
+    return items.values(
+        'business_partner_id', 'business_partner__code', 'business_partner__name',
+    ).annotate(**annotations, total=Sum('open_amount')).order_by('business_partner__code')
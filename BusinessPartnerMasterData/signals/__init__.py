@@ -0,0 +1 @@
+from .open_item_signals import *
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from BusinessPartnerMasterData.open_items import post_open_item, remove_open_item
+
+# ------------------------------------------
+# ✅ Posted documents -> OpenItem and partner balance
+# ------------------------------------------
+OPEN_ITEM_SENDERS = {
+    'Sales.SalesOrder': 'SO',
+    'Sales.ARInvoice': 'AR',
+    'Sales.Return': 'RET',
+    'Purchase.APInvoice': 'AP',
+    'Purchase.GoodsReturn': 'GR',
+    'Banking.Payment': 'PAY',
+}
+
+
+def get_document_type(sender):
+    return OPEN_ITEM_SENDERS[sender._meta.label]
+
+
+@receiver(post_save, sender='Sales.SalesOrder')
+@receiver(post_save, sender='Sales.ARInvoice')
+@receiver(post_save, sender='Sales.Return')
+@receiver(post_save, sender='Purchase.APInvoice')
+@receiver(post_save, sender='Purchase.GoodsReturn')
+@receiver(post_save, sender='Banking.Payment')
+def update_open_item(sender, instance, **kwargs):
+    """
+    Rewrites the document's open item in the transaction that saved it; paid and
+    due amounts set by payments arrive here as saves of the document too.
+    """
+    post_open_item(get_document_type(sender), instance)
+
+
+@receiver(post_delete, sender='Sales.SalesOrder')
+@receiver(post_delete, sender='Sales.ARInvoice')
+@receiver(post_delete, sender='Sales.Return')
+@receiver(post_delete, sender='Purchase.APInvoice')
+@receiver(post_delete, sender='Purchase.GoodsReturn')
+@receiver(post_delete, sender='Banking.Payment')
+def delete_open_item(sender, instance, **kwargs):
+    remove_open_item(get_document_type(sender), instance.pk)
@@ -0,0 +1,132 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+
+from config.importers import BulkImporter, BulkImportError, register_importer
+from Finance.models import AccountType, ChartOfAccounts, CostCenter, JournalEntry, JournalEntryLine
+from Finance.utils import bulk_post_to_general_ledger
+from global_settings.models import Currency
+
+
+@register_importer
+class AccountTypeImporter(BulkImporter):
+    name = 'account_types'
+    verbose_name = "Account Types"
+    model = AccountType
+    fields = {'code': 'code', 'name': 'name', 'is_debit': 'is_debit'}
+    required = ('code', 'name')
+
+
+@register_importer
+class ChartOfAccountsImporter(BulkImporter):
+    name = 'chart_of_accounts'
+    verbose_name = "Chart of Accounts"
+    model = ChartOfAccounts
+    fields = {
+        'code': 'code', 'name': 'name', 'account_type': 'account_type',
+        'parent': 'parent', 'currency': 'currency', 'is_active': 'is_active',
+    }
+    required = ('code', 'name', 'account_type', 'currency')
+    foreign_keys = {
+        'account_type': (AccountType, 'code'),
+        'parent': (ChartOfAccounts, 'code'),
+        'currency': (Currency, 'code'),
+    }
+
+
+@register_importer
+class CostCenterImporter(BulkImporter):
+    name = 'cost_centers'
+    verbose_name = "Cost Centers"
+    model = CostCenter
+    fields = {'code': 'code', 'name': 'name', 'parent': 'parent', 'is_active': 'is_active'}
+    required = ('code', 'name')
+    foreign_keys = {'parent': (CostCenter, 'code')}
+
+
+@register_importer
+class OpeningBalanceImporter(BulkImporter):
+    """
+    Opening balances as journal entry lines. Rows sharing posting date, currency
+    and cost center go into one journal entry; every entry must balance. The GL is
+    posted once for all entries at the end instead of per journal entry save.
+    """
+    name = 'opening_balances'
+    verbose_name = "Opening Balances"
+    model = JournalEntryLine
+    fields = {'account': 'account', 'debit': 'debit_amount', 'credit': 'credit_amount', 'description': 'description'}
+    required = ('account', 'posting_date', 'currency')
+    key_field = None
+    extra_columns = ('posting_date', 'currency', 'cost_center')
+    foreign_keys = {'account': (ChartOfAccounts, 'code')}
+    header_foreign_keys = {'currency': (Currency, 'code'), 'cost_center': (CostCenter, 'code')}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups.update({column: {} for column in self.header_foreign_keys})
+        self.journal_entries = {}
+        self.totals = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+
+    def prefetch(self, rows):
+        super().prefetch(rows)
+        for column, (related_model, lookup_field) in self.header_foreign_keys.items():
+            cache = self.lookups[column]
+            missing = {str(row.get(column) or '').strip() for row in rows} - set(cache) - {''}
+            cache.update(
+                (str(value), pk) for value, pk in
+                related_model.objects.filter(**{f'{lookup_field}__in': missing}).values_list(lookup_field, 'pk')
+            )
+
+    def clean_row(self, row):
+        data = super().clean_row(row)
+        posting_date = JournalEntry._meta.get_field('posting_date')
+        try:
+            data['posting_date'] = self.to_python(posting_date, str(row['posting_date']).strip())
+        except ValidationError as error:
+            raise ValidationError(f"posting_date: {'; '.join(error.messages)}")
+        for column in self.header_foreign_keys:
+            value = str(row.get(column) or '').strip()
+            if value and value not in self.lookups[column]:
+                raise ValidationError(f"{column} '{value}' does not exist")
+            data[f'{column}_id'] = self.lookups[column].get(value)
+        if not (data.get('debit_amount') or data.get('credit_amount')):
+            raise ValidationError("debit or credit is required")
+        return data
+
+    def get_journal_entry(self, posting_date, currency_id, cost_center_id):
+        key = (posting_date, currency_id, cost_center_id)
+        if key not in self.journal_entries:
+            prefix = f"OB-{posting_date:%Y%m%d}-"
+            sequence = JournalEntry.objects.filter(doc_num__startswith=prefix).count() + 1
+            # Created unposted, so the per-entry GL signal has nothing to do yet
+            self.journal_entries[key] = JournalEntry.objects.create(
+                doc_num=f"{prefix}{sequence:03d}",
+                posting_date=posting_date,
+                reference="Opening Balance",
+                currency_id=currency_id,
+                cost_center_id=cost_center_id,
+                is_posted=False,
+            )
+        return self.journal_entries[key]
+
+    def build_instance(self, data):
+        entry = self.get_journal_entry(data.pop('posting_date'), data.pop('currency_id'), data.pop('cost_center_id'))
+        instance = self.model(journal_entry=entry, **data)
+        instance.debit_amount = instance.debit_amount or Decimal('0')
+        instance.credit_amount = instance.credit_amount or Decimal('0')
+        self.totals[entry.pk][0] += instance.debit_amount
+        self.totals[entry.pk][1] += instance.credit_amount
+        return instance
+
+    def after_import(self):
+        unbalanced = [
+            f"{entry.doc_num} (Dr {self.totals[entry.pk][0]} / Cr {self.totals[entry.pk][1]})"
+            for entry in self.journal_entries.values()
+            if self.totals[entry.pk][0] != self.totals[entry.pk][1]
+        ]
+        if unbalanced:
+            raise BulkImportError(f"Opening balance entries do not balance: {', '.join(unbalanced)}")
+
+        posted = bulk_post_to_general_ledger([entry.pk for entry in self.journal_entries.values()], batch_size=self.batch_size)
+        self.result.messages.append(f"{posted} opening balance journal entries posted to the general ledger.")
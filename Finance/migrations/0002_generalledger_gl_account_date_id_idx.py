@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-19 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Finance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=models.Index(fields=['account', 'posting_date', 'id'], name='gl_account_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-19 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Finance', '0002_generalledger_gl_account_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=models.Index(fields=['posting_date', 'id'], name='gl_date_id_idx'),
+        ),
+    ]
@@ -4,6 +4,7 @@ from BusinessPartnerMasterData.models import BusinessPartner
 from django.utils import timezone
 import datetime
 from django.utils.translation import gettext_lazy as _
+from config.pagination import RowCountModelMixin, RowCountQuerySet
 
 class BaseModel(models.Model):
     """Base model with common fields for all models."""
@@ -74,7 +75,7 @@ class JournalEntryLine(BaseModel):
     def __str__(self):
         return f"JE-{self.journal_entry.doc_num} - {self.account.code}"
 
-class GeneralLedger(BaseModel):
+class GeneralLedger(RowCountModelMixin, BaseModel):
     account = models.ForeignKey(ChartOfAccounts, on_delete=models.PROTECT, verbose_name=_("Account"))
     posting_date = models.DateField(_("Posting Date"))
     journal_entry = models.ForeignKey(JournalEntry, on_delete=models.CASCADE, verbose_name=_("Journal Entry")) 
@@ -84,9 +85,15 @@ class GeneralLedger(BaseModel):
     currency = models.ForeignKey(Currency, on_delete=models.PROTECT, verbose_name=_("Currency"))
     cost_center = models.ForeignKey('CostCenter', on_delete=models.SET_NULL, null=True, blank=True, verbose_name=_("Cost Center"))
 
+    objects = RowCountQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("General Ledger")
         verbose_name_plural = _("General Ledger")
+        indexes = [
+            models.Index(fields=['account', 'posting_date', 'id'], name='gl_account_date_id_idx'),
+            models.Index(fields=['posting_date', 'id'], name='gl_date_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.account.code} - {self.posting_date}"
@@ -17,6 +17,12 @@ def register_signals():
         # Import and register finance signals
         from . import finance_signals
         print("✅ Finance signals registered")
+
+        # Import and register report cache signals
+        from . import report_cache_signals
+
+        # Import and register row count signals
+        from . import row_count_signals
         
     except ImportError as e:
         print(f"❌ Error importing signals: {e}")
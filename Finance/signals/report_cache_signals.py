@@ -0,0 +1,18 @@
+"""
+GL postings and chart-of-accounts changes invalidate the cached Finance reports.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from config.report_cache import FINANCE_GL_TAG, invalidate_report_tags
+
+
+@receiver(post_save, sender='Finance.GeneralLedger')
+@receiver(post_delete, sender='Finance.GeneralLedger')
+@receiver(post_save, sender='Finance.ChartOfAccounts')
+@receiver(post_delete, sender='Finance.ChartOfAccounts')
+@receiver(post_save, sender='Finance.AccountType')
+@receiver(post_delete, sender='Finance.AccountType')
+def invalidate_finance_reports(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_report_tags(FINANCE_GL_TAG))
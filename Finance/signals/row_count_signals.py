@@ -0,0 +1,7 @@
+"""
+Row counter behind the estimated total of the general ledger list.
+"""
+from config.pagination import track_row_count
+from Finance.models import GeneralLedger
+
+track_row_count(GeneralLedger)
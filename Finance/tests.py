@@ -1,3 +1,57 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from config.db_router import get_routing_state, use_read_replica
+from config.report_cache import FINANCE_GL_TAG, get_cached_report, invalidate_report_tags
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'finance-tests-default'},
+    'reports': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'finance-tests-reports'},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReportCacheRoutingTests(TestCase):
+    def setUp(self):
+        invalidate_report_tags(FINANCE_GL_TAG)
+        self.builder = mock.Mock(return_value={'total': 10})
+
+    def get_report(self):
+        return get_cached_report('finance.test', {'start_date': '2026-01-01'}, self.builder, tags=[FINANCE_GL_TAG])
+
+    def test_primary_result_is_cached(self):
+        self.assertEqual(self.get_report(), {'total': 10})
+        self.assertEqual(self.get_report(), {'total': 10})
+
+        self.assertEqual(self.builder.call_count, 1)
+
+    def test_replica_result_is_not_cached(self):
+        with mock.patch('config.db_router.get_readable_replica', return_value='default'):
+            with use_read_replica():
+                self.assertEqual(get_routing_state().alias, 'default')
+                self.get_report()
+                self.get_report()
+
+        self.assertEqual(self.builder.call_count, 2)
+        # The next primary read builds and stores its own result
+        self.get_report()
+        self.get_report()
+        self.assertEqual(self.builder.call_count, 3)
+
+    def test_cached_primary_result_is_served_on_the_replica(self):
+        self.get_report()
+        with mock.patch('config.db_router.get_readable_replica', return_value='default'):
+            with use_read_replica():
+                self.get_report()
+
+        self.assertEqual(self.builder.call_count, 1)
+
+    def test_pinned_request_reads_the_primary_and_caches(self):
+        with mock.patch('config.db_router.get_readable_replica', return_value='default'):
+            with use_read_replica() as state:
+                state.pinned = True
+                self.get_report()
+                self.get_report()
+
+        self.assertEqual(self.builder.call_count, 1)
@@ -29,6 +29,7 @@ from .views import (
     TrialBalanceView,
     ProfitAndLossView,
     BalanceSheetView,
+    FinancialStatementView,
     AccountLedgerView,
 
     # Demo Configuration
@@ -101,6 +102,7 @@ urlpatterns = [
     path('reports/profit-loss/print/', ProfitAndLossView.as_view(), {'print_view': True}, name='profit_loss_print'),
     path('reports/balance-sheet/', BalanceSheetView.as_view(), name='balance_sheet'),
     path('reports/balance-sheet/print/', BalanceSheetView.as_view(), {'print_view': True}, name='balance_sheet_print'),
+    path('reports/statements/<str:statement>/', FinancialStatementView.as_view(), name='financial_statement'),
 
     # Demo Configuration
     path('demo/config/', DemoConfigView.as_view(), name='demo_config'),
@@ -1,3 +1,10 @@
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+
+from config.pagination import reset_row_count
+from config.report_cache import FINANCE_GL_TAG, invalidate_report_tags
 from Finance.models import GeneralLedger
 
 def post_to_general_ledger(journal_entry):
@@ -18,3 +25,380 @@ def post_to_general_ledger(journal_entry):
                 currency=journal_entry.currency,
                 cost_center=journal_entry.cost_center  
             )
+
+
+def bulk_post_to_general_ledger(journal_entry_ids, batch_size=2000):
+    """
+    Post many journal entries to the GL in a handful of queries: old GL rows are
+    deleted, new ones bulk-created from the lines, and the headers are flagged as
+    posted with a queryset update so the per-entry post_save handler does not run.
+    Balances follow the account type's normal side, as in the journal entry signal.
+    """
+    from Finance.models import JournalEntry, JournalEntryLine
+
+    entries = JournalEntry.objects.in_bulk(journal_entry_ids)
+    GeneralLedger.objects.filter(journal_entry_id__in=entries).delete()
+
+    lines = JournalEntryLine.objects.filter(journal_entry_id__in=entries).select_related('account__account_type')
+    pending = []
+    for line in lines.iterator(chunk_size=batch_size):
+        entry = entries[line.journal_entry_id]
+        if line.account.account_type.is_debit:
+            balance = line.debit_amount - line.credit_amount
+        else:
+            balance = line.credit_amount - line.debit_amount
+        pending.append(GeneralLedger(
+            account_id=line.account_id,
+            posting_date=entry.posting_date,
+            journal_entry_id=entry.pk,
+            debit_amount=line.debit_amount,
+            credit_amount=line.credit_amount,
+            balance=balance,
+            currency_id=entry.currency_id,
+            cost_center_id=entry.cost_center_id,
+        ))
+        if len(pending) >= batch_size:
+            GeneralLedger.objects.bulk_create(pending, batch_size=batch_size)
+            pending = []
+    GeneralLedger.objects.bulk_create(pending, batch_size=batch_size)
+    invalidate_report_tags(FINANCE_GL_TAG)
+    reset_row_count(GeneralLedger)
+
+    totals = JournalEntryLine.objects.filter(journal_entry_id__in=entries).values('journal_entry_id').annotate(
+        sum_debit=Sum('debit_amount'), sum_credit=Sum('credit_amount'),
+    )
+    for total in totals:
+        JournalEntry.objects.filter(pk=total['journal_entry_id']).update(
+            total_debit=total['sum_debit'], total_credit=total['sum_credit'], is_posted=True,
+        )
+    return len(entries)
+
+
+def get_balance_expression(is_debit):
+    """
+    Signed GL amount on the account's normal side: Dr - Cr for debit accounts,
+    Cr - Dr for credit accounts.
+    """
+    from django.db.models import DecimalField, ExpressionWrapper, F
+
+    if is_debit:
+        expression = F('debit_amount') - F('credit_amount')
+    else:
+        expression = F('credit_amount') - F('debit_amount')
+    return ExpressionWrapper(expression, output_field=DecimalField(max_digits=15, decimal_places=2))
+
+
+# ------------------------------------------
+# ✅ Columnar financial statements
+# ------------------------------------------
+# Sections are taken from the account type code (1xx assets ... 5xx expenses),
+# falling back to keywords in the account type name.
+STATEMENT_SECTION_BY_CODE = {'1': 'asset', '2': 'liability', '3': 'equity', '4': 'revenue', '5': 'expense'}
+STATEMENT_SECTION_KEYWORDS = (
+    ('revenue', 'revenue'), ('income', 'revenue'), ('sales', 'revenue'),
+    ('expense', 'expense'), ('cost', 'expense'),
+    ('liabilit', 'liability'), ('payable', 'liability'),
+    ('equity', 'equity'), ('capital', 'equity'),
+    ('asset', 'asset'), ('receivable', 'asset'),
+)
+STATEMENT_SECTION_TITLES = {
+    'asset': 'Assets', 'liability': 'Liabilities', 'equity': 'Equity',
+    'revenue': 'Revenue', 'expense': 'Expenses',
+}
+CREDIT_SECTIONS = ('liability', 'equity', 'revenue')
+CASH_ACCOUNT_KEYWORDS = ('cash', 'bank')
+STATEMENT_PERIODS = ('month', 'quarter', 'year')
+
+
+def get_account_section(account_type):
+    section = STATEMENT_SECTION_BY_CODE.get(str(account_type.code)[:1])
+    if section:
+        return section
+    name = account_type.name.lower()
+    for keyword, section in STATEMENT_SECTION_KEYWORDS:
+        if keyword in name:
+            return section
+    return None
+
+
+def get_statement_periods(start_date, end_date, period='month'):
+    """
+    Splits [start_date, end_date] into month, quarter or year buckets, clipped to the range.
+    """
+    from datetime import date, timedelta
+
+    periods = []
+    current = start_date
+    while current <= end_date:
+        if period == 'year':
+            next_start = date(current.year + 1, 1, 1)
+            label = str(current.year)
+        elif period == 'quarter':
+            quarter = (current.month - 1) // 3
+            next_start = date(current.year + 1, 1, 1) if quarter == 3 else date(current.year, quarter * 3 + 4, 1)
+            label = f"Q{quarter + 1} {current.year}"
+        else:
+            next_start = date(current.year + 1, 1, 1) if current.month == 12 else date(current.year, current.month + 1, 1)
+            label = current.strftime('%b %Y')
+        period_end = min(next_start - timedelta(days=1), end_date)
+        periods.append({'key': f"{current:%Y%m%d}-{period_end:%Y%m%d}", 'label': label, 'start': current, 'end': period_end})
+        current = next_start
+    return periods
+
+
+def get_statement_column_filter(column):
+    condition = Q(posting_date__lte=column['end'])
+    if column.get('start'):
+        condition &= Q(posting_date__gte=column['start'])
+    if 'cost_center_id' in column:
+        condition &= Q(cost_center_id=column['cost_center_id']) if column['cost_center_id'] else Q(cost_center__isnull=True)
+    return condition
+
+
+def get_statement_amounts(columns, cost_center_id=None):
+    """
+    Returns {column key: {account_id: Dr - Cr}} for the given columns.
+
+    Columns are dicts with 'key', 'end' and optional 'start' (no start = everything up
+    to end) and 'cost_center_id'. All columns are computed together in one GROUP BY
+    account query with one conditional SUM per column; callers cache the finished
+    statement in the report cache.
+    """
+    amounts = {column['key']: {} for column in columns}
+    if not columns:
+        return amounts
+    balance = get_balance_expression(True)
+    entries = GeneralLedger.objects.filter(posting_date__lte=max(column['end'] for column in columns))
+    if cost_center_id:
+        entries = entries.filter(cost_center_id=cost_center_id)
+    pivots = {
+        f'col_{index}': Coalesce(Sum(balance, filter=get_statement_column_filter(column)), Decimal('0'))
+        for index, column in enumerate(columns)
+    }
+    for row in entries.values('account_id').annotate(**pivots).order_by():
+        for index, column in enumerate(columns):
+            if row[f'col_{index}']:
+                amounts[column['key']][row['account_id']] = row[f'col_{index}']
+    return amounts
+
+
+def get_statement_accounts():
+    """
+    Accounts in code order with their section, and the children map used for the rollup.
+    """
+    from collections import defaultdict
+    from Finance.models import ChartOfAccounts
+
+    accounts = list(ChartOfAccounts.objects.select_related('account_type').order_by('code'))
+    children = defaultdict(list)
+    for account in accounts:
+        account.section = get_account_section(account.account_type)
+        children[account.parent_id].append(account)
+    return accounts, children
+
+
+def build_statement_sections(sections, column_keys, amounts, accounts, children):
+    """
+    Rolls account amounts up the account hierarchy in memory and returns one entry per
+    section with indented rows and per-column totals. Amounts are shown on the section's
+    normal side (credit sections are negated).
+    """
+    by_id = {account.pk: account for account in accounts}
+    result = []
+    for section in sections:
+        sign = -1 if section in CREDIT_SECTIONS else 1
+        own = {
+            account.pk: [sign * amounts[key].get(account.pk, Decimal('0')) for key in column_keys]
+            for account in accounts if account.section == section
+        }
+
+        rows = []
+
+        def add_rows(account, depth):
+            """Depth-first walk returning the rolled-up amounts of account and its descendants."""
+            row = {'account': account, 'depth': depth, 'is_group': False}
+            rows.append(row)
+            totals = list(own.get(account.pk, [Decimal('0')] * len(column_keys)))
+            for child in children.get(account.pk, []):
+                if child.section == section:
+                    row['is_group'] = True
+                    totals = [total + amount for total, amount in zip(totals, add_rows(child, depth + 1))]
+            row['amounts'] = totals
+            row['total'] = sum(totals, Decimal('0'))
+            return totals
+
+        section_totals = [Decimal('0')] * len(column_keys)
+        roots = [
+            account for account in accounts
+            if account.section == section and (account.parent_id not in by_id or by_id[account.parent_id].section != section)
+        ]
+        for account in roots:
+            section_totals = [total + amount for total, amount in zip(section_totals, add_rows(account, 0))]
+
+        result.append({
+            'key': section,
+            'title': STATEMENT_SECTION_TITLES[section],
+            'rows': [row for row in rows if any(row['amounts'])],
+            'totals': section_totals,
+            'total': sum(section_totals, Decimal('0')),
+        })
+    return result
+
+
+def get_statement_columns(start_date, end_date, period='month', compare='period', cumulative=False):
+    """
+    Period columns, or one column per cost center (plus unassigned) over the whole range.
+    Cumulative columns (balance sheet) run from the beginning of the ledger to their end date.
+    """
+    from Finance.models import CostCenter
+
+    if compare == 'cost_center':
+        cost_centers = [(cost_center.pk, str(cost_center.name)) for cost_center in CostCenter.objects.order_by('code')]
+        columns = [
+            {
+                'key': f"{start_date:%Y%m%d}-{end_date:%Y%m%d}-cc{pk or 0}",
+                'label': name, 'start': start_date, 'end': end_date, 'cost_center_id': pk,
+            }
+            for pk, name in cost_centers + [(None, 'Unassigned')]
+        ]
+    else:
+        columns = get_statement_periods(start_date, end_date, period)
+
+    if cumulative:
+        for column in columns:
+            column['start'] = None
+            column['key'] = f"to-{column['key']}"
+    return columns
+
+
+def build_profit_loss_statement(start_date, end_date, period='month', compare='period', cost_center_id=None):
+    columns = get_statement_columns(start_date, end_date, period, compare)
+    keys = [column['key'] for column in columns]
+    amounts = get_statement_amounts(columns, cost_center_id)
+    accounts, children = get_statement_accounts()
+    revenue, expense = build_statement_sections(('revenue', 'expense'), keys, amounts, accounts, children)
+    net_profit = [income - cost for income, cost in zip(revenue['totals'], expense['totals'])]
+    return {
+        'columns': columns,
+        'sections': [revenue, expense],
+        'summary': [{'label': 'Net Profit', 'amounts': net_profit, 'total': sum(net_profit, Decimal('0'))}],
+    }
+
+
+def build_balance_sheet_statement(start_date, end_date, period='month', compare='period', cost_center_id=None):
+    """
+    Balances as of the end of each column. Revenue less expenses to date is shown as
+    current earnings inside equity, so assets equal liabilities plus equity.
+    """
+    columns = get_statement_columns(start_date, end_date, period, compare, cumulative=True)
+    keys = [column['key'] for column in columns]
+    amounts = get_statement_amounts(columns, cost_center_id)
+    accounts, children = get_statement_accounts()
+    assets, liabilities, equity, revenue, expense = build_statement_sections(
+        ('asset', 'liability', 'equity', 'revenue', 'expense'), keys, amounts, accounts, children
+    )
+    earnings = [income - cost for income, cost in zip(revenue['totals'], expense['totals'])]
+    if any(earnings):
+        equity['rows'].append({'account': None, 'label': 'Retained and Current Earnings', 'depth': 0, 'is_group': False, 'amounts': earnings, 'total': earnings[-1]})
+    equity['totals'] = [total + amount for total, amount in zip(equity['totals'], earnings)]
+    liabilities_equity = [debt + capital for debt, capital in zip(liabilities['totals'], equity['totals'])]
+
+    # Balances are point-in-time, so the "total" column is the last column rather than a sum
+    for section in (assets, liabilities, equity):
+        section['total'] = section['totals'][-1] if section['totals'] and compare == 'period' else sum(section['totals'], Decimal('0'))
+        for row in section['rows']:
+            row['total'] = row['amounts'][-1] if compare == 'period' else sum(row['amounts'], Decimal('0'))
+    difference = [asset - other for asset, other in zip(assets['totals'], liabilities_equity)]
+    return {
+        'columns': columns,
+        'sections': [assets, liabilities, equity],
+        'summary': [
+            {'label': 'Total Liabilities and Equity', 'amounts': liabilities_equity,
+             'total': liabilities_equity[-1] if compare == 'period' else sum(liabilities_equity, Decimal('0'))},
+            {'label': 'Difference', 'amounts': difference,
+             'total': difference[-1] if compare == 'period' else sum(difference, Decimal('0'))},
+        ],
+        'point_in_time': compare == 'period',
+    }
+
+
+def build_cash_flow_statement(start_date, end_date, period='month', compare='period', cost_center_id=None):
+    """
+    Indirect-method cash flow: net profit adjusted by the movement in non-cash assets and
+    liabilities (operating) and equity (financing). Cash accounts are asset accounts whose
+    name mentions cash or bank, and their sub-accounts.
+    """
+    from datetime import timedelta
+
+    columns = get_statement_columns(start_date, end_date, period, compare)
+    opening_column = {'key': f"to-{start_date - timedelta(days=1):%Y%m%d}", 'end': start_date - timedelta(days=1)}
+    keys = [column['key'] for column in columns]
+    amounts = get_statement_amounts(columns + [opening_column], cost_center_id)
+    accounts, children = get_statement_accounts()
+
+    by_id = {account.pk: account for account in accounts}
+    cash_ids = set()
+    for account in accounts:
+        node = account
+        while node is not None and node.section == 'asset':
+            if any(keyword in node.name.lower() for keyword in CASH_ACCOUNT_KEYWORDS):
+                cash_ids.add(account.pk)
+                break
+            node = by_id.get(node.parent_id)
+
+    zero = Decimal('0')
+    movement = {key: {'cash': zero, 'profit': zero, 'asset': zero, 'liability': zero, 'equity': zero} for key in keys}
+    for key in keys:
+        for account_id, amount in amounts[key].items():
+            account = by_id.get(account_id)
+            if account is None or account.section is None:
+                continue
+            if account_id in cash_ids:
+                movement[key]['cash'] += amount
+            elif account.section in ('revenue', 'expense'):
+                movement[key]['profit'] -= amount
+            else:
+                movement[key][account.section] -= amount
+
+    opening_cash = sum((amount for account_id, amount in amounts[opening_column['key']].items() if account_id in cash_ids), zero)
+    lines = [
+        ('Net Profit', 'profit'),
+        ('Change in Non-Cash Assets', 'asset'),
+        ('Change in Liabilities', 'liability'),
+    ]
+    operating = [[movement[key][field] for key in keys] for _, field in lines]
+    net_operating = [sum(values, zero) for values in zip(*operating)]
+    financing = [movement[key]['equity'] for key in keys]
+    net_change = [cash + capital for cash, capital in zip(net_operating, financing)]
+
+    opening, closing, running = [], [], opening_cash
+    if compare == 'period':
+        for key in keys:
+            opening.append(running)
+            running += movement[key]['cash']
+            closing.append(running)
+
+    def line(label, values):
+        return {'account': None, 'label': label, 'depth': 0, 'is_group': False, 'amounts': values, 'total': sum(values, zero)}
+
+    sections = [
+        {'key': 'operating', 'title': 'Operating Activities',
+         'rows': [line(label, values) for (label, _), values in zip(lines, operating)],
+         'totals': net_operating, 'total': sum(net_operating, zero)},
+        {'key': 'financing', 'title': 'Financing Activities',
+         'rows': [line('Change in Equity', financing)], 'totals': financing, 'total': sum(financing, zero)},
+    ]
+    summary = [{'label': 'Net Change in Cash', 'amounts': net_change, 'total': sum(net_change, zero)}]
+    if compare == 'period' and keys:
+        summary += [
+            {'label': 'Opening Cash', 'amounts': opening, 'total': opening[0]},
+            {'label': 'Closing Cash', 'amounts': closing, 'total': closing[-1]},
+        ]
+    return {'columns': columns, 'sections': sections, 'summary': summary}
+
+
+FINANCIAL_STATEMENTS = {
+    'profit-loss': ('Profit and Loss', build_profit_loss_statement),
+    'balance-sheet': ('Balance Sheet', build_balance_sheet_statement),
+    'cash-flow': ('Cash Flow Statement', build_cash_flow_statement),
+}
@@ -45,6 +45,9 @@ from .profit_loss_views import (
 from .balance_sheet_views import (
     BalanceSheetView,
 )
+from .financial_statement_views import (
+    FinancialStatementView,
+)
 
 from .account_ledger_views import (
     AccountLedgerView,
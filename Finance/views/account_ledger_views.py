@@ -1,54 +1,168 @@
+from datetime import date
+from decimal import Decimal
+from urllib.parse import urlencode
+
 from django.views.generic import TemplateView
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from decimal import Decimal
 from ..models import ChartOfAccounts, GeneralLedger
+from ..utils import get_balance_expression
+
 
 class AccountLedgerView(TemplateView):
+    """
+    Account ledger for a date window, paged by keyset on (posting_date, id).
+
+    The opening balance, period totals and the balance carried into the current
+    page come from one aggregate; the running balance inside the page is a SQL
+    window function, so only one page of GL rows is ever loaded.
+    """
     template_name = 'finance/account_ledger.html'
     permission_required = 'Finance.view_generalledger'
+    paginate_by = 100
+    max_paginate_by = 1000
+
+    # ---------- Request parsing ----------
+    def get_date_param(self, name):
+        try:
+            return date.fromisoformat(self.request.GET.get(name, ''))
+        except ValueError:
+            return None
+
+    def get_cursor_param(self, name):
+        """Cursors are '<posting_date>.<id>' of the row the page starts after / ends before."""
+        value = self.request.GET.get(name, '')
+        try:
+            posting_date, pk = value.split('.')
+            return date.fromisoformat(posting_date), int(pk)
+        except ValueError:
+            return None
+
+    def get_page_size(self):
+        try:
+            page_size = int(self.request.GET.get('page_size', self.paginate_by))
+        except ValueError:
+            page_size = self.paginate_by
+        return max(1, min(page_size, self.max_paginate_by))
+
+    # ---------- Keyset helpers ----------
+    @staticmethod
+    def after_cursor(cursor, inclusive=False):
+        posting_date, pk = cursor
+        id_lookup = 'id__gte' if inclusive else 'id__gt'
+        return Q(posting_date__gt=posting_date) | Q(posting_date=posting_date, **{id_lookup: pk})
+
+    @staticmethod
+    def before_cursor(cursor, inclusive=False):
+        posting_date, pk = cursor
+        id_lookup = 'id__lte' if inclusive else 'id__lt'
+        return Q(posting_date__lt=posting_date) | Q(posting_date=posting_date, **{id_lookup: pk})
+
+    @staticmethod
+    def format_cursor(entry):
+        return f"{entry.posting_date.isoformat()}.{entry.pk}"
 
+    def get_page_start(self, period_entries, page_size):
+        """
+        Returns (cursor, inclusive) for where the page starts, or (None, False) for
+        the first page. A 'before' cursor is turned into an inclusive start by walking
+        back one page on the index, so both directions share the same forward query.
+        """
+        after = self.get_cursor_param('after')
+        if after:
+            return after, False
+
+        before = self.get_cursor_param('before')
+        if before:
+            rows = list(
+                period_entries.filter(self.before_cursor(before))
+                .order_by('-posting_date', '-id').values_list('posting_date', 'id')[:page_size]
+            )
+            if rows:
+                return rows[-1], True
+        return None, False
+
+    # ---------- Context ----------
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
+
         account_id = kwargs.get('account_id')
-        account = get_object_or_404(ChartOfAccounts, id=account_id)
-        
-        # Get all GL entries for this account
-        gl_entries = GeneralLedger.objects.filter(
-            account=account
-        ).order_by('posting_date', 'id')
-        
-        # Calculate running balance
-        ledger_data = []
-        running_balance = Decimal('0')
-        
-        for entry in gl_entries:
-            if account.account_type.is_debit:
-                # Debit account: Dr increases, Cr decreases
-                running_balance += entry.debit_amount - entry.credit_amount
-            else:
-                # Credit account: Cr increases, Dr decreases
-                running_balance += entry.credit_amount - entry.debit_amount
-            
-            ledger_data.append({
-                'entry': entry,
-                'running_balance': running_balance,
-            })
-        
-        # Calculate totals
-        total_debits = gl_entries.aggregate(total=Sum('debit_amount'))['total'] or Decimal('0')
-        total_credits = gl_entries.aggregate(total=Sum('credit_amount'))['total'] or Decimal('0')
-        
+        account = get_object_or_404(ChartOfAccounts.objects.select_related('account_type'), id=account_id)
+        balance = get_balance_expression(account.account_type.is_debit)
+        date_from = self.get_date_param('date_from')
+        date_to = self.get_date_param('date_to')
+        page_size = self.get_page_size()
+
+        account_entries = GeneralLedger.objects.filter(account=account)
+        if date_to:
+            account_entries = account_entries.filter(posting_date__lte=date_to)
+        in_period = Q(posting_date__gte=date_from) if date_from else Q()
+        period_entries = account_entries.filter(in_period)
+
+        page_start, inclusive = self.get_page_start(period_entries, page_size)
+
+        # Opening balance, period totals and the balance brought forward to this page in one pass
+        zero = Decimal('0')
+        aggregates = {
+            'sum_debits': Coalesce(Sum('debit_amount', filter=in_period), zero),
+            'sum_credits': Coalesce(Sum('credit_amount', filter=in_period), zero),
+            'sum_period': Coalesce(Sum(balance, filter=in_period), zero),
+        }
+        if date_from:
+            aggregates['sum_opening'] = Coalesce(Sum(balance, filter=Q(posting_date__lt=date_from)), zero)
+        if page_start:
+            before_page = in_period & self.before_cursor(page_start, inclusive=not inclusive)
+            aggregates['sum_brought_forward'] = Coalesce(Sum(balance, filter=before_page), zero)
+            aggregates['count_before_page'] = Count('id', filter=before_page)
+        totals = account_entries.aggregate(**aggregates)
+        opening_balance = totals.get('sum_opening', zero)
+        brought_forward = opening_balance + totals.get('sum_brought_forward', zero)
+
+        page_entries = period_entries
+        if page_start:
+            page_entries = page_entries.filter(self.after_cursor(page_start, inclusive=inclusive))
+        page_entries = list(
+            page_entries.select_related('journal_entry')
+            .annotate(page_balance=Window(
+                expression=Sum(balance),
+                order_by=[F('posting_date').asc(), F('id').asc()],
+            ))
+            .order_by('posting_date', 'id')[:page_size + 1]
+        )
+        has_next = len(page_entries) > page_size
+        page_entries = page_entries[:page_size]
+
+        ledger_data = [
+            {'entry': entry, 'running_balance': brought_forward + entry.page_balance}
+            for entry in page_entries
+        ]
+
+        filters = {key: value for key, value in (('date_from', date_from), ('date_to', date_to)) if value}
+        if page_size != self.paginate_by:
+            filters['page_size'] = page_size
+        next_query = previous_query = None
+        if has_next:
+            next_query = urlencode({**filters, 'after': self.format_cursor(page_entries[-1])})
+        if totals.get('count_before_page') and page_entries:
+            previous_query = urlencode({**filters, 'before': self.format_cursor(page_entries[0])})
+
         context.update({
             'title': f'Account Ledger - {account.code}',
             'subtitle': account.name,
             'account': account,
             'ledger_data': ledger_data,
-            'total_debits': total_debits,
-            'total_credits': total_credits,
-            'final_balance': running_balance,
+            'date_from': date_from,
+            'date_to': date_to,
+            'opening_balance': opening_balance,
+            'brought_forward': brought_forward,
+            'total_debits': totals['sum_debits'],
+            'total_credits': totals['sum_credits'],
+            'final_balance': opening_balance + totals['sum_period'],
+            'is_first_page': not totals.get('count_before_page'),
+            'next_query': next_query,
+            'previous_query': previous_query,
             'generated_on': timezone.now(),
         })
         return context
@@ -1,91 +1,54 @@
 from django.views.generic import TemplateView
-from django.db.models import Sum
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
-from ..models import ChartOfAccounts, GeneralLedger, AccountType
+from config.report_cache import FINANCE_GL_TAG, get_cached_report
+from config.db_router import ReadReplicaMixin
+from ..utils import get_statement_accounts, get_statement_amounts
 
-class BalanceSheetView(TemplateView):
+class BalanceSheetView(ReadReplicaMixin, TemplateView):
     template_name = 'finance/balance_sheet.html'
     permission_required = 'Finance.view_generalledger'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Get account types
-        asset_types = AccountType.objects.filter(code='100')  # Assets
-        liability_types = AccountType.objects.filter(code='200')  # Liabilities
-        equity_types = AccountType.objects.filter(code='300')  # Equity
-
         # Initialize data structures
         asset_data = []
         liability_data = []
         equity_data = []
-        
+
         total_assets = Decimal('0')
         total_liabilities = Decimal('0')
         total_equity = Decimal('0')
 
-        print("📊 Generating Balance Sheet...")
+        # Balance of every account to date from one grouped query
+        today = timezone.localdate()
+        column = {'key': f"to-{today:%Y%m%d}", 'end': today}
+        amounts = get_cached_report(
+            'finance.balance_sheet', {'as_of': today}, lambda: get_statement_amounts([column])[column['key']],
+            tags=[FINANCE_GL_TAG], user=self.request.user,
+        )
+        accounts, _children = get_statement_accounts()
+        sections = {'asset': asset_data, 'liability': liability_data, 'equity': equity_data}
 
-        # Process Assets (100 series)
-        asset_accounts = ChartOfAccounts.objects.filter(
-            account_type__in=asset_types
-        ).order_by('code')
-        
-        for account in asset_accounts:
-            gl_entries = GeneralLedger.objects.filter(account=account)
-            debit_sum = gl_entries.aggregate(total=Sum('debit_amount'))['total'] or Decimal('0')
-            credit_sum = gl_entries.aggregate(total=Sum('credit_amount'))['total'] or Decimal('0')
-            balance = debit_sum - credit_sum  # Assets have debit balances
-            
-            if balance != 0:
-                asset_data.append({
-                    'account': account,
-                    'account_code': account.code,
-                    'account_name': account.name,
-                    'balance': balance,
-                })
+        for account in accounts:
+            amount = amounts.get(account.pk)
+            if not amount or account.section not in sections:
+                continue
+            # Assets have debit balances; liabilities and equity have credit balances
+            balance = amount if account.section == 'asset' else -amount
+            sections[account.section].append({
+                'account': account,
+                'account_code': account.code,
+                'account_name': account.name,
+                'balance': balance,
+            })
+            if account.section == 'asset':
                 total_assets += balance
-
-        # Process Liabilities (200 series)
-        liability_accounts = ChartOfAccounts.objects.filter(
-            account_type__in=liability_types
-        ).order_by('code')
-        
-        for account in liability_accounts:
-            gl_entries = GeneralLedger.objects.filter(account=account)
-            debit_sum = gl_entries.aggregate(total=Sum('debit_amount'))['total'] or Decimal('0')
-            credit_sum = gl_entries.aggregate(total=Sum('credit_amount'))['total'] or Decimal('0')
-            balance = credit_sum - debit_sum  # Liabilities have credit balances
-            
-            if balance != 0:
-                liability_data.append({
-                    'account': account,
-                    'account_code': account.code,
-                    'account_name': account.name,
-                    'balance': balance,
-                })
+            elif account.section == 'liability':
                 total_liabilities += balance
-
-        # Process Equity (300 series)
-        equity_accounts = ChartOfAccounts.objects.filter(
-            account_type__in=equity_types
-        ).order_by('code')
-        
-        for account in equity_accounts:
-            gl_entries = GeneralLedger.objects.filter(account=account)
-            debit_sum = gl_entries.aggregate(total=Sum('debit_amount'))['total'] or Decimal('0')
-            credit_sum = gl_entries.aggregate(total=Sum('credit_amount'))['total'] or Decimal('0')
-            balance = credit_sum - debit_sum  # Equity has credit balances
-            
-            if balance != 0:
-                equity_data.append({
-                    'account': account,
-                    'account_code': account.code,
-                    'account_name': account.name,
-                    'balance': balance,
-                })
+            else:
                 total_equity += balance
 
         # Calculate totals
@@ -93,12 +56,6 @@ class BalanceSheetView(TemplateView):
         balance_difference = total_assets - total_liabilities_equity
         is_balanced = abs(balance_difference) < Decimal('0.01')
 
-        print(f"📈 Balance Sheet Summary:")
-        print(f"   Total Assets: {total_assets}")
-        print(f"   Total Liabilities: {total_liabilities}")
-        print(f"   Total Equity: {total_equity}")
-        print(f"   Balanced: {is_balanced}")
-
         context.update({
             'title': _('Balance Sheet'),
             'subtitle': f'As of {timezone.now().date()}',
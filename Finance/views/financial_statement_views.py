@@ -0,0 +1,104 @@
+from django import forms
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.http import Http404
+from django.views.generic import TemplateView
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from config.report_cache import FINANCE_GL_TAG, get_cached_report
+from ..models import CostCenter
+from ..utils import FINANCIAL_STATEMENTS, STATEMENT_PERIODS
+
+MAX_STATEMENT_COLUMNS = 60
+
+
+class FinancialStatementFilterForm(forms.Form):
+    start_date = forms.DateField(label=_("Start Date"), widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(label=_("End Date"), widget=forms.DateInput(attrs={'type': 'date'}))
+    period = forms.ChoiceField(
+        label=_("Period"),
+        choices=[('month', _("Monthly")), ('quarter', _("Quarterly")), ('year', _("Yearly"))],
+        initial='month',
+    )
+    compare = forms.ChoiceField(
+        label=_("Columns"),
+        choices=[('period', _("Periods")), ('cost_center', _("Cost Centers"))],
+        initial='period',
+    )
+    cost_center = forms.ModelChoiceField(
+        label=_("Cost Center"), queryset=CostCenter.objects.order_by('code'), required=False,
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date, end_date = cleaned_data.get('start_date'), cleaned_data.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            cleaned_data['start_date'], cleaned_data['end_date'] = end_date, start_date
+        return cleaned_data
+
+
+class FinancialStatementView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """
+    Columnar P&L, balance sheet or cash flow. All columns (periods or cost centers)
+    come from one conditional-aggregation query over the GL; the result is kept in the
+    report cache until the next GL posting.
+    """
+    template_name = 'finance/financial_statement.html'
+    permission_required = 'Finance.view_generalledger'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        statement = kwargs.get('statement')
+        if statement not in FINANCIAL_STATEMENTS:
+            raise Http404("Unknown financial statement")
+        title, builder = FINANCIAL_STATEMENTS[statement]
+
+        today = timezone.localdate()
+        form = FinancialStatementFilterForm(self.request.GET or {
+            'start_date': today.replace(month=1, day=1),
+            'end_date': today,
+            'period': 'month',
+            'compare': 'period',
+        })
+        start_date, end_date = today.replace(month=1, day=1), today
+        period, compare, cost_center = 'month', 'period', None
+        if form.is_valid():
+            start_date = form.cleaned_data['start_date']
+            end_date = form.cleaned_data['end_date']
+            period = form.cleaned_data['period']
+            compare = form.cleaned_data['compare']
+            cost_center = form.cleaned_data['cost_center']
+
+        # Keep the pivot to a readable width; widen the bucket until it fits
+        for candidate in STATEMENT_PERIODS[STATEMENT_PERIODS.index(period):]:
+            period = candidate
+            months = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+            if months // {'month': 1, 'quarter': 3, 'year': 12}[period] <= MAX_STATEMENT_COLUMNS:
+                break
+
+        cost_center_id = cost_center.pk if cost_center else None
+        data = get_cached_report(
+            f'finance.statement.{statement}',
+            {'start_date': start_date, 'end_date': end_date, 'period': period,
+             'compare': compare, 'cost_center': cost_center_id},
+            lambda: builder(start_date, end_date, period, compare, cost_center_id),
+            tags=[FINANCE_GL_TAG], user=self.request.user,
+        )
+
+        context.update({
+            'title': _(title),
+            'subtitle': f'From {start_date.strftime("%B %d, %Y")} to {end_date.strftime("%B %d, %Y")}',
+            'statement': statement,
+            'statements': {key: label for key, (label, _builder) in FINANCIAL_STATEMENTS.items()},
+            'form': form,
+            'period': period,
+            'compare': compare,
+            'start_date': start_date,
+            'end_date': end_date,
+            'columns': data['columns'],
+            'sections': data['sections'],
+            'summary': data['summary'],
+            'point_in_time': data.get('point_in_time', False),
+            'generated_on': timezone.now(),
+        })
+        return context
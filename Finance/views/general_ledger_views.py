@@ -16,9 +16,10 @@ class GeneralLedgerListView(GenericFilterView):
     paginate_by = 10
     permission_required = 'Finance.view_generalledger'
     filter_form_class = GeneralLedgerFilterForm
+    keyset_ordering = ('-posting_date', '-id')
     
     def get_queryset(self):
-        queryset = super().get_queryset().order_by('-posting_date')
+        queryset = super().get_queryset().select_related('account', 'journal_entry', 'currency').order_by('-posting_date')
         
         # Filter by search query if provided
         search_query = self.request.GET.get('search', '')
@@ -1,9 +1,10 @@
 from django.views.generic import TemplateView
-from django.db.models import Sum
 from django.utils import timezone
 from datetime import datetime
 from django.utils.translation import gettext_lazy as _
-from ..models import ChartOfAccounts, GeneralLedger, AccountType
+from config.report_cache import FINANCE_GL_TAG, get_cached_report
+from config.db_router import ReadReplicaMixin
+from ..utils import get_statement_accounts, get_statement_amounts
 from django import forms
 
 class ProfitLossFilterForm(forms.Form):
@@ -18,7 +19,7 @@ class ProfitLossFilterForm(forms.Form):
         required=True
     )
 
-class ProfitAndLossView(TemplateView):
+class ProfitAndLossView(ReadReplicaMixin, TemplateView):
     template_name = 'finance/profit_loss.html'
     permission_required = 'Finance.view_generalledger'
 
@@ -48,44 +49,26 @@ class ProfitAndLossView(TemplateView):
         total_revenue = 0
         total_expenses = 0
 
-        # Get revenue and expense account types
-        revenue_types = AccountType.objects.filter(name__icontains='revenue')
-        expense_types = AccountType.objects.filter(name__icontains='expense')
+        # One grouped query for every account's net movement in the range
+        column = {'key': f"{start_date:%Y%m%d}-{end_date:%Y%m%d}", 'start': start_date, 'end': end_date}
+        amounts = get_cached_report(
+            'finance.profit_loss', {'start_date': start_date, 'end_date': end_date},
+            lambda: get_statement_amounts([column])[column['key']],
+            tags=[FINANCE_GL_TAG], user=self.request.user,
+        )
+        accounts, _children = get_statement_accounts()
 
-        # Process Revenue Accounts
-        revenue_accounts = ChartOfAccounts.objects.filter(account_type__in=revenue_types)
-        for account in revenue_accounts:
-            gl_entries = GeneralLedger.objects.filter(
-                account=account,
-                posting_date__range=[start_date, end_date]
-            )
-            credit_sum = gl_entries.aggregate(total=Sum('credit_amount'))['total'] or 0
-            debit_sum = gl_entries.aggregate(total=Sum('debit_amount'))['total'] or 0
-            amount = credit_sum - debit_sum  # Revenue: net credits
-
-            if amount != 0:
-                revenue_data.append({
-                    'account': account,
-                    'amount': amount,
-                })
-                total_revenue += amount
-
-        # Process Expense Accounts
-        expense_accounts = ChartOfAccounts.objects.filter(account_type__in=expense_types)
-        for account in expense_accounts:
-            gl_entries = GeneralLedger.objects.filter(
-                account=account,
-                posting_date__range=[start_date, end_date]  # Fixed date range
-            )
-            debit_sum = gl_entries.aggregate(total=Sum('debit_amount'))['total'] or 0
-            credit_sum = gl_entries.aggregate(total=Sum('credit_amount'))['total'] or 0
-            amount = debit_sum - credit_sum  # Expenses: net debits
-
-            if amount != 0:
-                expense_data.append({
-                    'account': account,
-                    'amount': amount,
-                })
+        for account in accounts:
+            amount = amounts.get(account.pk)
+            if not amount:
+                continue
+            if account.section == 'revenue':
+                # Revenue: net credits
+                revenue_data.append({'account': account, 'amount': -amount})
+                total_revenue += -amount
+            elif account.section == 'expense':
+                # Expenses: net debits
+                expense_data.append({'account': account, 'amount': amount})
                 total_expenses += amount
 
         net_profit = total_revenue - total_expenses
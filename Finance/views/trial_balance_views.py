@@ -4,15 +4,30 @@ from django.utils import timezone
 from django.urls import reverse_lazy
 from decimal import Decimal
 
+from config.report_cache import FINANCE_GL_TAG, get_cached_report
+from config.db_router import ReadReplicaMixin
 from ..models import ChartOfAccounts, GeneralLedger
 
-class TrialBalanceView(TemplateView):
+class TrialBalanceView(ReadReplicaMixin, TemplateView):
     template_name = 'finance/trial_balance.html'
     permission_required = 'Finance.view_generalledger'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Recomputed only after a GL posting or an account change
+        context.update(get_cached_report(
+            'finance.trial_balance', {}, self.get_trial_balance,
+            tags=[FINANCE_GL_TAG], user=self.request.user,
+        ))
+        context.update({
+            'title': 'Trial Balance',
+            'subtitle': f'As of {timezone.now().date()}',
+            'generated_on': timezone.now(),
+            'print_url': reverse_lazy('Finance:trial_balance_print'),
+        })
+        return context
 
+    def get_trial_balance(self):
         trial_data = []
         total_debit = Decimal('0')
         total_credit = Decimal('0')
@@ -82,15 +97,10 @@ class TrialBalanceView(TemplateView):
         print(f"📈 Trial Balance Totals: Dr={total_debit}, Cr={total_credit}")
         print(f"⚖️ Balanced: {is_balanced}, Difference: {balance_difference}")
 
-        context.update({
-            'title': 'Trial Balance',
-            'subtitle': f'As of {timezone.now().date()}',
+        return {
             'trial_data': trial_data,
             'total_debit': total_debit,
             'total_credit': total_credit,
             'balance_difference': balance_difference,
             'is_balanced': is_balanced,
-            'generated_on': timezone.now(),
-            'print_url': reverse_lazy('Finance:trial_balance_print'),
-        })
-        return context
+        }
@@ -0,0 +1,392 @@
+"""
+Monthly archival and compaction of ZKAttendanceLog.
+
+Closed months (older than HOT_MONTHS) are moved in batches from the live table
+to ZKAttendanceLogArchive, which keeps the columns reports read under two
+indexes, and get a ZKAttendanceDailySummary row per (user_id, date). Compacting
+an archived month drops its punches and keeps only the summaries.
+
+get_attendance_logs() is the read side: it returns the live queryset unchanged
+when no archived month is in range, and otherwise merges live rows, archived
+rows and punches rebuilt from the summaries of compacted months into an
+AttendanceLogList that filters like the queryset the reports use.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from config.pagination import reset_row_count
+from config.report_cache import attendance_tag, invalidate_report_tags
+from .models import ZKAttendanceArchiveMonth, ZKAttendanceDailySummary, ZKAttendanceLog, ZKAttendanceLogArchive
+from .signals.report_cache_signals import get_log_date
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'HOT_MONTHS': 3,           # months, besides the current one, kept in the live table
+    'COMPACT_AFTER_MONTHS': None,  # months after which archived punches are dropped; None keeps them
+    'BATCH_SIZE': 5000,        # rows moved per transaction
+}
+
+# Columns copied to the archive
+ARCHIVE_FIELDS = (
+    'device_id', 'device_serial_no', 'user_id', 'timestamp', 'punch_type', 'status', 'verify_type', 'work_code',
+)
+
+
+def get_archive_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'ATTENDANCE_ARCHIVE', {})}
+
+
+# ------------------------------------------
+# Months
+# ------------------------------------------
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def get_month_bounds(month):
+    """Aware [start, end) datetimes of a month in the current time zone."""
+    start = timezone.make_aware(datetime.combine(month, time.min))
+    end = timezone.make_aware(datetime.combine(add_months(month, 1), time.min))
+    return start, end
+
+
+def get_archive_cutoff(months=None):
+    """First month that stays live; every month before it is closed."""
+    if months is None:
+        months = get_archive_settings()['HOT_MONTHS']
+    return add_months(month_start(timezone.localdate()), -months)
+
+
+def get_archivable_months():
+    """Closed months that still have rows in the live table, oldest first; one index seek per month."""
+    cutoff, _ = get_month_bounds(get_archive_cutoff())
+    months = []
+    logs = ZKAttendanceLog.objects.filter(timestamp__lt=cutoff)
+    while True:
+        oldest = logs.aggregate(oldest=Min('timestamp'))['oldest']
+        if oldest is None:
+            return months
+        months.append(month_start(get_log_date(oldest)))
+        logs = logs.filter(timestamp__gte=get_month_bounds(months[-1])[1])
+
+
+def get_compactable_months():
+    months = get_archive_settings()['COMPACT_AFTER_MONTHS']
+    if months is None:
+        return []
+    return list(
+        ZKAttendanceArchiveMonth.objects.filter(compacted=False, month__lt=get_archive_cutoff(months))
+        .order_by('month').values_list('month', flat=True)
+    )
+
+
+# ------------------------------------------
+# Archiving
+# ------------------------------------------
+def delete_live_rows(start, end, first_id, last_id):
+    """
+    Deletes the live rows of [start, end) with ids in [first_id, last_id] in one
+    statement; a queryset delete would load every row to send post_delete.
+    """
+    quote = connection.ops.quote_name
+    adapt = connection.ops.adapt_datetimefield_value
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(ZKAttendanceLog._meta.db_table)} "
+            f"WHERE {quote('id')} BETWEEN %s AND %s AND {quote('timestamp')} >= %s AND {quote('timestamp')} < %s",
+            [first_id, last_id, adapt(start), adapt(end)],
+        )
+
+
+def get_daily_aggregates(queryset):
+    return (
+        queryset.annotate(day=TruncDate('timestamp')).values('user_id', 'day')
+        .annotate(first_punch=Min('timestamp'), last_punch=Max('timestamp'), punch_count=Count('id'))
+        .order_by()
+    )
+
+
+def merge_daily_summaries(aggregates):
+    """Adds aggregates to existing summaries (late punches of a compacted month) or creates them."""
+    aggregates = list(aggregates)
+    if not aggregates:
+        return
+    existing = {
+        (summary.user_id, summary.date): summary
+        for summary in ZKAttendanceDailySummary.objects.filter(
+            user_id__in={row['user_id'] for row in aggregates},
+            date__range=(min(row['day'] for row in aggregates), max(row['day'] for row in aggregates)),
+        )
+    }
+    created, updated = [], []
+    for row in aggregates:
+        summary = existing.get((row['user_id'], row['day']))
+        if summary is None:
+            created.append(ZKAttendanceDailySummary(
+                user_id=row['user_id'], date=row['day'], first_punch=row['first_punch'],
+                last_punch=row['last_punch'], punch_count=row['punch_count'],
+            ))
+            continue
+        summary.first_punch = min(summary.first_punch, row['first_punch'])
+        summary.last_punch = max(summary.last_punch, row['last_punch'])
+        summary.punch_count += row['punch_count']
+        updated.append(summary)
+    ZKAttendanceDailySummary.objects.bulk_create(created, batch_size=1000)
+    ZKAttendanceDailySummary.objects.bulk_update(updated, ['first_punch', 'last_punch', 'punch_count'], batch_size=1000)
+
+
+def get_late_punch_aggregates(archived):
+    """
+    Daily aggregates of the punches archived into a compacted month that its
+    summaries have not counted yet. The month's punches are gone, so a punch within
+    a summary's first/last range is taken to be one synced again from the device
+    and already counted; only punches outside it extend the range and the count.
+    """
+    punches = set(archived.values_list('user_id', 'timestamp'))
+    if not punches:
+        return []
+    days = {get_log_date(timestamp) for _, timestamp in punches}
+    summaries = {
+        (summary.user_id, summary.date): summary
+        for summary in ZKAttendanceDailySummary.objects.filter(
+            user_id__in={user_id for user_id, _ in punches}, date__range=(min(days), max(days)),
+        )
+    }
+    aggregates = {}
+    for user_id, timestamp in punches:
+        day = get_log_date(timestamp)
+        summary = summaries.get((user_id, day))
+        if summary is not None and summary.first_punch <= timestamp <= summary.last_punch:
+            continue
+        row = aggregates.setdefault((user_id, day), {
+            'user_id': user_id, 'day': day, 'first_punch': timestamp, 'last_punch': timestamp, 'punch_count': 0,
+        })
+        row['first_punch'] = min(row['first_punch'], timestamp)
+        row['last_punch'] = max(row['last_punch'], timestamp)
+        row['punch_count'] += 1
+    return list(aggregates.values())
+
+
+def archive_month(month):
+    """
+    Moves the live punches of a closed month to the archive in BATCH_SIZE
+    transactions and rebuilds its daily summaries. Running it again picks up late
+    punches of the month. Returns the number of live rows moved.
+    """
+    options = get_archive_settings()
+    month = month_start(month)
+    if month >= get_archive_cutoff():
+        raise ValueError(f"{month:%Y-%m} is not closed yet; the last {options['HOT_MONTHS']} months stay live.")
+
+    start, end = get_month_bounds(month)
+    live = ZKAttendanceLog.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    archive_month_record = ZKAttendanceArchiveMonth.objects.filter(month=month).first()
+    compacted = archive_month_record is not None and archive_month_record.compacted
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(live.order_by('id').values('id', *ARCHIVE_FIELDS)[:options['BATCH_SIZE']])
+            if not rows:
+                break
+            # ignore_conflicts skips punches archived before and synced into the live table again
+            ZKAttendanceLogArchive.objects.bulk_create(
+                [ZKAttendanceLogArchive(**{field: row[field] for field in ARCHIVE_FIELDS}) for row in rows],
+                batch_size=1000, ignore_conflicts=True,
+            )
+            delete_live_rows(start, end, rows[0]['id'], rows[-1]['id'])
+        moved += len(rows)
+
+    archived = ZKAttendanceLogArchive.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    with transaction.atomic():
+        if compacted:
+            # Only late punches are in the archive; fold the uncounted ones into the summaries and drop them again
+            merge_daily_summaries(get_late_punch_aggregates(archived))
+            archived.delete()
+        else:
+            ZKAttendanceDailySummary.objects.filter(date__gte=month, date__lt=add_months(month, 1)).delete()
+            merge_daily_summaries(get_daily_aggregates(archived))
+        archived_rows = archive_month_record.archived_rows + moved if compacted else archived.count()
+        ZKAttendanceArchiveMonth.objects.update_or_create(month=month, defaults={
+            'archived_rows': archived_rows,
+            'summary_rows': ZKAttendanceDailySummary.objects.filter(date__gte=month, date__lt=add_months(month, 1)).count(),
+        })
+        transaction.on_commit(lambda: reset_row_count(ZKAttendanceLog))
+
+    logger.info(f"Archived {moved} attendance logs of {month:%Y-%m}")
+    return moved
+
+
+def compact_month(month):
+    """Drops the archived punches of a month, keeping its daily summaries. Returns the rows dropped."""
+    month = month_start(month)
+    archive_month_record = ZKAttendanceArchiveMonth.objects.filter(month=month).first()
+    if archive_month_record is None:
+        raise ValueError(f"{month:%Y-%m} is not archived.")
+    if archive_month_record.compacted:
+        return 0
+
+    start, end = get_month_bounds(month)
+    with transaction.atomic():
+        dropped, _ = ZKAttendanceLogArchive.objects.filter(timestamp__gte=start, timestamp__lt=end).delete()
+        archive_month_record.compacted = True
+        archive_month_record.save(update_fields=['compacted', 'archived_at'])
+        # Reports of the month now see first/last punches only
+        tags = [attendance_tag(month + timedelta(days=n)) for n in range((add_months(month, 1) - month).days)]
+        transaction.on_commit(lambda: invalidate_report_tags(*tags))
+
+    logger.info(f"Compacted {dropped} archived attendance logs of {month:%Y-%m}")
+    return dropped
+
+
+# ------------------------------------------
+# Reading
+# ------------------------------------------
+class SummaryPunch:
+    """A first or last punch rebuilt from the daily summary of a compacted month."""
+    device = None
+    device_id = None
+    device_serial_no = None
+    status = None
+    verify_type = None
+    work_code = None
+
+    def __init__(self, user_id, timestamp, punch_type):
+        self.user_id = user_id
+        self.timestamp = timestamp
+        self.punch_type = punch_type
+
+    def __repr__(self):
+        return f"<SummaryPunch {self.user_id} {self.timestamp} {self.punch_type}>"
+
+
+def get_summary_punches(summary):
+    punches = [SummaryPunch(summary.user_id, summary.first_punch, 'Check In')]
+    if summary.punch_count > 1 and summary.last_punch != summary.first_punch:
+        punches.append(SummaryPunch(summary.user_id, summary.last_punch, 'Check Out'))
+    return punches
+
+
+# Lookups AttendanceLogList.filter() understands, as (log, value) predicates
+LOG_LOOKUPS = {
+    'user_id': lambda log, value: log.user_id == str(value),
+    'user_id__in': lambda log, value: log.user_id in {str(item) for item in value},
+    'timestamp__gte': lambda log, value: log.timestamp >= value,
+    'timestamp__gt': lambda log, value: log.timestamp > value,
+    'timestamp__lte': lambda log, value: log.timestamp <= value,
+    'timestamp__lt': lambda log, value: log.timestamp < value,
+    'timestamp__date': lambda log, value: get_log_date(log.timestamp) == value,
+    'timestamp__date__gte': lambda log, value: get_log_date(log.timestamp) >= value,
+    'timestamp__date__lte': lambda log, value: get_log_date(log.timestamp) <= value,
+    'timestamp__date__range': lambda log, value: value[0] <= get_log_date(log.timestamp) <= value[1],
+}
+
+
+class AttendanceLogList:
+    """
+    Punches merged from the live table and the archive. Supports the part of the
+    QuerySet API attendance reports use: filter() on user and date lookups,
+    order_by(), exists(), count(), first(), last() and iteration.
+    """
+
+    def __init__(self, logs):
+        self.logs = list(logs)
+
+    def __iter__(self):
+        return iter(self.logs)
+
+    def __len__(self):
+        return len(self.logs)
+
+    def __getitem__(self, index):
+        return self.logs[index]
+
+    def __bool__(self):
+        return bool(self.logs)
+
+    def filter(self, **lookups):
+        unknown = set(lookups) - set(LOG_LOOKUPS)
+        if unknown:
+            raise TypeError(f"Unsupported attendance log lookups: {', '.join(sorted(unknown))}")
+        return AttendanceLogList(
+            log for log in self.logs if all(LOG_LOOKUPS[name](log, value) for name, value in lookups.items())
+        )
+
+    def order_by(self, *fields):
+        logs = list(self.logs)
+        for field in reversed(fields):
+            logs.sort(key=lambda log: getattr(log, field.lstrip('-')) or '', reverse=field.startswith('-'))
+        return AttendanceLogList(logs)
+
+    def select_related(self, *fields):
+        return self
+
+    def exists(self):
+        return bool(self.logs)
+
+    def count(self):
+        return len(self.logs)
+
+    def first(self):
+        return self.logs[0] if self.logs else None
+
+    def last(self):
+        return self.logs[-1] if self.logs else None
+
+
+def filter_logs(queryset, user_ids, start_date, end_date):
+    queryset = queryset.filter(timestamp__date__range=[start_date, end_date])
+    if isinstance(user_ids, str):
+        return queryset.filter(user_id=user_ids)
+    if user_ids is not None:
+        return queryset.filter(user_id__in=list(user_ids))
+    return queryset
+
+
+def get_attendance_logs(user_ids, start_date, end_date):
+    """
+    Punches of user_ids (one device user ID or an iterable of them; None for all)
+    from start_date to end_date inclusive, ordered by user and time.
+
+    Ranges that only cover live months get the ZKAttendanceLog queryset itself;
+    ranges reaching into archived months get an AttendanceLogList of live,
+    archived and summary punches.
+    """
+    live = filter_logs(ZKAttendanceLog.objects.all(), user_ids, start_date, end_date).order_by('user_id', 'timestamp')
+    archived_months = dict(
+        ZKAttendanceArchiveMonth.objects.filter(month__gte=month_start(start_date), month__lte=end_date)
+        .values_list('month', 'compacted')
+    )
+    if not archived_months:
+        return live
+
+    logs = list(live.select_related('device'))
+    logs += filter_logs(ZKAttendanceLogArchive.objects.select_related('device'), user_ids, start_date, end_date)
+    compacted = [month for month, is_compacted in archived_months.items() if is_compacted]
+    if compacted:
+        summaries = ZKAttendanceDailySummary.objects.filter(date__range=[start_date, end_date])
+        if isinstance(user_ids, str):
+            summaries = summaries.filter(user_id=user_ids)
+        elif user_ids is not None:
+            summaries = summaries.filter(user_id__in=list(user_ids))
+        for summary in summaries:
+            if month_start(summary.date) in compacted:
+                logs += get_summary_punches(summary)
+
+    # A punch synced again after its month was archived is in both tables
+    unique_logs = {}
+    for log in logs:
+        unique_logs.setdefault((log.device_id, log.user_id, log.timestamp, log.punch_type), log)
+    return AttendanceLogList(sorted(unique_logs.values(), key=lambda log: (log.user_id, log.timestamp)))
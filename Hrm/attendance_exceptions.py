@@ -0,0 +1,312 @@
+"""
+Incremental attendance exceptions.
+
+Instead of replaying UnifiedAttendanceProcessor over a date range, the
+exceptions of an employee's day (late, early leave, missing check-in or
+check-out) are re-evaluated whenever punches of that day arrive and, through
+the evaluate_attendance_exceptions command, as shift windows close. The result
+is kept in AttendanceException, and new exceptions are sent to the employee's
+reporting manager (superusers when there is none) as one Notification per
+recipient and evaluation.
+
+Shift resolution follows the reports: RosterDay, then RosterAssignment, then the
+employee's default shift. Thresholds come from settings.ATTENDANCE_EXCEPTIONS.
+"""
+import contextvars
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from global_settings.models import Notification
+from global_settings.notifications import invalidate_unread_counts
+from .models import (
+    AttendanceException, Employee, Holiday, LeaveApplication, RosterAssignment, RosterDay, ZKAttendanceLog,
+)
+from .signals.report_cache_signals import get_log_date
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'LOOKBACK_DAYS': 1,                 # punches of older days (imports, late syncs) are not evaluated
+    'GRACE_MINUTES': 15,                # used when the shift has no grace time
+    'USE_SHIFT_GRACE': True,
+    'EARLY_OUT_THRESHOLD_MINUTES': 30,  # as the reports' early_out_threshold_minutes
+    'MISSING_IN_AFTER_MINUTES': 60,     # minutes after shift start without a punch
+    'WINDOW_CLOSE_MINUTES': 120,        # minutes after shift end before a single punch is a missing check-out
+    'WEEKEND_DAYS': [4],                # date.weekday() numbers, as in the report forms
+    'NOTIFY': True,
+}
+
+_request_days = contextvars.ContextVar('attendance_exception_request_days', default=None)
+
+
+def get_exception_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'ATTENDANCE_EXCEPTIONS', {})}
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# ------------------------------------------
+# Shifts
+# ------------------------------------------
+def get_shifts(employees, days):
+    """{(employee_id, day): shift} for each employee and day, RosterDay first."""
+    employee_ids = [employee.pk for employee in employees]
+    roster_days = {
+        (roster_day.roster_assignment.employee_id, roster_day.date): roster_day.shift
+        for roster_day in RosterDay.objects.filter(
+            roster_assignment__employee_id__in=employee_ids, date__in=days,
+        ).select_related('shift', 'roster_assignment')
+    }
+    assignments = list(
+        RosterAssignment.objects.filter(
+            employee_id__in=employee_ids, roster__start_date__lte=max(days), roster__end_date__gte=min(days),
+        ).select_related('shift', 'roster')
+    )
+    shifts = {}
+    for employee in employees:
+        for day in days:
+            shift = roster_days.get((employee.pk, day))
+            if shift is None:
+                assignment = next(
+                    (assignment for assignment in assignments if assignment.employee_id == employee.pk
+                     and assignment.roster.start_date <= day <= assignment.roster.end_date),
+                    None,
+                )
+                shift = assignment.shift if assignment and assignment.shift else employee.default_shift
+            shifts[(employee.pk, day)] = shift
+    return shifts
+
+
+def get_shift_window(shift, day):
+    """Aware expected start and end of shift on day; overnight shifts end the next day."""
+    expected_start = timezone.make_aware(datetime.combine(day, shift.start_time))
+    expected_end = timezone.make_aware(datetime.combine(day, shift.end_time))
+    if shift.end_time < shift.start_time:
+        expected_end += timedelta(days=1)
+    return expected_start, expected_end
+
+
+# ------------------------------------------
+# Evaluation
+# ------------------------------------------
+def get_day_exceptions(shift, day, punches, now, options):
+    """
+    Exceptions that hold for one employee's day at now, as {type: field values}.
+    Conditions that depend on time passing (missing punches, early leave) are only
+    raised once the moment that decides them is past.
+    """
+    expected_start, expected_end = get_shift_window(shift, day)
+    grace = shift.grace_time if options['USE_SHIFT_GRACE'] and shift.grace_time else options['GRACE_MINUTES']
+    base = {'shift_id': shift.pk, 'expected_start': expected_start, 'expected_end': expected_end}
+    in_time = punches[0] if punches else None
+    out_time = punches[-1] if len(punches) > 1 else None
+    exceptions = {}
+
+    if in_time is None:
+        if now >= expected_start + timedelta(minutes=options['MISSING_IN_AFTER_MINUTES']):
+            exceptions['MISSING_IN'] = {**base, 'in_time': None, 'out_time': None, 'minutes': 0}
+        return exceptions
+
+    base.update(in_time=in_time, out_time=out_time)
+    if in_time > expected_start + timedelta(minutes=grace):
+        exceptions['LATE'] = {**base, 'minutes': round((in_time - expected_start).total_seconds() / 60)}
+
+    early_threshold = expected_end - timedelta(minutes=options['EARLY_OUT_THRESHOLD_MINUTES'])
+    if out_time is None:
+        if now >= expected_end + timedelta(minutes=options['WINDOW_CLOSE_MINUTES']):
+            exceptions['MISSING_OUT'] = {**base, 'minutes': 0}
+    elif out_time < early_threshold and now >= early_threshold:
+        # A later punch moves out_time and clears this on the next evaluation
+        exceptions['EARLY_LEAVE'] = {**base, 'minutes': round((expected_end - out_time).total_seconds() / 60)}
+    return exceptions
+
+
+def get_punches(employees, shifts, day, options):
+    """
+    Sorted punch times of each employee's day: the calendar day, extended to the
+    window close of an overnight shift and starting after the previous night's.
+    """
+    close = timedelta(minutes=options['WINDOW_CLOSE_MINUTES'])
+    windows = {}
+    for employee in employees:
+        start, end = day_start(day), day_start(day + timedelta(days=1))
+        previous_shift = shifts.get((employee.pk, day - timedelta(days=1)))
+        if previous_shift and previous_shift.end_time < previous_shift.start_time:
+            start = max(start, get_shift_window(previous_shift, day - timedelta(days=1))[1] + close)
+        shift = shifts.get((employee.pk, day))
+        if shift and shift.end_time < shift.start_time:
+            end = get_shift_window(shift, day)[1] + close
+        windows[employee.employee_id] = (start, end)
+
+    punches = defaultdict(list)
+    if not windows:
+        return punches
+    logs = ZKAttendanceLog.objects.filter(
+        user_id__in=list(windows),
+        timestamp__gte=min(start for start, _ in windows.values()),
+        timestamp__lt=max(end for _, end in windows.values()),
+    ).values_list('user_id', 'timestamp').order_by('timestamp')
+    for user_id, timestamp in logs:
+        start, end = windows[user_id]
+        if start <= timestamp < end:
+            punches[user_id].append(timestamp)
+    return punches
+
+
+def evaluate_attendance_exceptions(day, user_ids=None, now=None):
+    """
+    Re-evaluates the exceptions of day for active employees (only those whose
+    employee_id is in user_ids, when given) and reconciles AttendanceException:
+    new exceptions are created and notified, changed ones updated, and ones that
+    no longer hold are marked resolved. Returns the list of new exceptions.
+    """
+    options = get_exception_settings()
+    now = now or timezone.now()
+    employees = Employee.objects.filter(is_active=True).select_related('default_shift', 'reporting_manager__user')
+    if user_ids is not None:
+        employees = employees.filter(employee_id__in=list(user_ids))
+    employees = list(employees)
+    if not employees:
+        return []
+
+    previous_day = day - timedelta(days=1)
+    shifts = get_shifts(employees, [previous_day, day])
+    punches = get_punches(employees, shifts, day, options)
+    is_day_off = day.weekday() in options['WEEKEND_DAYS'] or Holiday.objects.filter(date=day).exists()
+    on_leave = set(LeaveApplication.objects.filter(
+        employee__in=employees, status='APP', start_date__lte=day, end_date__gte=day,
+    ).values_list('employee_id', flat=True))
+
+    expected = {}
+    for employee in employees:
+        shift = shifts.get((employee.pk, day))
+        if shift is None or is_day_off or employee.pk in on_leave:
+            continue
+        for exception_type, values in get_day_exceptions(shift, day, punches[employee.employee_id], now, options).items():
+            expected[(employee.pk, exception_type)] = values
+
+    with transaction.atomic():
+        existing = {
+            (exception.employee_id, exception.exception_type): exception
+            for exception in AttendanceException.objects.select_for_update().filter(employee__in=employees, date=day)
+        }
+        created, changed = [], []
+        for key, values in expected.items():
+            exception = existing.get(key)
+            if exception is None:
+                created.append(AttendanceException(employee_id=key[0], date=day, exception_type=key[1], **values))
+                continue
+            updates = {name: value for name, value in values.items() if getattr(exception, name) != value}
+            if updates or exception.resolved_at:
+                for name, value in updates.items():
+                    setattr(exception, name, value)
+                exception.resolved_at = None
+                changed.append(exception)
+        for key, exception in existing.items():
+            if key not in expected and exception.resolved_at is None:
+                exception.resolved_at = now
+                changed.append(exception)
+
+        AttendanceException.objects.bulk_create(created)
+        for exception in changed:
+            exception.updated_at = now
+        AttendanceException.objects.bulk_update(changed, [
+            'shift', 'expected_start', 'expected_end', 'in_time', 'out_time', 'minutes', 'resolved_at', 'updated_at',
+        ])
+        if created and options['NOTIFY']:
+            employees_by_id = {employee.pk: employee for employee in employees}
+            notify_exceptions(day, [(employees_by_id[exception.employee_id], exception) for exception in created])
+    return created
+
+
+def notify_exceptions(day, exceptions):
+    """One Notification per recipient listing the new exceptions of their employees."""
+    by_recipient = defaultdict(list)
+    superusers = None
+    for employee, exception in exceptions:
+        manager = employee.reporting_manager
+        if manager and manager.user_id:
+            recipients = [manager.user]
+        else:
+            if superusers is None:
+                superusers = list(User.objects.filter(is_superuser=True, is_active=True))
+            recipients = superusers
+        for recipient in recipients:
+            by_recipient[recipient.pk].append((employee, exception))
+
+    notifications = []
+    for recipient_id, items in by_recipient.items():
+        lines = []
+        for employee, exception in items:
+            line = f"{employee.get_full_name()} ({employee.employee_id}): {exception.get_exception_type_display()}"
+            if exception.minutes:
+                line += f", {exception.minutes} min"
+            lines.append(line)
+        notifications.append(Notification(
+            recipient_id=recipient_id,
+            title=f"Attendance exceptions on {day:%Y-%m-%d} ({len(items)})",
+            message='\n'.join(lines),
+            notification_type='warning',
+        ))
+    Notification.objects.bulk_create(notifications)
+    # bulk_create sends no post_save, so the recipients' cached unread counts are invalidated here
+    invalidate_unread_counts(notifications)
+
+
+# ------------------------------------------
+# Triggers
+# ------------------------------------------
+def evaluate_punch_days(punch_days, now=None):
+    """
+    Evaluates the (user_id, date) pairs of new punches, one query batch per day.
+    A punch can close the previous day's overnight shift, so that day is evaluated
+    too. Failures are logged and never reach the code that stored the punches.
+    """
+    options = get_exception_settings()
+    if not options['ENABLED'] or not punch_days:
+        return
+    oldest = timezone.localdate() - timedelta(days=options['LOOKBACK_DAYS'])
+    users_by_day = defaultdict(set)
+    for user_id, day in punch_days:
+        for evaluated_day in (day, day - timedelta(days=1)):
+            if evaluated_day >= oldest:
+                users_by_day[evaluated_day].add(user_id)
+    for day, user_ids in sorted(users_by_day.items()):
+        try:
+            evaluate_attendance_exceptions(day, user_ids, now=now)
+        except Exception:
+            logger.exception(f"Could not evaluate attendance exceptions of {day}")
+
+
+def queue_punch_evaluation(user_id, timestamp):
+    """
+    Evaluates a stored punch's day. Inside a request the days are collected and
+    evaluated once when the request finishes, so a sync saving thousands of
+    punches costs one batch per day; elsewhere right after commit.
+    """
+    punch_day = (user_id, get_log_date(timestamp))
+    pending = _request_days.get()
+    if pending is not None:
+        pending.add(punch_day)
+    else:
+        transaction.on_commit(lambda: evaluate_punch_days({punch_day}))
+
+
+def start_request_batch(**kwargs):
+    _request_days.set(set())
+
+
+def finish_request_batch(**kwargs):
+    pending = _request_days.get()
+    _request_days.set(None)
+    if pending:
+        evaluate_punch_days(pending)
@@ -61,7 +61,7 @@ from .holiday_form import (
 
 from .attendance_forms import (
     AttendanceMonthForm, AttendanceLogForm, AttendanceForm, 
-    OvertimeRecordForm, AttendanceFilterForm
+    OvertimeRecordForm, AttendanceFilterForm, AttendanceExceptionFilterForm
 )
 
 from .payroll_forms import (
@@ -98,7 +98,7 @@ __all__ = [
     
     # Attendance related forms
     'AttendanceMonthForm', 'AttendanceLogForm', 'AttendanceForm',
-    'OvertimeRecordForm', 'AttendanceFilterForm',
+    'OvertimeRecordForm', 'AttendanceFilterForm', 'AttendanceExceptionFilterForm',
     
     # Payroll related forms
     'SalaryComponentForm', 'EmployeeSalaryStructureForm', 'SalaryStructureComponentForm',
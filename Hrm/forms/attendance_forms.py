@@ -1,6 +1,6 @@
 from django import forms
 from datetime import datetime, timedelta
-from ..models import AttendanceMonth, AttendanceLog, Attendance, OvertimeRecord, Employee
+from ..models import AttendanceMonth, AttendanceLog, Attendance, OvertimeRecord, Employee, AttendanceException
 from config.forms import CustomTextarea, BaseFilterForm
 
 class AttendanceMonthForm(forms.ModelForm):
@@ -178,3 +178,24 @@ class AttendanceFilterForm(BaseFilterForm):
         # Update employee queryset to only show active employees
         self.fields['employee'].queryset = Employee.objects.filter(is_active=True)
 
+
+class AttendanceExceptionFilterForm(BaseFilterForm):
+    """Form for filtering live attendance exceptions"""
+
+    MODEL_STATUS_CHOICES = list(AttendanceException.EXCEPTION_TYPES)
+
+    employee = forms.ModelChoiceField(
+        queryset=Employee.objects.all(),
+        required=False,
+        empty_label="All Employees",
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    include_resolved = forms.BooleanField(
+        required=False,
+        label="Include Resolved",
+        widget=forms.CheckboxInput(attrs={'class': 'form-checkbox'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['employee'].queryset = Employee.objects.filter(is_active=True)
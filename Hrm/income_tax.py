@@ -0,0 +1,386 @@
+"""
+Annual income tax projection.
+
+For a tax year, every employee's annual income is projected in one pass: the
+salaries already paid in the tax year (EmployeeSalary with its SalaryDetail
+rows) plus bonuses, and the current salary structure for each month still to
+be paid. Exemptions follow the components: a component that is not taxable is
+exempt, and an AllowanceCalculation row gives the taxable percentage of a
+taxable one. The TaxRate slabs of the year are loaded once and applied to the
+taxable income, EmployeeInvestment rows of the year earn a rebate, and the tax
+still due after what was withheld so far (deductions of the TAX_COMPONENT_CODES
+components) is spread over the remaining months as the monthly withholding.
+Results are written to EmployeeTax with bulk_update/bulk_create.
+
+Changes to salaries, structures, investments, slabs or components queue the
+affected employees (Hrm/signals/income_tax_signals.py); inside a request they
+are projected once when it finishes, elsewhere right after commit. Settings
+come from settings.INCOME_TAX.
+"""
+import contextvars
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import (
+    AllowanceCalculation, Employee, EmployeeBonus, EmployeeInvestment, EmployeeSalary, EmployeeSalaryStructure,
+    EmployeeTax, SalaryComponent, SalaryDetail, SalaryMonth, SalaryStructureComponent, TaxRate, TaxYear,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,                   # re-project when an input changes
+    'TAX_COMPONENT_CODES': ['TAX'],    # deduction components that record withheld tax
+    'ALLOWANCE_PLAN': None,            # AllowanceCalculationPlan name; None uses every plan
+    'INVESTMENT_ALLOWANCE_RATE': 20,   # % of taxable income an investment may count up to
+    'INVESTMENT_MAX': None,            # cap on the counted investment
+    'INVESTMENT_REBATE_RATE': 15,      # % of the counted investment taken off the tax
+}
+
+ZERO = Decimal('0.00')
+CENT = Decimal('0.01')
+HUNDRED = Decimal('100')
+
+_request_queue = contextvars.ContextVar('income_tax_request_queue', default=None)
+
+
+def get_income_tax_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'INCOME_TAX', {})}
+
+
+def money(value):
+    return Decimal(value or 0).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def month_index(year, month):
+    return year * 12 + month - 1
+
+
+def get_tax_year_months(tax_year):
+    """month_index() of every month the tax year touches."""
+    return range(
+        month_index(tax_year.start_date.year, tax_year.start_date.month),
+        month_index(tax_year.end_date.year, tax_year.end_date.month) + 1,
+    )
+
+
+def get_current_tax_year(day=None):
+    """The active tax year covering day (today), else the latest active one."""
+    day = day or timezone.localdate()
+    tax_years = TaxYear.objects.filter(is_active=True)
+    return (
+        tax_years.filter(start_date__lte=day, end_date__gte=day).order_by('-start_date').first()
+        or tax_years.order_by('-start_date').first()
+    )
+
+
+# ------------------------------------------
+# Slabs and exemptions
+# ------------------------------------------
+class TaxSlabs:
+    """The TaxRate slabs of a tax year, each rate applied to the part of the income inside its band."""
+
+    def __init__(self, tax_year):
+        self.slabs = [
+            (rate.min_amount, rate.max_amount, rate.rate)
+            for rate in TaxRate.objects.filter(tax_year=tax_year).order_by('min_amount')
+        ]
+
+    def tax_on(self, income):
+        tax = ZERO
+        for min_amount, max_amount, rate in self.slabs:
+            if income <= min_amount:
+                break
+            upper = income if max_amount is None else min(income, max_amount)
+            tax += (upper - min_amount) * rate / HUNDRED
+        return money(tax)
+
+
+def get_taxable_shares(options):
+    """{component_id: taxable fraction} of the earning components that are not fully taxable."""
+    shares = {
+        component_id: ZERO
+        for component_id in SalaryComponent.objects.filter(
+            component_type='EARN', is_taxable=False,
+        ).values_list('pk', flat=True)
+    }
+    calculations = AllowanceCalculation.objects.filter(component__is_taxable=True)
+    if options['ALLOWANCE_PLAN']:
+        calculations = calculations.filter(plan__name=options['ALLOWANCE_PLAN'])
+    for component_id, percentage in calculations.values_list('component_id', 'percentage'):
+        # With several plans the most favourable (lowest) taxable share wins
+        share = min(percentage, HUNDRED) / HUNDRED
+        shares[component_id] = min(shares.get(component_id, share), share)
+    return shares
+
+
+def get_exempt_amount(amount, component_id, shares):
+    share = shares.get(component_id)
+    return ZERO if share is None else amount * (1 - share)
+
+
+# ------------------------------------------
+# Income
+# ------------------------------------------
+def get_paid_income(salary_months, employee_ids, shares, options):
+    """
+    {employee_id: {'months', 'income', 'exemptions', 'tax_deducted'}} of the
+    salaries paid in salary_months ({salary_month_id: month_index}).
+    """
+    paid = defaultdict(lambda: {'months': set(), 'income': ZERO, 'exemptions': ZERO, 'tax_deducted': ZERO})
+    salaries = EmployeeSalary.objects.filter(salary_month_id__in=salary_months)
+    details = SalaryDetail.objects.filter(salary__salary_month_id__in=salary_months)
+    if employee_ids is not None:
+        salaries = salaries.filter(employee_id__in=employee_ids)
+        details = details.filter(salary__employee_id__in=employee_ids)
+
+    for employee_id, salary_month_id, total_earnings in salaries.values_list(
+        'employee_id', 'salary_month_id', 'total_earnings',
+    ):
+        paid[employee_id]['months'].add(salary_months[salary_month_id])
+        paid[employee_id]['income'] += total_earnings
+
+    tax_codes = options['TAX_COMPONENT_CODES']
+    for row in details.values('salary__employee_id', 'component_id', 'component__component_type').annotate(
+        total=Sum('amount'),
+    ).filter(Q(component__component_type='EARN') | Q(component__code__in=tax_codes)):
+        employee = paid[row['salary__employee_id']]
+        if row['component__component_type'] == 'EARN':
+            employee['exemptions'] += get_exempt_amount(row['total'], row['component_id'], shares)
+        else:
+            employee['tax_deducted'] += row['total']
+    return paid
+
+
+def get_bonus_income(tax_year, employee_ids):
+    """{employee_id: bonuses of the bonus months in the tax year}."""
+    months = get_tax_year_months(tax_year)
+    bonus_months = Q()
+    for year in range(tax_year.start_date.year, tax_year.end_date.year + 1):
+        month_numbers = [month for month in range(1, 13) if month_index(year, month) in months]
+        bonus_months |= Q(bonus_month__year=year, bonus_month__month__in=month_numbers)
+    bonuses = EmployeeBonus.objects.filter(bonus_months)
+    if employee_ids is not None:
+        bonuses = bonuses.filter(employee_id__in=employee_ids)
+    return dict(bonuses.values('employee_id').annotate(total=Sum('amount')).values_list('employee_id', 'total'))
+
+
+def get_monthly_income(employees, shares):
+    """{employee_id: (monthly earnings, monthly exemptions)} from the salary structures."""
+    structures = {
+        structure.employee_id: structure
+        for structure in EmployeeSalaryStructure.objects.filter(employee__in=employees)
+    }
+    exemptions = defaultdict(Decimal)
+    for employee_id, component_id, amount in SalaryStructureComponent.objects.filter(
+        salary_structure__employee__in=employees, component__component_type='EARN', is_active=True,
+    ).values_list('salary_structure__employee_id', 'component_id', 'calculated_amount'):
+        exemptions[employee_id] += get_exempt_amount(amount, component_id, shares)
+
+    monthly = {}
+    for employee in employees:
+        structure = structures.get(employee.pk)
+        if structure is not None:
+            monthly[employee.pk] = (structure.total_earnings, exemptions[employee.pk])
+        else:
+            monthly[employee.pk] = (employee.gross_salary or ZERO, ZERO)
+    return monthly
+
+
+def get_investments(tax_year, employee_ids):
+    investments = EmployeeInvestment.objects.filter(tax_year=tax_year)
+    if employee_ids is not None:
+        investments = investments.filter(employee_id__in=employee_ids)
+    return dict(investments.values('employee_id').annotate(total=Sum('amount')).values_list('employee_id', 'total'))
+
+
+def get_projected_months(tax_year_months, paid_months, employee):
+    """
+    Months of the tax year from the joining month on without a salary yet. Past
+    months nobody paid are projected too, since they will still be paid.
+    """
+    first = tax_year_months.start
+    if employee.joining_date:
+        first = max(first, month_index(employee.joining_date.year, employee.joining_date.month))
+    return len([index for index in range(first, tax_year_months.stop) if index not in paid_months])
+
+
+# ------------------------------------------
+# Projection
+# ------------------------------------------
+def calculate_tax(slabs, income, exemptions, investments, tax_deducted, projected_months, options):
+    taxable_income = max(money(income - exemptions), ZERO)
+    gross_tax = slabs.tax_on(taxable_income)
+    counted_investment = min(investments, taxable_income * Decimal(options['INVESTMENT_ALLOWANCE_RATE']) / HUNDRED)
+    if options['INVESTMENT_MAX'] is not None:
+        counted_investment = min(counted_investment, Decimal(options['INVESTMENT_MAX']))
+    rebate = min(money(counted_investment * Decimal(options['INVESTMENT_REBATE_RATE']) / HUNDRED), gross_tax)
+    tax_amount = gross_tax - rebate
+    remaining = max(tax_amount - tax_deducted, ZERO)
+    return {
+        'total_income': money(income),
+        'total_exemptions': money(exemptions),
+        'total_investments': money(investments),
+        'taxable_income': taxable_income,
+        'tax_amount': tax_amount,
+        'investment_rebate': rebate,
+        'tax_deducted': money(tax_deducted),
+        'monthly_tax': money(remaining / projected_months) if projected_months else ZERO,
+        'projected_months': projected_months,
+    }
+
+
+PROJECTED_FIELDS = (
+    'total_income', 'total_exemptions', 'total_investments', 'taxable_income', 'tax_amount',
+    'investment_rebate', 'tax_deducted', 'monthly_tax', 'projected_months',
+)
+
+
+def project_income_tax(tax_year=None, employee_ids=None, today=None):
+    """
+    Projects the tax of tax_year (the current one) for employee_ids, or every
+    active employee, and stores it in EmployeeTax. Returns the number of
+    employees projected.
+    """
+    options = get_income_tax_settings()
+    tax_year = tax_year or get_current_tax_year(today)
+    if tax_year is None:
+        return 0
+
+    employees = Employee.objects.filter(is_active=True)
+    if employee_ids is not None:
+        employee_ids = set(employee_ids)
+        employees = employees.filter(pk__in=employee_ids)
+    employees = list(employees.only('pk', 'joining_date', 'gross_salary'))
+    if not employees:
+        return 0
+
+    tax_year_months = get_tax_year_months(tax_year)
+    salary_months = {
+        salary_month.pk: month_index(salary_month.year, salary_month.month)
+        for salary_month in SalaryMonth.objects.filter(
+            year__gte=tax_year.start_date.year, year__lte=tax_year.end_date.year,
+        )
+        if month_index(salary_month.year, salary_month.month) in tax_year_months
+    }
+    slabs = TaxSlabs(tax_year)
+    shares = get_taxable_shares(options)
+    paid = get_paid_income(salary_months, employee_ids, shares, options)
+    bonuses = get_bonus_income(tax_year, employee_ids)
+    monthly = get_monthly_income(employees, shares)
+    investments = get_investments(tax_year, employee_ids)
+    existing = {
+        employee_tax.employee_id: employee_tax
+        for employee_tax in EmployeeTax.objects.filter(tax_year=tax_year, employee__in=employees)
+    }
+
+    now = timezone.now()
+    updated, created = [], []
+    for employee in employees:
+        employee_paid = paid.get(employee.pk) or {'months': set(), 'income': ZERO, 'exemptions': ZERO,
+                                                  'tax_deducted': ZERO}
+        projected_months = get_projected_months(tax_year_months, employee_paid['months'], employee)
+        monthly_income, monthly_exemptions = monthly[employee.pk]
+        values = calculate_tax(
+            slabs,
+            income=employee_paid['income'] + bonuses.get(employee.pk, ZERO) + monthly_income * projected_months,
+            exemptions=employee_paid['exemptions'] + monthly_exemptions * projected_months,
+            investments=investments.get(employee.pk, ZERO),
+            tax_deducted=employee_paid['tax_deducted'],
+            projected_months=projected_months,
+            options=options,
+        )
+        employee_tax = existing.get(employee.pk)
+        if employee_tax is None:
+            created.append(EmployeeTax(employee=employee, tax_year=tax_year, generated_date=now, **values))
+            continue
+        for field, value in values.items():
+            setattr(employee_tax, field, value)
+        employee_tax.generated_date = now
+        employee_tax.updated_at = now
+        updated.append(employee_tax)
+
+    with transaction.atomic():
+        EmployeeTax.objects.bulk_update(
+            updated, [*PROJECTED_FIELDS, 'generated_date', 'updated_at'], batch_size=500,
+        )
+        EmployeeTax.objects.bulk_create(created, batch_size=500)
+    return len(employees)
+
+
+# ------------------------------------------
+# Incremental projection
+# ------------------------------------------
+def get_tax_years_of(day):
+    return list(TaxYear.objects.filter(is_active=True, start_date__lte=day, end_date__gte=day))
+
+
+def project_queued(queued, today=None):
+    """
+    Projects queued changes: (tax_year_id, day, employee_id) entries where a
+    missing tax year means the one covering day (the current one without a day)
+    and a missing employee means everyone. Failures are logged and never reach
+    the code that saved the inputs.
+    """
+    if not queued or not get_income_tax_settings()['ENABLED']:
+        return
+    employees_by_year = {}
+    tax_years = {}
+    current = None
+    for tax_year_id, day, employee_id in queued:
+        if tax_year_id is not None:
+            years = [tax_years.get(tax_year_id) or TaxYear.objects.filter(pk=tax_year_id).first()]
+        elif day is not None:
+            years = get_tax_years_of(day)
+        else:
+            current = current or get_current_tax_year(today)
+            years = [current]
+        for tax_year in years:
+            if tax_year is None:
+                continue
+            tax_years[tax_year.pk] = tax_year
+            employee_ids = employees_by_year.setdefault(tax_year.pk, set())
+            if employee_id is None or employee_ids is None:
+                employees_by_year[tax_year.pk] = None
+            else:
+                employee_ids.add(employee_id)
+
+    for tax_year_id, employee_ids in employees_by_year.items():
+        try:
+            project_income_tax(tax_years[tax_year_id], employee_ids, today=today)
+        except Exception:
+            logger.exception(f"Could not project income tax of tax year {tax_year_id}")
+
+
+def queue_tax_projection(employee_id=None, tax_year_id=None, day=None):
+    """
+    Re-projects an employee (everyone without one) of a tax year, or the one
+    covering day. Inside a request the changes are collected and projected once
+    when it finishes; elsewhere right after commit.
+    """
+    if not get_income_tax_settings()['ENABLED']:
+        return
+    entry = (tax_year_id, day, employee_id)
+    pending = _request_queue.get()
+    if pending is not None:
+        pending.add(entry)
+    else:
+        transaction.on_commit(lambda: project_queued({entry}))
+
+
+def start_request_queue(**kwargs):
+    _request_queue.set(set())
+
+
+def finish_request_queue(**kwargs):
+    pending = _request_queue.get()
+    _request_queue.set(None)
+    if pending:
+        project_queued(pending)
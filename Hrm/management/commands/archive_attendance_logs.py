@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Hrm.attendance_archive import (
+    archive_month, compact_month, get_archivable_months, get_archive_cutoff, get_compactable_months,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move closed months of ZKAttendanceLog to the archive with daily summaries, and compact archived months "
+        "past ATTENDANCE_ARCHIVE['COMPACT_AFTER_MONTHS']. Safe to run repeatedly, e.g. nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help="Archive only this month (YYYY-MM).")
+        parser.add_argument('--compact', action='store_true', help="Also compact --month, keeping only its summaries.")
+        parser.add_argument('--dry-run', action='store_true', help="List the months that would be archived or compacted.")
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                month = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError("--month must be YYYY-MM.")
+            to_archive, to_compact = [month], [month] if options['compact'] else []
+        else:
+            to_archive, to_compact = get_archivable_months(), None
+
+        if options['dry_run']:
+            self.stdout.write(f"Archive: {', '.join(f'{month:%Y-%m}' for month in to_archive) or 'nothing'}")
+            if to_compact is None:
+                to_compact = get_compactable_months()
+            self.stdout.write(f"Compact: {', '.join(f'{month:%Y-%m}' for month in to_compact) or 'nothing'}")
+            return
+
+        for month in to_archive:
+            try:
+                moved = archive_month(month)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"{month:%Y-%m}: archived {moved} logs")
+
+        # Months archived just now may already be past the compaction age
+        for month in get_compactable_months() if to_compact is None else to_compact:
+            try:
+                dropped = compact_month(month)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"{month:%Y-%m}: compacted {dropped} logs")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done; punches from {get_archive_cutoff():%Y-%m} on stay in the live table."
+        ))
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Hrm.attendance_exceptions import evaluate_attendance_exceptions, get_exception_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-evaluate live attendance exceptions of today and the lookback days for all active employees. "
+        "Run it every few minutes: missing punches and early leaving are raised as shift windows close."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Evaluate only this day (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                days = [datetime.strptime(options['date'], '%Y-%m-%d').date()]
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD.")
+        else:
+            today = timezone.localdate()
+            days = [today - timedelta(days=n) for n in range(get_exception_settings()['LOOKBACK_DAYS'], -1, -1)]
+
+        for day in days:
+            created = evaluate_attendance_exceptions(day)
+            self.stdout.write(f"{day}: {len(created)} new exceptions")
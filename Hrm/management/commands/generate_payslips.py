@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Hrm.models import PayslipBatch, SalaryMonth
+from Hrm.payslip_batch import get_runnable_batches, run_payslip_batch
+
+
+class Command(BaseCommand):
+    help = "Render payslip batches to PDF: queued ones, or a new batch of all active employees for --year/--month"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, help="Run this pending or stale batch.")
+        parser.add_argument('--pending', action='store_true',
+                            help="Run every pending batch and every running one past STALE_AFTER, oldest first.")
+        parser.add_argument('--year', type=int, help="Create and run a batch for this salary year.")
+        parser.add_argument('--month', type=int, help="Create and run a batch for this salary month (1-12).")
+        parser.add_argument('--format', choices=['pdf', 'zip'], default='pdf', help="Merged PDF or a ZIP of PDFs.")
+
+    def handle(self, *args, **options):
+        if options['batch']:
+            batch_ids = [options['batch']]
+        elif options['pending']:
+            batch_ids = list(get_runnable_batches().order_by('created_at').values_list('pk', flat=True))
+        elif options['year'] and options['month']:
+            salary_month = SalaryMonth.objects.filter(year=options['year'], month=options['month']).first()
+            if salary_month is None:
+                raise CommandError(f"Salary month {options['year']}-{options['month']:02d} does not exist.")
+            batch = PayslipBatch.objects.create(
+                salary_month=salary_month,
+                output_format=options['format'].upper(),
+                parameters={
+                    'year': [str(options['year'])], 'month': [str(options['month'])], 'employee_filter': ['all'],
+                    'include_salary_breakdown': ['on'], 'include_overtime_details': ['on'],
+                    'include_bonus_details': ['on'], 'include_advance_deductions': ['on'],
+                },
+            )
+            batch_ids = [batch.pk]
+        else:
+            raise CommandError("Give --batch, --pending or --year and --month.")
+
+        for batch_id in batch_ids:
+            batch = run_payslip_batch(batch_id)
+            if batch.status == 'COM':
+                self.stdout.write(self.style.SUCCESS(
+                    f"Batch {batch.pk}: {batch.rendered_payslips} payslips written to {batch.file.name}."
+                ))
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f"Batch {batch.pk}: {batch.get_status_display()} {batch.error or ''}".strip()
+                ))
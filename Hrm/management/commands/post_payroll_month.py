@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Hrm.models import EmployeeAdvance, SalaryMonth
+from Hrm.payroll_recovery import post_payroll_month, rebuild_pf_balances, schedule_advance_installments
+
+
+class Command(BaseCommand):
+    help = (
+        "Recover the advance installments deducted from a payroll month's salaries and post its "
+        "provident fund contributions. Posting a month again changes nothing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help="Salary year to post.")
+        parser.add_argument('--month', type=int, help="Salary month to post (1-12).")
+        parser.add_argument('--schedule-advances', action='store_true',
+                            help="Create missing installment schedules of approved advances first.")
+        parser.add_argument('--rebuild-pf-balances', action='store_true',
+                            help="Recompute every provident fund balance from its transactions.")
+
+    def handle(self, *args, **options):
+        if not (options['year'] and options['month']) and not (
+            options['schedule_advances'] or options['rebuild_pf_balances']
+        ):
+            raise CommandError("Give --year and --month, --schedule-advances or --rebuild-pf-balances.")
+
+        if options['schedule_advances']:
+            created = schedule_advance_installments(
+                EmployeeAdvance.objects.filter(status__in=['APP', 'PAI']).select_related('advance_setup')
+            )
+            self.stdout.write(f"{created} advance installments scheduled")
+
+        if options['year'] and options['month']:
+            salary_month = SalaryMonth.objects.filter(year=options['year'], month=options['month']).first()
+            if salary_month is None:
+                raise CommandError(f"Salary month {options['year']}-{options['month']:02d} does not exist.")
+            posted = post_payroll_month(salary_month)
+            self.stdout.write(self.style.SUCCESS(
+                f"{salary_month}: {posted['installments']} installments recovered, "
+                f"{posted['closed_advances']} advances closed, {posted['pf_contributions']} PF contributions posted."
+            ))
+
+        if options['rebuild_pf_balances']:
+            rebuilt = rebuild_pf_balances()
+            self.stdout.write(self.style.SUCCESS(f"{rebuilt} provident fund balances rebuilt."))
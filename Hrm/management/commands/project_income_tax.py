@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Hrm.income_tax import get_current_tax_year, project_income_tax
+from Hrm.models import Employee, TaxYear
+
+
+class Command(BaseCommand):
+    help = "Project the annual income tax and monthly withholding of all active employees into EmployeeTax"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tax-year', type=int, help="Tax year ID (default: the current tax year).")
+        parser.add_argument('--employee', action='append', help="Project only this employee ID; repeatable.")
+
+    def handle(self, *args, **options):
+        if options['tax_year']:
+            tax_year = TaxYear.objects.filter(pk=options['tax_year']).first()
+        else:
+            tax_year = get_current_tax_year()
+        if tax_year is None:
+            raise CommandError("No tax year to project; create an active TaxYear or give --tax-year.")
+
+        employee_ids = None
+        if options['employee']:
+            employee_ids = list(
+                Employee.objects.filter(employee_id__in=options['employee']).values_list('pk', flat=True)
+            )
+        projected = project_income_tax(tax_year, employee_ids)
+        self.stdout.write(self.style.SUCCESS(f"{tax_year}: projected income tax of {projected} employees."))
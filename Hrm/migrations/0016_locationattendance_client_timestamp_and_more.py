@@ -0,0 +1,27 @@
+# Generated by Django 4.2.20 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Hrm', '0015_alter_employee_marital_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationattendance',
+            name='client_timestamp',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Client Timestamp'),
+        ),
+        migrations.AddField(
+            model_name='locationattendance',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='Idempotency Key'),
+        ),
+        migrations.AddConstraint(
+            model_name='locationattendance',
+            constraint=models.UniqueConstraint(fields=('user', 'idempotency_key'), name='location_attendance_idempotency_key'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.20 on 2026-10-19 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Hrm', '0016_locationattendance_client_timestamp_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zkdevice',
+            name='attlog_stamp',
+            field=models.CharField(blank=True, help_text='Last upload stamp reported by the device; it resumes from here.', max_length=50, null=True, verbose_name='ATTLOG Stamp'),
+        ),
+        migrations.AddField(
+            model_name='zkdevice',
+            name='last_heartbeat',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last Heartbeat'),
+        ),
+        migrations.AddField(
+            model_name='zkdevice',
+            name='last_push',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last Push'),
+        ),
+        migrations.AddField(
+            model_name='zkdevice',
+            name='push_queue_depth',
+            field=models.PositiveIntegerField(default=0, help_text='Pushed punches received but not yet written.', verbose_name='Push Queue Depth'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.20 on 2026-10-19 14:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Hrm', '0017_zkdevice_push_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZKAttendanceArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the archived month.', unique=True, verbose_name='Month')),
+                ('archived_rows', models.PositiveIntegerField(default=0, verbose_name='Archived Rows')),
+                ('summary_rows', models.PositiveIntegerField(default=0, verbose_name='Summary Rows')),
+                ('compacted', models.BooleanField(default=False, help_text='Punches were dropped; only the daily summaries of this month remain.', verbose_name='Compacted')),
+                ('archived_at', models.DateTimeField(auto_now=True, verbose_name='Archived At')),
+            ],
+            options={
+                'verbose_name': 'ZK Attendance Archive Month',
+                'verbose_name_plural': 'ZK Attendance Archive Months',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ZKAttendanceDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.CharField(max_length=255, verbose_name='User ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('first_punch', models.DateTimeField(verbose_name='First Punch')),
+                ('last_punch', models.DateTimeField(verbose_name='Last Punch')),
+                ('punch_count', models.PositiveIntegerField(default=0, verbose_name='Punch Count')),
+            ],
+            options={
+                'verbose_name': 'ZK Attendance Daily Summary',
+                'verbose_name_plural': 'ZK Attendance Daily Summaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='ZKAttendanceLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_serial_no', models.CharField(blank=True, max_length=100, null=True, verbose_name='Device Serial Number')),
+                ('user_id', models.CharField(max_length=255, verbose_name='User ID')),
+                ('timestamp', models.DateTimeField(verbose_name='Timestamp')),
+                ('punch_type', models.CharField(blank=True, max_length=50, null=True, verbose_name='Punch Type')),
+                ('status', models.CharField(blank=True, max_length=50, null=True, verbose_name='Status')),
+                ('verify_type', models.CharField(blank=True, max_length=50, null=True, verbose_name='Verification Type')),
+                ('work_code', models.CharField(blank=True, max_length=255, null=True, verbose_name='Work Code')),
+                ('device', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_attendance_logs', to='Hrm.zkdevice', verbose_name='Device')),
+            ],
+            options={
+                'verbose_name': 'ZK Attendance Log Archive',
+                'verbose_name_plural': 'ZK Attendance Log Archive',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='zkattendancedailysummary',
+            constraint=models.UniqueConstraint(fields=('user_id', 'date'), name='zk_daily_summary_user_date'),
+        ),
+        migrations.AddIndex(
+            model_name='zkattendancelogarchive',
+            index=models.Index(fields=['user_id', 'timestamp'], name='zk_log_archive_user_time_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='zkattendancelogarchive',
+            constraint=models.UniqueConstraint(fields=('device', 'user_id', 'timestamp', 'punch_type'), name='zk_log_archive_unique_punch'),
+        ),
+    ]
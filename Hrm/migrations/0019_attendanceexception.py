@@ -0,0 +1,42 @@
+# Generated by Django 4.2.20 on 2026-10-19 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Hrm', '0018_zkattendance_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('exception_type', models.CharField(choices=[('LATE', 'Late Coming'), ('EARLY_LEAVE', 'Early Leaving'), ('MISSING_IN', 'Missing Check-In'), ('MISSING_OUT', 'Missing Check-Out')], max_length=20, verbose_name='Exception Type')),
+                ('expected_start', models.DateTimeField(blank=True, null=True, verbose_name='Expected Start')),
+                ('expected_end', models.DateTimeField(blank=True, null=True, verbose_name='Expected End')),
+                ('in_time', models.DateTimeField(blank=True, null=True, verbose_name='In Time')),
+                ('out_time', models.DateTimeField(blank=True, null=True, verbose_name='Out Time')),
+                ('minutes', models.PositiveIntegerField(default=0, help_text='Minutes late or left early.', verbose_name='Minutes')),
+                ('resolved_at', models.DateTimeField(blank=True, help_text='Set when a later punch or change cleared the exception.', null=True, verbose_name='Resolved At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_exceptions', to='Hrm.employee', verbose_name='Employee')),
+                ('shift', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_exceptions', to='Hrm.shift', verbose_name='Shift')),
+            ],
+            options={
+                'verbose_name': 'Attendance Exception',
+                'verbose_name_plural': 'Attendance Exceptions',
+                'ordering': ['-date', 'employee__employee_id'],
+                'indexes': [models.Index(fields=['date', 'exception_type'], name='attendance_exception_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendanceexception',
+            constraint=models.UniqueConstraint(fields=('employee', 'date', 'exception_type'), name='attendance_exception_unique'),
+        ),
+    ]
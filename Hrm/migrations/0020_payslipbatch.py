@@ -0,0 +1,39 @@
+# Generated by Django 4.2.20 on 2026-10-19 14:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('Hrm', '0019_attendanceexception'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayslipBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('output_format', models.CharField(choices=[('PDF', 'Merged PDF'), ('ZIP', 'ZIP of PDF files')], default='PDF', max_length=3, verbose_name='Output Format')),
+                ('parameters', models.JSONField(blank=True, default=dict, help_text='Payslip report form data: employee filter and included sections.', verbose_name='Parameters')),
+                ('status', models.CharField(choices=[('PEN', 'Pending'), ('RUN', 'Running'), ('COM', 'Completed'), ('ERR', 'Failed')], default='PEN', max_length=3, verbose_name='Status')),
+                ('total_payslips', models.PositiveIntegerField(default=0, verbose_name='Total Payslips')),
+                ('rendered_payslips', models.PositiveIntegerField(default=0, verbose_name='Rendered Payslips')),
+                ('file', models.FileField(blank=True, null=True, upload_to='payslips/', verbose_name='File')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payslip_batches', to=settings.AUTH_USER_MODEL, verbose_name='Requested By')),
+                ('salary_month', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payslip_batches', to='Hrm.salarymonth', verbose_name='Salary Month')),
+            ],
+            options={
+                'verbose_name': 'Payslip Batch',
+                'verbose_name_plural': 'Payslip Batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.20 on 2026-10-19 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Hrm', '0020_payslipbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeetax',
+            name='investment_rebate',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Investment Rebate'),
+        ),
+        migrations.AddField(
+            model_name='employeetax',
+            name='monthly_tax',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Tax to withhold from each remaining salary of the tax year', max_digits=10, verbose_name='Monthly Withholding'),
+        ),
+        migrations.AddField(
+            model_name='employeetax',
+            name='projected_months',
+            field=models.PositiveIntegerField(default=0, help_text='Remaining salary months of the tax year', verbose_name='Projected Months'),
+        ),
+        migrations.AddField(
+            model_name='employeetax',
+            name='tax_deducted',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Tax withheld from salaries of the tax year so far', max_digits=10, verbose_name='Tax Deducted'),
+        ),
+    ]
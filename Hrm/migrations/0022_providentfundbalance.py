@@ -0,0 +1,31 @@
+# Generated by Django 4.2.20 on 2026-10-19 14:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Hrm', '0021_employeetax_withholding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProvidentFundBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employee_balance', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Employee Balance')),
+                ('employer_balance', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Employer Balance')),
+                ('total_balance', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Total Balance')),
+                ('last_transaction_date', models.DateField(blank=True, null=True, verbose_name='Last Transaction Date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('employee_pf', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='balance', to='Hrm.employeeprovidentfund', verbose_name='Employee Provident Fund')),
+            ],
+            options={
+                'verbose_name': 'Provident Fund Balance',
+                'verbose_name_plural': 'Provident Fund Balances',
+                'ordering': ['employee_pf__employee__first_name'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-19 15:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Hrm', '0022_providentfundbalance'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='zkdevice',
+            name='push_queue_depth',
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.20 on 2026-10-19 15:09
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def stamp_offline_punches(apps, schema_editor):
+    # Offline punches were stamped with the upload time; use the device time
+    LocationAttendance = apps.get_model('Hrm', 'LocationAttendance')
+    LocationAttendance.objects.filter(client_timestamp__isnull=False).update(timestamp=models.F('client_timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Hrm', '0023_remove_zkdevice_push_queue_depth'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='locationattendance',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Timestamp'),
+        ),
+        migrations.RunPython(stamp_offline_punches, migrations.RunPython.noop),
+    ]
@@ -7,6 +7,7 @@ from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django_ckeditor_5.fields import CKEditor5Field
 from django.contrib.auth import get_user_model
+from config.pagination import RowCountModelMixin, RowCountQuerySet
 
 # -------------------- EMPLOYEE INFORMATION --------------------
 
@@ -1587,6 +1588,24 @@ class ProvidentFundTransaction(models.Model):
         verbose_name_plural = _("Provident Fund Transactions")
         ordering = ['-transaction_date']
 
+class ProvidentFundBalance(models.Model):
+    """Running balance of an employee's provident fund, kept up to date as transactions are posted."""
+    employee_pf = models.OneToOneField(EmployeeProvidentFund, on_delete=models.CASCADE,
+                                       related_name='balance', verbose_name=_("Employee Provident Fund"))
+    employee_balance = models.DecimalField(_("Employee Balance"), max_digits=15, decimal_places=2, default=0)
+    employer_balance = models.DecimalField(_("Employer Balance"), max_digits=15, decimal_places=2, default=0)
+    total_balance = models.DecimalField(_("Total Balance"), max_digits=15, decimal_places=2, default=0)
+    last_transaction_date = models.DateField(_("Last Transaction Date"), null=True, blank=True)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee_pf.employee.get_full_name()} - PF Balance - {self.total_balance}"
+
+    class Meta:
+        verbose_name = _("Provident Fund Balance")
+        verbose_name_plural = _("Provident Fund Balances")
+        ordering = ['employee_pf__employee__first_name']
+
 class FixedDepositReceipt(models.Model):
     """Represents a fixed deposit receipt."""
     fdr_number = models.CharField(_("FDR Number"), max_length=100, unique=True)
@@ -1714,6 +1733,13 @@ class EmployeeTax(models.Model):
     total_investments = models.DecimalField(_("Total Investments"), max_digits=10, decimal_places=2)
     taxable_income = models.DecimalField(_("Taxable Income"), max_digits=12, decimal_places=2)
     tax_amount = models.DecimalField(_("Tax Amount"), max_digits=10, decimal_places=2)
+    investment_rebate = models.DecimalField(_("Investment Rebate"), max_digits=10, decimal_places=2, default=0)
+    tax_deducted = models.DecimalField(_("Tax Deducted"), max_digits=10, decimal_places=2, default=0,
+                                      help_text=_("Tax withheld from salaries of the tax year so far"))
+    monthly_tax = models.DecimalField(_("Monthly Withholding"), max_digits=10, decimal_places=2, default=0,
+                                     help_text=_("Tax to withhold from each remaining salary of the tax year"))
+    projected_months = models.PositiveIntegerField(_("Projected Months"), default=0,
+                                                   help_text=_("Remaining salary months of the tax year"))
     generated_date = models.DateTimeField(_("Generated Date"))
     generated_by = models.ForeignKey(Employee, on_delete=models.SET_NULL, null=True, blank=True, 
                                     related_name='generated_taxes', verbose_name=_("Generated By"))
@@ -1847,13 +1873,17 @@ class LocationAttendance(models.Model):
                                 related_name='attendances', verbose_name=_("Location"))
     attendance_type = models.CharField(_("Attendance Type"), max_length=3, 
                                       choices=ATTENDANCE_TYPE_CHOICES)
-    timestamp = models.DateTimeField(_("Timestamp"), auto_now_add=True)
+    # Server time for live punches; offline punches carry the time the device recorded them
+    timestamp = models.DateTimeField(_("Timestamp"), default=timezone.now)
     latitude = models.DecimalField(_("Latitude"), max_digits=10, decimal_places=8)
     longitude = models.DecimalField(_("Longitude"), max_digits=11, decimal_places=8)
     is_within_radius = models.BooleanField(_("Is Within Radius"), default=False)
     distance = models.DecimalField(_("Distance (km)"), max_digits=8, decimal_places=2)
     device_info = models.TextField(_("Device Info"), blank=True, null=True)
     ip_address = models.GenericIPAddressField(_("IP Address"), blank=True, null=True)
+    # Offline punches: the device time as sent, and the key it was queued under
+    client_timestamp = models.DateTimeField(_("Client Timestamp"), blank=True, null=True)
+    idempotency_key = models.CharField(_("Idempotency Key"), max_length=64, blank=True, null=True)
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
     
@@ -1864,6 +1894,9 @@ class LocationAttendance(models.Model):
         verbose_name = _("Location Attendance")
         verbose_name_plural = _("Location Attendances")
         ordering = ['-timestamp']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'idempotency_key'], name='location_attendance_idempotency_key'),
+        ]
 
 class ZKDevice(models.Model):
     """Stores ZKTeco device information."""
@@ -1877,6 +1910,11 @@ class ZKDevice(models.Model):
     timeout = models.IntegerField(_("Timeout"), default=5)
     password = models.CharField(_("Device Password"), max_length=100, blank=True, null=True)
     force_udp = models.BooleanField(_("Force UDP"), default=False)
+    # Push (ADMS/iclock) mode, maintained by the ZKPush receiver
+    last_heartbeat = models.DateTimeField(_("Last Heartbeat"), blank=True, null=True)
+    last_push = models.DateTimeField(_("Last Push"), blank=True, null=True)
+    attlog_stamp = models.CharField(_("ATTLOG Stamp"), max_length=50, blank=True, null=True,
+                                    help_text=_("Last upload stamp reported by the device; it resumes from here."))
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
     
@@ -1901,7 +1939,7 @@ class ZKDevice(models.Model):
         verbose_name_plural = _("ZK Devices")
         ordering = ['name']
 
-class ZKAttendanceLog(models.Model):
+class ZKAttendanceLog(RowCountModelMixin, models.Model):
     """
     Stores comprehensive attendance logs from ZKTeco devices, capturing all possible fields.
     """
@@ -1988,6 +2026,8 @@ class ZKAttendanceLog(models.Model):
         help_text=_("When this log was last updated in the database.")
     )
 
+    objects = RowCountQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.user_id} - {self.device.name if self.device else 'No Device'} - {self.timestamp}"
 
@@ -2023,3 +2063,170 @@ class ZKAttendanceLog(models.Model):
             '5': _("Overtime Out"),
         }
         return punch_types.get(self.punch_type, self.punch_type or _("Unknown"))
+
+
+# -------------------- ATTENDANCE LOG ARCHIVE --------------------
+# Closed months move out of ZKAttendanceLog (see Hrm/attendance_archive.py), so
+# the live table only holds recent punches.
+
+class ZKAttendanceArchiveMonth(models.Model):
+    """One archived month of ZKAttendanceLog."""
+    month = models.DateField(_("Month"), unique=True, help_text=_("First day of the archived month."))
+    archived_rows = models.PositiveIntegerField(_("Archived Rows"), default=0)
+    summary_rows = models.PositiveIntegerField(_("Summary Rows"), default=0)
+    compacted = models.BooleanField(
+        _("Compacted"), default=False,
+        help_text=_("Punches were dropped; only the daily summaries of this month remain.")
+    )
+    archived_at = models.DateTimeField(_("Archived At"), auto_now=True)
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}"
+
+    class Meta:
+        verbose_name = _("ZK Attendance Archive Month")
+        verbose_name_plural = _("ZK Attendance Archive Months")
+        ordering = ['-month']
+
+
+class ZKAttendanceLogArchive(models.Model):
+    """Punches of archived months; the columns reports read, with two indexes instead of six."""
+    device = models.ForeignKey(
+        ZKDevice,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_attendance_logs',
+        verbose_name=_("Device")
+    )
+    device_serial_no = models.CharField(_("Device Serial Number"), max_length=100, blank=True, null=True)
+    user_id = models.CharField(_("User ID"), max_length=255)
+    timestamp = models.DateTimeField(_("Timestamp"))
+    punch_type = models.CharField(_("Punch Type"), max_length=50, blank=True, null=True)
+    status = models.CharField(_("Status"), max_length=50, blank=True, null=True)
+    verify_type = models.CharField(_("Verification Type"), max_length=50, blank=True, null=True)
+    work_code = models.CharField(_("Work Code"), max_length=255, blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.timestamp}"
+
+    class Meta:
+        verbose_name = _("ZK Attendance Log Archive")
+        verbose_name_plural = _("ZK Attendance Log Archive")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['device', 'user_id', 'timestamp', 'punch_type'], name='zk_log_archive_unique_punch',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user_id', 'timestamp'], name='zk_log_archive_user_time_idx'),
+        ]
+
+
+class ZKAttendanceDailySummary(models.Model):
+    """First punch, last punch and punch count of a device user on one day of an archived month."""
+    user_id = models.CharField(_("User ID"), max_length=255)
+    date = models.DateField(_("Date"))
+    first_punch = models.DateTimeField(_("First Punch"))
+    last_punch = models.DateTimeField(_("Last Punch"))
+    punch_count = models.PositiveIntegerField(_("Punch Count"), default=0)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date}"
+
+    class Meta:
+        verbose_name = _("ZK Attendance Daily Summary")
+        verbose_name_plural = _("ZK Attendance Daily Summaries")
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'date'], name='zk_daily_summary_user_date'),
+        ]
+
+
+# -------------------- ATTENDANCE EXCEPTIONS --------------------
+
+class AttendanceException(models.Model):
+    """
+    A live late / early leave / missing punch exception of an employee's day,
+    kept current by Hrm/attendance_exceptions.py as punches arrive and shifts close.
+    """
+    EXCEPTION_TYPES = (
+        ('LATE', _('Late Coming')),
+        ('EARLY_LEAVE', _('Early Leaving')),
+        ('MISSING_IN', _('Missing Check-In')),
+        ('MISSING_OUT', _('Missing Check-Out')),
+    )
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE,
+                                 related_name='attendance_exceptions', verbose_name=_("Employee"))
+    date = models.DateField(_("Date"))
+    exception_type = models.CharField(_("Exception Type"), max_length=20, choices=EXCEPTION_TYPES)
+    shift = models.ForeignKey(Shift, on_delete=models.SET_NULL, null=True, blank=True,
+                              related_name='attendance_exceptions', verbose_name=_("Shift"))
+    expected_start = models.DateTimeField(_("Expected Start"), null=True, blank=True)
+    expected_end = models.DateTimeField(_("Expected End"), null=True, blank=True)
+    in_time = models.DateTimeField(_("In Time"), null=True, blank=True)
+    out_time = models.DateTimeField(_("Out Time"), null=True, blank=True)
+    minutes = models.PositiveIntegerField(_("Minutes"), default=0,
+                                          help_text=_("Minutes late or left early."))
+    resolved_at = models.DateTimeField(_("Resolved At"), null=True, blank=True,
+                                       help_text=_("Set when a later punch or change cleared the exception."))
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee} - {self.date} - {self.get_exception_type_display()}"
+
+    class Meta:
+        verbose_name = _("Attendance Exception")
+        verbose_name_plural = _("Attendance Exceptions")
+        ordering = ['-date', 'employee__employee_id']
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'date', 'exception_type'], name='attendance_exception_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'exception_type'], name='attendance_exception_date_idx'),
+        ]
+
+
+# -------------------- PAYSLIP BATCHES --------------------
+
+class PayslipBatch(models.Model):
+    """A background run rendering the payslips of one salary month to PDF (Hrm/payslip_batch.py)."""
+    FORMAT_CHOICES = (
+        ('PDF', _('Merged PDF')),
+        ('ZIP', _('ZIP of PDF files')),
+    )
+    STATUS_CHOICES = (
+        ('PEN', _('Pending')),
+        ('RUN', _('Running')),
+        ('COM', _('Completed')),
+        ('ERR', _('Failed')),
+    )
+
+    salary_month = models.ForeignKey(SalaryMonth, on_delete=models.CASCADE,
+                                     related_name='payslip_batches', verbose_name=_("Salary Month"))
+    output_format = models.CharField(_("Output Format"), max_length=3, choices=FORMAT_CHOICES, default='PDF')
+    parameters = models.JSONField(_("Parameters"), default=dict, blank=True,
+                                  help_text=_("Payslip report form data: employee filter and included sections."))
+    status = models.CharField(_("Status"), max_length=3, choices=STATUS_CHOICES, default='PEN')
+    total_payslips = models.PositiveIntegerField(_("Total Payslips"), default=0)
+    rendered_payslips = models.PositiveIntegerField(_("Rendered Payslips"), default=0)
+    file = models.FileField(_("File"), upload_to='payslips/', null=True, blank=True)
+    error = models.TextField(_("Error"), null=True, blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='payslip_batches', verbose_name=_("Requested By"))
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+    started_at = models.DateTimeField(_("Started At"), null=True, blank=True)
+    finished_at = models.DateTimeField(_("Finished At"), null=True, blank=True)
+
+    def __str__(self):
+        return f"Payslips {self.salary_month} ({self.get_output_format_display()})"
+
+    @property
+    def progress(self):
+        return int(self.rendered_payslips * 100 / self.total_payslips) if self.total_payslips else 0
+
+    class Meta:
+        verbose_name = _("Payslip Batch")
+        verbose_name_plural = _("Payslip Batches")
+        ordering = ['-created_at']
@@ -0,0 +1,332 @@
+"""
+Advance installment schedules and monthly payroll postings.
+
+When an EmployeeAdvance is approved its whole installment schedule is created
+at once: flat interest at AdvanceSetup.interest_rate, the total split evenly
+over the installments (the last one takes the rounding) and one installment
+due at the end of each month from FIRST_DUE_AFTER_MONTHS after approval.
+
+Posting a payroll month (on salary generation, or `manage.py
+post_payroll_month`) marks installments paid only as far as the month's
+salaries actually deducted them: the advance deduction components
+(ADVANCE_COMPONENT_CODES) of each salary are applied to the employee's unpaid
+installments in due date order, whole installments only. Installments due in
+the month are recovered; older overdue ones only with RECOVER_OVERDUE. Fully
+recovered advances are closed, and the month's provident fund contributions
+of all enrolled employees are posted with bulk_create. ProvidentFundBalance keeps each fund's
+running balance, moved by the posted amounts rather than re-summed from the
+transactions. Postings carry the month's reference, so posting a month twice
+changes nothing. Settings come from settings.PAYROLL_RECOVERY.
+"""
+import calendar
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, Max, OuterRef, Sum
+from django.utils import timezone
+
+from .models import (
+    AdvanceInstallment, EmployeeAdvance, EmployeeProvidentFund, EmployeeSalary, ProvidentFundBalance,
+    ProvidentFundTransaction, SalaryDetail,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'FIRST_DUE_AFTER_MONTHS': 1,   # first installment falls due at the end of the month after approval
+    'PF_BASE': 'basic_salary',     # EmployeeSalary field the PF percentages apply to
+    'POST_ON_GENERATE': True,      # post a payroll month when its salaries are marked generated
+    'ADVANCE_COMPONENT_CODES': ['ADV'],  # deduction components that record advance recoveries
+    'RECOVER_OVERDUE': False,      # let a deduction also settle installments due before the month
+}
+
+SCHEDULED_STATUSES = ('APP', 'PAI')
+
+# Direction in which each transaction type moves a provident fund balance
+PF_BALANCE_SIGNS = {'CON': 1, 'INT': 1, 'REP': 1, 'WIT': -1, 'LOA': -1}
+
+ZERO = Decimal('0.00')
+CENT = Decimal('0.01')
+HUNDRED = Decimal('100')
+
+
+def get_payroll_recovery_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PAYROLL_RECOVERY', {})}
+
+
+def money(value):
+    return Decimal(value or 0).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def month_end(year, month):
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return month_end(index // 12, index % 12 + 1)
+
+
+def get_payroll_reference(salary_month):
+    return f"PAYROLL-{salary_month.year}-{salary_month.month:02d}"
+
+
+# ------------------------------------------
+# Installment schedules
+# ------------------------------------------
+def build_installment_schedule(advance, options):
+    """
+    Sets the interest, total and installment amounts of advance and returns
+    its unsaved AdvanceInstallment rows.
+    """
+    count = max(advance.installments, 1)
+    interest = money(advance.amount * advance.advance_setup.interest_rate / HUNDRED)
+    total = money(advance.amount) + interest
+    installment_amount = money(total / count)
+    advance.interest_amount = interest
+    advance.total_amount = total
+    advance.installment_amount = installment_amount
+
+    first_due = advance.approval_date or advance.application_date
+    return [
+        AdvanceInstallment(
+            advance=advance,
+            installment_number=number,
+            amount=installment_amount if number < count else total - installment_amount * (count - 1),
+            due_date=add_months(first_due, options['FIRST_DUE_AFTER_MONTHS'] + number - 1),
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def schedule_advance_installments(advances):
+    """
+    Creates the installment schedule of every approved advance in advances
+    that has none yet. Returns the number of installments created.
+    """
+    options = get_payroll_recovery_settings()
+    advances = [advance for advance in advances if advance.status in SCHEDULED_STATUSES]
+    scheduled = set(
+        AdvanceInstallment.objects.filter(advance__in=advances).values_list('advance_id', flat=True).distinct()
+    )
+    advances = [advance for advance in advances if advance.pk not in scheduled]
+    if not advances:
+        return 0
+
+    installments = []
+    for advance in advances:
+        installments += build_installment_schedule(advance, options)
+    with transaction.atomic():
+        AdvanceInstallment.objects.bulk_create(installments, batch_size=500)
+        EmployeeAdvance.objects.bulk_update(
+            advances, ['interest_amount', 'total_amount', 'installment_amount'], batch_size=500,
+        )
+    return len(installments)
+
+
+# ------------------------------------------
+# Provident fund balances
+# ------------------------------------------
+def get_signed_amounts(transaction_type, employee_amount, employer_amount, total_amount):
+    sign = PF_BALANCE_SIGNS.get(transaction_type, 0)
+    return sign * (employee_amount or ZERO), sign * (employer_amount or ZERO), sign * (total_amount or ZERO)
+
+
+def rebuild_pf_balances(employee_pf_ids=None):
+    """Recomputes the balances of the given funds (all without ids) from their transactions."""
+    funds = EmployeeProvidentFund.objects.all()
+    transactions = ProvidentFundTransaction.objects.all()
+    if employee_pf_ids is not None:
+        funds = funds.filter(pk__in=employee_pf_ids)
+        transactions = transactions.filter(employee_pf_id__in=employee_pf_ids)
+
+    totals = {pk: [ZERO, ZERO, ZERO, None] for pk in funds.values_list('pk', flat=True)}
+    for row in transactions.values('employee_pf_id', 'transaction_type').annotate(
+        employee=Sum('employee_amount'), employer=Sum('employer_amount'), total=Sum('total_amount'),
+        last_date=Max('transaction_date'),
+    ):
+        fund = totals.get(row['employee_pf_id'])
+        if fund is None:
+            continue
+        amounts = get_signed_amounts(row['transaction_type'], row['employee'], row['employer'], row['total'])
+        for index, amount in enumerate(amounts):
+            fund[index] += amount
+        if fund[3] is None or row['last_date'] > fund[3]:
+            fund[3] = row['last_date']
+
+    balances = ProvidentFundBalance.objects.in_bulk(list(totals), field_name='employee_pf_id')
+    now = timezone.now()
+    updated, created = [], []
+    for employee_pf_id, (employee, employer, total, last_date) in totals.items():
+        balance = balances.get(employee_pf_id) or ProvidentFundBalance(employee_pf_id=employee_pf_id)
+        balance.employee_balance = employee
+        balance.employer_balance = employer
+        balance.total_balance = total
+        balance.last_transaction_date = last_date
+        balance.updated_at = now
+        (updated if balance.pk else created).append(balance)
+    with transaction.atomic():
+        ProvidentFundBalance.objects.bulk_update(
+            updated, ['employee_balance', 'employer_balance', 'total_balance', 'last_transaction_date', 'updated_at'],
+            batch_size=500,
+        )
+        ProvidentFundBalance.objects.bulk_create(created, batch_size=500)
+    return len(totals)
+
+
+def apply_pf_transactions(transactions):
+    """Moves the balances of newly posted transactions; funds without a balance yet are rebuilt."""
+    deltas = defaultdict(lambda: [ZERO, ZERO, ZERO, None])
+    for pf_transaction in transactions:
+        delta = deltas[pf_transaction.employee_pf_id]
+        amounts = get_signed_amounts(
+            pf_transaction.transaction_type, pf_transaction.employee_amount,
+            pf_transaction.employer_amount, pf_transaction.total_amount,
+        )
+        for index, amount in enumerate(amounts):
+            delta[index] += amount
+        if delta[3] is None or pf_transaction.transaction_date > delta[3]:
+            delta[3] = pf_transaction.transaction_date
+
+    balances = ProvidentFundBalance.objects.in_bulk(list(deltas), field_name='employee_pf_id')
+    now = timezone.now()
+    for employee_pf_id, (employee, employer, total, last_date) in deltas.items():
+        balance = balances.get(employee_pf_id)
+        if balance is None:
+            continue
+        balance.employee_balance += employee
+        balance.employer_balance += employer
+        balance.total_balance += total
+        if balance.last_transaction_date is None or last_date > balance.last_transaction_date:
+            balance.last_transaction_date = last_date
+        balance.updated_at = now
+    ProvidentFundBalance.objects.bulk_update(
+        balances.values(),
+        ['employee_balance', 'employer_balance', 'total_balance', 'last_transaction_date', 'updated_at'],
+        batch_size=500,
+    )
+    missing = [employee_pf_id for employee_pf_id in deltas if employee_pf_id not in balances]
+    if missing:
+        rebuild_pf_balances(missing)
+
+
+# ------------------------------------------
+# Payroll month postings
+# ------------------------------------------
+def get_advance_deductions(salary_month, options):
+    """
+    {employee id: amount} the month's salaries deducted for advances and not yet
+    matched to installments, so posting a month again recovers nothing twice.
+    """
+    posted_on = month_end(salary_month.year, salary_month.month)
+    deducted = dict(
+        SalaryDetail.objects.filter(
+            salary__salary_month=salary_month,
+            component__component_type='DED',
+            component__code__in=options['ADVANCE_COMPONENT_CODES'],
+        ).values('salary__employee_id').annotate(total=Sum('amount')).values_list('salary__employee_id', 'total')
+    )
+    recovered = AdvanceInstallment.objects.filter(
+        is_paid=True, payment_date=posted_on, advance__employee_id__in=list(deducted),
+    ).values('advance__employee_id').annotate(total=Sum('amount')).values_list('advance__employee_id', 'total')
+    for employee_id, amount in recovered:
+        deducted[employee_id] -= amount
+    return {employee_id: amount for employee_id, amount in deducted.items() if amount > ZERO}
+
+
+def recover_advance_installments(salary_month, options):
+    """
+    Marks installments paid as far as the month's advance deductions cover them,
+    oldest due first and whole installments only. Returns (recovered, closed).
+    """
+    posted_on = month_end(salary_month.year, salary_month.month)
+    deductions = get_advance_deductions(salary_month, options)
+    if not deductions:
+        return 0, 0
+
+    due = AdvanceInstallment.objects.filter(
+        is_paid=False,
+        due_date__lte=posted_on,
+        advance__status__in=SCHEDULED_STATUSES,
+        advance__employee_id__in=list(deductions),
+    )
+    if not options['RECOVER_OVERDUE']:
+        due = due.filter(due_date__gte=posted_on.replace(day=1))
+
+    now = timezone.now()
+    recovered, blocked = [], set()
+    for installment in due.annotate(employee_id=F('advance__employee_id')).order_by('due_date', 'installment_number'):
+        employee_id = installment.employee_id
+        # Installments are recovered in order; one the deduction cannot cover stops the rest
+        if employee_id in blocked or installment.amount > deductions[employee_id]:
+            blocked.add(employee_id)
+            continue
+        deductions[employee_id] -= installment.amount
+        installment.is_paid, installment.payment_date, installment.updated_at = True, posted_on, now
+        recovered.append(installment)
+    AdvanceInstallment.objects.bulk_update(recovered, ['is_paid', 'payment_date', 'updated_at'], batch_size=500)
+
+    unmatched = {employee_id: amount for employee_id, amount in deductions.items() if amount > ZERO}
+    if unmatched:
+        logger.warning(
+            f"{salary_month}: advance deductions of {len(unmatched)} employees exceed their recoverable installments"
+        )
+
+    installments = AdvanceInstallment.objects.filter(advance=OuterRef('pk'))
+    closed = EmployeeAdvance.objects.filter(
+        pk__in={installment.advance_id for installment in recovered}, status__in=SCHEDULED_STATUSES,
+    ).exclude(
+        Exists(installments.filter(is_paid=False)),
+    ).update(status='CLS', updated_at=now)
+    return len(recovered), closed
+
+
+def post_pf_contributions(salary_month, options):
+    """Posts the month's PF contributions of every enrolled employee with a salary. Returns the transactions."""
+    posted_on = month_end(salary_month.year, salary_month.month)
+    reference = get_payroll_reference(salary_month)
+    posted = ProvidentFundTransaction.objects.filter(
+        employee_pf_id=OuterRef('employee__provident_fund'), transaction_type='CON', reference=reference,
+    )
+    rows = EmployeeSalary.objects.filter(
+        salary_month=salary_month,
+        employee__provident_fund__is_active=True,
+        employee__provident_fund__enrollment_date__lte=posted_on,
+    ).exclude(Exists(posted)).values_list(
+        'employee__provident_fund', options['PF_BASE'],
+        'employee__provident_fund__employee_contribution', 'employee__provident_fund__employer_contribution',
+    )
+
+    transactions = []
+    for employee_pf_id, base, employee_rate, employer_rate in rows:
+        employee_amount = money(base * employee_rate / HUNDRED)
+        employer_amount = money(base * employer_rate / HUNDRED)
+        transactions.append(ProvidentFundTransaction(
+            employee_pf_id=employee_pf_id,
+            transaction_date=posted_on,
+            transaction_type='CON',
+            employee_amount=employee_amount,
+            employer_amount=employer_amount,
+            total_amount=employee_amount + employer_amount,
+            reference=reference,
+            remarks=f"Payroll contribution {salary_month.year}-{salary_month.month:02d}",
+        ))
+    ProvidentFundTransaction.objects.bulk_create(transactions, batch_size=500)
+    apply_pf_transactions(transactions)
+    return transactions
+
+
+def post_payroll_month(salary_month):
+    """
+    Recovers the advance installments deducted from the salaries of a payroll
+    month and posts its PF contributions. Returns {'installments', 'closed_advances', 'pf_contributions'}.
+    """
+    options = get_payroll_recovery_settings()
+    with transaction.atomic():
+        recovered, closed = recover_advance_installments(salary_month, options)
+        contributions = post_pf_contributions(salary_month, options)
+    return {'installments': recovered, 'closed_advances': closed, 'pf_contributions': len(contributions)}
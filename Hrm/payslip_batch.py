@@ -0,0 +1,233 @@
+"""
+Batch payslip documents.
+
+A PayslipBatch holds the payslip report form data of one salary month. Running
+it gathers the payslips once with PayslipReportView's report builder (on the
+read replica when one is configured), compiles the payslip template once and
+renders the pages in a process pool (Hrm/payslip_pdf.py). Pages are written as
+they arrive, in employee order, into one merged PDF or a ZIP with a PDF per
+employee, so memory stays flat however many employees are printed.
+
+Batches started from the payslip report run in a background thread of the web
+process; with RUN_IN_BACKGROUND off they stay pending for
+`manage.py generate_payslips --pending`. A batch still running STALE_AFTER
+seconds after it started is taken to have lost its process and can be claimed
+again. Settings come from settings.PAYSLIP_BATCH.
+"""
+import calendar
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.datastructures import MultiValueDict
+
+from config.db_router import use_read_replica
+from .models import PayslipBatch
+from .payslip_pdf import (
+    PdfWriter, build_pdf, compile_payslip_template, init_worker, render_in_worker, render_payslip,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'WORKERS': min(4, os.cpu_count() or 1),  # render processes; 1 renders in the calling process
+    'CHUNK_SIZE': 25,                        # payslips sent to a worker at a time
+    'START_METHOD': 'spawn',                 # workers do not inherit the web process's threads and connections
+    'RUN_IN_BACKGROUND': True,               # False leaves batches pending for the generate_payslips command
+    'PROGRESS_EVERY': 50,                    # payslips between progress updates
+    'STALE_AFTER': 2 * 60 * 60,              # seconds after which a running batch is reclaimed
+}
+
+# Form options copied onto the compiled template
+TEMPLATE_OPTIONS = (
+    'include_salary_breakdown', 'include_attendance_summary', 'include_overtime_details',
+    'include_bonus_details', 'include_advance_deductions', 'show_year_to_date',
+)
+
+
+def get_payslip_batch_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PAYSLIP_BATCH', {})}
+
+
+def get_runnable_batches(options=None):
+    """Pending batches and running ones whose runner died, i.e. started more than STALE_AFTER ago."""
+    options = options or get_payslip_batch_settings()
+    stale_before = timezone.now() - timedelta(seconds=options['STALE_AFTER'])
+    return PayslipBatch.objects.filter(Q(status='PEN') | Q(status='RUN', started_at__lt=stale_before))
+
+
+def amount(value):
+    return f"{value or 0:,.2f}"
+
+
+# ------------------------------------------
+# Payslip data
+# ------------------------------------------
+def get_payslip_form(batch):
+    from .views.zktico.payslip_report import PayslipReportForm
+    return PayslipReportForm(MultiValueDict(batch.parameters))
+
+
+def get_company_name():
+    from global_settings.models import CompanyInfo
+    return CompanyInfo.objects.values_list('name', flat=True).first() or ''
+
+
+def get_payslip_document(record):
+    """The plain, picklable values of one payslip report record that a page shows."""
+    breakdown = record['salary_breakdown']
+    attendance = record['attendance_summary']
+    ytd = record['ytd_totals']
+    return {
+        'employee_id': record['employee_id'],
+        'employee_name': record['employee_name'],
+        'department': record['department'],
+        'designation': record['designation'],
+        'joining_date': f"{record['joining_date']:%d %b %Y}" if record['joining_date'] else '',
+        'working_days': record['working_days'],
+        'present_days': record['present_days'],
+        'absent_leave_days': f"{record['absent_days']} / {record['leave_days']}",
+        'earnings': [(row['name'], amount(row['amount'])) for row in breakdown['earnings']],
+        'deductions': [(row['name'], amount(row['amount'])) for row in breakdown['deductions']],
+        'total_earnings': amount(record['total_earnings']),
+        'total_deductions': amount(record['total_deductions']),
+        'net_salary': amount(record['net_salary']),
+        'overtime_hours': record['overtime_hours'],
+        'overtime_amount': amount(record['overtime_amount']) if record['overtime_amount'] else '',
+        'bonuses': [(row['name'], amount(row['amount'])) for row in record['bonus_details']],
+        'advances': [
+            (f"{row['setup_name']} #{row['installment_number']}", amount(row['amount']))
+            for row in record['advance_details']
+        ],
+        'attendance': (
+            f"present {attendance.get('present_days', 0)}, absent {attendance.get('absent_days', 0)}, "
+            f"late {attendance.get('late_days', 0)}, leave {attendance.get('leave_days', 0)}, "
+            f"{attendance.get('attendance_percentage', 0)}%"
+        ) if attendance else '',
+        'ytd': (
+            f"gross {amount(ytd['ytd_gross_salary'])}, deductions {amount(ytd['ytd_deductions'])}, "
+            f"net {amount(ytd['ytd_net_salary'])}"
+        ) if ytd else '',
+    }
+
+
+def get_payslip_documents(form_data):
+    """Payslip documents of the report form data, ordered by employee ID."""
+    from .views.zktico.payslip_report import PayslipReportView
+    report = PayslipReportView()._generate_payslip_report(form_data)
+    documents = [get_payslip_document(record) for record in report['payslip_data']]
+    documents.sort(key=lambda document: document['employee_id'])
+    return documents
+
+
+# ------------------------------------------
+# Rendering
+# ------------------------------------------
+def render_payslips(template, documents, options):
+    """Compressed pages of documents, in order, rendered in a process pool when WORKERS > 1."""
+    workers = min(options['WORKERS'], len(documents))
+    if workers <= 1:
+        for document in documents:
+            yield render_payslip(template, document)
+        return
+    context = multiprocessing.get_context(options['START_METHOD'])
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=init_worker, initargs=(template,)) as executor:
+        yield from executor.map(render_in_worker, documents, chunksize=options['CHUNK_SIZE'])
+
+
+def write_payslips(batch, template, documents, file, options):
+    """Writes the rendered pages into file as a merged PDF or a ZIP and records progress."""
+    def report_progress(rendered):
+        PayslipBatch.objects.filter(pk=batch.pk).update(rendered_payslips=rendered)
+
+    pages = render_payslips(template, documents, options)
+    rendered = 0
+    if batch.output_format == 'ZIP':
+        with zipfile.ZipFile(file, 'w', zipfile.ZIP_STORED) as archive:
+            for document, page in zip(documents, pages):
+                # Pages are compressed already
+                archive.writestr(f"{document['employee_id']}.pdf", build_pdf([page]))
+                rendered += 1
+                if rendered % options['PROGRESS_EVERY'] == 0:
+                    report_progress(rendered)
+    else:
+        writer = PdfWriter(file)
+        for page in pages:
+            writer.add_page(page)
+            rendered += 1
+            if rendered % options['PROGRESS_EVERY'] == 0:
+                report_progress(rendered)
+        writer.close()
+    return rendered
+
+
+def run_payslip_batch(batch_id):
+    """Renders a pending or stale batch. Returns the batch, COM or ERR."""
+    options = get_payslip_batch_settings()
+    # Claim the batch so two runners never render it twice; a new started_at takes it out of the stale ones
+    claimed = get_runnable_batches(options).filter(pk=batch_id).update(
+        status='RUN', started_at=timezone.now(), rendered_payslips=0,
+    )
+    batch = PayslipBatch.objects.select_related('salary_month').get(pk=batch_id)
+    if not claimed:
+        return batch
+
+    try:
+        form = get_payslip_form(batch)
+        if not form.is_valid():
+            raise ValueError(f"Invalid payslip parameters: {form.errors.as_text()}")
+        with use_read_replica():
+            documents = get_payslip_documents(form.cleaned_data)
+            company_name = get_company_name()
+        PayslipBatch.objects.filter(pk=batch.pk).update(total_payslips=len(documents))
+
+        month = batch.salary_month
+        title = f"{calendar.month_name[month.month]} {month.year}"
+        template = compile_payslip_template(company_name, title, {
+            name: form.cleaned_data.get(name) for name in TEMPLATE_OPTIONS
+        })
+        extension = 'zip' if batch.output_format == 'ZIP' else 'pdf'
+        with tempfile.TemporaryFile() as file:
+            rendered = write_payslips(batch, template, documents, file, options)
+            file.seek(0)
+            batch.file.save(f"payslips_{month.year}_{month.month:02d}_{batch.pk}.{extension}", File(file), save=False)
+        batch.total_payslips = len(documents)
+        batch.rendered_payslips = rendered
+        batch.status = 'COM'
+        update_fields = ['file', 'total_payslips', 'rendered_payslips', 'status', 'finished_at']
+    except Exception as e:
+        logger.exception(f"Payslip batch {batch_id} failed")
+        batch.status = 'ERR'
+        batch.error = str(e)
+        update_fields = ['status', 'error', 'finished_at']
+    batch.finished_at = timezone.now()
+    batch.save(update_fields=update_fields)
+    return batch
+
+
+def run_in_thread(batch_id):
+    close_old_connections()
+    try:
+        run_payslip_batch(batch_id)
+    finally:
+        connections.close_all()
+
+
+def start_payslip_batch(batch):
+    """Runs batch in a background thread once the transaction creating it commits."""
+    if not get_payslip_batch_settings()['RUN_IN_BACKGROUND']:
+        return
+    transaction.on_commit(lambda: threading.Thread(
+        target=run_in_thread, args=(batch.pk,), name=f'payslip-batch-{batch.pk}', daemon=True,
+    ).start())
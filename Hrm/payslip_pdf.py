@@ -0,0 +1,258 @@
+"""
+Payslip PDF rendering without third-party libraries.
+
+A PayslipTemplate is compiled once per batch: the static drawing (company
+header, labels, rules, table heads) becomes a block of PDF operators and only
+the values are written per employee. render_payslip() turns one payslip dict
+into a compressed page, so it can run in worker processes, and PdfWriter
+streams pages into a single file. Text uses the standard Helvetica fonts with
+WinAnsi encoding; characters outside it print as '?'.
+
+This module imports nothing from Django so spawned workers start quickly.
+"""
+import io
+import zlib
+
+PAGE_WIDTH = 595   # A4 in points
+PAGE_HEIGHT = 842
+MARGIN = 40
+
+REGULAR = b'F1'
+BOLD = b'F2'
+
+# Helvetica advance widths (1/1000 em) of the characters in formatted amounts
+AMOUNT_WIDTHS = {',': 278, '.': 278, '-': 333, ' ': 278}
+DEFAULT_WIDTH = 556
+
+TABLE_TOP = 612
+ROW_HEIGHT = 14
+MAX_TABLE_ROWS = 18
+NOTES_TOP = 300
+MAX_NOTE_LINES = 12
+
+
+def pdf_text(value):
+    """value as an escaped PDF string literal body."""
+    text = ' '.join(str(value).split())
+    text = text.encode('cp1252', 'replace')
+    return text.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def text_width(text, size):
+    return sum(AMOUNT_WIDTHS.get(char, DEFAULT_WIDTH) for char in str(text)) * size / 1000
+
+
+def fit(text, width, size):
+    """Cuts text to about width points; Helvetica averages half an em per character."""
+    text = str(text)
+    limit = int(width / (size * 0.5))
+    return text if len(text) <= limit else text[:max(limit - 3, 1)] + '...'
+
+
+def draw_text(x, y, text, size=9, font=REGULAR):
+    return b'BT /%s %d Tf %.2f %.2f Td (%s) Tj ET\n' % (font, size, x, y, pdf_text(text))
+
+
+def draw_right(x, y, text, size=9, font=REGULAR):
+    return draw_text(x - text_width(text, size), y, text, size, font)
+
+
+def draw_line(x1, y1, x2, y2, width=0.5):
+    return b'%.2f w %.2f %.2f m %.2f %.2f l S\n' % (width, x1, y1, x2, y2)
+
+
+def draw_box(x, y, width, height, gray=0.93):
+    return b'%.2f g %.2f %.2f %.2f %.2f re f 0 g\n' % (gray, x, y, width, height)
+
+
+# ------------------------------------------
+# Template
+# ------------------------------------------
+INFO_FIELDS = (
+    # (label, payslip key, column)
+    ('Employee ID', 'employee_id', 0),
+    ('Name', 'employee_name', 0),
+    ('Department', 'department', 0),
+    ('Designation', 'designation', 0),
+    ('Joining Date', 'joining_date', 1),
+    ('Working Days', 'working_days', 1),
+    ('Present Days', 'present_days', 1),
+    ('Absent / Leave Days', 'absent_leave_days', 1),
+)
+INFO_TOP = 722
+INFO_COLUMNS = (MARGIN, 310)
+INFO_VALUE_OFFSET = 95
+
+
+class PayslipTemplate:
+    """A compiled payslip layout: static PDF operators plus the options that decide which values are drawn."""
+
+    def __init__(self, static, options):
+        self.static = static
+        self.options = options
+
+
+def compile_payslip_template(company_name, title, options=None):
+    """Draws everything that is the same on every payslip of a batch once."""
+    options = dict(options or {})
+    right = PAGE_WIDTH - MARGIN
+    middle = PAGE_WIDTH / 2
+    parts = [
+        draw_box(MARGIN, 770, right - MARGIN, 42),
+        draw_text(MARGIN + 10, 794, fit(company_name, 330, 14), 14, BOLD),
+        draw_text(MARGIN + 10, 778, 'PAYSLIP', 9),
+        draw_right(right - 10, 786, title, 11, BOLD),
+    ]
+    for index, (label, key, column) in enumerate(INFO_FIELDS):
+        y = INFO_TOP - (index % 4) * 16
+        parts.append(draw_text(INFO_COLUMNS[column], y, label, 9, BOLD))
+    parts.append(draw_line(MARGIN, 650, right, 650))
+
+    if options.get('include_salary_breakdown', True):
+        parts += [
+            draw_box(MARGIN, TABLE_TOP + 16, middle - MARGIN - 5, 16),
+            draw_box(middle + 5, TABLE_TOP + 16, right - middle - 5, 16),
+            draw_text(MARGIN + 5, TABLE_TOP + 21, 'Earnings', 9, BOLD),
+            draw_right(middle - 10, TABLE_TOP + 21, 'Amount', 9, BOLD),
+            draw_text(middle + 10, TABLE_TOP + 21, 'Deductions', 9, BOLD),
+            draw_right(right - 5, TABLE_TOP + 21, 'Amount', 9, BOLD),
+        ]
+    totals_y = TABLE_TOP - (MAX_TABLE_ROWS + 1) * ROW_HEIGHT
+    parts += [
+        draw_line(MARGIN, totals_y + 12, right, totals_y + 12),
+        draw_text(MARGIN + 5, totals_y, 'Total Earnings', 9, BOLD),
+        draw_text(middle + 10, totals_y, 'Total Deductions', 9, BOLD),
+        draw_text(MARGIN, NOTES_TOP + 16, 'Details', 10, BOLD),
+        draw_box(MARGIN, 90, right - MARGIN, 34),
+        draw_text(MARGIN + 10, 102, 'Net Salary', 12, BOLD),
+        draw_line(MARGIN, 60, right, 60),
+        draw_text(MARGIN, 48, 'This is a computer generated payslip and needs no signature.', 8),
+    ]
+    return PayslipTemplate(b''.join(parts), options)
+
+
+# ------------------------------------------
+# Pages
+# ------------------------------------------
+def get_note_lines(payslip, options):
+    lines = []
+    if options.get('include_overtime_details', True) and payslip.get('overtime_amount'):
+        lines.append(f"Overtime: {payslip['overtime_hours']} hours, {payslip['overtime_amount']}")
+    if options.get('include_bonus_details', True):
+        lines += [f"Bonus {name}: {amount}" for name, amount in payslip.get('bonuses', ())]
+    if options.get('include_advance_deductions', True):
+        lines += [f"Advance {name}: {amount}" for name, amount in payslip.get('advances', ())]
+    if options.get('include_attendance_summary', True) and payslip.get('attendance'):
+        lines.append(f"Attendance: {payslip['attendance']}")
+    if options.get('show_year_to_date') and payslip.get('ytd'):
+        lines.append(f"Year to date: {payslip['ytd']}")
+    return lines
+
+
+def render_payslip(template, payslip):
+    """The compressed PDF content stream of one payslip page."""
+    right = PAGE_WIDTH - MARGIN
+    middle = PAGE_WIDTH / 2
+    parts = [template.static]
+    for index, (label, key, column) in enumerate(INFO_FIELDS):
+        y = INFO_TOP - (index % 4) * 16
+        x = INFO_COLUMNS[column] + INFO_VALUE_OFFSET
+        parts.append(draw_text(x, y, fit(payslip.get(key, ''), 150, 9), 9))
+
+    if template.options.get('include_salary_breakdown', True):
+        for column, rows in ((0, payslip.get('earnings', ())), (1, payslip.get('deductions', ()))):
+            name_x = MARGIN + 5 if column == 0 else middle + 10
+            amount_x = middle - 10 if column == 0 else right - 5
+            rows = list(rows)
+            if len(rows) > MAX_TABLE_ROWS:
+                hidden = len(rows) - MAX_TABLE_ROWS + 1
+                rows = rows[:MAX_TABLE_ROWS - 1] + [(f'{hidden} more components', '')]
+            for index, (name, amount) in enumerate(rows):
+                y = TABLE_TOP - index * ROW_HEIGHT
+                parts.append(draw_text(name_x, y, fit(name, 170, 9), 9))
+                parts.append(draw_right(amount_x, y, amount, 9))
+
+    totals_y = TABLE_TOP - (MAX_TABLE_ROWS + 1) * ROW_HEIGHT
+    parts.append(draw_right(middle - 10, totals_y, payslip.get('total_earnings', ''), 9, BOLD))
+    parts.append(draw_right(right - 5, totals_y, payslip.get('total_deductions', ''), 9, BOLD))
+
+    for index, line in enumerate(get_note_lines(payslip, template.options)[:MAX_NOTE_LINES]):
+        parts.append(draw_text(MARGIN, NOTES_TOP - index * ROW_HEIGHT, fit(line, right - MARGIN, 9), 9))
+
+    parts.append(draw_right(right - 10, 102, payslip.get('net_salary', ''), 12, BOLD))
+    return zlib.compress(b''.join(parts))
+
+
+# Set in each pool worker by init_worker so the template is sent once per process
+_worker_template = None
+
+
+def init_worker(template):
+    global _worker_template
+    _worker_template = template
+
+
+def render_in_worker(payslip):
+    return render_payslip(_worker_template, payslip)
+
+
+# ------------------------------------------
+# Documents
+# ------------------------------------------
+class PdfWriter:
+    """
+    Writes a PDF page by page into a binary file object, so a merged document
+    of thousands of payslips never sits in memory. Objects 1-4 are the catalog,
+    the page tree (written last) and the two fonts.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 5
+        self.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self.write_object(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+        self.write_object(4, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>')
+
+    def write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+    def write_object(self, object_id, body):
+        self.offsets[object_id] = self.position
+        self.write(b'%d 0 obj\n%s\nendobj\n' % (object_id, body))
+
+    def add_page(self, content):
+        """Adds a page from a FlateDecode-compressed content stream."""
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self.write_object(content_id, b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (
+            len(content), content,
+        ))
+        self.write_object(page_id, (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+        ) % (PAGE_WIDTH, PAGE_HEIGHT, content_id))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self.page_ids)
+        self.write_object(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.page_ids)))
+        self.write_object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        xref_position = self.position
+        entries = [b'xref\n0 %d\n0000000000 65535 f \n' % self.next_id]
+        entries += [b'%010d 00000 n \n' % self.offsets[object_id] for object_id in range(1, self.next_id)]
+        self.write(b''.join(entries))
+        self.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (self.next_id, xref_position))
+
+
+def build_pdf(pages):
+    """A complete PDF document of the given compressed pages, as bytes."""
+    buffer = io.BytesIO()
+    writer = PdfWriter(buffer)
+    for content in pages:
+        writer.add_page(content)
+    writer.close()
+    return buffer.getvalue()
@@ -1 +1,7 @@
-from .leave_signals import *
\ No newline at end of file
+from .leave_signals import *
+from .report_cache_signals import *
+from .row_count_signals import *
+from .location_signals import *
+from .attendance_exception_signals import *
+from .income_tax_signals import *
+from .payroll_recovery_signals import *
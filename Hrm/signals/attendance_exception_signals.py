@@ -0,0 +1,19 @@
+"""
+Stored punches re-evaluate the live attendance exceptions of their day; punches
+saved during a request are evaluated together when it finishes.
+"""
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_save
+
+from ..attendance_exceptions import finish_request_batch, queue_punch_evaluation, start_request_batch
+from ..models import ZKAttendanceLog
+
+
+def evaluate_punch_exceptions(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and instance.user_id and instance.timestamp:
+        queue_punch_evaluation(instance.user_id, instance.timestamp)
+
+
+post_save.connect(evaluate_punch_exceptions, sender=ZKAttendanceLog, dispatch_uid='attendance_exception_punch')
+request_started.connect(start_request_batch, dispatch_uid='attendance_exception_request_started')
+request_finished.connect(finish_request_batch, dispatch_uid='attendance_exception_request_finished')
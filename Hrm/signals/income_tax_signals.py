@@ -0,0 +1,85 @@
+"""
+Changed inputs of the income tax projection re-project the affected employees;
+changes saved during a request are projected together when it finishes.
+"""
+from datetime import date
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_delete, post_save
+
+from ..income_tax import finish_request_queue, queue_tax_projection, start_request_queue
+from ..models import (
+    AllowanceCalculation, EmployeeBonus, EmployeeInvestment, EmployeeSalary, EmployeeSalaryStructure,
+    SalaryComponent, SalaryDetail, SalaryStructureComponent, TaxRate, TaxYear,
+)
+
+
+def get_salary_day(salary):
+    return date(salary.salary_month.year, salary.salary_month.month, 1)
+
+
+def project_salary(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    try:
+        queue_tax_projection(instance.employee_id, day=get_salary_day(instance))
+    except ObjectDoesNotExist:
+        queue_tax_projection(instance.employee_id)  # deleted along with its salary month
+
+
+def project_salary_detail(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    try:
+        salary = instance.salary
+        queue_tax_projection(salary.employee_id, day=get_salary_day(salary))
+    except ObjectDoesNotExist:
+        pass  # deleted along with its salary, which queues the employee itself
+
+
+def project_employee(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_tax_projection(instance.employee_id)
+
+
+def project_structure_component(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    try:
+        queue_tax_projection(instance.salary_structure.employee_id)
+    except ObjectDoesNotExist:
+        pass
+
+
+def project_investment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_tax_projection(instance.employee_id, tax_year_id=instance.tax_year_id)
+
+
+def project_tax_year(sender, instance, raw=False, **kwargs):
+    if not raw:
+        tax_year_id = instance.pk if sender is TaxYear else instance.tax_year_id
+        queue_tax_projection(tax_year_id=tax_year_id)
+
+
+def project_everyone(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_tax_projection()
+
+
+for signal in (post_save, post_delete):
+    name = 'save' if signal is post_save else 'delete'
+    signal.connect(project_salary, sender=EmployeeSalary, dispatch_uid=f'income_tax_salary_{name}')
+    signal.connect(project_salary_detail, sender=SalaryDetail, dispatch_uid=f'income_tax_salary_detail_{name}')
+    signal.connect(project_employee, sender=EmployeeBonus, dispatch_uid=f'income_tax_bonus_{name}')
+    signal.connect(project_employee, sender=EmployeeSalaryStructure, dispatch_uid=f'income_tax_structure_{name}')
+    signal.connect(project_structure_component, sender=SalaryStructureComponent,
+                   dispatch_uid=f'income_tax_structure_component_{name}')
+    signal.connect(project_investment, sender=EmployeeInvestment, dispatch_uid=f'income_tax_investment_{name}')
+    signal.connect(project_tax_year, sender=TaxRate, dispatch_uid=f'income_tax_rate_{name}')
+    signal.connect(project_everyone, sender=AllowanceCalculation, dispatch_uid=f'income_tax_allowance_{name}')
+    signal.connect(project_everyone, sender=SalaryComponent, dispatch_uid=f'income_tax_component_{name}')
+post_save.connect(project_tax_year, sender=TaxYear, dispatch_uid='income_tax_tax_year_save')
+request_started.connect(start_request_queue, dispatch_uid='income_tax_request_started')
+request_finished.connect(finish_request_queue, dispatch_uid='income_tax_request_finished')
@@ -0,0 +1,17 @@
+"""
+Location and assignment changes rebuild the cached geofence index.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models import Location, UserLocation
+from ..utils import invalidate_location_index
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=UserLocation)
+@receiver(post_delete, sender=UserLocation)
+def invalidate_location_cache(sender, **kwargs):
+    transaction.on_commit(invalidate_location_index)
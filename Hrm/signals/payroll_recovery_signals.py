@@ -0,0 +1,47 @@
+"""
+Approved advances get their installment schedule, generated payroll months
+recover installments and post PF contributions, and provident fund
+transactions entered by hand rebuild their fund's balance, all after commit.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from ..models import EmployeeAdvance, ProvidentFundTransaction, SalaryMonth
+from ..payroll_recovery import (
+    SCHEDULED_STATUSES, get_payroll_recovery_settings, post_payroll_month, rebuild_pf_balances,
+    schedule_advance_installments,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def run_after_commit(function, *args):
+    def run():
+        try:
+            function(*args)
+        except Exception:
+            logger.exception(f"{function.__name__} failed")
+    transaction.on_commit(run)
+
+
+def schedule_approved_advance(sender, instance, raw=False, **kwargs):
+    if not raw and instance.status in SCHEDULED_STATUSES:
+        run_after_commit(schedule_advance_installments, [instance])
+
+
+def post_generated_payroll_month(sender, instance, raw=False, **kwargs):
+    if not raw and instance.is_generated and get_payroll_recovery_settings()['POST_ON_GENERATE']:
+        run_after_commit(post_payroll_month, instance)
+
+
+def rebuild_pf_balance(sender, instance, raw=False, **kwargs):
+    if not raw:
+        run_after_commit(rebuild_pf_balances, [instance.employee_pf_id])
+
+
+post_save.connect(schedule_approved_advance, sender=EmployeeAdvance, dispatch_uid='payroll_recovery_advance')
+post_save.connect(post_generated_payroll_month, sender=SalaryMonth, dispatch_uid='payroll_recovery_salary_month')
+post_save.connect(rebuild_pf_balance, sender=ProvidentFundTransaction, dispatch_uid='payroll_recovery_pf_save')
+post_delete.connect(rebuild_pf_balance, sender=ProvidentFundTransaction, dispatch_uid='payroll_recovery_pf_delete')
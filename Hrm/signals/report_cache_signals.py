@@ -0,0 +1,78 @@
+"""
+Attendance inputs invalidate the cached attendance reports of the dates they touch;
+employee and shift master data invalidates all of them.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.utils import timezone
+
+from config.report_cache import HRM_MASTER_TAG, attendance_tag, invalidate_report_tags
+from ..models import (
+    ZKAttendanceLog, Holiday, LeaveApplication, ShortLeaveApplication, OvertimeRecord, RosterDay,
+    Employee, Shift, Department, Designation, Roster, RosterAssignment,
+)
+
+
+def get_log_date(timestamp):
+    if timezone.is_aware(timestamp):
+        return timezone.localtime(timestamp).date()
+    return timestamp.date()
+
+
+def get_leave_dates(instance):
+    days = (instance.end_date - instance.start_date).days + 1
+    return [instance.start_date + timedelta(days=n) for n in range(max(days, 0))]
+
+
+# Dates of each dated attendance input that its cached reports depend on
+ATTENDANCE_DATES = {
+    ZKAttendanceLog: lambda instance: [get_log_date(instance.timestamp)],
+    Holiday: lambda instance: [instance.date],
+    ShortLeaveApplication: lambda instance: [instance.date],
+    OvertimeRecord: lambda instance: [instance.date],
+    RosterDay: lambda instance: [instance.date],
+    LeaveApplication: get_leave_dates,
+}
+MASTER_DATA_MODELS = (Employee, Shift, Department, Designation, Roster, RosterAssignment)
+
+
+def get_attendance_dates(sender, instance):
+    try:
+        return [day for day in ATTENDANCE_DATES[sender](instance) if day]
+    except (TypeError, AttributeError):  # incomplete instance, e.g. a date not set yet
+        return []
+
+
+def remember_attendance_dates(sender, instance, raw=False, **kwargs):
+    """An edit can move a record to another date, so the old dates are invalidated too."""
+    instance._report_cache_dates = []
+    if raw or instance._state.adding or not instance.pk:
+        return
+    previous = sender.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._report_cache_dates = get_attendance_dates(sender, previous)
+
+
+def invalidate_attendance_reports(sender, instance, **kwargs):
+    dates = set(get_attendance_dates(sender, instance)) | set(getattr(instance, '_report_cache_dates', []))
+    tags = [attendance_tag(day) for day in dates]
+    if tags:
+        transaction.on_commit(lambda: invalidate_report_tags(*tags))
+
+
+def invalidate_all_attendance_reports(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_report_tags(HRM_MASTER_TAG))
+
+
+for attendance_sender in ATTENDANCE_DATES:
+    name = attendance_sender.__name__
+    pre_save.connect(remember_attendance_dates, sender=attendance_sender, dispatch_uid=f'report_cache_pre_save_{name}')
+    post_save.connect(invalidate_attendance_reports, sender=attendance_sender, dispatch_uid=f'report_cache_save_{name}')
+    post_delete.connect(invalidate_attendance_reports, sender=attendance_sender, dispatch_uid=f'report_cache_delete_{name}')
+
+for master_sender in MASTER_DATA_MODELS:
+    name = master_sender.__name__
+    post_save.connect(invalidate_all_attendance_reports, sender=master_sender, dispatch_uid=f'report_cache_save_{name}')
+    post_delete.connect(invalidate_all_attendance_reports, sender=master_sender, dispatch_uid=f'report_cache_delete_{name}')
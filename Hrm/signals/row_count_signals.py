@@ -0,0 +1,7 @@
+"""
+Row counter behind the estimated total of the attendance log list.
+"""
+from config.pagination import track_row_count
+from ..models import ZKAttendanceLog
+
+track_row_count(ZKAttendanceLog)
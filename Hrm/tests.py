@@ -1,3 +1,340 @@
-from django.test import TestCase
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from config.pagination import KeysetPaginator, get_row_count, reset_row_count
+from Hrm.models import (
+    AdvanceInstallment, AdvanceSetup, Department, Designation, Employee, EmployeeAdvance, EmployeeSalary,
+    EmployeeTax, Location, LocationAttendance, PayslipBatch, SalaryComponent, SalaryDetail, SalaryMonth, TaxRate,
+    TaxYear, UserLocation, ZKAttendanceDailySummary, ZKAttendanceLog, ZKDevice,
+)
+from Hrm.income_tax import project_income_tax
+from Hrm.attendance_archive import add_months, archive_month, compact_month, month_start
+from Hrm.payroll_recovery import post_payroll_month, schedule_advance_installments
+from Hrm.payslip_batch import get_runnable_batches, run_payslip_batch
+from Hrm.utils import invalidate_location_index
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'hrm-tests-default'},
+    'reports': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'hrm-tests-reports'},
+}
+
+
+def create_employee(employee_id='E001', joining_date=date(2020, 1, 1), basic_salary=Decimal('30000')):
+    department, _created = Department.objects.get_or_create(code='ADM', defaults={'name': 'Administration'})
+    designation, _created = Designation.objects.get_or_create(name='Officer', department=department)
+    return Employee.objects.create(
+        employee_id=employee_id, first_name='Test', last_name=employee_id, gender='M',
+        date_of_birth=date(1990, 1, 1), marital_status='S', phone='0100', department=department,
+        designation=designation, joining_date=joining_date, basic_salary=basic_salary,
+        gross_salary=basic_salary * 2,
+    )
+
+
+def create_salary(employee, year, month, details=()):
+    salary_month, _created = SalaryMonth.objects.get_or_create(year=year, month=month)
+    salary = EmployeeSalary.objects.create(
+        salary_month=salary_month, employee=employee, basic_salary=employee.basic_salary,
+        gross_salary=employee.gross_salary, total_earnings=employee.gross_salary, total_deductions=0,
+        net_salary=employee.gross_salary, working_days=26, present_days=26, absent_days=0, leave_days=0,
+    )
+    for code, component_type, amount in details:
+        component, _created = SalaryComponent.objects.get_or_create(
+            code=code, defaults={'name': code, 'component_type': component_type},
+        )
+        SalaryDetail.objects.create(salary=salary, component=component, amount=amount)
+    return salary_month
+
+
+@override_settings(CACHES=TEST_CACHES)
+class OfflinePunchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('field', password='x')
+        self.location = Location.objects.create(
+            name='Depot', address='Road 1', latitude=Decimal('23.81000000'),
+            longitude=Decimal('90.41000000'), radius=Decimal('0.50'),
+        )
+        UserLocation.objects.create(user=self.user, location=self.location, is_primary=True)
+        # The location signals invalidate on commit, which a test transaction never reaches
+        invalidate_location_index()
+        self.client.force_login(self.user)
+
+    def upload(self, *punches):
+        response = self.client.post(
+            '/hrm/mark-attendance/batch/', data=json.dumps({'punches': list(punches)}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def punch(self, key, **values):
+        return {'idempotency_key': key, 'attendance_type': 'IN', 'latitude': 23.8101, 'longitude': 90.4101, **values}
+
+    def test_offline_punch_is_stamped_with_the_device_time(self):
+        punched_at = (timezone.now() - timedelta(hours=20)).replace(microsecond=0)
+
+        data = self.upload(self.punch('a1', client_timestamp=punched_at.isoformat()))
+
+        self.assertEqual(data['accepted'], 1)
+        attendance = LocationAttendance.objects.get(idempotency_key='a1')
+        self.assertEqual(attendance.timestamp, punched_at)
+        self.assertEqual(attendance.client_timestamp, punched_at)
+        self.assertTrue(attendance.is_within_radius)
+
+    def test_punch_without_device_time_is_stamped_on_arrival(self):
+        before = timezone.now()
+
+        self.upload(self.punch('a2'))
+
+        attendance = LocationAttendance.objects.get(idempotency_key='a2')
+        self.assertGreaterEqual(attendance.timestamp, before)
+        self.assertLessEqual(attendance.timestamp, timezone.now())
+
+    def test_device_time_outside_the_window_is_rejected(self):
+        too_old = timezone.now() - timedelta(days=8)
+        too_new = timezone.now() + timedelta(hours=1)
+
+        data = self.upload(
+            self.punch('a3', client_timestamp=too_old.isoformat()),
+            self.punch('a4', client_timestamp=too_new.isoformat()),
+        )
+
+        self.assertEqual(data['rejected'], 2)
+        self.assertFalse(LocationAttendance.objects.exists())
+
+    def test_resent_offline_punch_keeps_its_first_timestamp(self):
+        punched_at = (timezone.now() - timedelta(hours=3)).replace(microsecond=0)
+        self.upload(self.punch('a5', client_timestamp=punched_at.isoformat()))
+
+        data = self.upload(self.punch('a5', client_timestamp=timezone.now().isoformat()))
+
+        self.assertEqual(data['duplicate'], 1)
+        self.assertEqual(LocationAttendance.objects.get(idempotency_key='a5').timestamp, punched_at)
+
+
+class AdvanceRecoveryTests(TestCase):
+    def setUp(self):
+        self.employee = create_employee()
+        setup = AdvanceSetup.objects.create(name='Salary advance', max_amount=10000, max_installments=12)
+        self.advance = EmployeeAdvance.objects.create(
+            employee=self.employee, advance_setup=setup, amount=Decimal('3000'), installments=3,
+            installment_amount=0, total_amount=0, application_date=date(2026, 1, 5),
+            approval_date=date(2026, 1, 10), reason='Rent', status='APP',
+        )
+        # The approval signal schedules on commit, which a test transaction never reaches
+        schedule_advance_installments([self.advance])
+
+    def get_paid_due_dates(self):
+        return list(
+            AdvanceInstallment.objects.filter(advance=self.advance, is_paid=True)
+            .order_by('due_date').values_list('due_date', flat=True)
+        )
+
+    def test_salary_without_advance_deduction_recovers_nothing(self):
+        posted = post_payroll_month(create_salary(self.employee, 2026, 3))
+
+        self.assertEqual(posted['installments'], 0)
+        self.assertEqual(self.get_paid_due_dates(), [])
+
+    def test_deduction_recovers_the_installment_of_the_month_only(self):
+        posted = post_payroll_month(create_salary(self.employee, 2026, 3, [('ADV', 'DED', Decimal('2000'))]))
+
+        self.assertEqual(posted['installments'], 1)
+        self.assertEqual(self.get_paid_due_dates(), [date(2026, 3, 31)])
+
+    @override_settings(PAYROLL_RECOVERY={'RECOVER_OVERDUE': True})
+    def test_overdue_installments_are_caught_up_when_enabled(self):
+        posted = post_payroll_month(create_salary(self.employee, 2026, 3, [('ADV', 'DED', Decimal('2000'))]))
+
+        self.assertEqual(posted['installments'], 2)
+        self.assertEqual(self.get_paid_due_dates(), [date(2026, 2, 28), date(2026, 3, 31)])
+
+    @override_settings(PAYROLL_RECOVERY={'RECOVER_OVERDUE': True})
+    def test_partial_deduction_recovers_whole_installments_only(self):
+        post_payroll_month(create_salary(self.employee, 2026, 3, [('ADV', 'DED', Decimal('1500'))]))
+
+        self.assertEqual(self.get_paid_due_dates(), [date(2026, 2, 28)])
+
+    def test_posting_a_month_again_recovers_nothing_twice(self):
+        salary_month = create_salary(self.employee, 2026, 2, [('ADV', 'DED', Decimal('1000'))])
+        post_payroll_month(salary_month)
+
+        posted = post_payroll_month(salary_month)
+
+        self.assertEqual(posted['installments'], 0)
+        self.assertEqual(self.get_paid_due_dates(), [date(2026, 2, 28)])
+
+    def test_advance_closes_with_its_last_installment(self):
+        for month in (2, 3, 4):
+            post_payroll_month(create_salary(self.employee, 2026, month, [('ADV', 'DED', Decimal('1000'))]))
+
+        self.advance.refresh_from_db()
+        self.assertEqual(self.advance.status, 'CLS')
+
+
+class IncomeTaxProjectionTests(TestCase):
+    def setUp(self):
+        self.tax_year = TaxYear.objects.create(
+            name='2026-27', start_date=date(2026, 7, 1), end_date=date(2027, 6, 30),
+        )
+        TaxRate.objects.create(tax_year=self.tax_year, min_amount=0, max_amount=300000, rate=0)
+        TaxRate.objects.create(tax_year=self.tax_year, min_amount=300000, max_amount=None, rate=10)
+
+    def project(self, employee):
+        project_income_tax(self.tax_year, [employee.pk], today=date(2026, 10, 15))
+        return EmployeeTax.objects.get(employee=employee, tax_year=self.tax_year)
+
+    def test_past_months_without_salary_are_projected(self):
+        employee = create_employee()
+        # July paid; August and September were never paid and still count
+        create_salary(employee, 2026, 7, [('TAX', 'DED', Decimal('1000'))])
+
+        employee_tax = self.project(employee)
+
+        self.assertEqual(employee_tax.projected_months, 11)
+        self.assertEqual(employee_tax.total_income, Decimal('720000.00'))
+        self.assertEqual(employee_tax.tax_amount, Decimal('42000.00'))
+        self.assertEqual(employee_tax.tax_deducted, Decimal('1000.00'))
+        self.assertEqual(employee_tax.monthly_tax, Decimal('3727.27'))
+
+    def test_months_before_joining_are_not_projected(self):
+        employee = create_employee(joining_date=date(2026, 9, 10))
+
+        employee_tax = self.project(employee)
+
+        self.assertEqual(employee_tax.projected_months, 10)
+        self.assertEqual(employee_tax.total_income, Decimal('600000.00'))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AttendanceLogRowCountTests(TestCase):
+    def setUp(self):
+        self.device = ZKDevice.objects.create(name='Gate', ip_address='10.0.0.5', device_id='SN001')
+        reset_row_count(ZKAttendanceLog)
+        for minute in range(5):
+            self.create_log(f'U{minute % 2}', minute)
+
+    def create_log(self, user_id, minute):
+        with self.captureOnCommitCallbacks(execute=True):
+            ZKAttendanceLog.objects.create(
+                device=self.device, user_id=user_id, timestamp=timezone.now() - timedelta(minutes=minute),
+            )
+
+    def test_counter_follows_creates_and_queryset_deletes(self):
+        self.assertEqual(get_row_count(ZKAttendanceLog), 5)
+        self.create_log('U2', 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ZKAttendanceLog.objects.filter(user_id='U0').delete()
+
+        self.assertEqual(get_row_count(ZKAttendanceLog), 3)
+        self.assertEqual(ZKAttendanceLog.objects.count(), 3)
+
+    def test_counter_follows_instance_deletes(self):
+        self.assertEqual(get_row_count(ZKAttendanceLog), 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ZKAttendanceLog.objects.filter(user_id='U1').first().delete()
+
+        self.assertEqual(get_row_count(ZKAttendanceLog), 4)
+
+    def test_counter_is_only_used_for_the_whole_table(self):
+        ordering = ('-timestamp', '-id')
+        get_row_count(ZKAttendanceLog)
+        ZKAttendanceLog.objects.filter(user_id='U0').update(user_id='U9')
+        # A stale counter shows through on the whole table only
+        ZKAttendanceLog.objects.bulk_create([
+            ZKAttendanceLog(device=self.device, user_id='U9', timestamp=timezone.now()),
+        ])
+
+        whole_table = KeysetPaginator(ZKAttendanceLog.objects.select_related('device'), ordering, 2)
+        scoped = KeysetPaginator(ZKAttendanceLog.objects.filter(user_id='U9'), ordering, 2)
+
+        self.assertEqual(whole_table.get_count(), (5, True))
+        self.assertEqual(scoped.get_count(), (4, False))
+
+
+@override_settings(PAYSLIP_BATCH={'STALE_AFTER': 3600})
+class PayslipBatchClaimTests(TestCase):
+    def setUp(self):
+        self.salary_month = SalaryMonth.objects.create(year=2026, month=9)
+
+    def create_batch(self, status, started_minutes_ago=None):
+        started_at = timezone.now() - timedelta(minutes=started_minutes_ago) if started_minutes_ago else None
+        return PayslipBatch.objects.create(salary_month=self.salary_month, status=status, started_at=started_at)
+
+    def run_batch(self, batch):
+        # The parameters are never rendered; failing at the form shows whether the batch was claimed
+        with mock.patch('Hrm.payslip_batch.get_payslip_form', side_effect=ValueError('not rendered')):
+            return run_payslip_batch(batch.pk)
+
+    def test_stale_and_pending_batches_are_runnable(self):
+        pending = self.create_batch('PEN')
+        stale = self.create_batch('RUN', started_minutes_ago=90)
+        self.create_batch('RUN', started_minutes_ago=10)
+        self.create_batch('COM', started_minutes_ago=90)
+
+        self.assertEqual(set(get_runnable_batches()), {pending, stale})
+
+    def test_stale_batch_is_reclaimed_and_a_live_one_is_left_alone(self):
+        stale = self.create_batch('RUN', started_minutes_ago=90)
+        live = self.create_batch('RUN', started_minutes_ago=10)
+
+        self.assertEqual(self.run_batch(stale).status, 'ERR')
+        self.assertEqual(self.run_batch(live).status, 'RUN')
+
+
+class EmployeeExportTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='x'))
+
+    def test_view_without_field_names_exports_every_field(self):
+        employee = create_employee()
+
+        response = self.client.get('/hrm/employee/export/')
+
+        self.assertEqual(response.status_code, 200)
+        header, *rows = csv.reader(b''.join(response.streaming_content).decode('utf-8').splitlines())
+        self.assertIn('Employee ID', header)
+        self.assertIn('Department', header)
+        self.assertEqual(len(rows), 1)
+        row = dict(zip(header, rows[0]))
+        self.assertEqual(row['Employee ID'], employee.employee_id)
+        self.assertEqual(row['Department'], str(employee.department_id))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CompactedMonthTests(TestCase):
+    def setUp(self):
+        self.device = ZKDevice.objects.create(name='Gate', ip_address='10.0.0.5', device_id='SN001')
+        self.month = add_months(month_start(timezone.localdate()), -6)
+        self.day = self.month + timedelta(days=4)
+
+    def punch(self, hour):
+        return ZKAttendanceLog.objects.create(
+            device=self.device, user_id='U1', punch_type='0',
+            timestamp=timezone.make_aware(datetime.combine(self.day, time(hour))),
+        )
+
+    def get_summary(self):
+        summary = ZKAttendanceDailySummary.objects.get(user_id='U1', date=self.day)
+        return timezone.localtime(summary.first_punch).hour, timezone.localtime(summary.last_punch).hour, summary.punch_count
+
+    def test_punches_synced_again_after_compaction_are_not_counted_twice(self):
+        for hour in (9, 13, 18):
+            self.punch(hour)
+        archive_month(self.month)
+        compact_month(self.month)
+
+        # The device sends 13:00 again along with a punch the summary has not seen
+        self.punch(13)
+        self.punch(20)
+        archive_month(self.month)
+
+        self.assertEqual(self.get_summary(), (9, 20, 4))
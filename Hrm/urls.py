@@ -10,7 +10,7 @@ from .views.location.location_attendance_views import (
     LocationAttendanceUpdateView, LocationAttendanceDetailView,
     LocationAttendanceDeleteView, LocationAttendanceBulkDeleteView,
     LocationAttendanceExportView, attendance_page, mark_attendance,
-    get_locations
+    mark_attendance_batch, get_locations
 )
 from .views.location.user_location_views import (
     UserLocationListView, UserLocationCreateView, UserLocationUpdateView,
@@ -55,7 +55,7 @@ from .views.zktico.early_leaving_report import EarlyLeavingReportView
 from .views.zktico.overtime_import_view import OvertimeImportView, OvertimeImportSaveView
 from .views.zktico.attendance_import_view import AttendanceImportView, AttendanceImportSaveView
 
-from .views.zktico.payslip_report import PayslipReportView
+from .views.zktico.payslip_report import PayslipReportView, PayslipBatchListView, PayslipBatchDownloadView
 from .views.zktico.payroll_summary_report import PayrollSummaryReportView
 
 app_name = 'hrm'
@@ -245,6 +245,8 @@ urlpatterns = [
     path('attendance-log/<int:pk>/delete/', views.AttendanceLogDeleteView.as_view(), name='attendance_log_delete'),
     path('attendance-log/export/', views.AttendanceLogExportView.as_view(), name='attendance_log_export'),
     path('attendance-log/bulk-delete/', views.AttendanceLogBulkDeleteView.as_view(), name='attendance_log_bulk_delete'),
+    # Attendance Exception URLs
+    path('attendance-exception/', views.AttendanceExceptionListView.as_view(), name='attendance_exception_list'),
     # Overtime Record URLs
     path('overtime-record/', views.OvertimeRecordListView.as_view(), name='overtime_record_list'),
     path('overtime-record/create/', views.OvertimeRecordCreateView.as_view(), name='overtime_record_create'),
@@ -282,6 +284,7 @@ urlpatterns = [
     # Attendance Page URLs
     path('attendance-page/', attendance_page, name='attendance_page'),
     path('mark-attendance/', mark_attendance, name='mark_attendance'),
+    path('mark-attendance/batch/', mark_attendance_batch, name='mark_attendance_batch'),
     path('get-locations/', get_locations, name='get_locations'),
     path('debug-locations/', debug_user_locations, name='debug_locations'),
 
@@ -448,5 +451,7 @@ urlpatterns = [
     path('overtime/import/save/', OvertimeImportSaveView.as_view(), name='overtime-import-save'),
     # Payroll Reports
     path('payroll/reports/payslip/', PayslipReportView.as_view(), name='payroll-payslip'),
+    path('payroll/reports/payslip/documents/', PayslipBatchListView.as_view(), name='payroll-payslip-batches'),
+    path('payroll/reports/payslip/documents/<int:pk>/download/', PayslipBatchDownloadView.as_view(), name='payroll-payslip-batch-download'),
     path('payroll/reports/summary/', PayrollSummaryReportView.as_view(), name='payroll-summary'),
 ]
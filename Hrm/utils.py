@@ -102,4 +102,106 @@ def get_user_primary_location(user):
         user_locations = UserLocation.objects.filter(user=user)
         if user_locations.exists():
             return user_locations.first().location
-        return None
\ No newline at end of file
+        return None
+
+# ------------------------------------------
+# Geofence index for location attendance
+# ------------------------------------------
+from django.core.cache import cache
+
+from config.report_cache import get_tag_versions, invalidate_report_tags
+
+# Bumped whenever a Location or UserLocation changes (see Hrm/signals/location_signals.py)
+LOCATION_INDEX_TAG = 'hrm:locations'
+LOCATION_GRID_DEGREES = 0.01  # ~1.1 km cells
+LOCATION_MAX_GRID_CELLS = 400  # larger geofences are checked against every punch instead
+USER_LOCATIONS_CACHE_TIMEOUT = 60 * 60  # seconds
+KM_PER_DEGREE = 111.32
+
+
+class LocationGridIndex:
+    """
+    Active locations bucketed into a lat/lon grid. Each geofence is registered in
+    every cell its bounding box touches, so a punch only measures the distance to
+    the few locations of its own cell.
+    """
+
+    def __init__(self, locations):
+        self.locations = {}
+        self.cells = {}
+        self.wide = []
+        for location in locations:
+            latitude, longitude, radius = float(location.latitude), float(location.longitude), float(location.radius)
+            self.locations[location.pk] = {
+                'id': location.pk, 'name': location.name,
+                'latitude': latitude, 'longitude': longitude, 'radius': radius,
+            }
+            lat_delta = radius / KM_PER_DEGREE
+            lon_delta = radius / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+            rows = range(self.get_cell(latitude - lat_delta), self.get_cell(latitude + lat_delta) + 1)
+            columns = range(self.get_cell(longitude - lon_delta), self.get_cell(longitude + lon_delta) + 1)
+            if len(rows) * len(columns) > LOCATION_MAX_GRID_CELLS:
+                self.wide.append(location.pk)
+                continue
+            for row in rows:
+                for column in columns:
+                    self.cells.setdefault((row, column), []).append(location.pk)
+
+    @staticmethod
+    def get_cell(degrees):
+        return math.floor(degrees / LOCATION_GRID_DEGREES)
+
+    def measure(self, location_id, latitude, longitude):
+        """(is_within_radius, distance_km) of a point to one indexed location."""
+        location = self.locations[location_id]
+        distance = calculate_distance(latitude, longitude, location['latitude'], location['longitude'])
+        return distance <= location['radius'], distance
+
+    def find_containing(self, latitude, longitude, location_ids=None):
+        """
+        Locations whose geofence contains the point, nearest first, as
+        (location_id, distance_km). location_ids limits the candidates.
+        """
+        candidates = self.cells.get((self.get_cell(latitude), self.get_cell(longitude)), []) + self.wide
+        matches = []
+        for location_id in candidates:
+            if location_ids is not None and location_id not in location_ids:
+                continue
+            within, distance = self.measure(location_id, latitude, longitude)
+            if within:
+                matches.append((location_id, distance))
+        return sorted(matches, key=lambda match: match[1])
+
+
+_location_index = (None, None)
+
+
+def get_location_index():
+    """
+    Grid index of active locations, rebuilt in-process only when the shared
+    location version changes, so a burst of punches does not re-read Location.
+    """
+    global _location_index
+    from .models import Location
+
+    version = get_tag_versions([LOCATION_INDEX_TAG])[0]
+    if _location_index[0] != version:
+        _location_index = (version, LocationGridIndex(Location.objects.filter(is_active=True)))
+    return _location_index[1]
+
+
+def get_user_location_ids(user_id):
+    """Ids of the locations assigned to a user, cached until assignments change."""
+    from .models import UserLocation
+
+    version = get_tag_versions([LOCATION_INDEX_TAG])[0]
+    cache_key = f'user_locations:{version}:{user_id}'
+    location_ids = cache.get(cache_key)
+    if location_ids is None:
+        location_ids = frozenset(UserLocation.objects.filter(user_id=user_id).values_list('location_id', flat=True))
+        cache.set(cache_key, location_ids, USER_LOCATIONS_CACHE_TIMEOUT)
+    return location_ids
+
+
+def invalidate_location_index():
+    invalidate_report_tags(LOCATION_INDEX_TAG)
@@ -104,6 +104,7 @@ from .attendance.attendance_log_view import (
     AttendanceLogDetailView, AttendanceLogDeleteView, AttendanceLogExportView,
     AttendanceLogBulkDeleteView
 )
+from .attendance.attendance_exception_view import AttendanceExceptionListView
 
 from .attendance.reports.attendance_summary_views import (AttendanceSummaryView,EmployeeAttendanceDetailView,MonthlySalarySummaryView)
 
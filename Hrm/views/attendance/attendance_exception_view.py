@@ -0,0 +1,65 @@
+from django.utils import timezone
+
+from Hrm.models import AttendanceException, Employee
+from Hrm.forms import AttendanceExceptionFilterForm
+from config.views import GenericFilterView
+
+
+class AttendanceExceptionListView(GenericFilterView):
+    """
+    Live attendance exceptions, today's unresolved ones unless filtered otherwise.
+    Users without Hrm.view_attendanceexception see those of their direct reports.
+    """
+    model = AttendanceException
+    template_name = 'attendance/attendance_exception_list.html'
+    context_object_name = 'objects'
+    paginate_by = 20
+    filter_form_class = AttendanceExceptionFilterForm
+    permission_required = 'Hrm.view_attendanceexception'
+
+    def get_manager(self):
+        return Employee.objects.filter(user=self.request.user, subordinates__isnull=False).first()
+
+    def has_permission(self):
+        return super().has_permission() or self.get_manager() is not None
+
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related('employee', 'shift').order_by('-date', 'employee__employee_id')
+        if not self.request.user.has_perm(self.permission_required):
+            queryset = queryset.filter(employee__reporting_manager__user=self.request.user)
+        return queryset
+
+    def apply_filters(self, queryset):
+        """Apply filters from the filter form"""
+        filters = self.filter_form.cleaned_data
+        if filters.get('search'):
+            queryset = queryset.filter(
+                employee__first_name__icontains=filters['search']
+            ) | queryset.filter(
+                employee__last_name__icontains=filters['search']
+            ) | queryset.filter(
+                employee__employee_id__icontains=filters['search']
+            )
+
+        if filters.get('employee'):
+            queryset = queryset.filter(employee=filters['employee'])
+
+        if filters.get('status'):
+            queryset = queryset.filter(exception_type=filters['status'])
+
+        if not filters.get('include_resolved'):
+            queryset = queryset.filter(resolved_at__isnull=True)
+
+        if not filters.get('date_from') and not filters.get('date_to'):
+            queryset = queryset.filter(date=timezone.localdate())
+        if filters.get('date_from'):
+            queryset = queryset.filter(date__gte=filters['date_from'])
+        if filters.get('date_to'):
+            queryset = queryset.filter(date__lte=filters['date_to'])
+
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['today'] = timezone.localdate()
+        return context
@@ -10,8 +10,9 @@ from Hrm.forms.attendance_report_forms import (
     WeekendHolidayAttendanceForm
 )
 from config.views import GenericFilterView
+from config.db_router import ReadReplicaMixin
 
-class DailyAttendanceReportView(GenericFilterView):
+class DailyAttendanceReportView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/daily_attendance_report.html'
     context_object_name = 'attendances'
@@ -39,7 +40,7 @@ class DailyAttendanceReportView(GenericFilterView):
         context['report_subtitle'] = 'Daily attendance status of employees'
         return context
 
-class MonthlyAttendanceSummaryView(GenericFilterView):
+class MonthlyAttendanceSummaryView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/monthly_attendance_summary.html'
     context_object_name = ' summaries'
@@ -79,7 +80,7 @@ class MonthlyAttendanceSummaryView(GenericFilterView):
         context['report_subtitle'] = 'Summary of employee attendance for a month'
         return context
 
-class MissingAttendanceReportView(GenericFilterView):
+class MissingAttendanceReportView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/missing_attendance_report.html'
     context_object_name = 'attendances'
@@ -104,7 +105,7 @@ class MissingAttendanceReportView(GenericFilterView):
         context['report_subtitle'] = 'Employees with missing check-in or check-out'
         return context
 
-class LateArrivalReportView(GenericFilterView):
+class LateArrivalReportView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/late_arrival_report.html'
     context_object_name = 'attendances'
@@ -129,7 +130,7 @@ class LateArrivalReportView(GenericFilterView):
         context['report_subtitle'] = 'Employees who arrived late beyond grace time'
         return context
 
-class EarlyDepartureReportView(GenericFilterView):
+class EarlyDepartureReportView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/early_departure_report.html'
     context_object_name = 'attendances'
@@ -154,7 +155,7 @@ class EarlyDepartureReportView(GenericFilterView):
         context['report_subtitle'] = 'Employees who left before shift end'
         return context
 
-class AbsentReportView(GenericFilterView):
+class AbsentReportView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/absent_report.html'
     context_object_name = 'attendances'
@@ -179,7 +180,7 @@ class AbsentReportView(GenericFilterView):
         context['report_subtitle'] = 'Employees who were absent on specific dates'
         return context
 
-class OvertimeReportView(GenericFilterView):
+class OvertimeReportView(ReadReplicaMixin, GenericFilterView):
     model = OvertimeRecord
     template_name = 'attendance/reports/overtime_report.html'
     context_object_name = 'overtimes'
@@ -206,7 +207,7 @@ class OvertimeReportView(GenericFilterView):
         context['report_subtitle'] = 'Approved overtime hours and amounts'
         return context
 
-class DailyAttendanceWithOvertimeView(GenericFilterView):
+class DailyAttendanceWithOvertimeView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/daily_attendance_with_overtime.html'
     context_object_name = 'attendances'
@@ -229,7 +230,7 @@ class DailyAttendanceWithOvertimeView(GenericFilterView):
         context['report_title'] = 'Daily Attendance with Overtime'
         context['report_subtitle'] = 'Daily attendance with overtime details'
         return context
-class ShiftWiseAttendanceReportView(GenericFilterView):
+class ShiftWiseAttendanceReportView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/shift_wise_attendance_report.html'
     context_object_name = 'attendances'
@@ -253,7 +254,7 @@ class ShiftWiseAttendanceReportView(GenericFilterView):
         context['report_subtitle'] = 'Attendance details by shift'
         return context
 
-class RosterVsActualAttendanceView(GenericFilterView):
+class RosterVsActualAttendanceView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/roster_vs_actual_attendance.html'
     context_object_name = 'attendances'
@@ -278,7 +279,7 @@ class RosterVsActualAttendanceView(GenericFilterView):
         context['report_subtitle'] = 'Comparison of rostered vs actual attendance'
         return context
 
-class WeekendHolidayAttendanceView(GenericFilterView):
+class WeekendHolidayAttendanceView(ReadReplicaMixin, GenericFilterView):
     model = Attendance
     template_name = 'attendance/reports/weekend_holiday_attendance.html'
     context_object_name = 'attendances'
@@ -7,7 +7,7 @@ import datetime
 from Hrm.models import (
     Employee, LeaveBalance, LeaveApplication, ShortLeaveApplication,
     Attendance, OvertimeRecord, EmployeeSalary, EmployeeBonus,
-    EmployeeAdvance, EmployeeProvidentFund, EmployeeLetter
+    EmployeeAdvance, EmployeeProvidentFund, EmployeeLetter, ProvidentFundBalance
 )
 
 class EmployeeDashboardView(LoginRequiredMixin, TemplateView):
@@ -97,9 +97,11 @@ class EmployeeDashboardView(LoginRequiredMixin, TemplateView):
         try:
             pf_info = employee.provident_fund
             pf_transactions = pf_info.transactions.order_by('-transaction_date')[:5]
+            pf_balance = ProvidentFundBalance.objects.filter(employee_pf=pf_info).first()
         except:
             pf_info = None
             pf_transactions = []
+            pf_balance = None
         
         # Get recent letters
         recent_letters = employee.letters.select_related('template', 'issued_by').order_by('-issue_date')[:5]
@@ -118,6 +120,7 @@ class EmployeeDashboardView(LoginRequiredMixin, TemplateView):
             'active_advances': active_advances,
             'pf_info': pf_info,
             'pf_transactions': pf_transactions,
+            'pf_balance': pf_balance,
             'recent_letters': recent_letters,
             'current_year': current_year,
             'current_month': current_month,
@@ -6,11 +6,15 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from math import radians, cos, sin, asin, sqrt
+from datetime import timedelta
 from decimal import Decimal
+import json
 import logging
 
 from Hrm.models import LocationAttendance, Location, UserLocation
+from Hrm.utils import get_location_index, get_user_location_ids
 from Hrm.forms.location_forms import LocationAttendanceForm, LocationAttendanceFilterForm
 from config.views import GenericFilterView, GenericDeleteView, BaseExportView, BaseBulkDeleteConfirmView
 # Set up logging
@@ -224,43 +228,34 @@ def mark_attendance(request):
         if attendance_type not in ['IN', 'OUT']:
             return JsonResponse({'status': 'error', 'message': _('Invalid attendance type')})
         
-        # Get location
-        try:
-            location = Location.objects.get(id=location_id)
-        except Location.DoesNotExist:
+        # Location and assignment come from the cached geofence index
+        index = get_location_index()
+        location = index.locations.get(int(location_id))
+        if location is None:
             return JsonResponse({'status': 'error', 'message': _('Location not found')})
         
         # Check if user is assigned to this location
-        user_location = UserLocation.objects.filter(user=request.user, location=location).first()
-        if not user_location:
-            logger.warning(f"User {request.user.username} attempted to mark attendance at unassigned location {location.name}")
+        if location['id'] not in get_user_location_ids(request.user.id):
+            logger.warning(f"User {request.user.username} attempted to mark attendance at unassigned location {location['name']}")
             return JsonResponse({'status': 'error', 'message': _('You are not assigned to this location')})
         
-        # Calculate distance
-        distance = haversine(
-            location.latitude, 
-            location.longitude, 
-            Decimal(latitude), 
-            Decimal(longitude)
-        )
-        
-        # Check if within radius
-        is_within_radius = distance <= float(location.radius)
+        # Calculate distance and check if within radius
+        is_within_radius, distance = index.measure(location['id'], float(latitude), float(longitude))
         
         # Create attendance record
         attendance = LocationAttendance.objects.create(
             user=request.user,
-            location=location,
+            location_id=location['id'],
             attendance_type=attendance_type,
             latitude=latitude,
             longitude=longitude,
             is_within_radius=is_within_radius,
-            distance=distance,
+            distance=round(distance, 2),
             device_info=device_info,
             ip_address=request.META.get('REMOTE_ADDR')
         )
         
-        logger.info(f"Attendance marked: user={request.user.username}, location={location.name}, type={attendance_type}, within_radius={is_within_radius}")
+        logger.info(f"Attendance marked: user={request.user.username}, location={location['name']}, type={attendance_type}, within_radius={is_within_radius}")
         
         return JsonResponse({
             'status': 'success',
@@ -277,6 +272,151 @@ def mark_attendance(request):
         logger.exception(f"Error marking attendance: {str(e)}")
         return JsonResponse({'status': 'error', 'message': str(e)})
 
+# Offline punch queues uploaded in one request
+MAX_BATCH_PUNCHES = 500
+MAX_PUNCH_AGE = timedelta(days=7)
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+def parse_queued_punch(punch, index, location_ids, now):
+    """
+    Validates one queued punch against the geofence index and the user's assigned
+    locations. Returns (field values, None) or (None, error message). Without a
+    location_id the nearest assigned geofence containing the point is used, or the
+    nearest assigned location flagged as outside its radius. The punch is stamped
+    with its client timestamp, which must lie within MAX_PUNCH_AGE before and
+    MAX_CLOCK_SKEW after the server time.
+    """
+    attendance_type = punch.get('attendance_type')
+    if attendance_type not in ('IN', 'OUT'):
+        return None, _('Invalid attendance type')
+    try:
+        latitude, longitude = float(punch['latitude']), float(punch['longitude'])
+    except (KeyError, TypeError, ValueError):
+        return None, _('Invalid coordinates')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None, _('Invalid coordinates')
+
+    client_timestamp = now
+    if punch.get('client_timestamp'):
+        try:
+            client_timestamp = parse_datetime(str(punch['client_timestamp']))
+        except ValueError:
+            client_timestamp = None
+        if client_timestamp is None:
+            return None, _('Invalid client timestamp')
+        if timezone.is_naive(client_timestamp):
+            client_timestamp = timezone.make_aware(client_timestamp)
+        if client_timestamp > now + MAX_CLOCK_SKEW or client_timestamp < now - MAX_PUNCH_AGE:
+            return None, _('Client timestamp is outside the accepted window')
+
+    active_ids = location_ids & index.locations.keys()
+    if punch.get('location_id'):
+        try:
+            location_id = int(punch['location_id'])
+        except (TypeError, ValueError):
+            return None, _('Location not found')
+        if location_id not in index.locations:
+            return None, _('Location not found')
+        if location_id not in active_ids:
+            return None, _('You are not assigned to this location')
+        is_within_radius, distance = index.measure(location_id, latitude, longitude)
+    else:
+        matches = index.find_containing(latitude, longitude, active_ids)
+        if matches:
+            (location_id, distance), is_within_radius = matches[0], True
+        elif active_ids:
+            is_within_radius = False
+            location_id, distance = min(
+                ((candidate, index.measure(candidate, latitude, longitude)[1]) for candidate in active_ids),
+                key=lambda candidate: candidate[1],
+            )
+        else:
+            return None, _('You are not assigned to any active location')
+
+    return {
+        'location_id': location_id,
+        'attendance_type': attendance_type,
+        'latitude': Decimal(str(round(latitude, 8))),
+        'longitude': Decimal(str(round(longitude, 8))),
+        'is_within_radius': is_within_radius,
+        'distance': Decimal(str(round(distance, 2))),
+        'timestamp': client_timestamp,
+        'client_timestamp': client_timestamp,
+        'device_info': str(punch.get('device_info') or '')[:1000],
+    }, None
+
+@login_required
+def mark_attendance_batch(request):
+    """
+    API view to upload a queue of offline punches as JSON:
+    {"punches": [{"idempotency_key", "attendance_type", "latitude", "longitude",
+                  "client_timestamp", "location_id" (optional), "device_info"}]}
+    Every punch gets a result; re-sent keys are reported as duplicates, so a
+    client can retry the whole queue until it gets a response.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': _('Invalid request method')})
+
+    try:
+        payload = json.loads(request.body or b'{}')
+        punches = payload.get('punches') if isinstance(payload, dict) else None
+    except ValueError:
+        punches = None
+    if not isinstance(punches, list):
+        return JsonResponse({'status': 'error', 'message': _('Expected a JSON object with a "punches" list')}, status=400)
+    if len(punches) > MAX_BATCH_PUNCHES:
+        return JsonResponse({'status': 'error', 'message': _('At most {} punches per request').format(MAX_BATCH_PUNCHES)}, status=400)
+
+    keys = [str(punch.get('idempotency_key') or '').strip() if isinstance(punch, dict) else '' for punch in punches]
+    existing = dict(
+        LocationAttendance.objects.filter(user=request.user, idempotency_key__in={key for key in keys if key})
+        .values_list('idempotency_key', 'id')
+    )
+
+    index = get_location_index()
+    location_ids = get_user_location_ids(request.user.id)
+    now = timezone.now()
+    ip_address = request.META.get('REMOTE_ADDR')
+
+    results, pending, seen = [], {}, set()
+    for punch, key in zip(punches, keys):
+        result = {'idempotency_key': key}
+        results.append(result)
+        if not key or len(key) > 64:
+            result.update(status='rejected', message=_('Missing or too long idempotency key'))
+        elif key in existing or key in seen:
+            result.update(status='duplicate', id=existing.get(key))
+        else:
+            values, error = parse_queued_punch(punch, index, location_ids, now)
+            if error:
+                result.update(status='rejected', message=error)
+            else:
+                pending[key] = LocationAttendance(
+                    user=request.user, idempotency_key=key, ip_address=ip_address, **values
+                )
+                result.update(
+                    status='accepted', location_id=values['location_id'],
+                    is_within_radius=values['is_within_radius'], distance=float(values['distance']),
+                )
+        seen.add(key)
+
+    if pending:
+        # A concurrent retry of the same queue may have inserted some keys already
+        LocationAttendance.objects.bulk_create(pending.values(), batch_size=MAX_BATCH_PUNCHES, ignore_conflicts=True)
+        created = dict(
+            LocationAttendance.objects.filter(user=request.user, idempotency_key__in=pending)
+            .values_list('idempotency_key', 'id')
+        )
+        for result in results:
+            if result['status'] == 'accepted':
+                result['id'] = created.get(result['idempotency_key'])
+            elif result['status'] == 'duplicate' and result.get('id') is None:
+                result['id'] = created.get(result['idempotency_key']) or existing.get(result['idempotency_key'])
+
+    summary = {status: sum(1 for result in results if result['status'] == status) for status in ('accepted', 'duplicate', 'rejected')}
+    logger.info(f"Batch attendance: user={request.user.username}, {summary}")
+    return JsonResponse({'status': 'success', 'data': {**summary, 'results': results}})
+
 @login_required
 def get_locations(request):
     """API view to get user's assigned locations"""
@@ -12,6 +12,9 @@ from django.http import JsonResponse
 from django.db import transaction
 import json
 
+from config.report_cache import cached_report, get_attendance_report_tags
+from config.db_router import ReadReplicaMixin
+from Hrm.attendance_archive import get_attendance_logs
 from Hrm.models import *
 
 logger = logging.getLogger(__name__)
@@ -245,9 +248,16 @@ class AttendanceDetailsReportForm(forms.Form):
 
         return cleaned_data
 
-class AttendanceDetailsReportView(LoginRequiredMixin, View):
+class AttendanceDetailsReportView(ReadReplicaMixin, LoginRequiredMixin, View):
     """Advanced view to generate attendance details report from ZKAttendanceLog for Attendance model import."""
     template_name = 'report/hrm/attendance_details_report.html'
+    read_replica_methods = ('GET', 'HEAD', 'POST')
+
+    def should_use_read_replica(self, request):
+        # The JSON POST imports the report into Attendance and must read the primary
+        if request.headers.get('Content-Type') == 'application/json':
+            return False
+        return super().should_use_read_replica(request)
     
     def get(self, request, *args, **kwargs):
         form = AttendanceDetailsReportForm()
@@ -304,6 +314,7 @@ class AttendanceDetailsReportView(LoginRequiredMixin, View):
             'page_title': _("Advanced Attendance Details Report"),
         }
     
+    @cached_report(tags=get_attendance_report_tags)
     def _generate_attendance_details_report(self, form_data):
         """Generate comprehensive attendance details report from ZKAttendanceLog data."""
         start_date = form_data['start_date']
@@ -524,11 +535,7 @@ class AttendanceDetailsReportView(LoginRequiredMixin, View):
         """Get ZK attendance logs for employees and date range."""
         employee_ids = [emp.employee_id for emp in employees]
         
-        return ZKAttendanceLog.objects.filter(
-            user_id__in=employee_ids,
-            timestamp__date__gte=start_date,
-            timestamp__date__lte=end_date
-        ).select_related('device').order_by('user_id', 'timestamp')
+        return get_attendance_logs(employee_ids, start_date, end_date).select_related('device').order_by('user_id', 'timestamp')
     
     def _get_roster_data(self, employees, start_date, end_date):
         """Get roster assignments and roster days for employees."""
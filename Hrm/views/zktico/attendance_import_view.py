@@ -17,6 +17,7 @@ from django.views.decorators.csrf import csrf_exempt
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from Hrm.models import *
+from Hrm.attendance_archive import get_attendance_logs
 from .unified_attendance_processor import UnifiedAttendanceProcessor
 
 logger = logging.getLogger(__name__)
@@ -504,10 +505,7 @@ class AttendanceImportView(LoginRequiredMixin, View):
         """Process attendance for a single employee using UnifiedAttendanceProcessor."""
         try:
             # Get ZK logs for this employee
-            zk_logs = ZKAttendanceLog.objects.filter(
-                user_id=employee.employee_id,
-                timestamp__date__range=[start_date, end_date]
-            ).order_by('timestamp')
+            zk_logs = get_attendance_logs(employee.employee_id, start_date, end_date).order_by('timestamp')
             
             # Get leave applications
             leave_applications = LeaveApplication.objects.filter(
@@ -13,6 +13,9 @@ import json
 import csv
 from decimal import Decimal, ROUND_HALF_UP
 
+from config.report_cache import cached_report, get_attendance_report_tags
+from config.db_router import ReadReplicaMixin
+from Hrm.attendance_archive import get_attendance_logs
 from Hrm.models import *
 from .unified_attendance_processor import UnifiedAttendanceProcessor
 
@@ -452,9 +455,10 @@ class AttendanceSummaryReportForm(forms.Form):
         help_text=_("Use individual employee expected work hours when available.")
     )
 
-class AttendanceSummaryReportView(LoginRequiredMixin, View):
+class AttendanceSummaryReportView(ReadReplicaMixin, LoginRequiredMixin, View):
     """Enhanced view for generating attendance summary reports with dynamic shift options and 🔥 NEW RULES."""
     template_name = 'report/hrm/attendance_summary_report.html'
+    read_replica_methods = ('GET', 'HEAD', 'POST')  # POST only submits the filter form
     
     def get(self, request, *args, **kwargs):
         form = AttendanceSummaryReportForm()
@@ -515,6 +519,7 @@ class AttendanceSummaryReportView(LoginRequiredMixin, View):
             'report_generated': False,
         }
     
+    @cached_report(tags=get_attendance_report_tags)
     def _generate_attendance_summary_report(self, form_data):
         """Generate attendance summary report using enhanced UnifiedAttendanceProcessor with 🔥 NEW RULES."""
         start_date = form_data['start_date']
@@ -588,10 +593,7 @@ class AttendanceSummaryReportView(LoginRequiredMixin, View):
         for employee in employees:
             try:
                 # Get ZK attendance logs for the employee in the date range
-                zk_logs = ZKAttendanceLog.objects.filter(
-                    user_id=employee.employee_id,
-                    timestamp__date__range=[start_date, end_date]
-                ).order_by('timestamp')
+                zk_logs = get_attendance_logs(employee.employee_id, start_date, end_date).order_by('timestamp')
                 
                 employee_roster_data = roster_data.get(employee.id, {})
                 
@@ -12,6 +12,9 @@ from django.http import JsonResponse, HttpResponse
 import json
 import csv
 
+from config.report_cache import cached_report, get_attendance_report_tags
+from config.db_router import ReadReplicaMixin
+from Hrm.attendance_archive import get_attendance_logs
 from Hrm.models import *
 from .unified_attendance_processor import UnifiedAttendanceProcessor
 
@@ -444,9 +447,10 @@ class DailyAttendanceReportForm(forms.Form):
         help_text=_("Use individual employee expected work hours when available.")
     )
 
-class DailyAttendanceReportView(LoginRequiredMixin, View):
+class DailyAttendanceReportView(ReadReplicaMixin, LoginRequiredMixin, View):
     """Enhanced view for generating daily attendance reports with dynamic shift options and 🔥 NEW RULES."""
     template_name = 'report/hrm/daily_attendance_report.html'
+    read_replica_methods = ('GET', 'HEAD', 'POST')  # POST only submits the filter form
     
     def get(self, request, *args, **kwargs):
         form = DailyAttendanceReportForm()
@@ -501,6 +505,7 @@ class DailyAttendanceReportView(LoginRequiredMixin, View):
             'report_generated': False,
         }
     
+    @cached_report(tags=get_attendance_report_tags)
     def _generate_daily_attendance_report(self, form_data):
         """Generate daily attendance report using enhanced UnifiedAttendanceProcessor with 🔥 NEW RULES."""
         report_date = form_data['report_date']
@@ -519,10 +524,7 @@ class DailyAttendanceReportView(LoginRequiredMixin, View):
         
         # Get ZK attendance logs for the date
         employee_ids = [emp.employee_id for emp in employees]
-        zk_logs = ZKAttendanceLog.objects.filter(
-            user_id__in=employee_ids,
-            timestamp__date=report_date
-        ).order_by('user_id', 'timestamp')
+        zk_logs = get_attendance_logs(employee_ids, report_date, report_date).order_by('user_id', 'timestamp')
         
         # Get roster data
         roster_data = self._get_roster_data(employees, report_date, report_date)
@@ -12,6 +12,9 @@ from django.http import JsonResponse, HttpResponse
 import json
 import csv
 
+from config.report_cache import cached_report, get_attendance_report_tags
+from config.db_router import ReadReplicaMixin
+from Hrm.attendance_archive import get_attendance_logs
 from Hrm.models import *
 from .unified_attendance_processor import UnifiedAttendanceProcessor
 
@@ -139,9 +142,10 @@ class EarlyLeavingReportForm(forms.Form):
         widget=forms.NumberInput(attrs={'class': 'form-control'}),
     )
 
-class EarlyLeavingReportView(LoginRequiredMixin, View):
+class EarlyLeavingReportView(ReadReplicaMixin, LoginRequiredMixin, View):
     """View for generating early leaving reports."""
     template_name = 'report/hrm/early_leaving_report.html'
+    read_replica_methods = ('GET', 'HEAD', 'POST')  # POST only submits the filter form
     
     def get(self, request, *args, **kwargs):
         form = EarlyLeavingReportForm()
@@ -194,6 +198,7 @@ class EarlyLeavingReportView(LoginRequiredMixin, View):
             'report_generated': False,
         }
     
+    @cached_report(tags=get_attendance_report_tags)
     def _generate_early_leaving_report(self, form_data):
         """Generate early leaving report using UnifiedAttendanceProcessor."""
         start_date = form_data['start_date']
@@ -207,10 +212,7 @@ class EarlyLeavingReportView(LoginRequiredMixin, View):
         
         # Get ZK attendance logs for the date range
         employee_ids = [emp.employee_id for emp in employees]
-        zk_logs = ZKAttendanceLog.objects.filter(
-            user_id__in=employee_ids,
-            timestamp__date__range=[start_date, end_date]
-        ).order_by('user_id', 'timestamp')
+        zk_logs = get_attendance_logs(employee_ids, start_date, end_date).order_by('user_id', 'timestamp')
         
         # Get roster data
         roster_data = self._get_roster_data(employees, start_date, end_date)
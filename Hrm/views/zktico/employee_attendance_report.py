@@ -13,6 +13,9 @@ import json
 import csv
 from decimal import Decimal, ROUND_HALF_UP
 
+from config.report_cache import cached_report, get_attendance_report_tags
+from config.db_router import ReadReplicaMixin
+from Hrm.attendance_archive import get_attendance_logs
 from Hrm.models import *
 from .unified_attendance_processor import UnifiedAttendanceProcessor
 
@@ -435,9 +438,10 @@ class EmployeeDetailedAttendanceReportForm(forms.Form):
         help_text=_("Use individual employee expected work hours when available.")
     )
 
-class EmployeeDetailedAttendanceReportView(LoginRequiredMixin, View):
+class EmployeeDetailedAttendanceReportView(ReadReplicaMixin, LoginRequiredMixin, View):
     """Enhanced view for generating employee detailed attendance reports with dynamic shift options and 🔥 NEW RULES."""
     template_name = 'report/hrm/employee_detailed_attendance_report.html'
+    read_replica_methods = ('GET', 'HEAD', 'POST')  # POST only submits the filter form
     
     def get(self, request, *args, **kwargs):
         form = EmployeeDetailedAttendanceReportForm()
@@ -500,6 +504,7 @@ class EmployeeDetailedAttendanceReportView(LoginRequiredMixin, View):
             'report_generated': False,
         }
     
+    @cached_report(tags=get_attendance_report_tags)
     def _generate_employee_detailed_report(self, form_data):
         """Generate employee detailed attendance report using enhanced UnifiedAttendanceProcessor with 🔥 NEW RULES."""
         employee = form_data['employee']
@@ -511,10 +516,7 @@ class EmployeeDetailedAttendanceReportView(LoginRequiredMixin, View):
         holiday_dates = set(holidays.values_list('date', flat=True))
         
         # Get ZK attendance logs for the employee in the date range
-        zk_logs = ZKAttendanceLog.objects.filter(
-            user_id=employee.employee_id,
-            timestamp__date__range=[start_date, end_date]
-        ).order_by('timestamp')
+        zk_logs = get_attendance_logs(employee.employee_id, start_date, end_date).order_by('timestamp')
         
         # Get roster data for the employee
         roster_data = self._get_roster_data([employee], start_date, end_date)
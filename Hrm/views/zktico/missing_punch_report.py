@@ -12,6 +12,9 @@ from django.http import JsonResponse, HttpResponse
 import json
 import csv
 
+from config.report_cache import cached_report, get_attendance_report_tags
+from config.db_router import ReadReplicaMixin
+from Hrm.attendance_archive import get_attendance_logs
 from Hrm.models import *
 from .unified_attendance_processor import UnifiedAttendanceProcessor
 
@@ -143,9 +146,10 @@ class MissingPunchReportForm(forms.Form):
         
         return cleaned_data
 
-class MissingPunchReportView(LoginRequiredMixin, View):
+class MissingPunchReportView(ReadReplicaMixin, LoginRequiredMixin, View):
     """View for generating missing punch reports."""
     template_name = 'report/hrm/missing_punch_report.html'
+    read_replica_methods = ('GET', 'HEAD', 'POST')  # POST only submits the filter form
     
     def get(self, request, *args, **kwargs):
         form = MissingPunchReportForm()
@@ -196,6 +200,7 @@ class MissingPunchReportView(LoginRequiredMixin, View):
             'report_generated': False,
         }
     
+    @cached_report(tags=get_attendance_report_tags)
     def _generate_missing_punch_report(self, form_data):
         """Generate missing punch report using UnifiedAttendanceProcessor."""
         start_date = form_data['start_date']
@@ -212,11 +217,7 @@ class MissingPunchReportView(LoginRequiredMixin, View):
         
         # Get ZK attendance logs
         employee_ids = [emp.employee_id for emp in employees]
-        zk_logs = ZKAttendanceLog.objects.filter(
-            user_id__in=employee_ids,
-            timestamp__date__gte=start_date,
-            timestamp__date__lte=end_date
-        ).order_by('user_id', 'timestamp')
+        zk_logs = get_attendance_logs(employee_ids, start_date, end_date).order_by('user_id', 'timestamp')
         
         # Get roster data
         roster_data = self._get_roster_data(employees, start_date, end_date)
@@ -17,6 +17,7 @@ from django.views.decorators.csrf import csrf_exempt
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from Hrm.models import *
+from Hrm.attendance_archive import get_attendance_logs
 from .unified_attendance_processor import UnifiedAttendanceProcessor
 
 logger = logging.getLogger(__name__)
@@ -657,10 +658,7 @@ class OvertimeImportView(LoginRequiredMixin, View):
         """🔥 Process overtime using COMPLETE unified attendance processor with EXACT field matching."""
         try:
             # Get ZK logs for this employee
-            zk_logs = ZKAttendanceLog.objects.filter(
-                user_id=employee.employee_id,
-                timestamp__date__range=[start_date, end_date]
-            ).order_by('timestamp')
+            zk_logs = get_attendance_logs(employee.employee_id, start_date, end_date).order_by('timestamp')
             
             # Get leave applications
             leave_applications = LeaveApplication.objects.filter(
@@ -7,6 +7,7 @@ from django.shortcuts import render
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.views import View
+from config.db_router import ReadReplicaMixin
 from django.db.models import Q, Sum, Avg, Count, Max, Min
 from django.http import JsonResponse, HttpResponse
 import json
@@ -173,9 +174,10 @@ class PayrollSummaryReportForm(forms.Form):
         self.fields['year'].initial = now.year
         self.fields['month'].initial = now.month
 
-class PayrollSummaryReportView(LoginRequiredMixin, View):
+class PayrollSummaryReportView(ReadReplicaMixin, LoginRequiredMixin, View):
     """View for generating payroll summary reports."""
     template_name = 'report/hrm/payroll_summary_report.html'
+    read_replica_methods = ('GET', 'HEAD', 'POST')  # POST only submits the filter form
     
     def get(self, request, *args, **kwargs):
         form = PayrollSummaryReportForm()
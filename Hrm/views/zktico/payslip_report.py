@@ -3,17 +3,21 @@ from datetime import timedelta, datetime
 from django import forms
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.views import View
+from config.db_router import ReadReplicaMixin
 from django.db.models import Q, Sum, Avg
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, Http404, JsonResponse, HttpResponse
+from django.views.generic import ListView
 import json
 import csv
 import calendar
 
+from Hrm.attendance_archive import get_attendance_logs
 from Hrm.models import *
+from Hrm.payslip_batch import start_payslip_batch
 from .unified_attendance_processor import UnifiedAttendanceProcessor
 
 logger = logging.getLogger(__name__)
@@ -132,9 +136,16 @@ class PayslipReportForm(forms.Form):
         self.fields['year'].initial = now.year
         self.fields['month'].initial = now.month
 
-class PayslipReportView(LoginRequiredMixin, View):
+class PayslipReportView(ReadReplicaMixin, LoginRequiredMixin, View):
     """View for generating payslip reports."""
     template_name = 'report/hrm/payslip_report.html'
+    read_replica_methods = ('GET', 'HEAD', 'POST')  # POST only submits the filter form
+
+    def should_use_read_replica(self, request):
+        # Starting a payslip batch writes and must read the primary
+        if 'payslip_batch' in request.POST:
+            return False
+        return super().should_use_read_replica(request)
     
     def get(self, request, *args, **kwargs):
         form = PayslipReportForm()
@@ -145,6 +156,10 @@ class PayslipReportView(LoginRequiredMixin, View):
         # Handle export request
         if 'export' in request.POST:
             return self._handle_export(request)
+
+        # Handle PDF payslip documents, rendered in the background
+        if 'payslip_batch' in request.POST:
+            return self._start_payslip_batch(request)
         
         form = PayslipReportForm(request.POST)
         context_data = self._get_context_data(form)
@@ -179,6 +194,34 @@ class PayslipReportView(LoginRequiredMixin, View):
             'page_title': _("Payslip Report"),
             'report_generated': False,
         }
+
+    def _start_payslip_batch(self, request):
+        """Queue a PayslipBatch rendering the selected payslips to a merged PDF or a ZIP."""
+        form = PayslipReportForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, _("Please fix form errors before generating payslips."))
+            return render(request, self.template_name, self._get_context_data(form))
+
+        year = int(form.cleaned_data['year'])
+        month = int(form.cleaned_data['month'])
+        salary_month = SalaryMonth.objects.filter(year=year, month=month).first()
+        if salary_month is None:
+            messages.error(request, _("Salary month not found for {} {}").format(calendar.month_name[month], year))
+            return render(request, self.template_name, self._get_context_data(form))
+
+        parameters = {
+            key: request.POST.getlist(key) for key in request.POST
+            if key not in ('csrfmiddlewaretoken', 'payslip_batch')
+        }
+        batch = PayslipBatch.objects.create(
+            salary_month=salary_month,
+            output_format='ZIP' if request.POST['payslip_batch'] == 'zip' else 'PDF',
+            parameters=parameters,
+            requested_by=request.user,
+        )
+        start_payslip_batch(batch)
+        messages.success(request, _("Payslips for {} {} are being generated.").format(calendar.month_name[month], year))
+        return redirect('hrm:payroll-payslip-batches')
     
     def _generate_payslip_report(self, form_data):
         """Generate payslip report using UnifiedAttendanceProcessor."""
@@ -394,15 +437,16 @@ class PayslipReportView(LoginRequiredMixin, View):
             last_day = calendar.monthrange(year, month)[1]
             end_date = datetime(year, month, last_day).date()
             
+            # Installments recovered by this month's payroll, overdue ones included
             installments = AdvanceInstallment.objects.filter(
+                Q(payment_date__gte=start_date, payment_date__lte=end_date)
+                | Q(payment_date__isnull=True, due_date__gte=start_date, due_date__lte=end_date),
                 advance__employee__in=employees,
-                due_date__gte=start_date,
-                due_date__lte=end_date,
                 is_paid=True
             ).select_related('advance__advance_setup')
             
             for installment in installments:
-                employee_id = installment.advance.employee.id
+                employee_id = installment.advance.employee_id
                 if employee_id not in advance_data:
                     advance_data[employee_id] = []
                 
@@ -438,11 +482,7 @@ class PayslipReportView(LoginRequiredMixin, View):
             
             for employee in employees:
                 # Get ZK logs for this employee
-                zk_logs = ZKAttendanceLog.objects.filter(
-                    user_id=employee.employee_id,
-                    timestamp__date__gte=start_date,
-                    timestamp__date__lte=end_date
-                ).order_by('timestamp')
+                zk_logs = get_attendance_logs(employee.employee_id, start_date, end_date).order_by('timestamp')
                 
                 # Get leave applications
                 leave_applications = LeaveApplication.objects.filter(
@@ -535,3 +575,35 @@ class PayslipReportView(LoginRequiredMixin, View):
             logger.error(f"Error exporting payslip report: {str(e)}")
             messages.error(request, _("Failed to export report: {}").format(str(e)))
             return self.post(request)
+
+
+class PayslipBatchListView(LoginRequiredMixin, ListView):
+    """Payslip batches of the user (all of them with the view permission), refreshed while any is running."""
+    model = PayslipBatch
+    template_name = 'report/hrm/payslip_batch_list.html'
+    context_object_name = 'batches'
+    paginate_by = 20
+
+    def get_queryset(self):
+        queryset = PayslipBatch.objects.select_related('salary_month', 'requested_by')
+        if not self.request.user.has_perm('Hrm.view_payslipbatch'):
+            queryset = queryset.filter(requested_by=self.request.user)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = _("Payslip Documents")
+        context['has_running'] = any(batch.status in ('PEN', 'RUN') for batch in context['batches'])
+        return context
+
+
+class PayslipBatchDownloadView(LoginRequiredMixin, View):
+    """Download the PDF or ZIP of a completed payslip batch."""
+
+    def get(self, request, pk, *args, **kwargs):
+        batch = get_object_or_404(PayslipBatch, pk=pk, status='COM')
+        if batch.requested_by_id != request.user.pk and not request.user.has_perm('Hrm.view_payslipbatch'):
+            raise Http404
+        if not batch.file:
+            raise Http404
+        return FileResponse(batch.file.open('rb'), as_attachment=True, filename=batch.file.name.rsplit('/', 1)[-1])
@@ -17,22 +17,23 @@ from django import forms
 
 from Hrm.models import ZKAttendanceLog, ZKDevice, Employee
 from Hrm.forms.zk_device_forms import ZKAttendanceLogForm
-from config.views import BaseBulkDeleteConfirmView, BaseExportView, GenericDeleteView
+from config.views import BaseBulkDeleteConfirmView, BaseExportView, GenericDeleteView, KeysetPaginationMixin
 
 logger = logging.getLogger(__name__)
 
 # === ZK Attendance Log List View ===
-class ZKAttendanceLogListView(LoginRequiredMixin, ListView):
-    """List view for ZK Attendance Logs."""
+class ZKAttendanceLogListView(KeysetPaginationMixin, LoginRequiredMixin, ListView):
+    """List view for ZK Attendance Logs, paged by cursor on the timestamp index."""
     model = ZKAttendanceLog
     template_name = 'zk_device/attendance_log_list.html'
     context_object_name = 'logs'
     paginate_by = 50
+    keyset_ordering = ('-timestamp', '-id')
     permission_required = 'Hrm.view_zkattendancelog'
 
     def get_queryset(self):
         """Filter and order attendance logs based on query parameters."""
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('device')
         if device_id := self.request.GET.get('device'):
             queryset = queryset.filter(device_id=device_id)
         if user_id := self.request.GET.get('user_id'):
@@ -12,6 +12,8 @@ from .models import (
     GoodsIssueLine,
     InventoryTransfer,
     InventoryTransferLine,
+    StockSnapshot,
+    StockCostLayer,
 )
 
 @admin.register(UnitOfMeasure)
@@ -61,3 +63,15 @@ class InventoryTransferAdmin(admin.ModelAdmin):
 @admin.register(InventoryTransferLine)
 class InventoryTransferLineAdmin(admin.ModelAdmin):
     list_display = ('inventory_transfer', 'item_code', 'item_name', 'quantity', 'from_warehouse', 'to_warehouse', 'total_amount')
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('item_code', 'warehouse', 'period_type', 'snapshot_date', 'quantity_in', 'quantity_out', 'closing_quantity', 'closing_value')
+    list_filter = ('period_type', 'warehouse')
+    search_fields = ('item_code', 'item_name')
+
+@admin.register(StockCostLayer)
+class StockCostLayerAdmin(admin.ModelAdmin):
+    list_display = ('item_code', 'warehouse', 'layer_date', 'quantity', 'remaining_quantity', 'unit_cost')
+    list_filter = ('warehouse',)
+    search_fields = ('item_code',)
@@ -0,0 +1,181 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from config.importers import BulkImporter, register_importer
+from config.pagination import reset_row_count
+from Inventory.models import (
+    UnitOfMeasure, Warehouse, ItemGroup, Item, ItemWarehouseInfo, InventoryTransaction,
+)
+from Inventory.utils.stock_snapshot_utils import rebuild_stock_snapshots
+
+
+@register_importer
+class UnitOfMeasureImporter(BulkImporter):
+    name = 'uoms'
+    verbose_name = "Units of Measure"
+    model = UnitOfMeasure
+    fields = {'code': 'code', 'name': 'name', 'is_active': 'is_active'}
+    required = ('code', 'name')
+
+
+@register_importer
+class WarehouseImporter(BulkImporter):
+    name = 'warehouses'
+    verbose_name = "Warehouses"
+    model = Warehouse
+    fields = {
+        'code': 'code', 'name': 'name', 'address': 'address', 'contact_person': 'contact_person',
+        'contact_phone': 'contact_phone', 'notes': 'notes', 'is_active': 'is_active',
+    }
+    required = ('code', 'name')
+
+    def after_import(self):
+        # Warehouse.save() makes the only warehouse the default one
+        if not Warehouse.objects.filter(is_default=True).exists():
+            Warehouse.objects.filter(pk=Warehouse.objects.order_by('id').values('pk')[:1]).update(is_default=True)
+
+
+@register_importer
+class ItemGroupImporter(BulkImporter):
+    name = 'item_groups'
+    verbose_name = "Item Groups"
+    model = ItemGroup
+    fields = {'code': 'code', 'name': 'name', 'parent': 'parent', 'description': 'description', 'is_active': 'is_active'}
+    required = ('code', 'name')
+    foreign_keys = {'parent': (ItemGroup, 'code')}
+
+
+@register_importer
+class ItemImporter(BulkImporter):
+    """
+    Items with their group, UOMs and default warehouse given by code.
+    Mirrors Item.save() (purchase/sales UOM and default warehouse fallbacks) and
+    the item post_save signal (ItemWarehouseInfo for the default warehouse).
+    """
+    name = 'items'
+    verbose_name = "Items"
+    model = Item
+    fields = {
+        'code': 'code', 'name': 'name', 'description': 'description', 'item_group': 'item_group',
+        'inventory_uom': 'inventory_uom', 'purchase_uom': 'purchase_uom', 'sales_uom': 'sales_uom',
+        'default_warehouse': 'default_warehouse', 'barcode': 'barcode',
+        'is_inventory_item': 'is_inventory_item', 'is_sales_item': 'is_sales_item',
+        'is_purchase_item': 'is_purchase_item', 'is_service': 'is_service',
+        'minimum_stock': 'minimum_stock', 'maximum_stock': 'maximum_stock', 'reorder_point': 'reorder_point',
+        'unit_price': 'unit_price', 'item_cost': 'item_cost', 'purchase_price': 'purchase_price',
+        'selling_price': 'selling_price', 'is_active': 'is_active',
+    }
+    required = ('code', 'name', 'item_group', 'inventory_uom')
+    foreign_keys = {
+        'item_group': (ItemGroup, 'code'),
+        'inventory_uom': (UnitOfMeasure, 'code'),
+        'purchase_uom': (UnitOfMeasure, 'code'),
+        'sales_uom': (UnitOfMeasure, 'code'),
+        'default_warehouse': (Warehouse, 'code'),
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.first_warehouse_id = Warehouse.objects.filter(is_active=True).order_by('id').values_list('id', flat=True).first()
+
+    def prepare_instance(self, instance, row):
+        instance.purchase_uom_id = instance.purchase_uom_id or instance.inventory_uom_id
+        instance.sales_uom_id = instance.sales_uom_id or instance.inventory_uom_id
+        instance.default_warehouse_id = instance.default_warehouse_id or self.first_warehouse_id
+
+    def after_import(self):
+        items = Item.objects.filter(pk__in=self.written_pks, default_warehouse__isnull=False)
+        existing = set(
+            ItemWarehouseInfo.objects.filter(item__in=items).values_list('item_id', 'warehouse_id')
+        )
+        ItemWarehouseInfo.objects.bulk_create([
+            ItemWarehouseInfo(
+                item_id=item.pk,
+                warehouse_id=item.default_warehouse_id,
+                min_stock=item.minimum_stock,
+                max_stock=item.maximum_stock,
+                reorder_point=item.reorder_point,
+            )
+            for item in items.only('id', 'default_warehouse_id', 'minimum_stock', 'maximum_stock', 'reorder_point')
+            if (item.pk, item.default_warehouse_id) not in existing
+        ], batch_size=self.batch_size)
+
+
+@register_importer
+class OpeningStockImporter(BulkImporter):
+    """
+    Opening quantities per item and warehouse, written as ADJUSTMENT transactions.
+    ItemWarehouseInfo is updated once per item/warehouse and stock snapshots and
+    FIFO cost layers are rebuilt once for the imported items.
+    """
+    name = 'opening_stock'
+    verbose_name = "Opening Stock"
+    model = InventoryTransaction
+    fields = {
+        'item_code': 'item_code', 'warehouse': 'warehouse', 'quantity': 'quantity',
+        'unit_price': 'unit_price', 'transaction_date': 'transaction_date',
+        'reference': 'reference', 'notes': 'notes',
+    }
+    required = ('item_code', 'warehouse', 'quantity')
+    key_field = None
+    foreign_keys = {'warehouse': (Warehouse, 'code')}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.item_names = {}
+        self.stock = defaultdict(Decimal)
+
+    def prefetch(self, rows):
+        super().prefetch(rows)
+        missing = {str(row.get('item_code') or '').strip() for row in rows} - set(self.item_names)
+        self.item_names.update(Item.objects.filter(code__in=missing).values_list('code', 'name'))
+
+    def clean_row(self, row):
+        data = super().clean_row(row)
+        if data['item_code'] not in self.item_names:
+            raise ValidationError(f"Item '{data['item_code']}' does not exist")
+        return data
+
+    def prepare_instance(self, instance, row):
+        instance.item_name = self.item_names[instance.item_code]
+        instance.transaction_type = 'ADJUSTMENT'
+        instance.unit_price = instance.unit_price or Decimal('0')
+        instance.total_amount = instance.quantity * instance.unit_price
+        instance.reference = instance.reference or 'OPENING'
+        self.stock[(instance.item_code, instance.warehouse_id)] += instance.quantity
+
+    def after_import(self):
+        if not self.stock:
+            return
+        # bulk_create skips the post_save that counts rows for the transaction list
+        transaction.on_commit(lambda: reset_row_count(InventoryTransaction))
+        item_ids = dict(Item.objects.filter(code__in={code for code, _ in self.stock}).values_list('code', 'id'))
+        quantities = {(item_ids[code], warehouse_id): quantity for (code, warehouse_id), quantity in self.stock.items()}
+        infos = ItemWarehouseInfo.objects.filter(
+            item_id__in={item_id for item_id, _ in quantities},
+            warehouse_id__in={warehouse_id for _, warehouse_id in quantities},
+        )
+        existing = {(info.item_id, info.warehouse_id): info for info in infos}
+
+        to_create, to_update = [], []
+        for key, quantity in quantities.items():
+            info = existing.get(key)
+            if info is None:
+                info = ItemWarehouseInfo(item_id=key[0], warehouse_id=key[1])
+                to_create.append(info)
+            else:
+                to_update.append(info)
+            info.in_stock += quantity
+            info.available = info.calculate_available()
+            info.updated_at = timezone.now()
+        ItemWarehouseInfo.objects.bulk_create(to_create, batch_size=self.batch_size)
+        ItemWarehouseInfo.objects.bulk_update(to_update, ['in_stock', 'available', 'updated_at'], batch_size=self.batch_size)
+
+        stats = rebuild_stock_snapshots(item_codes=list(item_ids), batch_size=self.batch_size)
+        self.result.messages.append(
+            f"Stock snapshots rebuilt from {stats['transactions']} transactions for {len(item_ids)} items."
+        )
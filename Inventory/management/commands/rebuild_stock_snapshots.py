@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from Inventory.utils.stock_snapshot_utils import rebuild_stock_snapshots
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily/monthly stock snapshots and FIFO cost layers from InventoryTransaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--item', action='append', dest='items', help="Item code to rebuild (repeatable). Defaults to all items.")
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        stats = rebuild_stock_snapshots(item_codes=options['items'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Replayed {stats['transactions']} transactions into {stats['snapshots']} snapshots and {stats['layers']} cost layers."
+        ))
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.20 on 2026-10-19 12:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_code', models.CharField(max_length=50, verbose_name='Item Code')),
+                ('item_name', models.CharField(blank=True, max_length=100, null=True, verbose_name='Item Name')),
+                ('period_type', models.CharField(choices=[('DAILY', 'Daily'), ('MONTHLY', 'Monthly')], default='DAILY', max_length=10, verbose_name='Period Type')),
+                ('snapshot_date', models.DateField(help_text='Day of the movement, or the first day of the month for monthly snapshots.', verbose_name='Snapshot Date')),
+                ('quantity_in', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Quantity In')),
+                ('quantity_out', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Quantity Out')),
+                ('value_in', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Value In')),
+                ('value_out', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Value Out')),
+                ('closing_quantity', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Closing Quantity')),
+                ('closing_value', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Closing Value')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='Inventory.warehouse', verbose_name='Warehouse')),
+            ],
+            options={
+                'verbose_name': 'Stock Snapshot',
+                'verbose_name_plural': 'Stock Snapshots',
+                'ordering': ['item_code', 'warehouse', 'snapshot_date'],
+                'indexes': [models.Index(fields=['item_code', 'warehouse', 'period_type', 'snapshot_date'], name='Inventory_s_item_co_aeec72_idx'), models.Index(fields=['period_type', 'snapshot_date'], name='Inventory_s_period__f295c3_idx')],
+                'unique_together': {('item_code', 'warehouse', 'period_type', 'snapshot_date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StockCostLayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_code', models.CharField(max_length=50, verbose_name='Item Code')),
+                ('layer_date', models.DateTimeField(verbose_name='Layer Date')),
+                ('quantity', models.DecimalField(decimal_places=6, max_digits=18, verbose_name='Quantity')),
+                ('remaining_quantity', models.DecimalField(decimal_places=6, max_digits=18, verbose_name='Remaining Quantity')),
+                ('unit_cost', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Unit Cost')),
+                ('transaction', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cost_layer', to='Inventory.inventorytransaction', verbose_name='Transaction')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_layers', to='Inventory.warehouse', verbose_name='Warehouse')),
+            ],
+            options={
+                'verbose_name': 'Stock Cost Layer',
+                'verbose_name_plural': 'Stock Cost Layers',
+                'ordering': ['layer_date', 'id'],
+                'indexes': [models.Index(fields=['item_code', 'warehouse', 'layer_date'], name='Inventory_s_item_co_dd5292_idx'), models.Index(fields=['layer_date'], name='Inventory_s_layer_d_179944_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-19 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0002_stocksnapshot_stockcostlayer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventorytransaction',
+            name='stock_value',
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, help_text='Signed value posted to the stock snapshots; reversing the transaction takes out exactly this amount.', max_digits=18, null=True, verbose_name='Stock Value'),
+        ),
+    ]
@@ -9,6 +9,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import gettext_lazy as _
 from PIL import Image
 import os
+from config.pagination import RowCountModelMixin, RowCountQuerySet
 class BaseModel(models.Model):
     """Base model with common fields for all models."""
     created_at = models.DateTimeField(default=timezone.now)
@@ -212,7 +213,7 @@ class ItemWarehouseInfo(BaseModel):
             self.available = self.calculate_available()
         super().save(*args, **kwargs)
 
-class InventoryTransaction(BaseModel):
+class InventoryTransaction(RowCountModelMixin, BaseModel):
     """Records inventory transactions such as purchases, sales, transfers, and adjustments."""
     
     TRANSACTION_TYPES = [
@@ -236,8 +237,9 @@ class InventoryTransaction(BaseModel):
     reference = models.CharField(_("Reference"), max_length=100, blank=True, null=True, help_text=_("Reference to invoice, PO, or document."))
     transaction_date = models.DateTimeField(_("Transaction Date"), default=timezone.now)
     notes = models.TextField(_("Notes"), blank=True, null=True)
+    stock_value = models.DecimalField(_("Stock Value"), max_digits=18, decimal_places=6, null=True, blank=True, editable=False, help_text=_("Signed value posted to the stock snapshots; reversing the transaction takes out exactly this amount."))
 
-
+    objects = RowCountQuerySet.as_manager()
 
     class Meta:
         ordering = ['-transaction_date']
@@ -452,4 +454,72 @@ class InventoryTransferLine(BaseModel):
     def save(self, *args, **kwargs):
         """Calculate total amount before saving."""
         self.total_amount = self.quantity * self.unit_price
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class StockSnapshot(models.Model):
+    """Daily / monthly stock position per item and warehouse, maintained from InventoryTransaction"""
+
+    PERIOD_TYPES = [
+        ('DAILY', _('Daily')),
+        ('MONTHLY', _('Monthly')),
+    ]
+
+    item_code = models.CharField(_("Item Code"), max_length=50)
+    item_name = models.CharField(_("Item Name"), max_length=100, blank=True, null=True)
+    warehouse = models.ForeignKey('Warehouse', on_delete=models.CASCADE, related_name='stock_snapshots', verbose_name=_("Warehouse"))
+    period_type = models.CharField(_("Period Type"), max_length=10, choices=PERIOD_TYPES, default='DAILY')
+    snapshot_date = models.DateField(_("Snapshot Date"), help_text=_("Day of the movement, or the first day of the month for monthly snapshots."))
+    quantity_in = models.DecimalField(_("Quantity In"), max_digits=18, decimal_places=6, default=0)
+    quantity_out = models.DecimalField(_("Quantity Out"), max_digits=18, decimal_places=6, default=0)
+    value_in = models.DecimalField(_("Value In"), max_digits=18, decimal_places=6, default=0)
+    value_out = models.DecimalField(_("Value Out"), max_digits=18, decimal_places=6, default=0)
+    closing_quantity = models.DecimalField(_("Closing Quantity"), max_digits=18, decimal_places=6, default=0)
+    closing_value = models.DecimalField(_("Closing Value"), max_digits=18, decimal_places=6, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('item_code', 'warehouse', 'period_type', 'snapshot_date')
+        indexes = [
+            models.Index(fields=['item_code', 'warehouse', 'period_type', 'snapshot_date']),
+            models.Index(fields=['period_type', 'snapshot_date']),
+        ]
+        ordering = ['item_code', 'warehouse', 'snapshot_date']
+        verbose_name = _("Stock Snapshot")
+        verbose_name_plural = _("Stock Snapshots")
+
+    def __str__(self):
+        return f"{self.item_code} - {self.warehouse_id} @ {self.snapshot_date} ({self.period_type})"
+
+    @property
+    def average_cost(self):
+        """Moving average unit cost at the end of the period"""
+        if self.closing_quantity:
+            return self.closing_value / self.closing_quantity
+        return Decimal('0')
+
+
+class StockCostLayer(models.Model):
+    """FIFO cost layer created by each inbound InventoryTransaction"""
+    item_code = models.CharField(_("Item Code"), max_length=50)
+    warehouse = models.ForeignKey('Warehouse', on_delete=models.CASCADE, related_name='cost_layers', verbose_name=_("Warehouse"))
+    transaction = models.OneToOneField('InventoryTransaction', on_delete=models.CASCADE, null=True, blank=True, related_name='cost_layer', verbose_name=_("Transaction"))
+    layer_date = models.DateTimeField(_("Layer Date"))
+    quantity = models.DecimalField(_("Quantity"), max_digits=18, decimal_places=6)
+    remaining_quantity = models.DecimalField(_("Remaining Quantity"), max_digits=18, decimal_places=6)
+    unit_cost = models.DecimalField(_("Unit Cost"), max_digits=18, decimal_places=6, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item_code', 'warehouse', 'layer_date']),
+            models.Index(fields=['layer_date']),
+        ]
+        ordering = ['layer_date', 'id']
+        verbose_name = _("Stock Cost Layer")
+        verbose_name_plural = _("Stock Cost Layers")
+
+    def __str__(self):
+        return f"{self.item_code} - {self.remaining_quantity}/{self.quantity} @ {self.unit_cost}"
+
+    @property
+    def remaining_value(self):
+        return self.remaining_quantity * self.unit_cost
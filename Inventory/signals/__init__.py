@@ -2,4 +2,7 @@ from .goods_receipt_signals import *
 from .goods_issue_signals import *
 from .inventory_transfer_signals import *
 from .item_signals import *
-from .item_warehouse_info_signals import *
\ No newline at end of file
+from .item_warehouse_info_signals import *
+from .stock_snapshot_signals import *
+from .report_cache_signals import *
+from .row_count_signals import *
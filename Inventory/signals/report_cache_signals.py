@@ -0,0 +1,21 @@
+"""
+Stock movements and item/warehouse changes invalidate the cached Inventory reports.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from config.report_cache import INVENTORY_STOCK_TAG, invalidate_report_tags
+from Inventory.models import InventoryTransaction, ItemWarehouseInfo, Item, Warehouse
+
+
+@receiver(post_save, sender=InventoryTransaction)
+@receiver(post_delete, sender=InventoryTransaction)
+@receiver(post_save, sender=ItemWarehouseInfo)
+@receiver(post_delete, sender=ItemWarehouseInfo)
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+@receiver(post_save, sender=Warehouse)
+@receiver(post_delete, sender=Warehouse)
+def invalidate_inventory_reports(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_report_tags(INVENTORY_STOCK_TAG))
@@ -0,0 +1,7 @@
+"""
+Row counter behind the estimated total of the inventory transaction list.
+"""
+from config.pagination import track_row_count
+from Inventory.models import InventoryTransaction
+
+track_row_count(InventoryTransaction)
@@ -0,0 +1,31 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from Inventory.models import InventoryTransaction
+from Inventory.utils.stock_snapshot_utils import (
+    apply_transaction_to_snapshots, repost_transaction_to_snapshots, reverse_transaction_from_snapshots,
+)
+
+
+@receiver(pre_save, sender=InventoryTransaction)
+def remember_previous_transaction(sender, instance, **kwargs):
+    """Keep the stored version of an edited transaction so its old effect can be reversed."""
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = InventoryTransaction.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=InventoryTransaction)
+def update_stock_snapshots(sender, instance, created, **kwargs):
+    """Post the transaction into the daily/monthly snapshots and FIFO cost layers."""
+    previous = getattr(instance, '_previous_state', None)
+    if not created and previous is not None:
+        repost_transaction_to_snapshots(previous, instance)
+    else:
+        apply_transaction_to_snapshots(instance)
+
+
+@receiver(post_delete, sender=InventoryTransaction)
+def reverse_stock_snapshots(sender, instance, **kwargs):
+    """Take a deleted transaction back out of the snapshots and cost layers."""
+    reverse_transaction_from_snapshots(instance)
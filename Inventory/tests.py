@@ -1,3 +1,171 @@
-from django.test import TestCase
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from config.importers import get_importer
+from config.pagination import get_row_count
+from Inventory.models import (
+    InventoryTransaction, Item, ItemGroup, ItemWarehouseInfo, StockCostLayer, StockSnapshot, UnitOfMeasure, Warehouse,
+)
+from Inventory.utils.stock_snapshot_utils import get_stock_aging, rebuild_stock_snapshots
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'inventory-tests-default'},
+    'reports': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'inventory-tests-reports'},
+}
+GROUPS_CSV = "code,name,parent\nCHILD,Child,ROOT\nROOT,Root,\n"
+ITEMS_CSV = "code,name,item_group,inventory_uom\nA,Item A,ROOT,EA\nB,Item B,CHILD,EA\n"
+
+
+class BulkImportPkTests(TestCase):
+    def run_import(self, name, text):
+        importer = get_importer(name)()
+        result = importer.run(io.BytesIO(text.encode()), f'{name}.csv')
+        self.assertEqual(result.errors, [])
+        return result
+
+    def test_imports_link_rows_when_the_backend_returns_no_pks(self):
+        UnitOfMeasure.objects.create(code='EA', name='Each')
+        warehouse = Warehouse.objects.create(code='W1', name='Main')
+
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            self.run_import('item_groups', GROUPS_CSV)
+            result = self.run_import('items', ITEMS_CSV)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(ItemGroup.objects.get(code='CHILD').parent, ItemGroup.objects.get(code='ROOT'))
+        self.assertEqual(
+            set(ItemWarehouseInfo.objects.values_list('item__code', 'warehouse')),
+            {('A', warehouse.pk), ('B', warehouse.pk)},
+        )
+        self.assertEqual(set(Item.objects.values_list('default_warehouse', flat=True)), {warehouse.pk})
+
+    @override_settings(CACHES=TEST_CACHES)
+    def test_opening_stock_import_resets_the_transaction_counter(self):
+        uom = UnitOfMeasure.objects.create(code='EA', name='Each')
+        group = ItemGroup.objects.create(code='G', name='Goods')
+        Warehouse.objects.create(code='W1', name='Main')
+        Item.objects.create(code='A', name='Item A', item_group=group, inventory_uom=uom)
+        self.assertEqual(get_row_count(InventoryTransaction), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_import('opening_stock', "item_code,warehouse,quantity,unit_price\nA,W1,5,10\n")
+
+        self.assertEqual(get_row_count(InventoryTransaction), 1)
+
+
+class StockSnapshotTests(TestCase):
+    def setUp(self):
+        self.warehouse = Warehouse.objects.create(code='W1', name='Main')
+        self.day = timezone.make_aware(datetime(2026, 9, 1, 10))
+
+    def post(self, transaction_type, quantity, unit_price=0, days=0):
+        return InventoryTransaction.objects.create(
+            item_code='A', item_name='Item A', warehouse=self.warehouse, transaction_type=transaction_type,
+            quantity=Decimal(quantity), unit_price=Decimal(unit_price), transaction_date=self.day + timedelta(days=days),
+        )
+
+    def get_state(self):
+        # Days left without movement by a reversal are not rebuilt
+        snapshots = [
+            (period_type, day, round(quantity, 2), round(value, 2))
+            for period_type, day, quantity, value in StockSnapshot.objects.exclude(quantity_in=0, quantity_out=0)
+            .order_by('period_type', 'snapshot_date').values_list('period_type', 'snapshot_date', 'closing_quantity', 'closing_value')
+        ]
+        layers = [
+            (transaction_id, round(quantity, 2), round(remaining, 2), round(unit_cost, 2))
+            for transaction_id, quantity, remaining, unit_cost in StockCostLayer.objects.order_by('transaction_id')
+            .values_list('transaction_id', 'quantity', 'remaining_quantity', 'unit_cost')
+        ]
+        return snapshots, layers
+
+    def get_closing(self):
+        snapshot = StockSnapshot.objects.filter(period_type='DAILY').latest('snapshot_date')
+        return round(snapshot.closing_quantity, 2), round(snapshot.closing_value, 2)
+
+    def assertMatchesRebuild(self):
+        incremental = self.get_state()
+        rebuild_stock_snapshots()
+        self.assertEqual(incremental, self.get_state())
+
+    def test_postings_match_a_rebuild(self):
+        self.post('RECEIPT', 10, 10)
+        self.post('ISSUE', 4, days=1)
+        self.post('RECEIPT', 6, 20, days=40)
+        self.post('SALE', 7, days=41)
+
+        self.assertEqual(self.get_closing(), (Decimal('5.00'), Decimal('75.00')))
+        self.assertMatchesRebuild()
+
+    def test_back_dated_posting_shifts_later_closing_balances(self):
+        self.post('RECEIPT', 10, 10)
+        self.post('ISSUE', 5, days=10)
+
+        self.post('RECEIPT', 10, 10, days=5)
+
+        self.assertEqual(self.get_closing(), (Decimal('15.00'), Decimal('150.00')))
+        self.assertMatchesRebuild()
+
+    def test_aging_is_as_of_the_date(self):
+        self.post('RECEIPT', 10, 10)
+        self.post('RECEIPT', 10, 20, days=50)
+        self.post('ISSUE', 12, days=60)
+        past = (self.day + timedelta(days=55)).date()
+
+        [aged] = get_stock_aging(past)
+        [current] = get_stock_aging((self.day + timedelta(days=65)).date())
+
+        self.assertEqual(
+            (aged['total_quantity'], aged['age_0_30'], aged['age_31_60'], aged['total_value']),
+            (Decimal('20'), Decimal('10'), Decimal('10'), Decimal('300')),
+        )
+        self.assertEqual(
+            (current['total_quantity'], current['age_0_30'], current['age_61_90'], current['total_value']),
+            (Decimal('8'), Decimal('8'), Decimal('0'), Decimal('160')),
+        )
+
+    def test_deleted_issue_takes_out_the_value_it_was_posted_at(self):
+        # The day's closing average cost (250 / 15) is not what the issue went out at
+        self.post('RECEIPT', 10, 10)
+        issue = self.post('ISSUE', 5)
+        self.post('RECEIPT', 10, 20)
+
+        issue.delete()
+
+        self.assertEqual(self.get_closing(), (Decimal('20.00'), Decimal('300.00')))
+        self.assertMatchesRebuild()
+
+    def test_editing_notes_keeps_the_consumed_cost_layer(self):
+        receipt = self.post('RECEIPT', 10, 10)
+        self.post('ISSUE', 5, days=1)
+
+        receipt.notes = 'Checked'
+        receipt.save()
+
+        self.assertEqual(StockCostLayer.objects.get(transaction=receipt).remaining_quantity, Decimal('5'))
+        self.assertMatchesRebuild()
+
+    def test_edited_receipt_keeps_what_was_issued_from_it(self):
+        receipt = self.post('RECEIPT', 10, 10)
+        self.post('ISSUE', 5, days=1)
+
+        receipt.quantity = Decimal('8')
+        receipt.save()
+
+        self.assertEqual(StockCostLayer.objects.get(transaction=receipt).remaining_quantity, Decimal('3'))
+        self.assertEqual(self.get_closing(), (Decimal('3.00'), Decimal('30.00')))
+        self.assertMatchesRebuild()
+
+    def test_deleted_receipt_moves_its_issues_to_the_other_layers(self):
+        first = self.post('RECEIPT', 10, 10)
+        second = self.post('RECEIPT', 10, 20, days=1)
+        self.post('ISSUE', 5, days=2)
+
+        first.delete()
+
+        self.assertEqual(StockCostLayer.objects.get(transaction=second).remaining_quantity, Decimal('5'))
@@ -123,5 +123,7 @@ urlpatterns = [
     path('reports/stock-below-minimum/', inventory_report_views.StockBelowMinimumView.as_view(), name='stock_below_minimum'),
     path('reports/negative-stock/', inventory_report_views.NegativeStockReportView.as_view(), name='negative_stock_report'),
     path('reports/zero-movement/', inventory_report_views.ZeroMovementReportView.as_view(), name='zero_movement_report'),
+    path('reports/stock-as-of-date/', inventory_report_views.StockAsOfDateReportView.as_view(), name='stock_as_of_date_report'),
+    path('reports/stock-aging/', inventory_report_views.StockAgingReportView.as_view(), name='stock_aging_report'),
 ]
 
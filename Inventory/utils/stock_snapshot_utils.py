@@ -0,0 +1,503 @@
+from collections import defaultdict, deque
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from config.report_cache import INVENTORY_STOCK_TAG, invalidate_report_tags
+from Inventory.models import InventoryTransaction, StockCostLayer, StockSnapshot
+
+# Transaction types and the direction they move stock in, mirroring the
+# in_stock adjustments done by the document signals.
+INBOUND_TYPES = ('PURCHASE', 'RECEIPT')
+OUTBOUND_TYPES = ('SALE', 'ISSUE', 'DELIVERY')
+SIGNED_TYPES = ('TRANSFER', 'ADJUSTMENT')
+
+AGING_BUCKETS = (
+    ('age_0_30', 0, 30),
+    ('age_31_60', 31, 60),
+    ('age_61_90', 61, 90),
+    ('age_over_90', 91, None),
+)
+
+ZERO = Decimal('0')
+
+# Fields that decide a transaction's postings; edits to anything else leave them alone
+POSTING_FIELDS = ('item_code', 'warehouse_id', 'transaction_type', 'quantity', 'unit_price', 'reference', 'transaction_date')
+
+
+def get_stock_movement(inventory_transaction):
+    """
+    Returns the signed stock movement of a transaction (positive = stock in),
+    or None when the transaction type does not move stock (e.g. ORDER).
+    """
+    quantity = inventory_transaction.quantity or ZERO
+    transaction_type = inventory_transaction.transaction_type
+
+    if transaction_type in INBOUND_TYPES:
+        return quantity
+    if transaction_type in OUTBOUND_TYPES:
+        return -quantity
+    if transaction_type in SIGNED_TYPES:
+        return quantity
+    if transaction_type == 'RETURN':
+        # Sales returns (RET-*) bring stock back, purchase returns send it out
+        if (inventory_transaction.reference or '').startswith('RET-'):
+            return quantity
+        return -quantity
+    return None
+
+
+def get_local_date(value):
+    if timezone.is_aware(value):
+        return timezone.localdate(value)
+    return value.date()
+
+
+def get_transaction_day(inventory_transaction):
+    """Returns the local calendar date a transaction belongs to."""
+    return get_local_date(inventory_transaction.transaction_date or timezone.now())
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def is_costed_receipt(inventory_transaction, movement):
+    """Receipts create a new cost layer at their own unit price; returns re-enter at average cost."""
+    return movement > 0 and inventory_transaction.transaction_type != 'RETURN'
+
+
+def get_movement_value(inventory_transaction, movement, average_cost):
+    """Values a stock movement: receipts at unit price, everything else at moving average cost."""
+    unit_price = inventory_transaction.unit_price or ZERO
+    if is_costed_receipt(inventory_transaction, movement) or average_cost is None:
+        return movement * unit_price
+    return movement * average_cost
+
+
+def get_average_cost(item_code, warehouse_id, as_of_date):
+    """Moving average cost of an item in a warehouse at the end of as_of_date."""
+    snapshot = StockSnapshot.objects.filter(
+        item_code=item_code,
+        warehouse_id=warehouse_id,
+        period_type='DAILY',
+        snapshot_date__lte=as_of_date,
+    ).order_by('-snapshot_date').values('closing_quantity', 'closing_value').first()
+
+    if not snapshot or not snapshot['closing_quantity']:
+        return None
+    return snapshot['closing_value'] / snapshot['closing_quantity']
+
+
+def _post_to_snapshot(inventory_transaction, period_type, snapshot_date, movement, value, inbound):
+    """Adds a movement to one snapshot row and rolls it into every later closing balance."""
+    keys = {
+        'item_code': inventory_transaction.item_code,
+        'warehouse_id': inventory_transaction.warehouse_id,
+        'period_type': period_type,
+    }
+
+    previous = StockSnapshot.objects.filter(
+        snapshot_date__lt=snapshot_date, **keys
+    ).order_by('-snapshot_date').values('closing_quantity', 'closing_value').first() or {}
+
+    snapshot, created = StockSnapshot.objects.select_for_update().get_or_create(
+        snapshot_date=snapshot_date,
+        defaults={
+            'item_name': inventory_transaction.item_name,
+            'closing_quantity': previous.get('closing_quantity', ZERO),
+            'closing_value': previous.get('closing_value', ZERO),
+        },
+        **keys
+    )
+
+    if inbound:
+        StockSnapshot.objects.filter(pk=snapshot.pk).update(
+            quantity_in=F('quantity_in') + movement,
+            value_in=F('value_in') + value,
+        )
+    else:
+        StockSnapshot.objects.filter(pk=snapshot.pk).update(
+            quantity_out=F('quantity_out') - movement,
+            value_out=F('value_out') - value,
+        )
+
+    # Closing balances are cumulative, so a back-dated movement shifts every later row
+    StockSnapshot.objects.filter(snapshot_date__gte=snapshot_date, **keys).update(
+        closing_quantity=F('closing_quantity') + movement,
+        closing_value=F('closing_value') + value,
+    )
+
+
+def _consume_cost_layers(item_code, warehouse_id, quantity):
+    """Consumes open FIFO layers, oldest first."""
+    layers = StockCostLayer.objects.select_for_update().filter(
+        item_code=item_code,
+        warehouse_id=warehouse_id,
+        remaining_quantity__gt=0,
+    ).order_by('layer_date', 'id')
+
+    for layer in layers:
+        if quantity <= 0:
+            break
+        taken = min(layer.remaining_quantity, quantity)
+        layer.remaining_quantity -= taken
+        layer.save(update_fields=['remaining_quantity'])
+        quantity -= taken
+
+
+def _restore_cost_layers(item_code, warehouse_id, quantity):
+    """Puts quantity back into consumed layers, newest first (reverse of FIFO consumption)."""
+    layers = StockCostLayer.objects.select_for_update().filter(
+        item_code=item_code,
+        warehouse_id=warehouse_id,
+        remaining_quantity__lt=F('quantity'),
+    ).order_by('-layer_date', '-id')
+
+    for layer in layers:
+        if quantity <= 0:
+            break
+        restored = min(layer.quantity - layer.remaining_quantity, quantity)
+        layer.remaining_quantity += restored
+        layer.save(update_fields=['remaining_quantity'])
+        quantity -= restored
+
+
+def get_consumed_quantity(inventory_transaction):
+    """Quantity already taken out of the cost layer of a transaction."""
+    layer = StockCostLayer.objects.filter(transaction_id=inventory_transaction.pk).values('quantity', 'remaining_quantity').first()
+    return layer['quantity'] - layer['remaining_quantity'] if layer else ZERO
+
+
+def apply_transaction_to_snapshots(inventory_transaction, reverse=False, consumed=ZERO):
+    """
+    Incrementally posts (or reverses) one InventoryTransaction into the daily and
+    monthly snapshots and the FIFO cost layers. The value posted is stored on the
+    transaction as stock_value and a reversal takes out exactly that value, since
+    the average cost may have moved in between. Returns the value posted.
+
+    consumed is stock already issued out of the layer this posting replaces: it
+    stays consumed from the new layer, and what the new layer cannot cover is
+    taken from the other open layers.
+    """
+    movement = get_stock_movement(inventory_transaction)
+    if not movement:
+        return None
+
+    day = get_transaction_day(inventory_transaction)
+    original_movement = movement
+    if reverse:
+        movement = -movement
+
+    with transaction.atomic():
+        if reverse and inventory_transaction.stock_value is not None:
+            value = -inventory_transaction.stock_value
+        else:
+            average_cost = get_average_cost(inventory_transaction.item_code, inventory_transaction.warehouse_id, day)
+            value = get_movement_value(inventory_transaction, movement, average_cost)
+        inbound = original_movement > 0
+
+        _post_to_snapshot(inventory_transaction, 'DAILY', day, movement, value, inbound)
+        _post_to_snapshot(inventory_transaction, 'MONTHLY', month_start(day), movement, value, inbound)
+
+        if original_movement > 0:
+            if reverse:
+                StockCostLayer.objects.filter(transaction_id=inventory_transaction.pk).delete()
+            else:
+                unit_cost = value / movement if movement else ZERO
+                carried = min(consumed, movement)
+                consumed -= carried
+                StockCostLayer.objects.update_or_create(
+                    transaction_id=inventory_transaction.pk,
+                    defaults={
+                        'item_code': inventory_transaction.item_code,
+                        'warehouse_id': inventory_transaction.warehouse_id,
+                        'layer_date': inventory_transaction.transaction_date,
+                        'quantity': movement,
+                        'remaining_quantity': movement - carried,
+                        'unit_cost': unit_cost,
+                    }
+                )
+        elif reverse:
+            _restore_cost_layers(inventory_transaction.item_code, inventory_transaction.warehouse_id, -original_movement)
+        else:
+            consumed -= movement
+        if consumed > 0 and not reverse:
+            _consume_cost_layers(inventory_transaction.item_code, inventory_transaction.warehouse_id, consumed)
+
+        if not reverse:
+            inventory_transaction.stock_value = value
+            if inventory_transaction.pk:
+                InventoryTransaction.objects.filter(pk=inventory_transaction.pk).update(stock_value=value)
+    return value
+
+
+def repost_transaction_to_snapshots(previous, inventory_transaction):
+    """
+    Moves the postings of an edited transaction from its stored version to the new
+    one. Edits that leave POSTING_FIELDS alone change nothing; otherwise stock
+    already issued out of the old cost layer stays issued from the new one.
+    """
+    if all(getattr(previous, name) == getattr(inventory_transaction, name) for name in POSTING_FIELDS):
+        return
+    with transaction.atomic():
+        consumed = get_consumed_quantity(previous)
+        apply_transaction_to_snapshots(previous, reverse=True)
+        apply_transaction_to_snapshots(inventory_transaction, consumed=consumed)
+
+
+def reverse_transaction_from_snapshots(inventory_transaction):
+    """
+    Takes a deleted transaction out of the snapshots. Stock already issued out of
+    its cost layer is taken from the remaining open layers instead.
+    """
+    with transaction.atomic():
+        consumed = get_consumed_quantity(inventory_transaction)
+        apply_transaction_to_snapshots(inventory_transaction, reverse=True)
+        if consumed > 0:
+            _consume_cost_layers(inventory_transaction.item_code, inventory_transaction.warehouse_id, consumed)
+
+
+def apply_transactions_to_snapshots(inventory_transactions):
+    """
+    Posts many new transactions into the snapshots. Outbound movements of the same
+    item, warehouse, day and price are netted into one posting; stock coming in is
+    posted per transaction since each one carries its own cost layer. A netted
+    posting's value is split back over its transactions by quantity.
+    """
+    outbound = {}
+    netted_transactions = defaultdict(list)
+    for inventory_transaction in inventory_transactions:
+        movement = get_stock_movement(inventory_transaction)
+        if not movement:
+            continue
+        if movement > 0:
+            apply_transaction_to_snapshots(inventory_transaction)
+            continue
+        key = (
+            inventory_transaction.item_code, inventory_transaction.warehouse_id,
+            get_transaction_day(inventory_transaction), inventory_transaction.unit_price,
+            inventory_transaction.transaction_type,
+        )
+        netted_transactions[key].append(inventory_transaction)
+        if key in outbound:
+            outbound[key].quantity += inventory_transaction.quantity
+        else:
+            outbound[key] = InventoryTransaction(
+                item_code=inventory_transaction.item_code,
+                item_name=inventory_transaction.item_name,
+                warehouse_id=inventory_transaction.warehouse_id,
+                transaction_type=inventory_transaction.transaction_type,
+                quantity=inventory_transaction.quantity,
+                unit_price=inventory_transaction.unit_price,
+                reference=inventory_transaction.reference,
+                transaction_date=inventory_transaction.transaction_date,
+            )
+    stamped = []
+    for key, netted in outbound.items():
+        value = apply_transaction_to_snapshots(netted)
+        remaining = value
+        *leading, last = netted_transactions[key]
+        for inventory_transaction in leading:
+            inventory_transaction.stock_value = round(value * inventory_transaction.quantity / netted.quantity, 6)
+            remaining -= inventory_transaction.stock_value
+        last.stock_value = remaining
+        stamped.extend(inventory_transaction for inventory_transaction in netted_transactions[key] if inventory_transaction.pk)
+    InventoryTransaction.objects.bulk_update(stamped, ['stock_value'], batch_size=2000)
+
+def rebuild_stock_snapshots(item_codes=None, batch_size=2000):
+    """
+    Rebuilds snapshots and cost layers from scratch by replaying InventoryTransaction.
+    Transactions are streamed per item and warehouse, so memory stays bounded by one
+    item's history rather than the whole ledger.
+    """
+    transactions = InventoryTransaction.objects.all()
+    snapshots = StockSnapshot.objects.all()
+    layers = StockCostLayer.objects.all()
+    if item_codes:
+        transactions = transactions.filter(item_code__in=item_codes)
+        snapshots = snapshots.filter(item_code__in=item_codes)
+        layers = layers.filter(item_code__in=item_codes)
+
+    transactions = transactions.only(
+        'id', 'item_code', 'item_name', 'warehouse_id', 'transaction_type',
+        'quantity', 'unit_price', 'reference', 'transaction_date',
+    ).order_by('item_code', 'warehouse_id', 'transaction_date', 'id')
+
+    pending_snapshots = []
+    pending_layers = []
+    pending_transactions = []
+    stats = {'transactions': 0, 'snapshots': 0, 'layers': 0}
+
+    def flush():
+        StockSnapshot.objects.bulk_create(pending_snapshots, batch_size=batch_size)
+        StockCostLayer.objects.bulk_create(pending_layers, batch_size=batch_size)
+        InventoryTransaction.objects.bulk_update(pending_transactions, ['stock_value'], batch_size=batch_size)
+        stats['snapshots'] += len(pending_snapshots)
+        stats['layers'] += len(pending_layers)
+        pending_snapshots.clear()
+        pending_layers.clear()
+        pending_transactions.clear()
+
+    with transaction.atomic():
+        snapshots.delete()
+        layers.delete()
+
+        current_key = None
+        quantity = value = ZERO
+        daily = monthly = None
+        open_layers = deque()
+
+        for txn in transactions.iterator(chunk_size=batch_size):
+            movement = get_stock_movement(txn)
+            if not movement:
+                continue
+
+            key = (txn.item_code, txn.warehouse_id)
+            if key != current_key:
+                if len(pending_snapshots) + len(pending_layers) + len(pending_transactions) >= batch_size:
+                    flush()
+                current_key = key
+                quantity = value = ZERO
+                daily = monthly = None
+                open_layers = deque()
+
+            day = get_transaction_day(txn)
+            average_cost = value / quantity if quantity else None
+            movement_value = get_movement_value(txn, movement, average_cost)
+            txn.stock_value = movement_value
+            pending_transactions.append(txn)
+
+            if movement > 0:
+                layer = StockCostLayer(
+                    item_code=txn.item_code,
+                    warehouse_id=txn.warehouse_id,
+                    transaction_id=txn.pk,
+                    layer_date=txn.transaction_date,
+                    quantity=movement,
+                    remaining_quantity=movement,
+                    unit_cost=movement_value / movement,
+                )
+                pending_layers.append(layer)
+                open_layers.append(layer)
+            else:
+                remaining = -movement
+                while remaining > 0 and open_layers:
+                    layer = open_layers[0]
+                    taken = min(layer.remaining_quantity, remaining)
+                    layer.remaining_quantity -= taken
+                    remaining -= taken
+                    if layer.remaining_quantity <= 0:
+                        open_layers.popleft()
+
+            quantity += movement
+            value += movement_value
+
+            if daily is None or daily.snapshot_date != day:
+                daily = StockSnapshot(item_code=txn.item_code, item_name=txn.item_name, warehouse_id=txn.warehouse_id, period_type='DAILY', snapshot_date=day)
+                pending_snapshots.append(daily)
+            if monthly is None or monthly.snapshot_date != month_start(day):
+                monthly = StockSnapshot(item_code=txn.item_code, item_name=txn.item_name, warehouse_id=txn.warehouse_id, period_type='MONTHLY', snapshot_date=month_start(day))
+                pending_snapshots.append(monthly)
+
+            for snapshot in (daily, monthly):
+                if movement > 0:
+                    snapshot.quantity_in += movement
+                    snapshot.value_in += movement_value
+                else:
+                    snapshot.quantity_out -= movement
+                    snapshot.value_out -= movement_value
+                snapshot.closing_quantity = quantity
+                snapshot.closing_value = value
+
+            stats['transactions'] += 1
+
+        flush()
+        # Bulk writes skip the model signals that normally invalidate cached reports
+        transaction.on_commit(lambda: invalidate_report_tags(INVENTORY_STOCK_TAG))
+
+    return stats
+
+
+def get_stock_as_of(as_of_date, warehouse=None):
+    """
+    Closing stock per item and warehouse at the end of as_of_date: the latest daily
+    snapshot on or before that date, found through the (item, warehouse, period, date) index.
+    """
+    latest_date = StockSnapshot.objects.filter(
+        item_code=OuterRef('item_code'),
+        warehouse=OuterRef('warehouse'),
+        period_type='DAILY',
+        snapshot_date__lte=as_of_date,
+    ).order_by('-snapshot_date').values('snapshot_date')[:1]
+
+    queryset = StockSnapshot.objects.select_related('warehouse').filter(
+        period_type='DAILY',
+        snapshot_date__lte=as_of_date,
+    )
+    if warehouse:
+        queryset = queryset.filter(warehouse=warehouse)
+
+    return queryset.annotate(
+        latest_date=Subquery(latest_date)
+    ).filter(snapshot_date=F('latest_date')).exclude(
+        closing_quantity=0, closing_value=0
+    )
+
+
+def get_stock_aging(as_of_date=None, warehouse=None):
+    """
+    Stock on hand at the end of as_of_date per item and warehouse, bucketed by
+    receipt age. Under FIFO the stock left on hand is the most recently received,
+    so the closing quantity as of the date is matched against the cost layers
+    received up to that date, newest first; issues after the date do not count.
+    """
+    as_of_date = as_of_date or timezone.localdate()
+    closing = get_stock_as_of(as_of_date, warehouse=warehouse).filter(closing_quantity__gt=0)
+
+    rows = {}
+    for snapshot in closing:
+        row = {
+            'item_code': snapshot.item_code,
+            'warehouse__code': snapshot.warehouse.code,
+            'warehouse__name': snapshot.warehouse.name,
+            'total_quantity': ZERO,
+            'total_value': ZERO,
+            'unmatched': snapshot.closing_quantity,
+        }
+        row.update((name, ZERO) for name, _, _ in AGING_BUCKETS)
+        rows[(snapshot.item_code, snapshot.warehouse_id)] = row
+    if not rows:
+        return []
+
+    layers = StockCostLayer.objects.filter(
+        item_code__in={item_code for item_code, _ in rows}, layer_date__date__lte=as_of_date,
+    )
+    if warehouse:
+        layers = layers.filter(warehouse=warehouse)
+    layers = layers.order_by('item_code', 'warehouse_id', '-layer_date', '-id').values_list(
+        'item_code', 'warehouse_id', 'layer_date', 'quantity', 'unit_cost',
+    )
+
+    for item_code, warehouse_id, layer_date, quantity, unit_cost in layers.iterator(chunk_size=2000):
+        row = rows.get((item_code, warehouse_id))
+        if row is None or row['unmatched'] <= 0:
+            continue
+        on_hand = min(quantity, row['unmatched'])
+        row['unmatched'] -= on_hand
+        row['total_quantity'] += on_hand
+        row['total_value'] += on_hand * unit_cost
+        age = (as_of_date - get_local_date(layer_date)).days
+        for name, min_days, max_days in AGING_BUCKETS:
+            if age >= min_days and (max_days is None or age <= max_days):
+                row[name] += on_hand
+                break
+
+    for row in rows.values():
+        del row['unmatched']
+    return sorted(
+        (row for row in rows.values() if row['total_quantity']),
+        key=lambda row: (row['item_code'], row['warehouse__code']),
+    )
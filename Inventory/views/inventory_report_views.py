@@ -2,8 +2,11 @@ from django.views.generic import TemplateView
 from django.db.models import Sum, Q, Count, F, Value, DecimalField, Case, When
 from decimal import Decimal
 from django.utils import timezone
-from Inventory.models import ItemWarehouseInfo, GoodsReceipt, GoodsReceiptLine, GoodsIssue, GoodsIssueLine, InventoryTransfer, InventoryTransferLine, InventoryTransaction, Item, Warehouse
+from Inventory.models import ItemWarehouseInfo, GoodsReceipt, GoodsReceiptLine, GoodsIssue, GoodsIssueLine, InventoryTransfer, InventoryTransferLine, InventoryTransaction, Item, Warehouse, StockSnapshot, StockCostLayer
+from Inventory.utils.stock_snapshot_utils import get_stock_as_of, get_stock_aging
+from config.report_cache import INVENTORY_STOCK_TAG, get_cached_report
 from config.views import GenericFilterView
+from config.db_router import ReadReplicaMixin
 from django import forms
 from config.forms import BaseFilterForm
 import logging
@@ -34,6 +37,13 @@ class InventoryReportFilterForm(BaseFilterForm):
         self.fields['date_from'].label = "Start Date"
         self.fields['date_to'].label = "End Date"
 
+class StockAsOfFilterForm(InventoryReportFilterForm):
+    as_of_date = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+        label="As of Date"
+    )
+
 # Report List View
 class InventoryReportListView(TemplateView):
     template_name = 'inventory/reports/inventory_report_list.html'
@@ -45,7 +55,7 @@ class InventoryReportListView(TemplateView):
         return context
 
 # Stock Reports
-class CurrentStockReportView(GenericFilterView):
+class CurrentStockReportView(ReadReplicaMixin, GenericFilterView):
     model = ItemWarehouseInfo
     template_name = 'inventory/reports/current_stock_report.html'
     context_object_name = 'stock_records'
@@ -140,7 +150,7 @@ class CurrentStockReportView(GenericFilterView):
         logger.debug(f"Current Stock context: {len(records)} records, Total Available: {context['total_available']}")
         return context
 
-class StockByWarehouseReportView(GenericFilterView):
+class StockByWarehouseReportView(ReadReplicaMixin, GenericFilterView):
     model = ItemWarehouseInfo
     template_name = 'inventory/reports/stock_by_warehouse_report.html'
     context_object_name = 'warehouse_stocks'
@@ -231,7 +241,7 @@ class StockByWarehouseReportView(GenericFilterView):
         context['filter_summary'] = filter_summary
         logger.debug(f"Stock by Warehouse context: {len(records)} warehouses, Total Available: {context['total_available']}")
         return context
-class ReorderReportView(GenericFilterView):
+class ReorderReportView(ReadReplicaMixin, GenericFilterView):
     model = ItemWarehouseInfo
     template_name = 'inventory/reports/reorder_report.html'
     context_object_name = 'reorder_items'
@@ -332,7 +342,7 @@ class ReorderReportView(GenericFilterView):
         context['filter_summary'] = filter_summary
         logger.debug(f"Reorder context: {len(records)} items, Total Shortage: {context['total_shortage']}")
         return context
-class OverstockReportView(GenericFilterView):
+class OverstockReportView(ReadReplicaMixin, GenericFilterView):
     model = ItemWarehouseInfo
     template_name = 'inventory/reports/overstock_report.html'
     context_object_name = 'overstock_items'
@@ -428,7 +438,7 @@ class OverstockReportView(GenericFilterView):
         logger.debug(f"Overstock context: {len(records)} items")
         return context
 # Inbound Reports
-class GoodsReceiptSummaryView(GenericFilterView):
+class GoodsReceiptSummaryView(ReadReplicaMixin, GenericFilterView):
     model = GoodsReceipt
     template_name = 'inventory/reports/goods_receipt_summary.html'
     context_object_name = 'goods_receipts'
@@ -527,7 +537,7 @@ class GoodsReceiptSummaryView(GenericFilterView):
         context['filter_summary'] = filter_summary
         logger.debug(f"Goods Receipt context: {len(records)} items, Total Amount: {context['total_amount']}")
         return context
-class PendingGoodsReceiptView(GenericFilterView):
+class PendingGoodsReceiptView(ReadReplicaMixin, GenericFilterView):
     model = GoodsReceipt
     template_name = 'inventory/reports/pending_goods_receipt.html'
     context_object_name = 'pending_receipts'
@@ -610,7 +620,7 @@ class PendingGoodsReceiptView(GenericFilterView):
         return context
 
 # Outbound Reports
-class GoodsIssueSummaryView(GenericFilterView):
+class GoodsIssueSummaryView(ReadReplicaMixin, GenericFilterView):
     model = GoodsIssue
     template_name = 'inventory/reports/goods_issue_summary.html'
     context_object_name = 'goods_issues'
@@ -712,7 +722,7 @@ class GoodsIssueSummaryView(GenericFilterView):
         logger.debug(f"Goods Issue context: {len(issues)} issues, Total Amount: {context['total_amount']}")
         return context
 
-class InventoryConsumptionReportView(GenericFilterView):
+class InventoryConsumptionReportView(ReadReplicaMixin, GenericFilterView):
     model = GoodsIssueLine
     template_name = 'inventory/reports/inventory_consumption_report.html'
     context_object_name = 'consumption_records'
@@ -785,7 +795,7 @@ class InventoryConsumptionReportView(GenericFilterView):
         context['page_title'] = 'Inventory Consumption Report'
         
         records = context['consumption_records']
-        total_quantity = sum(r['total_quantity'] for r in records)
+        total_quantity = records.aggregate(total=Sum('total_quantity'))['total']
         
         context.update({
             'total_quantity': "{:.2f}".format(total_quantity or 0),
@@ -811,7 +821,7 @@ class InventoryConsumptionReportView(GenericFilterView):
         return context
 
 # Inventory Movement Reports
-class InventoryTransactionsLedgerView(GenericFilterView):
+class InventoryTransactionsLedgerView(ReadReplicaMixin, GenericFilterView):
     model = InventoryTransaction
     template_name = 'inventory/reports/inventory_transactions_ledger.html'
     context_object_name = 'transactions'
@@ -917,7 +927,7 @@ class InventoryTransactionsLedgerView(GenericFilterView):
         logger.debug(f"Inventory Transactions context: {len(transactions)} transactions, Total Amount: {context['total_amount']}")
         return context
 
-class InventoryValuationReportView(GenericFilterView):
+class InventoryValuationReportView(ReadReplicaMixin, GenericFilterView):
     model = ItemWarehouseInfo
     template_name = 'inventory/reports/inventory_valuation_report.html'
     context_object_name = 'valuation_records'
@@ -986,7 +996,7 @@ class InventoryValuationReportView(GenericFilterView):
         context['all_warehouses'] = Warehouse.objects.filter(is_active=True)
         
         records = context['valuation_records']
-        total_value = sum(r.total_value or 0 for r in records)
+        total_value = records.aggregate(total=Sum('total_value'))['total'] or 0
         
         context.update({
             'total_value': "{:.2f}".format(total_value),
@@ -1007,7 +1017,7 @@ class InventoryValuationReportView(GenericFilterView):
         logger.debug(f"Inventory Valuation context: {len(records)} items, Total Value: {context['total_value']}")
         return context
 
-class ItemMovementReportView(GenericFilterView):
+class ItemMovementReportView(ReadReplicaMixin, GenericFilterView):
     model = InventoryTransaction
     template_name = 'inventory/reports/item_movement_report.html'
     context_object_name = 'movements'
@@ -1087,8 +1097,9 @@ class ItemMovementReportView(GenericFilterView):
         context['all_warehouses'] = Warehouse.objects.filter(is_active=True)
         
         records = context['movements']
-        total_in = sum(r['total_in'] or 0 for r in records)
-        total_out = sum(r['total_out'] or 0 for r in records)
+        totals = records.aggregate(sum_in=Sum('total_in'), sum_out=Sum('total_out'))
+        total_in = totals['sum_in'] or 0
+        total_out = totals['sum_out'] or 0
         
         context.update({
             'total_in': "{:.2f}".format(total_in),
@@ -1117,7 +1128,7 @@ class ItemMovementReportView(GenericFilterView):
         return context
 
 # Transfer Reports
-class TransferSummaryView(GenericFilterView):
+class TransferSummaryView(ReadReplicaMixin, GenericFilterView):
     model = InventoryTransfer
     template_name = 'inventory/reports/transfer_summary.html'
     context_object_name = 'transfers'
@@ -1222,7 +1233,7 @@ class TransferSummaryView(GenericFilterView):
         logger.debug(f"Transfer Summary context: {len(transfers)} transfers, Total Amount: {context['total_amount']}")
         return context
 
-class PendingTransfersView(GenericFilterView):
+class PendingTransfersView(ReadReplicaMixin, GenericFilterView):
     model = InventoryTransfer
     template_name = 'inventory/reports/pending_transfers.html'
     context_object_name = 'pending_transfers'
@@ -1315,7 +1326,7 @@ class PendingTransfersView(GenericFilterView):
         return context
 
 # Adjustment Reports
-class StockAdjustmentHistoryView(GenericFilterView):
+class StockAdjustmentHistoryView(ReadReplicaMixin, GenericFilterView):
     model = InventoryTransaction
     template_name = 'inventory/reports/stock_adjustment_history.html'
     context_object_name = 'adjustments'
@@ -1424,7 +1435,7 @@ class StockAdjustmentHistoryView(GenericFilterView):
         return context
 
 # Exception Reports
-class StockBelowMinimumView(GenericFilterView):
+class StockBelowMinimumView(ReadReplicaMixin, GenericFilterView):
     model = ItemWarehouseInfo
     template_name = 'inventory/reports/stock_below_minimum.html'
     context_object_name = 'low_stock_items'
@@ -1509,7 +1520,7 @@ class StockBelowMinimumView(GenericFilterView):
         logger.debug(f"Stock Below Minimum context: {len(records)} items")
         return context
 
-class NegativeStockReportView(GenericFilterView):
+class NegativeStockReportView(ReadReplicaMixin, GenericFilterView):
     model = ItemWarehouseInfo
     template_name = 'inventory/reports/negative_stock_report.html'
     context_object_name = 'negative_stock_items'
@@ -1594,7 +1605,7 @@ class NegativeStockReportView(GenericFilterView):
         logger.debug(f"Negative Stock context: {len(records)} items")
         return context
 
-class ZeroMovementReportView(GenericFilterView):
+class ZeroMovementReportView(ReadReplicaMixin, GenericFilterView):
     model = Item
     template_name = 'inventory/reports/zero_movement_report.html'
     context_object_name = 'zero_movement_items'
@@ -1691,6 +1702,127 @@ class ZeroMovementReportView(GenericFilterView):
         return context
 
 
+# Snapshot based Reports
+class StockAsOfDateReportView(ReadReplicaMixin, GenericFilterView):
+    model = StockSnapshot
+    template_name = 'inventory/reports/stock_as_of_date_report.html'
+    context_object_name = 'stock_records'
+    filter_form_class = StockAsOfFilterForm
+    permission_required = 'Inventory.view_itemwarehouseinfo'
+    paginate_by = 50
+
+    def get_as_of_date(self):
+        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
+            return self.filter_form.cleaned_data.get('as_of_date') or timezone.localdate()
+        return timezone.localdate()
+
+    def get_report_params(self):
+        # Totals cover every page, so paging through the report reuses them
+        params = self.request.GET.copy()
+        params['as_of_date'] = self.get_as_of_date().isoformat()
+        return params
+
+    def get_queryset(self):
+        self.filter_form = self.filter_form_class(self.request.GET)
+        warehouse = None
+        if self.filter_form.is_valid():
+            warehouse = self.filter_form.cleaned_data.get('warehouse')
+        else:
+            logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
+
+        queryset = get_stock_as_of(self.get_as_of_date(), warehouse=warehouse)
+        if self.filter_form.is_valid():
+            queryset = self.apply_filters(queryset)
+        return queryset.order_by('item_code', 'warehouse__code')
+
+    def apply_filters(self, queryset):
+        filters = self.filter_form.cleaned_data
+        for key in ('search', 'item'):
+            if filters.get(key):
+                term = filters[key].strip()
+                queryset = queryset.filter(Q(item_code__icontains=term) | Q(item_name__icontains=term))
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        as_of_date = self.get_as_of_date()
+
+        totals = get_cached_report(
+            'inventory.stock_as_of_date', self.get_report_params(),
+            lambda: self.object_list.aggregate(
+                total_quantity=Sum('closing_quantity'),
+                total_value=Sum('closing_value')
+            ),
+            tags=[INVENTORY_STOCK_TAG], user=self.request.user,
+        )
+
+        context.update({
+            'page_title': 'Stock As Of Date Report',
+            'as_of_date': as_of_date,
+            'all_warehouses': Warehouse.objects.filter(is_active=True),
+            'total_quantity': "{:.2f}".format(totals['total_quantity'] or 0),
+            'total_value': "{:.2f}".format(totals['total_value'] or 0),
+        })
+        return context
+
+class StockAgingReportView(ReadReplicaMixin, GenericFilterView):
+    model = StockCostLayer
+    template_name = 'inventory/reports/stock_aging_report.html'
+    context_object_name = 'aging_records'
+    filter_form_class = StockAsOfFilterForm
+    permission_required = 'Inventory.view_itemwarehouseinfo'
+    paginate_by = 50
+
+    def get_as_of_date(self):
+        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
+            return self.filter_form.cleaned_data.get('as_of_date') or timezone.localdate()
+        return timezone.localdate()
+
+    def get_report_params(self):
+        # Totals cover every page, so paging through the report reuses them
+        params = self.request.GET.copy()
+        params['as_of_date'] = self.get_as_of_date().isoformat()
+        return params
+
+    def get_queryset(self):
+        self.filter_form = self.filter_form_class(self.request.GET)
+        warehouse = None
+        if self.filter_form.is_valid():
+            warehouse = self.filter_form.cleaned_data.get('warehouse')
+        else:
+            logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
+
+        records = get_stock_aging(self.get_as_of_date(), warehouse=warehouse)
+        if self.filter_form.is_valid():
+            for key in ('search', 'item'):
+                if self.filter_form.cleaned_data.get(key):
+                    term = self.filter_form.cleaned_data[key].strip().lower()
+                    records = [record for record in records if term in record['item_code'].lower()]
+        return records
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        totals = get_cached_report(
+            'inventory.stock_aging', self.get_report_params(),
+            lambda: {
+                'sum_quantity': sum(record['total_quantity'] for record in self.object_list),
+                'sum_value': sum(record['total_value'] for record in self.object_list),
+                'sum_over_90': sum(record['age_over_90'] for record in self.object_list),
+            },
+            tags=[INVENTORY_STOCK_TAG], user=self.request.user,
+        )
+
+        context.update({
+            'page_title': 'Stock Aging Report',
+            'as_of_date': self.get_as_of_date(),
+            'all_warehouses': Warehouse.objects.filter(is_active=True),
+            'total_quantity': "{:.2f}".format(totals['sum_quantity'] or 0),
+            'total_value': "{:.2f}".format(totals['sum_value'] or 0),
+            'total_over_90': "{:.2f}".format(totals['sum_over_90'] or 0),
+        })
+        return context
+
+
 class MenuPageView(TemplateView):
     template_name = 'inventory/inventory_menu_page.html'
 
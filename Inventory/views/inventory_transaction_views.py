@@ -34,6 +34,7 @@ class InventoryTransactionListView(InventoryTransactionAccessMixin, GenericFilte
     paginate_by = 10
     permission_required = 'Inventory.view_inventorytransaction'
     filter_form_class = InventoryTransactionFilterForm
+    keyset_ordering = ('-transaction_date', '-id')
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import ValidationError
+
+from Production.models import ProductionOrder
+from Production.utils import MRP_OPEN_STATUSES, run_mrp
+
+
+class Command(BaseCommand):
+    help = "Run material requirements planning for open production orders and print the suggestions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--warehouse', type=int, help="Only plan orders for this warehouse id.")
+        parser.add_argument('--order', dest='orders', action='append', default=[], help="Production order number (repeatable).")
+
+    def handle(self, *args, **options):
+        orders = ProductionOrder.objects.filter(status__in=MRP_OPEN_STATUSES)
+        if options['warehouse']:
+            orders = orders.filter(warehouse_id=options['warehouse'])
+        if options['orders']:
+            orders = orders.filter(order_number__in=options['orders'])
+
+        try:
+            plan = run_mrp(orders)
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+
+        for row in plan['production_suggestions']:
+            self.stdout.write(f"PRODUCE  {row['item_code']:<20} {row['warehouse_name']:<20} {row['shortage_quantity']}")
+        for row in plan['purchase_suggestions']:
+            self.stdout.write(f"PURCHASE {row['item_code']:<20} {row['warehouse_name']:<20} {row['suggested_quantity']}")
+
+        summary = plan['summary']
+        self.stdout.write(self.style.SUCCESS(
+            f"Planned {summary['order_count']} orders over {summary['bom_count']} BOMs: "
+            f"{summary['line_count']} requirement lines, {summary['shortage_count']} shortages, "
+            f"{len(plan['purchase_suggestions'])} purchase and {len(plan['production_suggestions'])} production suggestions."
+        ))
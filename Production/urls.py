@@ -17,6 +17,9 @@ from .views import (
     
     # Dashboard views
     ProductionDashboardView,
+
+    # MRP views
+    MRPView,
     
     # API views
     ProductBOMsAPIView, ProductInfoAPIView
@@ -54,6 +57,10 @@ urlpatterns = [
     path('production-orders/<int:pk>/delete/', ProductionOrderDeleteView.as_view(), name='production_order_delete'),
     path('production-orders/export/', ProductionOrderExportView.as_view(), name='production_order_export'),
     path('production-orders/bulk-delete/', ProductionOrderBulkDeleteView.as_view(), name='production_order_bulk_delete'),
+
+    # Material Requirements Planning
+    path('mrp/', MRPView.as_view(), name='mrp'),
+
     # Production Receipt URLs
     path('receipt/', ProductionReceiptListView.as_view(), name='production_receipt_list'),
     path('receipt/create/', ProductionReceiptCreateView.as_view(), name='production_receipt_create'),
@@ -0,0 +1,286 @@
+from collections import defaultdict, deque
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+
+MRP_OPEN_STATUSES = ('Draft', 'Released', 'In Process')
+MRP_QUERY_CHUNK_SIZE = 500
+MRP_QUANTITY_PLACES = Decimal('0.000001')
+
+
+def chunked(values, size=MRP_QUERY_CHUNK_SIZE):
+    """Yields slices of `values` small enough for an IN (...) lookup."""
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+# ----------------------------------------------------------------------
+# BOM structure
+# ----------------------------------------------------------------------
+def load_bom_structure(root_bom_ids):
+    """
+    Loads the given BOMs and every sub-assembly BOM below them, one level per
+    round trip. A component is a sub-assembly when its item_code is the product
+    of a non-inactive BOM; an Active BOM wins over a Draft one, then the newest.
+
+    Returns (boms, bom_for_item):
+      boms          {bom_id: {'code', 'product_code', 'x_quantity', 'other_cost_percentage', 'components'}}
+      bom_for_item  {item_code: bom_id} for every sub-assembly found
+    """
+    from .models import BillOfMaterials, BOMComponent
+
+    boms, bom_for_item = {}, {}
+    resolved_codes = set()
+    pending = set(root_bom_ids)
+
+    while pending:
+        for ids in chunked(pending):
+            for bom in BillOfMaterials.objects.filter(id__in=ids).values(
+                'id', 'code', 'product__code', 'x_quantity', 'other_cost_percentage'
+            ):
+                boms[bom['id']] = {
+                    'code': bom['code'],
+                    'product_code': bom['product__code'],
+                    'x_quantity': bom['x_quantity'] if bom['x_quantity'] and bom['x_quantity'] > 0 else Decimal('1'),
+                    'other_cost_percentage': bom['other_cost_percentage'] or Decimal('0'),
+                    'components': [],
+                }
+            for component in BOMComponent.objects.filter(bom_id__in=ids).order_by('id').values(
+                'bom_id', 'item_code', 'item_name', 'unit', 'quantity', 'unit_price'
+            ):
+                boms[component['bom_id']]['components'].append(component)
+
+        component_codes = {
+            component['item_code']
+            for bom_id in pending
+            for component in boms.get(bom_id, {}).get('components', ())
+        } - resolved_codes
+        resolved_codes |= component_codes
+
+        pending = set()
+        for codes in chunked(component_codes):
+            candidates = (
+                BillOfMaterials.objects.filter(product__code__in=codes)
+                .exclude(status='Inactive')
+                .values_list('product__code', 'id', 'status')
+            )
+            best = {}
+            for code, bom_id, status in candidates:
+                rank = (status == 'Active', bom_id)
+                if code not in best or rank > best[code]:
+                    best[code] = rank
+            for code, (_active, bom_id) in best.items():
+                bom_for_item[code] = bom_id
+                if bom_id not in boms:
+                    pending.add(bom_id)
+
+    return boms, bom_for_item
+
+
+def get_planning_order(boms, bom_for_item, root_bom_ids):
+    """
+    Orders the component item codes so every sub-assembly comes before all of its
+    own components (low-level coding), which lets each item be netted once with
+    its complete gross requirement. Raises ValidationError on a BOM cycle.
+    """
+    children = {}
+    for code, bom_id in bom_for_item.items():
+        children[code] = {component['item_code'] for component in boms[bom_id]['components']}
+
+    nodes = set()
+    for bom_id in root_bom_ids:
+        nodes.update(component['item_code'] for component in boms.get(bom_id, {}).get('components', ()))
+    stack = list(nodes)
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            if child not in nodes:
+                nodes.add(child)
+                stack.append(child)
+
+    parents_left = defaultdict(int)
+    for code in nodes:
+        for child in children.get(code, ()):
+            parents_left[child] += 1
+
+    levels = {code: 1 for code in nodes}
+    queue = deque(sorted(code for code in nodes if not parents_left[code]))
+    order = []
+    while queue:
+        code = queue.popleft()
+        order.append(code)
+        for child in sorted(children.get(code, ())):
+            levels[child] = max(levels[child], levels[code] + 1)
+            parents_left[child] -= 1
+            if not parents_left[child]:
+                queue.append(child)
+
+    if len(order) != len(nodes):
+        cyclic = sorted(code for code in nodes if parents_left[code])
+        raise ValidationError(f"BOM cycle detected involving items: {', '.join(cyclic[:10])}")
+    return order, levels
+
+
+def get_rolled_up_costs(boms, bom_for_item):
+    """
+    Unit cost per BOM with sub-assemblies costed from their own BOM instead of the
+    price on the component line. Each BOM is rolled up once and memoized, so a
+    sub-assembly shared by many parents is never re-exploded.
+    """
+    costs = {}
+
+    def rollup(bom_id, path=()):
+        if bom_id in costs:
+            return costs[bom_id]
+        if bom_id in path:
+            raise ValidationError(f"BOM cycle detected at {boms[bom_id]['code']}")
+        bom = boms[bom_id]
+        component_value = Decimal('0')
+        for component in bom['components']:
+            child_bom_id = bom_for_item.get(component['item_code'])
+            unit_price = rollup(child_bom_id, path + (bom_id,)) if child_bom_id else component['unit_price']
+            component_value += component['quantity'] * unit_price
+        total = component_value * (1 + bom['other_cost_percentage'] / 100)
+        costs[bom_id] = total / bom['x_quantity']
+        return costs[bom_id]
+
+    for bom_id in boms:
+        rollup(bom_id)
+    return costs
+
+
+def get_stock_positions(item_codes, warehouse_ids):
+    """{(item_code, warehouse_id): {'available', 'ordered'}} from ItemWarehouseInfo, in bulk."""
+    from Inventory.models import ItemWarehouseInfo
+
+    positions = {}
+    for codes in chunked(item_codes):
+        rows = ItemWarehouseInfo.objects.filter(
+            item__code__in=codes, warehouse_id__in=warehouse_ids
+        ).values_list('item__code', 'warehouse_id', 'available', 'ordered')
+        for code, warehouse_id, available, ordered in rows:
+            positions[(code, warehouse_id)] = {
+                'available': max(available or Decimal('0'), Decimal('0')),
+                'ordered': max(ordered or Decimal('0'), Decimal('0')),
+            }
+    return positions
+
+
+# ----------------------------------------------------------------------
+# Material requirements planning
+# ----------------------------------------------------------------------
+def run_mrp(production_orders):
+    """
+    Explodes the remaining quantity (planned - produced) of the given production
+    orders through all BOM levels and nets the requirements per item and order
+    warehouse against ItemWarehouseInfo.available.
+
+    Items are processed in low-level-code order: a sub-assembly's shortage becomes
+    a production suggestion and only that shortage is exploded further, so stock
+    already on hand at any level reduces the demand below it.
+
+    Returns a dict with 'requirements' (every item/warehouse), 'shortages',
+    'purchase_suggestions' (shortage less quantity already on order),
+    'production_suggestions' and 'summary'.
+    """
+    from Inventory.models import Warehouse
+
+    orders = [
+        order for order in production_orders.values(
+            'id', 'order_number', 'bom_id', 'warehouse_id', 'planned_quantity', 'produced_quantity'
+        )
+        if (order['planned_quantity'] or 0) > (order['produced_quantity'] or 0)
+    ]
+    root_bom_ids = {order['bom_id'] for order in orders}
+    boms, bom_for_item = load_bom_structure(root_bom_ids)
+    planning_order, levels = get_planning_order(boms, bom_for_item, root_bom_ids)
+    unit_costs = get_rolled_up_costs(boms, bom_for_item)
+
+    gross = defaultdict(Decimal)
+    pegging = defaultdict(set)
+    item_info = {}
+
+    def explode(bom_id, quantity, warehouse_id, order_numbers):
+        bom = boms[bom_id]
+        for component in bom['components']:
+            code = component['item_code']
+            key = (code, warehouse_id)
+            gross[key] += component['quantity'] * quantity / bom['x_quantity']
+            pegging[key] |= order_numbers
+            if code not in item_info:
+                item_info[code] = {
+                    'item_name': component['item_name'],
+                    'unit': component['unit'],
+                    'unit_price': component['unit_price'],
+                }
+
+    for order in orders:
+        if order['bom_id'] in boms:
+            remaining = order['planned_quantity'] - (order['produced_quantity'] or 0)
+            explode(order['bom_id'], remaining, order['warehouse_id'], {order['order_number'] or str(order['id'])})
+
+    warehouse_ids = {order['warehouse_id'] for order in orders}
+    positions = get_stock_positions(planning_order, warehouse_ids)
+    warehouse_names = dict(Warehouse.objects.filter(id__in=warehouse_ids).values_list('id', 'name'))
+
+    requirements = []
+    for code in planning_order:
+        child_bom_id = bom_for_item.get(code)
+        for warehouse_id in sorted(warehouse_ids):
+            key = (code, warehouse_id)
+            if key not in gross:
+                continue
+            required = gross[key]
+            position = positions.get(key, {'available': Decimal('0'), 'ordered': Decimal('0')})
+            allocated = min(required, position['available'])
+            shortage = required - allocated
+            if child_bom_id and shortage > 0:
+                explode(child_bom_id, shortage, warehouse_id, pegging[key])
+
+            unit_cost = unit_costs[child_bom_id] if child_bom_id else item_info[code]['unit_price']
+            requirements.append({
+                'item_code': code,
+                'item_name': item_info[code]['item_name'],
+                'unit': item_info[code]['unit'],
+                'warehouse_id': warehouse_id,
+                'warehouse_name': warehouse_names.get(warehouse_id, ''),
+                'level': levels[code],
+                'is_subassembly': bool(child_bom_id),
+                'bom_code': boms[child_bom_id]['code'] if child_bom_id else None,
+                'gross_quantity': required.quantize(MRP_QUANTITY_PLACES),
+                'available': position['available'],
+                'allocated_quantity': allocated.quantize(MRP_QUANTITY_PLACES),
+                'shortage_quantity': shortage.quantize(MRP_QUANTITY_PLACES),
+                'on_order': position['ordered'],
+                'unit_cost': unit_cost.quantize(MRP_QUANTITY_PLACES),
+                'shortage_value': (shortage * unit_cost).quantize(Decimal('0.01')),
+                'orders': sorted(pegging[key]),
+            })
+
+    shortages = [row for row in requirements if row['shortage_quantity'] > 0]
+    production_suggestions = [row for row in shortages if row['is_subassembly']]
+    purchase_suggestions = []
+    for row in shortages:
+        if row['is_subassembly']:
+            continue
+        suggested = row['shortage_quantity'] - row['on_order']
+        if suggested > 0:
+            purchase_suggestions.append({**row, 'suggested_quantity': suggested})
+
+    return {
+        'requirements': requirements,
+        'shortages': shortages,
+        'purchase_suggestions': purchase_suggestions,
+        'production_suggestions': production_suggestions,
+        'summary': {
+            'order_count': len(orders),
+            'bom_count': len(boms),
+            'item_count': len(planning_order),
+            'line_count': len(requirements),
+            'shortage_count': len(shortages),
+            'shortage_value': sum((row['shortage_value'] for row in shortages), Decimal('0')),
+            'purchase_value': sum(
+                (row['suggested_quantity'] * row['unit_cost'] for row in purchase_suggestions), Decimal('0')
+            ).quantize(Decimal('0.01')),
+        },
+    }
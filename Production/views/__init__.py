@@ -24,3 +24,4 @@ from .production_issue_views import (
 
 from .dashboard_views import ProductionDashboardView
 
+from .mrp_views import MRPView
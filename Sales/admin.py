@@ -5,7 +5,8 @@ from .models import (
     SalesOrder, SalesOrderLine,
     Delivery, DeliveryLine,
     Return, ReturnLine,
-    ARInvoice, ARInvoiceLine
+    ARInvoice, ARInvoiceLine,
+    SalesDailySummary, SalesDailyItemSummary
 )
 
 @admin.register(SalesEmployee)
@@ -62,3 +63,15 @@ class ARInvoiceAdmin(admin.ModelAdmin):
     list_display = ('id', 'customer', 'document_date', 'status', 'payable_amount', 'paid_amount', 'due_amount')
     search_fields = ('customer__name',)
     inlines = [ARInvoiceLineInline]
+
+@admin.register(SalesDailySummary)
+class SalesDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ('summary_date', 'customer', 'sales_employee', 'order_count', 'order_amount', 'return_count', 'return_amount')
+    list_filter = ('summary_date', 'sales_employee')
+    search_fields = ('customer__name',)
+
+@admin.register(SalesDailyItemSummary)
+class SalesDailyItemSummaryAdmin(admin.ModelAdmin):
+    list_display = ('summary_date', 'item_code', 'item_name', 'customer', 'sales_employee', 'quantity', 'sales_amount', 'return_quantity', 'return_amount')
+    list_filter = ('summary_date', 'sales_employee')
+    search_fields = ('item_code', 'item_name', 'customer__name')
@@ -8,9 +8,68 @@ from ..models import (
     Return, ReturnLine,
     ARInvoice, ARInvoiceLine
 )
+from django.db import transaction
 from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from decimal import Decimal
+
+from ..utils import write_document_lines
+from BusinessPartnerMasterData.open_items import CreditLimitExceeded, check_credit_limit
 
 import datetime
+
+
+class DocumentLinesWriteMixin:
+    """
+    Create/update for documents with nested lines. Lines are written in bulk by
+    write_document_lines(): lines sent with their id are updated, new ones created
+    and missing ones deleted, with stock and rollup effects posted once per document.
+    """
+    line_kind = None
+
+    def validate_lines(self, lines):
+        line_ids = [line['id'] for line in lines if line.get('id')]
+        if len(line_ids) != len(set(line_ids)):
+            raise serializers.ValidationError(_("Each line id can only be sent once."))
+        existing_ids = set(self.instance.lines.values_list('id', flat=True)) if self.instance else set()
+        unknown_ids = set(line_ids) - existing_ids
+        if unknown_ids:
+            raise serializers.ValidationError(
+                _("Lines %(ids)s do not belong to this document.") % {'ids': sorted(unknown_ids)}
+            )
+        return lines
+
+    def set_document_totals(self, document, lines):
+        document.total_amount = sum((line.total_amount for line in lines), Decimal('0'))
+        document.payable_amount = document.total_amount - document.discount_amount
+        document.due_amount = document.payable_amount - document.paid_amount
+
+    def check_document(self, document):
+        """Runs after the document is saved; raising rolls the write back."""
+
+    def create(self, validated_data):
+        lines_data = validated_data.pop('lines')
+        with transaction.atomic():
+            document = self.Meta.model.objects.create(**validated_data)
+            lines = write_document_lines(document, lines_data, kind=self.line_kind)
+            self.set_document_totals(document, lines)
+            document.save()
+            self.check_document(document)
+        return document
+
+    def update(self, instance, validated_data):
+        lines_data = validated_data.pop('lines', None)
+        with transaction.atomic():
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            if lines_data is not None:
+                lines = write_document_lines(instance, lines_data, kind=self.line_kind)
+                self.set_document_totals(instance, lines)
+            instance.save()
+            self.check_document(instance)
+        return instance
+
+
 class SalesEmployeeSerializer(serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
     
@@ -23,12 +82,17 @@ class SalesEmployeeSerializer(serializers.ModelSerializer):
 
 # Sales Quotation Serializers
 class SalesQuotationLineSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)  # sent back to update a line in place
+
     class Meta:
         model = SalesQuotationLine
         fields = [
             'id', 'quotation', 'item_code', 'item_name', 'quantity',
             'unit_price', 'total_amount', 'uom', 'remarks', 'is_active'
         ]
+        extra_kwargs = {
+            'quotation': {'required': False},  # set from the document
+        }
 
 class SalesQuotationListSerializer(serializers.ModelSerializer):
     """Serializer for list view with limited fields"""
@@ -78,64 +142,21 @@ class SalesQuotationDetailSerializer(serializers.ModelSerializer):
             return f"{addr.street}, {addr.city}, {addr.state}, {addr.zip_code}, {addr.country}"
         return ""
 
-class SalesQuotationCreateUpdateSerializer(serializers.ModelSerializer):
+class SalesQuotationCreateUpdateSerializer(DocumentLinesWriteMixin, serializers.ModelSerializer):
     lines = SalesQuotationLineSerializer(many=True)
     
     class Meta:
         model = SalesQuotation
         fields = [
-            'document_date', 'valid_until', 'customer', 'contact_person',
-            'billing_address', 'shipping_address', 'currency', 'payment_terms',
+            'document_date', 'valid_until', 'customer',
             'discount_amount', 'tax_amount', 'remarks', 'status',
             'sales_employee', 'lines'
         ]
-    
-    def create(self, validated_data):
-        lines_data = validated_data.pop('lines')
-        quotation = SalesQuotation.objects.create(**validated_data)
-        
-        # Calculate total amount from lines
-        total_amount = 0
-        
-        for line_data in lines_data:
-            line = SalesQuotationLine.objects.create(quotation=quotation, **line_data)
-            total_amount += line.total_amount
-        
-        # Update quotation with calculated values
-        quotation.total_amount = total_amount
-        quotation.payable_amount = total_amount - quotation.discount_amount
-        quotation.due_amount = quotation.payable_amount - quotation.paid_amount
-        quotation.save()
-        
-        return quotation
-    
-    def update(self, instance, validated_data):
-        lines_data = validated_data.pop('lines', None)
-        
-        # Update quotation fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        
-        if lines_data is not None:
-            # Delete existing lines
-            instance.lines.all().delete()
-            
-            # Create new lines
-            total_amount = 0
-            for line_data in lines_data:
-                line = SalesQuotationLine.objects.create(quotation=instance, **line_data)
-                total_amount += line.total_amount
-            
-            # Update quotation with calculated values
-            instance.total_amount = total_amount
-            instance.payable_amount = total_amount - instance.discount_amount
-            instance.due_amount = instance.payable_amount - instance.paid_amount
-        
-        instance.save()
-        return instance
 
 # Sales Order Serializers
 class SalesOrderLineSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)  # sent back to update a line in place
+
     class Meta:
         model = SalesOrderLine
         fields = [
@@ -206,70 +227,37 @@ class SalesOrderDetailSerializer(serializers.ModelSerializer):
             return f"{addr.street}, {addr.city}, {addr.state}, {addr.zip_code}, {addr.country}"
         return ""
 
-class SalesOrderCreateUpdateSerializer(serializers.ModelSerializer):
+class SalesOrderCreateUpdateSerializer(DocumentLinesWriteMixin, serializers.ModelSerializer):
     lines = SalesOrderLineSerializer(many=True)
+    line_kind = 'order'
     
     class Meta:
         model = SalesOrder
         fields = [
-            'document_date', 'delivery_date', 'customer', 'contact_person',
-            'billing_address', 'shipping_address', 'currency', 'payment_terms',
+            'document_date', 'delivery_date', 'customer',
             'discount_amount', 'tax_amount', 'remarks', 'status',
             'sales_employee', 'lines'
         ]
-    
-    def create(self, validated_data):
-        lines_data = validated_data.pop('lines')
-        order = SalesOrder.objects.create(**validated_data)
-        
-        # Calculate total amount from lines
-        total_amount = 0
-        
-        for line_data in lines_data:
-            line = SalesOrderLine.objects.create(order=order, **line_data)
-            total_amount += line.total_amount
-        
-        # Update order with calculated values
-        order.total_amount = total_amount
-        order.payable_amount = total_amount - order.discount_amount
-        order.due_amount = order.payable_amount - order.paid_amount
-        order.save()
-        
-        return order
-    
-    def update(self, instance, validated_data):
-        lines_data = validated_data.pop('lines', None)
-        
-        # Update order fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        
-        if lines_data is not None:
-            # Delete existing lines
-            instance.lines.all().delete()
-            
-            # Create new lines
-            total_amount = 0
-            for line_data in lines_data:
-                line = SalesOrderLine.objects.create(order=instance, **line_data)
-                total_amount += line.total_amount
-            
-            # Update order with calculated values
-            instance.total_amount = total_amount
-            instance.payable_amount = total_amount - instance.discount_amount
-            instance.due_amount = instance.payable_amount - instance.paid_amount
-        
-        instance.save()
-        return instance
+
+    def check_document(self, document):
+        try:
+            check_credit_limit(document)
+        except CreditLimitExceeded as error:
+            raise serializers.ValidationError({'customer': error.messages})
 
 # Delivery Serializers
 class DeliveryLineSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)  # sent back to update a line in place
+
     class Meta:
         model = DeliveryLine
         fields = [
             'id', 'delivery', 'sales_order_line', 'item_code', 'item_name', 
             'quantity', 'unit_price', 'total_amount', 'uom', 'remarks', 'is_active'
         ]
+        extra_kwargs = {
+            'delivery': {'required': False},  # set from the document
+        }
 
 class DeliveryListSerializer(serializers.ModelSerializer):
     """Serializer for list view with limited fields"""
@@ -312,8 +300,9 @@ class DeliveryDetailSerializer(serializers.ModelSerializer):
             return f"{addr.street}, {addr.city}, {addr.state}, {addr.zip_code}, {addr.country}"
         return ""
 
-class DeliveryCreateUpdateSerializer(serializers.ModelSerializer):
+class DeliveryCreateUpdateSerializer(DocumentLinesWriteMixin, serializers.ModelSerializer):
     lines = DeliveryLineSerializer(many=True)
+    line_kind = 'delivery'
     
     class Meta:
         model = Delivery
@@ -323,59 +312,20 @@ class DeliveryCreateUpdateSerializer(serializers.ModelSerializer):
             'discount_amount', 'tax_amount', 'remarks', 'status',
             'sales_employee', 'deliveryemployee', 'lines'
         ]
-    
-    def create(self, validated_data):
-        lines_data = validated_data.pop('lines')
-        delivery = Delivery.objects.create(**validated_data)
-        
-        # Calculate total amount from lines
-        total_amount = 0
-        
-        for line_data in lines_data:
-            line = DeliveryLine.objects.create(delivery=delivery, **line_data)
-            total_amount += line.total_amount
-        
-        # Update delivery with calculated values
-        delivery.total_amount = total_amount
-        delivery.payable_amount = total_amount - delivery.discount_amount
-        delivery.due_amount = delivery.payable_amount - delivery.paid_amount
-        delivery.save()
-        
-        return delivery
-    
-    def update(self, instance, validated_data):
-        lines_data = validated_data.pop('lines', None)
-        
-        # Update delivery fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        
-        if lines_data is not None:
-            # Delete existing lines
-            instance.lines.all().delete()
-            
-            # Create new lines
-            total_amount = 0
-            for line_data in lines_data:
-                line = DeliveryLine.objects.create(delivery=instance, **line_data)
-                total_amount += line.total_amount
-            
-            # Update delivery with calculated values
-            instance.total_amount = total_amount
-            instance.payable_amount = total_amount - instance.discount_amount
-            instance.due_amount = instance.payable_amount - instance.paid_amount
-        
-        instance.save()
-        return instance
 
 # Return Serializers
 class ReturnLineSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)  # sent back to update a line in place
+
     class Meta:
         model = ReturnLine
         fields = [
             'id', 'return_doc', 'delivery_line', 'item_code', 'item_name', 
             'quantity', 'unit_price', 'total_amount', 'uom', 'remarks', 'is_active'
         ]
+        extra_kwargs = {
+            'return_doc': {'required': False},  # set from the document
+        }
 
 class ReturnListSerializer(serializers.ModelSerializer):
     """Serializer for list view with limited fields"""
@@ -418,8 +368,9 @@ class ReturnDetailSerializer(serializers.ModelSerializer):
             return f"{addr.street}, {addr.city}, {addr.state}, {addr.zip_code}, {addr.country}"
         return ""
 
-class ReturnCreateUpdateSerializer(serializers.ModelSerializer):
+class ReturnCreateUpdateSerializer(DocumentLinesWriteMixin, serializers.ModelSerializer):
     lines = ReturnLineSerializer(many=True)
+    line_kind = 'return'
     
     class Meta:
         model = Return
@@ -429,53 +380,11 @@ class ReturnCreateUpdateSerializer(serializers.ModelSerializer):
             'discount_amount', 'tax_amount', 'return_reason', 'remarks', 'status',
             'sales_employee', 'lines'
         ]
-    
-    def create(self, validated_data):
-        lines_data = validated_data.pop('lines')
-        return_doc = Return.objects.create(**validated_data)
-        
-        # Calculate total amount from lines
-        total_amount = 0
-        
-        for line_data in lines_data:
-            line = ReturnLine.objects.create(return_doc=return_doc, **line_data)
-            total_amount += line.total_amount
-        
-        # Update return with calculated values
-        return_doc.total_amount = total_amount
-        return_doc.payable_amount = total_amount - return_doc.discount_amount
-        return_doc.due_amount = return_doc.payable_amount - return_doc.paid_amount
-        return_doc.save()
-        
-        return return_doc
-    
-    def update(self, instance, validated_data):
-        lines_data = validated_data.pop('lines', None)
-        
-        # Update return fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        
-        if lines_data is not None:
-            # Delete existing lines
-            instance.lines.all().delete()
-            
-            # Create new lines
-            total_amount = 0
-            for line_data in lines_data:
-                line = ReturnLine.objects.create(return_doc=instance, **line_data)
-                total_amount += line.total_amount
-            
-            # Update return with calculated values
-            instance.total_amount = total_amount
-            instance.payable_amount = total_amount - instance.discount_amount
-            instance.due_amount = instance.payable_amount - instance.paid_amount
-        
-        instance.save()
-        return instance
 
 # AR Invoice Serializers
 class ARInvoiceLineSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)  # sent back to update a line in place
+
     class Meta:
         model = ARInvoiceLine
         fields = [
@@ -483,6 +392,9 @@ class ARInvoiceLineSerializer(serializers.ModelSerializer):
             'item_name', 'quantity', 'unit_price', 'total_amount', 'uom', 
             'remarks', 'is_active'
         ]
+        extra_kwargs = {
+            'invoice': {'required': False},  # set from the document
+        }
 
 class ARInvoiceListSerializer(serializers.ModelSerializer):
     """Serializer for list view with limited fields"""
@@ -525,7 +437,7 @@ class ARInvoiceDetailSerializer(serializers.ModelSerializer):
             return f"{addr.street}, {addr.city}, {addr.state}, {addr.zip_code}, {addr.country}"
         return ""
 
-class ARInvoiceCreateUpdateSerializer(serializers.ModelSerializer):
+class ARInvoiceCreateUpdateSerializer(DocumentLinesWriteMixin, serializers.ModelSerializer):
     lines = ARInvoiceLineSerializer(many=True)
     
     class Meta:
@@ -537,50 +449,6 @@ class ARInvoiceCreateUpdateSerializer(serializers.ModelSerializer):
             'sales_employee', 'lines'
         ]
     
-    def create(self, validated_data):
-        lines_data = validated_data.pop('lines')
-        invoice = ARInvoice.objects.create(**validated_data)
-        
-        # Calculate total amount from lines
-        total_amount = 0
-        
-        for line_data in lines_data:
-            line = ARInvoiceLine.objects.create(invoice=invoice, **line_data)
-            total_amount += line.total_amount
-        
-        # Update invoice with calculated values
-        invoice.total_amount = total_amount
-        invoice.payable_amount = total_amount - invoice.discount_amount
-        invoice.due_amount = invoice.payable_amount - invoice.paid_amount
-        invoice.save()
-        
-        return invoice
-    
-    def update(self, instance, validated_data):
-        lines_data = validated_data.pop('lines', None)
-        
-        # Update invoice fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        
-        if lines_data is not None:
-            # Delete existing lines
-            instance.lines.all().delete()
-            
-            # Create new lines
-            total_amount = 0
-            for line_data in lines_data:
-                line = ARInvoiceLine.objects.create(invoice=instance, **line_data)
-                total_amount += line.total_amount
-            
-            # Update invoice with calculated values
-            instance.total_amount = total_amount
-            instance.payable_amount = total_amount - instance.discount_amount
-            instance.due_amount = instance.payable_amount - instance.paid_amount
-        
-        instance.save()
-        return instance
-    
     
 
 # Add this to your existing serializers.py file
@@ -1,12 +1,13 @@
 # This file shows how to properly tag your views for the hierarchical documentation
 
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated,BasePermission
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils.timezone import now
+from django.db import transaction
 from django.db.models import Sum
 from rest_framework.views import APIView
 from datetime import timedelta
@@ -32,6 +33,31 @@ from .serializers import (
 )
 from .permissions import SalesHasDynamicModelPermission
 
+BULK_MAX_DOCUMENTS = 100
+
+
+class BulkDocumentCreateMixin:
+    """
+    Creates many documents from one request body: a list of create payloads.
+    Every document is validated before any is written, and all are saved in one
+    transaction with their lines written in bulk.
+    """
+    def bulk_create_documents(self, request, result_serializer_class):
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of documents.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > BULK_MAX_DOCUMENTS:
+            return Response(
+                {'detail': f'At most {BULK_MAX_DOCUMENTS} documents can be sent per request.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            documents = serializer.save()
+        # Read back so the response carries stored values (dates, document numbers)
+        documents = self.queryset.model.objects.filter(pk__in=[document.pk for document in documents]).order_by('id')
+        return Response(result_serializer_class(documents, many=True).data, status=status.HTTP_201_CREATED)
+
 # Add tags to each ViewSet to ensure proper categorization in the documentation
 
 class SalesEmployeeViewSet(viewsets.ModelViewSet):
@@ -101,7 +127,7 @@ class SalesEmployeeViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
-class SalesQuotationViewSet(viewsets.ModelViewSet):
+class SalesQuotationViewSet(BulkDocumentCreateMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing Sales Quotations.
     
@@ -123,18 +149,13 @@ class SalesQuotationViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'list':
             return SalesQuotationListSerializer
-        elif self.action in ['create', 'update', 'partial_update']:
+        elif self.action in ['create', 'update', 'partial_update', 'bulk']:
             return SalesQuotationCreateUpdateSerializer
         return SalesQuotationDetailSerializer
 
     def get_queryset(self):
         queryset = SalesQuotation.objects.select_related(
             'customer', 
-            'contact_person',
-            'billing_address',
-            'shipping_address',
-            'currency',
-            'payment_terms',
             'sales_employee'
         ).prefetch_related('lines')
         
@@ -212,7 +233,19 @@ class SalesQuotationViewSet(viewsets.ModelViewSet):
         serializer = SalesQuotationLineSerializer(lines, many=True)
         return Response(serializer.data)
 
-class SalesOrderViewSet(viewsets.ModelViewSet):
+    @swagger_auto_schema(
+        operation_summary="Create sales quotations in bulk",
+        operation_description="Creates many sales quotations from a list of documents in one transaction. "
+                              "Lines are written in bulk and their side effects applied once per document.",
+        request_body=SalesQuotationCreateUpdateSerializer(many=True),
+        responses={201: SalesQuotationListSerializer(many=True)},
+        tags=['Sales Quotations']
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        return self.bulk_create_documents(request, SalesQuotationListSerializer)
+
+class SalesOrderViewSet(BulkDocumentCreateMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing Sales Orders.
     
@@ -235,18 +268,13 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'list':
             return SalesOrderListSerializer
-        elif self.action in ['create', 'update', 'partial_update']:
+        elif self.action in ['create', 'update', 'partial_update', 'bulk']:
             return SalesOrderCreateUpdateSerializer
         return SalesOrderDetailSerializer
 
     def get_queryset(self):
         queryset = SalesOrder.objects.select_related(
             'customer', 
-            'contact_person',
-            'billing_address',
-            'shipping_address',
-            'currency',
-            'payment_terms',
             'sales_employee'
         ).prefetch_related('lines')
         
@@ -324,7 +352,19 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
         serializer = SalesOrderLineSerializer(lines, many=True)
         return Response(serializer.data)
 
-class DeliveryViewSet(viewsets.ModelViewSet):
+    @swagger_auto_schema(
+        operation_summary="Create sales orders in bulk",
+        operation_description="Creates many sales orders from a list of documents in one transaction. "
+                              "Lines are written in bulk and their side effects applied once per document.",
+        request_body=SalesOrderCreateUpdateSerializer(many=True),
+        responses={201: SalesOrderListSerializer(many=True)},
+        tags=['Sales Orders']
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        return self.bulk_create_documents(request, SalesOrderListSerializer)
+
+class DeliveryViewSet(BulkDocumentCreateMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing Deliveries.
     
@@ -347,7 +387,7 @@ class DeliveryViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'list':
             return DeliveryListSerializer
-        elif self.action in ['create', 'update', 'partial_update']:
+        elif self.action in ['create', 'update', 'partial_update', 'bulk']:
             return DeliveryCreateUpdateSerializer
         return DeliveryDetailSerializer
 
@@ -436,7 +476,19 @@ class DeliveryViewSet(viewsets.ModelViewSet):
         serializer = DeliveryLineSerializer(lines, many=True)
         return Response(serializer.data)
 
-class ReturnViewSet(viewsets.ModelViewSet):
+    @swagger_auto_schema(
+        operation_summary="Create deliveries in bulk",
+        operation_description="Creates many deliveries from a list of documents in one transaction. "
+                              "Lines are written in bulk and their side effects applied once per document.",
+        request_body=DeliveryCreateUpdateSerializer(many=True),
+        responses={201: DeliveryListSerializer(many=True)},
+        tags=['Deliveries']
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        return self.bulk_create_documents(request, DeliveryListSerializer)
+
+class ReturnViewSet(BulkDocumentCreateMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing Returns.
     
@@ -458,7 +510,7 @@ class ReturnViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'list':
             return ReturnListSerializer
-        elif self.action in ['create', 'update', 'partial_update']:
+        elif self.action in ['create', 'update', 'partial_update', 'bulk']:
             return ReturnCreateUpdateSerializer
         return ReturnDetailSerializer
 
@@ -547,7 +599,19 @@ class ReturnViewSet(viewsets.ModelViewSet):
         serializer = ReturnLineSerializer(lines, many=True)
         return Response(serializer.data)
 
-class ARInvoiceViewSet(viewsets.ModelViewSet):
+    @swagger_auto_schema(
+        operation_summary="Create returns in bulk",
+        operation_description="Creates many returns from a list of documents in one transaction. "
+                              "Lines are written in bulk and their side effects applied once per document.",
+        request_body=ReturnCreateUpdateSerializer(many=True),
+        responses={201: ReturnListSerializer(many=True)},
+        tags=['Returns']
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        return self.bulk_create_documents(request, ReturnListSerializer)
+
+class ARInvoiceViewSet(BulkDocumentCreateMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing AR Invoices (Accounts Receivable Invoices).
     
@@ -569,7 +633,7 @@ class ARInvoiceViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'list':
             return ARInvoiceListSerializer
-        elif self.action in ['create', 'update', 'partial_update']:
+        elif self.action in ['create', 'update', 'partial_update', 'bulk']:
             return ARInvoiceCreateUpdateSerializer
         return ARInvoiceDetailSerializer
 
@@ -658,6 +722,18 @@ class ARInvoiceViewSet(viewsets.ModelViewSet):
         lines = invoice.lines.all()
         serializer = ARInvoiceLineSerializer(lines, many=True)
         return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_summary="Create AR invoices in bulk",
+        operation_description="Creates many AR invoices from a list of documents in one transaction. "
+                              "Lines are written in bulk and their side effects applied once per document.",
+        request_body=ARInvoiceCreateUpdateSerializer(many=True),
+        responses={201: ARInvoiceListSerializer(many=True)},
+        tags=['AR Invoices']
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        return self.bulk_create_documents(request, ARInvoiceListSerializer)
     
 
 from rest_framework import status
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from Sales.utils import rebuild_sales_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales rollup (SalesDailySummary / SalesDailyItemSummary) from orders and returns"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start_date', type=parse_date, help="First document date to rebuild (YYYY-MM-DD).")
+        parser.add_argument('--to', dest='end_date', type=parse_date, help="Last document date to rebuild (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        stats = rebuild_sales_rollup(start_date=options['start_date'], end_date=options['end_date'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {stats['summaries']} daily summaries and {stats['item_summaries']} item summaries."
+        ))
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.20 on 2026-10-19 12:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BusinessPartnerMasterData', '0001_initial'),
+        ('Sales', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summary_date', models.DateField(verbose_name='Summary Date')),
+                ('order_count', models.IntegerField(default=0, verbose_name='Order Count')),
+                ('order_amount', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Order Amount')),
+                ('return_count', models.IntegerField(default=0, verbose_name='Return Count')),
+                ('return_amount', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Return Amount')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_daily_summaries', to='BusinessPartnerMasterData.businesspartner', verbose_name='Customer')),
+                ('sales_employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sales_daily_summaries', to='Sales.salesemployee', verbose_name='Sales Employee')),
+            ],
+            options={
+                'verbose_name': 'Sales Daily Summary',
+                'verbose_name_plural': 'Sales Daily Summaries',
+                'ordering': ['-summary_date'],
+                'indexes': [models.Index(fields=['summary_date'], name='Sales_sales_summary_6ef7b6_idx'), models.Index(fields=['sales_employee', 'summary_date'], name='Sales_sales_sales_e_a3078b_idx')],
+                'unique_together': {('summary_date', 'customer', 'sales_employee')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SalesDailyItemSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summary_date', models.DateField(verbose_name='Summary Date')),
+                ('item_code', models.CharField(max_length=50, verbose_name='Item Code')),
+                ('item_name', models.CharField(blank=True, max_length=100, null=True, verbose_name='Item Name')),
+                ('quantity', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Quantity')),
+                ('sales_amount', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Sales Amount')),
+                ('return_quantity', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Return Quantity')),
+                ('return_amount', models.DecimalField(decimal_places=6, default=0, max_digits=18, verbose_name='Return Amount')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_daily_item_summaries', to='BusinessPartnerMasterData.businesspartner', verbose_name='Customer')),
+                ('sales_employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sales_daily_item_summaries', to='Sales.salesemployee', verbose_name='Sales Employee')),
+            ],
+            options={
+                'verbose_name': 'Sales Daily Item Summary',
+                'verbose_name_plural': 'Sales Daily Item Summaries',
+                'ordering': ['-summary_date', 'item_code'],
+                'indexes': [models.Index(fields=['summary_date', 'item_code'], name='Sales_sales_summary_3b6a25_idx')],
+                'unique_together': {('summary_date', 'item_code', 'customer', 'sales_employee')},
+            },
+        ),
+    ]
@@ -636,3 +636,54 @@ class FreeItemDiscount(BaseModel):
 
     def __str__(self):
         return f"Buy {self.buy_quantity} of {self.item.name} get {self.free_quantity} of {self.free_item.name} free"
+
+
+class SalesDailySummary(models.Model):
+    """Per-day order and return totals by customer and sales employee, maintained from SalesOrder/Return signals"""
+    summary_date = models.DateField(_("Summary Date"))
+    customer = models.ForeignKey(BusinessPartner, on_delete=models.CASCADE, related_name='sales_daily_summaries', verbose_name=_("Customer"))
+    sales_employee = models.ForeignKey(SalesEmployee, on_delete=models.SET_NULL, null=True, blank=True, related_name='sales_daily_summaries', verbose_name=_("Sales Employee"))
+    order_count = models.IntegerField(_("Order Count"), default=0)
+    order_amount = models.DecimalField(_("Order Amount"), max_digits=18, decimal_places=6, default=0)
+    return_count = models.IntegerField(_("Return Count"), default=0)
+    return_amount = models.DecimalField(_("Return Amount"), max_digits=18, decimal_places=6, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('summary_date', 'customer', 'sales_employee')
+        indexes = [
+            models.Index(fields=['summary_date']),
+            models.Index(fields=['sales_employee', 'summary_date']),
+        ]
+        ordering = ['-summary_date']
+        verbose_name = _("Sales Daily Summary")
+        verbose_name_plural = _("Sales Daily Summaries")
+
+    def __str__(self):
+        return f"{self.summary_date} - {self.customer_id} / {self.sales_employee_id}"
+
+
+class SalesDailyItemSummary(models.Model):
+    """Per-day item quantities and amounts by customer and sales employee, maintained from order/return line signals"""
+    summary_date = models.DateField(_("Summary Date"))
+    item_code = models.CharField(_("Item Code"), max_length=50)
+    item_name = models.CharField(_("Item Name"), max_length=100, blank=True, null=True)
+    customer = models.ForeignKey(BusinessPartner, on_delete=models.CASCADE, related_name='sales_daily_item_summaries', verbose_name=_("Customer"))
+    sales_employee = models.ForeignKey(SalesEmployee, on_delete=models.SET_NULL, null=True, blank=True, related_name='sales_daily_item_summaries', verbose_name=_("Sales Employee"))
+    quantity = models.DecimalField(_("Quantity"), max_digits=18, decimal_places=6, default=0)
+    sales_amount = models.DecimalField(_("Sales Amount"), max_digits=18, decimal_places=6, default=0)
+    return_quantity = models.DecimalField(_("Return Quantity"), max_digits=18, decimal_places=6, default=0)
+    return_amount = models.DecimalField(_("Return Amount"), max_digits=18, decimal_places=6, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('summary_date', 'item_code', 'customer', 'sales_employee')
+        indexes = [
+            models.Index(fields=['summary_date', 'item_code']),
+        ]
+        ordering = ['-summary_date', 'item_code']
+        verbose_name = _("Sales Daily Item Summary")
+        verbose_name_plural = _("Sales Daily Item Summaries")
+
+    def __str__(self):
+        return f"{self.summary_date} - {self.item_code}"
@@ -2,4 +2,5 @@ from .sales_signals import *
 from .delivery_signals import *
 from .return_signals import *
 from .discount_signal import *
-
+from .sales_rollup_signals import *
+from .report_cache_signals import *
@@ -1,6 +1,7 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from Sales.models import DeliveryLine
+from Sales.utils import in_bulk_line_write
 from Inventory.models import ItemWarehouseInfo, Item, InventoryTransaction
 from django.db import transaction
 from decimal import Decimal
@@ -16,6 +17,8 @@ def handle_delivery_line_save(sender, instance, created, **kwargs):
     - committed কমবে বা বাড়বে
     - InventoryTransaction আপডেট হবে
     """
+    if in_bulk_line_write():
+        return
     try:
         item = Item.objects.get(code=instance.item_code)
         warehouse = item.default_warehouse
@@ -86,6 +89,8 @@ def handle_delivery_line_delete(sender, instance, **kwargs):
     - committed বাড়বে
     - InventoryTransaction delete হবে
     """
+    if in_bulk_line_write():
+        return
     try:
         item = Item.objects.get(code=instance.item_code)
         warehouse = item.default_warehouse
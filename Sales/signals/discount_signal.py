@@ -1,17 +1,20 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from Sales.models import SalesOrder, SalesOrderLine
-from Sales.utils import apply_free_items, adjust_committed_quantity
+from Sales.utils import apply_free_items, adjust_committed_quantity, in_bulk_line_write
 
 @receiver(post_save, sender=SalesOrder)
 def handle_sales_order_update(sender, instance, created, **kwargs):
     if instance.status == "Open":
         apply_free_items(instance)
-        for line in instance.lines.all():
+        # Committed is recomputed per item, so one line of each item is enough
+        for line in {line.item_code: line for line in instance.lines.all()}.values():
             adjust_committed_quantity(line)
 
 @receiver(post_save, sender=SalesOrderLine)
 def handle_sales_order_line_change(sender, instance, created, **kwargs):
+    if in_bulk_line_write():  # the document save applies free items once
+        return
     if instance.remarks == "Free Item (Auto)":  # ✅ Prevent infinite recursion
         return
     if instance.order.status == "Open":
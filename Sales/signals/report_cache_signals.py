@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from Sales.models import (
+    SalesQuotation, SalesQuotationLine, SalesOrder, SalesOrderLine,
+    Delivery, DeliveryLine, Return, ReturnLine, ARInvoice, ARInvoiceLine,
+)
+from Sales.utils import invalidate_sales_report_cache, in_bulk_line_write
+
+# Document model whose cached report results depend on each sender
+REPORT_CACHE_MODELS = {
+    SalesQuotation: SalesQuotation, SalesQuotationLine: SalesQuotation,
+    SalesOrder: SalesOrder, SalesOrderLine: SalesOrder,
+    Delivery: Delivery, DeliveryLine: Delivery,
+    Return: Return, ReturnLine: Return,
+    ARInvoice: ARInvoice, ARInvoiceLine: ARInvoice,
+}
+
+
+def invalidate_report_cache_for(sender, **kwargs):
+    """
+    Any saved or deleted document or line makes the cached report totals of its document type stale.
+    """
+    if in_bulk_line_write():  # the document save that follows invalidates once
+        return
+    model = REPORT_CACHE_MODELS[sender]
+    transaction.on_commit(lambda: invalidate_sales_report_cache(model))
+
+
+for report_sender in REPORT_CACHE_MODELS:
+    post_save.connect(invalidate_report_cache_for, sender=report_sender, dispatch_uid=f'sales_report_cache_save_{report_sender.__name__}')
+    post_delete.connect(invalidate_report_cache_for, sender=report_sender, dispatch_uid=f'sales_report_cache_delete_{report_sender.__name__}')
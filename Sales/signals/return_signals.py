@@ -4,6 +4,7 @@ from django.db import transaction
 from decimal import Decimal
 
 from Sales.models import ReturnLine
+from Sales.utils import in_bulk_line_write
 from Inventory.models import InventoryTransaction, Item, ItemWarehouseInfo
 
 @receiver(post_save, sender=ReturnLine)
@@ -13,6 +14,8 @@ def create_return_transaction(sender, instance, created, **kwargs):
     - Increases in_stock in ItemWarehouseInfo (does not affect committed).
     - Records a RETURN transaction in InventoryTransaction.
     """
+    if in_bulk_line_write():
+        return
     if instance.return_doc.status != "Open":
         return  # Only process returns with status 'Open'
 
@@ -77,6 +80,8 @@ def delete_return_transaction(sender, instance, **kwargs):
     - Reduces in_stock in ItemWarehouseInfo (does not affect committed).
     - Deletes the corresponding RETURN transaction.
     """
+    if in_bulk_line_write():
+        return
     if instance.return_doc.status != "Open":
         return  # Only process returns with status 'Open'
 
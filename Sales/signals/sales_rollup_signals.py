@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from Sales.models import SalesOrder, SalesOrderLine, Return, ReturnLine
+from Sales.utils import (
+    get_document_rollup_state, get_line_rollup_state, same_rollup_key,
+    post_document_to_rollup, post_line_to_rollup, move_lines_in_rollup,
+    invalidate_sales_dashboard_cache, in_bulk_line_write,
+)
+
+# ------------------------------------------
+# ✅ SalesOrder / Return header -> SalesDailySummary
+# ------------------------------------------
+ROLLUP_DOCUMENTS = {SalesOrder: 'order', Return: 'return'}
+
+
+@receiver(pre_save, sender=SalesOrder)
+@receiver(pre_save, sender=Return)
+def remember_document_rollup_state(sender, instance, **kwargs):
+    """
+    Keep the stored header values so post_save can take them out of the rollup.
+    """
+    instance._rollup_previous_state = None
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).first()
+        if previous:
+            instance._rollup_previous_state = get_document_rollup_state(previous)
+
+
+@receiver(post_save, sender=SalesOrder)
+@receiver(post_save, sender=Return)
+def update_document_rollup(sender, instance, created, **kwargs):
+    """
+    Swap the previous header values for the new ones in the daily summary.
+    Lines follow their document when its date, customer or sales employee changes.
+    """
+    kind = ROLLUP_DOCUMENTS[sender]
+    previous = getattr(instance, '_rollup_previous_state', None)
+    current = get_document_rollup_state(instance)
+    if previous == current:
+        return
+
+    with transaction.atomic():
+        if previous:
+            post_document_to_rollup(kind, previous, sign=-1)
+        post_document_to_rollup(kind, current, sign=1)
+        if previous and not same_rollup_key(previous, current):
+            move_lines_in_rollup(kind, instance.lines.all(), previous, current)
+    transaction.on_commit(invalidate_sales_dashboard_cache)
+
+
+@receiver(post_delete, sender=SalesOrder)
+@receiver(post_delete, sender=Return)
+def remove_document_rollup(sender, instance, **kwargs):
+    post_document_to_rollup(ROLLUP_DOCUMENTS[sender], get_document_rollup_state(instance), sign=-1)
+    transaction.on_commit(invalidate_sales_dashboard_cache)
+
+
+# ------------------------------------------
+# ✅ SalesOrderLine / ReturnLine -> SalesDailyItemSummary
+# ------------------------------------------
+ROLLUP_LINES = {SalesOrderLine: ('order', 'order'), ReturnLine: ('return', 'return_doc')}
+
+
+def get_line_document(sender, instance):
+    return getattr(instance, ROLLUP_LINES[sender][1])
+
+
+@receiver(pre_save, sender=SalesOrderLine)
+@receiver(pre_save, sender=ReturnLine)
+def remember_line_rollup_state(sender, instance, **kwargs):
+    if in_bulk_line_write():
+        return
+    instance._rollup_previous_state = None
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).first()
+        if previous:
+            instance._rollup_previous_state = (
+                get_document_rollup_state(get_line_document(sender, previous)),
+                get_line_rollup_state(previous),
+            )
+
+
+@receiver(post_save, sender=SalesOrderLine)
+@receiver(post_save, sender=ReturnLine)
+def update_line_rollup(sender, instance, created, **kwargs):
+    if in_bulk_line_write():
+        return
+    kind = ROLLUP_LINES[sender][0]
+    previous = getattr(instance, '_rollup_previous_state', None)
+    current = (get_document_rollup_state(get_line_document(sender, instance)), get_line_rollup_state(instance))
+    if previous == current:
+        return
+
+    with transaction.atomic():
+        if previous:
+            post_line_to_rollup(kind, *previous, sign=-1)
+        post_line_to_rollup(kind, *current, sign=1)
+    transaction.on_commit(invalidate_sales_dashboard_cache)
+
+
+@receiver(pre_delete, sender=SalesOrderLine)
+@receiver(pre_delete, sender=ReturnLine)
+def remember_deleted_line_rollup_state(sender, instance, **kwargs):
+    """
+    Read the document while it still exists; lines are deleted before their document on cascade.
+    """
+    if in_bulk_line_write():
+        return
+    instance._rollup_delete_state = (
+        get_document_rollup_state(get_line_document(sender, instance)),
+        get_line_rollup_state(instance),
+    )
+
+
+@receiver(post_delete, sender=SalesOrderLine)
+@receiver(post_delete, sender=ReturnLine)
+def remove_line_rollup(sender, instance, **kwargs):
+    if in_bulk_line_write():
+        return
+    state = getattr(instance, '_rollup_delete_state', None)
+    if state:
+        post_line_to_rollup(ROLLUP_LINES[sender][0], *state, sign=-1)
+        transaction.on_commit(invalidate_sales_dashboard_cache)
@@ -1,6 +1,7 @@
 from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 from Sales.models import SalesOrderLine
+from Sales.utils import in_bulk_line_write
 from Inventory.models import ItemWarehouseInfo, Item, InventoryTransaction
 from django.db import transaction
 from decimal import Decimal
@@ -15,6 +16,8 @@ def handle_sales_orderline_commit_stock(sender, instance, created, **kwargs):
     - in_stock এবং committed আপডেট হবে
     - InventoryTransaction তৈরি বা আপডেট হবে
     """
+    if in_bulk_line_write():
+        return
     try:
         item = Item.objects.get(code=instance.item_code)
         warehouse = item.default_warehouse
@@ -85,6 +88,8 @@ def delete_sales_orderline_commit_stock(sender, instance, **kwargs):
     - committed বাড়বে
     - InventoryTransaction ডিলিট হবে
     """
+    if in_bulk_line_write():
+        return
     try:
         item = Item.objects.get(code=instance.item_code)
         warehouse = item.default_warehouse
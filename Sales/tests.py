@@ -1,3 +1,125 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from BusinessPartnerMasterData.models import BusinessPartner
+from config.pagination import get_row_count, reset_row_count
+from Inventory.models import InventoryTransaction, Item, ItemGroup, ItemWarehouseInfo, UnitOfMeasure, Warehouse
+from Sales.models import SalesOrder, SalesOrderLine
+from Sales.utils import get_previous_period, write_document_lines
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sales-tests-default'},
+    'reports': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sales-tests-reports'},
+}
+LINES = [('A', Decimal('3'), Decimal('10')), ('B', Decimal('5'), Decimal('20')), ('A', Decimal('2'), Decimal('10'))]
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BulkLineStockParityTests(TestCase):
+    def setUp(self):
+        uom = UnitOfMeasure.objects.create(code='EA', name='Each')
+        group = ItemGroup.objects.create(code='G', name='Goods')
+        warehouse = Warehouse.objects.create(code='W1', name='Main')
+        for code in ('A', 'B'):
+            item = Item.objects.create(
+                code=code, name=f'Item {code}', item_group=group, inventory_uom=uom, purchase_uom=uom,
+                sales_uom=uom, default_warehouse=warehouse,
+            )
+            ItemWarehouseInfo.objects.update_or_create(
+                item=item, warehouse=warehouse, defaults={'in_stock': Decimal('100'), 'committed': Decimal('50')},
+            )
+        self.customer = BusinessPartner.objects.create(code='C1', name='Customer', bp_type='C')
+
+    def create_order(self):
+        return SalesOrder.objects.create(
+            customer=self.customer, document_date=timezone.localdate(), status='Open',
+            total_amount=Decimal('0'), payable_amount=Decimal('0'), due_amount=Decimal('0'),
+        )
+
+    def get_stock(self):
+        return {
+            info.item.code: (info.in_stock, info.committed)
+            for info in ItemWarehouseInfo.objects.select_related('item')
+        }
+
+    def get_in_stock_change(self, before, after):
+        # Committed is not compared: the order line signals recompute it from the whole order
+        return {code: after[code][0] - before[code][0] for code in after}
+
+    def get_transactions(self, order):
+        return dict(
+            InventoryTransaction.objects.filter(transaction_type='SALE', reference__startswith=f'SO-{order.pk}-')
+            .values_list('reference', 'quantity')
+        )
+
+    def get_expected_transactions(self, order):
+        return {f'SO-{order.pk}-{line.pk}': line.quantity for line in order.lines.all()}
+
+    def write_lines(self, order, lines):
+        return write_document_lines(order, [
+            {'item_code': code, 'item_name': f'Item {code}', 'quantity': quantity, 'unit_price': price}
+            for code, quantity, price in lines
+        ], kind='order')
+
+    def test_bulk_lines_post_the_same_stock_as_line_signals(self):
+        before = self.get_stock()
+        signal_order = self.create_order()
+        for code, quantity, price in LINES:
+            SalesOrderLine.objects.create(
+                order=signal_order, item_code=code, item_name=f'Item {code}', quantity=quantity, unit_price=price,
+            )
+        after_signals = self.get_stock()
+
+        bulk_order = self.create_order()
+        self.write_lines(bulk_order, LINES)
+
+        self.assertEqual(
+            self.get_in_stock_change(after_signals, self.get_stock()), self.get_in_stock_change(before, after_signals),
+        )
+        self.assertEqual(self.get_in_stock_change(before, after_signals), {'A': Decimal('-5'), 'B': Decimal('-5')})
+        self.assertEqual(self.get_transactions(signal_order), self.get_expected_transactions(signal_order))
+        self.assertEqual(self.get_transactions(bulk_order), self.get_expected_transactions(bulk_order))
+
+    def test_lines_are_referenced_when_the_backend_returns_no_pks(self):
+        order = self.create_order()
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            lines = self.write_lines(order, LINES)
+            self.assertTrue(all(line.pk for line in lines))
+            self.assertEqual(self.get_transactions(order), self.get_expected_transactions(order))
+
+            # Update the first line, drop the others and add one
+            first = lines[0]
+            write_document_lines(order, [
+                {'id': first.pk, 'item_code': 'A', 'item_name': 'Item A', 'quantity': Decimal('4'),
+                 'unit_price': Decimal('10')},
+                {'item_code': 'B', 'item_name': 'Item B', 'quantity': Decimal('1'), 'unit_price': Decimal('20')},
+            ], kind='order')
+
+        self.assertEqual(order.lines.count(), 2)
+        self.assertEqual(self.get_transactions(order), self.get_expected_transactions(order))
+        self.assertEqual(self.get_stock(), {'A': (Decimal('96'), Decimal('46')), 'B': (Decimal('99'), Decimal('49'))})
+
+    def test_bulk_written_transactions_are_counted(self):
+        reset_row_count(InventoryTransaction)
+        get_row_count(InventoryTransaction)
+        order = self.create_order()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.write_lines(order, LINES)
+
+        self.assertEqual(get_row_count(InventoryTransaction), InventoryTransaction.objects.count())
+
+
+class PreviousPeriodTests(SimpleTestCase):
+    def test_whole_months_are_compared_with_as_many_months_before(self):
+        self.assertEqual(get_previous_period(date(2026, 3, 1), date(2026, 3, 31)), (date(2026, 2, 1), date(2026, 2, 28)))
+        self.assertEqual(get_previous_period(date(2026, 1, 1), date(2026, 3, 31)), (date(2025, 10, 1), date(2025, 12, 31)))
+
+    def test_partial_month_from_the_first_is_shifted_by_its_length(self):
+        self.assertEqual(get_previous_period(date(2026, 3, 1), date(2026, 4, 15)), (date(2026, 1, 14), date(2026, 2, 28)))
+        self.assertEqual(get_previous_period(date(2026, 3, 1), date(2026, 3, 15)), (date(2026, 2, 14), date(2026, 2, 28)))
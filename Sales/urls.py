@@ -36,7 +36,7 @@ from .views import (
   ConvertDeliveryToInvoiceView,
   demo_views,
   # Dashboard views
-  SalesDashboardView, SalesDashboardChartView,
+  SalesDashboardView, SalesDashboardChartView, SalesDashboardChartDataView,
   
     FreeItemDiscountListView, FreeItemDiscountCreateView, FreeItemDiscountUpdateView,
     FreeItemDiscountDetailView, FreeItemDiscountDeleteView,
@@ -159,6 +159,7 @@ urlpatterns = [
   path('dashboard/chart/daily/', SalesDashboardChartView.as_view(), {'period': 'daily'}, name='dashboard_chart_daily'),
   path('dashboard/chart/monthly/', SalesDashboardChartView.as_view(), {'period': 'monthly'}, name='dashboard_chart_monthly'),
   path('dashboard/chart/', SalesDashboardChartView.as_view(), name='dashboard_chart'),
+  path('dashboard/chart/data/<str:chart>/', SalesDashboardChartDataView.as_view(), name='dashboard_chart_data'),
   
     # Dashboard URLs
   path('dashboard/daily/', SalesDashboardView.as_view(), {'period': 'daily'}, name='dashboard_daily'),
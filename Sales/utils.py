@@ -239,9 +239,16 @@ def apply_free_items(order):
     # Remove old auto-added free items before recalculating
     order.lines.filter(remarks="Free Item (Auto)").delete()
 
-    for line in order.lines.exclude(remarks="Free Item (Auto)"):
-        discounts = FreeItemDiscount.objects.filter(item__code=line.item_code)
-        for discount in discounts:
+    lines = list(order.lines.exclude(remarks="Free Item (Auto)"))
+    # All discount rules for the order's items in one query
+    discounts_by_item = {}
+    for discount in FreeItemDiscount.objects.filter(
+        item__code__in={line.item_code for line in lines}
+    ).select_related('item', 'free_item'):
+        discounts_by_item.setdefault(discount.item.code, []).append(discount)
+
+    for line in lines:
+        for discount in discounts_by_item.get(line.item_code, []):
             free_qty = (line.quantity // discount.buy_quantity) * discount.free_quantity
             if free_qty > 0:
                 free_line = SalesOrderLine.objects.create(
@@ -255,4 +262,646 @@ def apply_free_items(order):
                 )
                 adjust_committed_quantity(free_line)  # Immediately update committed for this free item
 
-    del order._applying_free_items
\ No newline at end of file
+    del order._applying_free_items
+
+# ------------------------------------------
+# Daily sales rollup (SalesDailySummary / SalesDailyItemSummary)
+# ------------------------------------------
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F, Count
+from django.db.models.functions import TruncMonth
+
+from config.pagination import adjust_row_count
+from config.report_cache import SALES_ROLLUP_TAG, get_cached_report, invalidate_report_tags
+
+SALES_DASHBOARD_CACHE_TIMEOUT = 60  # seconds
+
+# Rollup fields touched by each document kind: (count, amount) on the daily summary,
+# (quantity, amount) on the item summary
+ROLLUP_DOCUMENT_FIELDS = {
+    'order': ('order_count', 'order_amount'),
+    'return': ('return_count', 'return_amount'),
+}
+ROLLUP_LINE_FIELDS = {
+    'order': ('quantity', 'sales_amount'),
+    'return': ('return_quantity', 'return_amount'),
+}
+
+
+def get_document_rollup_state(document):
+    """
+    Returns the rollup key and amount of a SalesOrder or Return.
+    """
+    return {
+        'summary_date': document.document_date,
+        'customer_id': document.customer_id,
+        'sales_employee_id': document.sales_employee_id,
+        'amount': document.total_amount or Decimal('0'),
+    }
+
+
+def get_line_rollup_state(line):
+    """
+    Returns the item and amounts of a SalesOrderLine or ReturnLine.
+    """
+    return {
+        'item_code': line.item_code,
+        'item_name': line.item_name,
+        'quantity': line.quantity or Decimal('0'),
+        'amount': line.total_amount or Decimal('0'),
+    }
+
+
+def same_rollup_key(previous, current):
+    return all(previous[key] == current[key] for key in ('summary_date', 'customer_id', 'sales_employee_id'))
+
+
+def _post_rollup_row(model, key, deltas):
+    """
+    Adds deltas to a rollup row with F() expressions, creating the row if needed.
+    """
+    if not key.get('customer_id') or key.get('summary_date') is None:
+        return
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    lookup = {field: value for field, value in key.items() if field != 'item_name'}
+    defaults = {'item_name': key['item_name']} if 'item_name' in key else {}
+    row, created = model.objects.get_or_create(**lookup, defaults=defaults)
+    model.objects.filter(pk=row.pk).update(**{field: F(field) + value for field, value in deltas.items()})
+
+
+def post_document_to_rollup(kind, state, sign=1):
+    """
+    Adds (sign=1) or removes (sign=-1) one order/return header from SalesDailySummary.
+    """
+    from .models import SalesDailySummary
+    count_field, amount_field = ROLLUP_DOCUMENT_FIELDS[kind]
+    key = {
+        'summary_date': state['summary_date'],
+        'customer_id': state['customer_id'],
+        'sales_employee_id': state['sales_employee_id'],
+    }
+    _post_rollup_row(SalesDailySummary, key, {count_field: sign, amount_field: sign * state['amount']})
+
+
+def post_line_to_rollup(kind, document_state, line_state, sign=1):
+    """
+    Adds (sign=1) or removes (sign=-1) one order/return line from SalesDailyItemSummary.
+    """
+    from .models import SalesDailyItemSummary
+    quantity_field, amount_field = ROLLUP_LINE_FIELDS[kind]
+    key = {
+        'summary_date': document_state['summary_date'],
+        'customer_id': document_state['customer_id'],
+        'sales_employee_id': document_state['sales_employee_id'],
+        'item_code': line_state['item_code'],
+        'item_name': line_state['item_name'],
+    }
+    _post_rollup_row(SalesDailyItemSummary, key, {
+        quantity_field: sign * line_state['quantity'],
+        amount_field: sign * line_state['amount'],
+    })
+
+
+def move_lines_in_rollup(kind, lines, previous_state, current_state):
+    """
+    Moves the item rollup of a document's lines when its date, customer or sales employee changes.
+    """
+    for line in lines:
+        line_state = get_line_rollup_state(line)
+        post_line_to_rollup(kind, previous_state, line_state, sign=-1)
+        post_line_to_rollup(kind, current_state, line_state, sign=1)
+
+
+def rebuild_sales_rollup(start_date=None, end_date=None):
+    """
+    Recomputes the daily sales rollup from SalesOrder/Return and their lines.
+    Rows in the date range are replaced, so this also repairs drift from bulk updates.
+    """
+    from .models import (
+        SalesOrder, SalesOrderLine, Return, ReturnLine,
+        SalesDailySummary, SalesDailyItemSummary,
+    )
+
+    def date_filter(prefix):
+        filters = {}
+        if start_date:
+            filters[f'{prefix}document_date__gte'] = start_date
+        if end_date:
+            filters[f'{prefix}document_date__lte'] = end_date
+        return filters
+
+    summaries = {}
+    for kind, model in (('order', SalesOrder), ('return', Return)):
+        count_field, amount_field = ROLLUP_DOCUMENT_FIELDS[kind]
+        rows = model.objects.filter(**date_filter('')).values(
+            'document_date', 'customer_id', 'sales_employee_id'
+        ).annotate(doc_count=Count('id'), doc_amount=Sum('total_amount')).order_by()
+        for row in rows:
+            key = (row['document_date'], row['customer_id'], row['sales_employee_id'])
+            summary = summaries.setdefault(key, SalesDailySummary(
+                summary_date=key[0], customer_id=key[1], sales_employee_id=key[2]
+            ))
+            setattr(summary, count_field, row['doc_count'])
+            setattr(summary, amount_field, row['doc_amount'] or 0)
+
+    item_summaries = {}
+    for kind, model, parent in (('order', SalesOrderLine, 'order'), ('return', ReturnLine, 'return_doc')):
+        quantity_field, amount_field = ROLLUP_LINE_FIELDS[kind]
+        rows = model.objects.filter(**date_filter(f'{parent}__')).values(
+            f'{parent}__document_date', f'{parent}__customer_id', f'{parent}__sales_employee_id', 'item_code'
+        ).annotate(
+            line_item_name=models.Max('item_name'),
+            line_quantity=Sum('quantity'),
+            line_amount=Sum('total_amount'),
+        ).order_by()
+        for row in rows:
+            key = (
+                row[f'{parent}__document_date'], row[f'{parent}__customer_id'],
+                row[f'{parent}__sales_employee_id'], row['item_code'],
+            )
+            summary = item_summaries.setdefault(key, SalesDailyItemSummary(
+                summary_date=key[0], customer_id=key[1], sales_employee_id=key[2],
+                item_code=key[3], item_name=row['line_item_name'],
+            ))
+            setattr(summary, quantity_field, row['line_quantity'] or 0)
+            setattr(summary, amount_field, row['line_amount'] or 0)
+
+    range_filter = {}
+    if start_date:
+        range_filter['summary_date__gte'] = start_date
+    if end_date:
+        range_filter['summary_date__lte'] = end_date
+
+    with transaction.atomic():
+        SalesDailySummary.objects.filter(**range_filter).delete()
+        SalesDailyItemSummary.objects.filter(**range_filter).delete()
+        SalesDailySummary.objects.bulk_create(summaries.values(), batch_size=1000)
+        SalesDailyItemSummary.objects.bulk_create(item_summaries.values(), batch_size=1000)
+        transaction.on_commit(invalidate_sales_dashboard_cache)
+
+    return {'summaries': len(summaries), 'item_summaries': len(item_summaries)}
+
+
+# ------------------------------------------
+# Cached sales dashboard data
+# ------------------------------------------
+def invalidate_sales_dashboard_cache():
+    """
+    Bumps the sales rollup tag so every cached chart is recomputed on next read.
+    """
+    invalidate_report_tags(SALES_ROLLUP_TAG)
+
+
+def get_cached_dashboard_data(name, params, builder, user=None, tags=(SALES_ROLLUP_TAG,),
+                              timeout=SALES_DASHBOARD_CACHE_TIMEOUT):
+    """
+    Returns builder() from the report cache, keyed by name, params, the user's
+    permission scope and the versions of tags.
+    """
+    return get_cached_report(f'sales.dashboard.{name}', params, builder, tags=tags, user=user, timeout=timeout)
+
+
+def get_rollup_totals(start_date, end_date):
+    """
+    Order and return totals for a date range.
+    """
+    from .models import SalesDailySummary
+    totals = SalesDailySummary.objects.filter(
+        summary_date__gte=start_date, summary_date__lte=end_date
+    ).aggregate(
+        sum_order_count=Sum('order_count'), sum_order_amount=Sum('order_amount'),
+        sum_return_count=Sum('return_count'), sum_return_amount=Sum('return_amount'),
+    )
+    return {
+        'orders': {'total': totals['sum_order_amount'] or Decimal('0'), 'count': totals['sum_order_count'] or 0},
+        'returns': {'total': totals['sum_return_amount'] or Decimal('0'), 'count': totals['sum_return_count'] or 0},
+    }
+
+
+def get_rollup_series(start_date, end_date, period='daily'):
+    """
+    Order and return amounts per day (or per month), keyed by date.
+    """
+    from .models import SalesDailySummary
+    queryset = SalesDailySummary.objects.filter(summary_date__gte=start_date, summary_date__lte=end_date)
+    if period == 'monthly':
+        queryset = queryset.annotate(bucket=TruncMonth('summary_date'))
+    else:
+        queryset = queryset.annotate(bucket=F('summary_date'))
+    rows = queryset.values('bucket').annotate(
+        sum_order_amount=Sum('order_amount'), sum_return_amount=Sum('return_amount')
+    ).order_by('bucket')
+    return {
+        row['bucket']: {'sales': row['sum_order_amount'] or Decimal('0'), 'returns': row['sum_return_amount'] or Decimal('0')}
+        for row in rows
+    }
+
+
+def get_rollup_top_products(start_date, end_date, limit=5):
+    """
+    Top items by sales amount for a date range.
+    """
+    from .models import SalesDailyItemSummary
+    rows = SalesDailyItemSummary.objects.filter(
+        summary_date__gte=start_date, summary_date__lte=end_date
+    ).values('item_name').annotate(
+        total_quantity=Sum('quantity'), total_sales=Sum('sales_amount')
+    ).filter(total_quantity__gt=0).order_by('-total_sales')[:limit]
+    products = []
+    for row in rows:
+        row['avg_price'] = row['total_sales'] / row['total_quantity']
+        products.append(row)
+    return products
+
+
+def get_rollup_top_customers(start_date, end_date, limit=5):
+    """
+    Top customers by order amount for a date range.
+    """
+    from .models import SalesDailySummary, ARInvoice
+    customers = list(SalesDailySummary.objects.filter(
+        summary_date__gte=start_date, summary_date__lte=end_date
+    ).values('customer_id').annotate(
+        customer_name=F('customer__name'),
+        order_count=Sum('order_count'),
+        total_sales=Sum('order_amount'),
+    ).filter(order_count__gt=0).order_by('-total_sales')[:limit])
+
+    # Invoice counts only for the customers shown
+    invoice_counts = dict(ARInvoice.objects.filter(
+        sales_order__document_date__gte=start_date,
+        sales_order__document_date__lte=end_date,
+        sales_order__customer_id__in=[customer['customer_id'] for customer in customers],
+    ).values('sales_order__customer_id').annotate(invoice_count=Count('id')).values_list(
+        'sales_order__customer_id', 'invoice_count'
+    ))
+    for customer in customers:
+        customer['invoice_count'] = invoice_counts.get(customer['customer_id'], 0)
+    return customers
+
+def get_month_starts(today, months=6):
+    """
+    First day of each of the last `months` months, oldest first.
+    """
+    month_starts = []
+    month_start = today.replace(day=1)
+    for i in range(months):
+        month_starts.append(month_start)
+        month_start = (month_start - timedelta(days=1)).replace(day=1)
+    return list(reversed(month_starts))
+
+
+# ------------------------------------------
+# Cached sales report results
+# ------------------------------------------
+def get_sales_report_tag(model):
+    """Report cache tag of every cached report result over a document model."""
+    return f'sales:{model._meta.label_lower}'
+
+
+def invalidate_sales_report_cache(model):
+    """
+    Drops every cached report result for a document model by bumping its tag.
+    """
+    invalidate_report_tags(get_sales_report_tag(model))
+
+
+# ------------------------------------------
+# Bulk document line writes (API)
+# ------------------------------------------
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections, router
+
+LINE_WRITE_BATCH_SIZE = 500
+
+_bulk_line_write = ContextVar('sales_bulk_line_write', default=False)
+
+# Stock posted by the line signals of each document kind
+LINE_STOCK_EFFECTS = {
+    'order': {'transaction_type': 'SALE', 'reference': 'SO', 'sign': -1, 'committed': True, 'open_only': False},
+    'delivery': {'transaction_type': 'DELIVERY', 'reference': 'DEL', 'sign': -1, 'committed': True, 'open_only': False},
+    'return': {'transaction_type': 'RETURN', 'reference': 'RET', 'sign': 1, 'committed': False, 'open_only': True},
+}
+
+
+@contextmanager
+def bulk_line_write():
+    """
+    Line signals (stock commit, free items, order totals, rollup, report cache) do
+    nothing inside this block; write_document_lines() applies their effects per document.
+    """
+    token = _bulk_line_write.set(True)
+    try:
+        yield
+    finally:
+        _bulk_line_write.reset(token)
+
+
+def in_bulk_line_write():
+    return _bulk_line_write.get()
+
+
+def write_document_lines(document, lines_data, kind=None):
+    """
+    Writes a document's lines from validated serializer data in bulk.
+
+    Lines with an 'id' of an existing line are updated, lines without one are created
+    and existing lines missing from lines_data are deleted. Stock and rollup effects of
+    the line signals are then posted once for the whole document. Returns the lines.
+    """
+    manager = document.lines
+    line_model, parent_field = manager.model, manager.field.name
+    existing = {line.pk: line for line in manager.all()}
+    now = timezone.now()
+
+    to_create, to_update, previous_states = [], [], {}
+    update_fields = {'total_amount', 'updated_at'}
+    for line_data in lines_data:
+        line_data = dict(line_data)
+        line_data.pop(parent_field, None)
+        line = existing.get(line_data.pop('id', None))
+        if line is None:
+            line = line_model(**{parent_field: document}, **line_data)
+            to_create.append(line)
+        else:
+            previous_states[line.pk] = get_line_rollup_state(line)
+            for attr, value in line_data.items():
+                setattr(line, attr, value)
+            update_fields.update(line_data)
+            to_update.append(line)
+        line.total_amount = Decimal(line.quantity * line.unit_price).quantize(Decimal('0.000001'))
+        line.updated_at = now
+    kept = {line.pk for line in to_update}
+    removed = [line for pk, line in existing.items() if pk not in kept]
+
+    with transaction.atomic(), bulk_line_write():
+        if removed:
+            line_model.objects.filter(pk__in=[line.pk for line in removed]).delete()
+        line_model.objects.bulk_create(to_create, batch_size=LINE_WRITE_BATCH_SIZE)
+        if to_create and not connections[router.db_for_write(line_model)].features.can_return_rows_from_bulk_insert:
+            assign_created_line_pks(document, to_create, known_pks=existing)
+        line_model.objects.bulk_update(to_update, sorted(update_fields), batch_size=LINE_WRITE_BATCH_SIZE)
+
+        if kind in LINE_STOCK_EFFECTS:
+            post_document_lines_to_stock(kind, document, to_create + to_update, removed)
+        if kind in ROLLUP_LINE_FIELDS:
+            changes = [(get_line_rollup_state(line), -1) for line in removed]
+            changes += [(state, -1) for state in previous_states.values()]
+            changes += [(get_line_rollup_state(line), 1) for line in to_create + to_update]
+            post_document_lines_to_rollup(kind, document, changes)
+
+    # Drop lines prefetched by the API queryset so document.save() totals the new ones
+    getattr(document, '_prefetched_objects_cache', {}).pop(manager.field.remote_field.get_cache_name(), None)
+    return to_create + to_update
+
+
+def assign_created_line_pks(document, created_lines, known_pks):
+    """
+    Sets the pks of lines just bulk-created for document. Backends that cannot return
+    rows from a bulk insert (MySQL) leave them unset, and the stock references are
+    built from them; the new lines are the document's lines not in known_pks, and
+    their auto-increment pks follow the insert order.
+    """
+    manager = document.lines
+    pks = list(
+        manager.model.objects.filter(**{manager.field.name: document}).exclude(pk__in=known_pks)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    if len(pks) != len(created_lines):
+        raise RuntimeError(f"Expected {len(created_lines)} new lines on {document!r}, found {len(pks)}")
+    for line, pk in zip(created_lines, pks):
+        line.pk = pk
+        line._state.adding = False
+
+
+def post_document_lines_to_stock(kind, document, written_lines, removed_lines):
+    """
+    Replaces the inventory transactions of a document's written and removed lines and
+    moves ItemWarehouseInfo once per item/warehouse, as the line signals do per line.
+    """
+    effect = LINE_STOCK_EFFECTS[kind]
+    if effect['open_only'] and document.status != 'Open':
+        return
+
+    from Inventory.models import InventoryTransaction
+    from Inventory.utils.stock_snapshot_utils import apply_transactions_to_snapshots
+
+    prefix = f"{effect['reference']}-{document.pk}-"
+    old_transactions = list(InventoryTransaction.objects.filter(
+        transaction_type=effect['transaction_type'],
+        reference__in=[f'{prefix}{line.pk}' for line in written_lines + removed_lines],
+    ))
+    codes = {line.item_code for line in written_lines} | {tx.item_code for tx in old_transactions}
+    items = {code: (item_id, warehouse_id) for code, item_id, warehouse_id in Item.objects.filter(
+        code__in=codes
+    ).values_list('code', 'id', 'default_warehouse_id')}
+
+    # Net stock movement per (item, warehouse): old transactions out, new lines in
+    movements = defaultdict(Decimal)
+    for old in old_transactions:
+        if old.item_code in items:
+            movements[(items[old.item_code][0], old.warehouse_id)] -= effect['sign'] * old.quantity
+    new_transactions = []
+    for line in written_lines:
+        item_id, warehouse_id = items.get(line.item_code, (None, None))
+        if not warehouse_id:
+            continue
+        movements[(item_id, warehouse_id)] += effect['sign'] * line.quantity
+        new_transactions.append(InventoryTransaction(
+            item_code=line.item_code,
+            item_name=line.item_name,
+            warehouse_id=warehouse_id,
+            transaction_type=effect['transaction_type'],
+            quantity=line.quantity,
+            unit_price=line.unit_price,
+            total_amount=line.quantity * line.unit_price,
+            reference=f'{prefix}{line.pk}',
+            notes=f"Auto created from {type(line).__name__} Save",
+        ))
+
+    # Deleting goes through post_delete, which takes the old rows out of the stock snapshots
+    InventoryTransaction.objects.filter(pk__in=[old.pk for old in old_transactions]).delete()
+    InventoryTransaction.objects.bulk_create(new_transactions, batch_size=LINE_WRITE_BATCH_SIZE)
+    if new_transactions and not connections[router.db_for_write(InventoryTransaction)].features.can_return_rows_from_bulk_insert:
+        # The snapshot postings are stamped on the rows by pk; references are unique per line
+        pks = dict(InventoryTransaction.objects.filter(
+            transaction_type=effect['transaction_type'], reference__in=[tx.reference for tx in new_transactions],
+        ).values_list('reference', 'pk'))
+        for new_transaction in new_transactions:
+            new_transaction.pk = pks[new_transaction.reference]
+            new_transaction._state.adding = False
+    if new_transactions:
+        # bulk_create sends no post_save, which counts the rows for the transaction list
+        created = len(new_transactions)
+        transaction.on_commit(lambda: adjust_row_count(InventoryTransaction, created))
+    apply_transactions_to_snapshots(new_transactions)
+
+    infos = {
+        (info.item_id, info.warehouse_id): info
+        for info in ItemWarehouseInfo.objects.filter(
+            item_id__in={item_id for item_id, _ in movements},
+            warehouse_id__in={warehouse_id for _, warehouse_id in movements},
+        )
+    }
+    for key, movement in movements.items():
+        if not movement:
+            continue
+        info = infos.get(key) or ItemWarehouseInfo(item_id=key[0], warehouse_id=key[1])
+        info.in_stock = max(info.in_stock + movement, Decimal('0'))
+        if effect['committed']:
+            info.committed = max(info.committed + movement, Decimal('0'))
+        info.available = info.calculate_available()
+        info.updated_at = timezone.now()
+        # One save per item keeps the stock level notifications of ItemWarehouseInfo post_save
+        if info.pk:
+            info.save(update_fields=['in_stock', 'committed', 'available', 'updated_at'])
+        else:
+            info.save()
+
+
+def post_document_lines_to_rollup(kind, document, changes):
+    """
+    Posts (line state, sign) changes to SalesDailyItemSummary, netted per item.
+    Lines are posted under the stored document so a header save can move them.
+    """
+    stored = type(document).objects.filter(pk=document.pk).first()
+    if stored is None:
+        return
+    document_state = get_document_rollup_state(stored)
+
+    netted = {}
+    for state, sign in changes:
+        line_state = netted.setdefault(state['item_code'], {
+            'item_code': state['item_code'], 'item_name': state['item_name'],
+            'quantity': Decimal('0'), 'amount': Decimal('0'),
+        })
+        line_state['quantity'] += sign * state['quantity']
+        line_state['amount'] += sign * state['amount']
+    for line_state in netted.values():
+        post_line_to_rollup(kind, document_state, line_state)
+    transaction.on_commit(invalidate_sales_dashboard_cache)
+
+
+
+# ------------------------------------------
+# Employee leaderboards
+# ------------------------------------------
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
+
+SALES_LEADERBOARD_CACHE_TIMEOUT = 60  # seconds
+
+
+def get_previous_period(start_date, end_date):
+    """
+    The period a date range is compared against. A range of whole calendar
+    months is compared with as many whole months right before it (March with
+    February, a quarter with the previous quarter), any other range with the
+    equally long range right before it.
+    """
+    next_day = end_date + timedelta(days=1)
+    if start_date.day == 1 and next_day.day == 1:
+        months = (next_day.year - start_date.year) * 12 + next_day.month - start_date.month
+        index = start_date.year * 12 + start_date.month - 1 - months
+        return start_date.replace(year=index // 12, month=index % 12 + 1), start_date - timedelta(days=1)
+    length = end_date - start_date + timedelta(days=1)
+    return start_date - length, end_date - length
+
+
+def get_change_percentage(current, previous):
+    if not previous:
+        return None
+    return (current - previous) / previous * 100
+
+
+def get_leaderboard_rows(queryset, group_fields, start_date, end_date, previous_start, previous_end):
+    """
+    Count and amount per group for a period and its comparison period, in one
+    GROUP BY with conditional aggregates.
+    """
+    current = Q(document_date__gte=start_date, document_date__lte=end_date)
+    previous = Q(document_date__gte=previous_start, document_date__lte=previous_end)
+    zero = Value(Decimal('0'), output_field=models.DecimalField())
+    return queryset.filter(current | previous).values(*group_fields).annotate(
+        doc_count=Count('id', filter=current),
+        doc_amount=Coalesce(Sum('total_amount', filter=current), zero),
+        previous_doc_count=Count('id', filter=previous),
+        previous_doc_amount=Coalesce(Sum('total_amount', filter=previous), zero),
+    ).filter(doc_count__gt=0).order_by('-doc_amount')
+
+
+def get_sales_employee_leaderboard(start_date, end_date, previous_start=None, previous_end=None):
+    """
+    Order count, amount and average order per sales employee, with the comparison
+    period's figures and the change in percent. Cached for a short while.
+    """
+    from .models import SalesOrder
+    if previous_start is None or previous_end is None:
+        previous_start, previous_end = get_previous_period(start_date, end_date)
+
+    def build():
+        rows = get_leaderboard_rows(
+            SalesOrder.objects.filter(sales_employee__isnull=False),
+            ('sales_employee_id', 'sales_employee__name'),
+            start_date, end_date, previous_start, previous_end,
+        )
+        return [
+            {
+                'employee_id': row['sales_employee_id'],
+                'employee_name': row['sales_employee__name'],
+                'order_count': row['doc_count'],
+                'total_amount': row['doc_amount'],
+                'avg_order': row['doc_amount'] / row['doc_count'],
+                'previous_order_count': row['previous_doc_count'],
+                'previous_total_amount': row['previous_doc_amount'],
+                'change_pct': get_change_percentage(row['doc_amount'], row['previous_doc_amount']),
+            }
+            for row in rows
+        ]
+
+    return get_cached_dashboard_data(
+        'sales_employee_leaderboard',
+        {'start': start_date, 'end': end_date, 'previous_start': previous_start, 'previous_end': previous_end},
+        build, tags=[get_sales_report_tag(SalesOrder)], timeout=SALES_LEADERBOARD_CACHE_TIMEOUT,
+    )
+
+
+def get_delivery_employee_leaderboard(start_date, end_date, previous_start=None, previous_end=None):
+    """
+    Delivery count, amount and average delivery per delivery employee, with the
+    comparison period's figures and the change in percent. Cached for a short while.
+    """
+    from .models import Delivery
+    if previous_start is None or previous_end is None:
+        previous_start, previous_end = get_previous_period(start_date, end_date)
+
+    def build():
+        rows = get_leaderboard_rows(
+            Delivery.objects.exclude(deliveryemployee__isnull=True).exclude(deliveryemployee=''),
+            ('deliveryemployee',),
+            start_date, end_date, previous_start, previous_end,
+        )
+        return [
+            {
+                'delivery_employee_name': row['deliveryemployee'],
+                'delivery_count': row['doc_count'],
+                'total_amount': row['doc_amount'],
+                'avg_delivery': row['doc_amount'] / row['doc_count'],
+                'previous_delivery_count': row['previous_doc_count'],
+                'previous_total_amount': row['previous_doc_amount'],
+                'change_pct': get_change_percentage(row['doc_amount'], row['previous_doc_amount']),
+            }
+            for row in rows
+        ]
+
+    return get_cached_dashboard_data(
+        'delivery_employee_leaderboard',
+        {'start': start_date, 'end': end_date, 'previous_start': previous_start, 'previous_end': previous_end},
+        build, tags=[get_sales_report_tag(Delivery)], timeout=SALES_LEADERBOARD_CACHE_TIMEOUT,
+    )
@@ -42,7 +42,7 @@ from .conversion_views import (
 
 # Import the dashboard view
 from .dashboard_views import SalesDashboardView
-from .dashboard_chart_views import SalesDashboardChartView
+from .dashboard_chart_views import SalesDashboardChartView, SalesDashboardChartDataView
 from .freeitem_views import (
     FreeItemDiscountListView, FreeItemDiscountCreateView, FreeItemDiscountUpdateView,
     FreeItemDiscountDetailView, FreeItemDiscountDeleteView,
@@ -1,11 +1,12 @@
 import json
 from datetime import datetime, timedelta
 from django.views.generic import TemplateView
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Sum, Count, F, Q, Value, FloatField, DecimalField, ExpressionWrapper, Avg
 from django.db.models.functions import TruncDay, TruncMonth, Coalesce, ExtractDay, ExtractMonth
 from django.utils import timezone
 from django.shortcuts import redirect
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 
 from Sales.models import (
     ARInvoice, ARInvoiceLine, SalesOrder, SalesOrderLine, 
@@ -13,6 +14,11 @@ from Sales.models import (
 )
 from Inventory.models import Item, Warehouse
 from BusinessPartnerMasterData.models import BusinessPartner
+from Sales.utils import (
+    get_cached_dashboard_data, get_month_starts, get_rollup_totals, get_rollup_series,
+    get_rollup_top_products, get_rollup_top_customers,
+    get_sales_employee_leaderboard, get_delivery_employee_leaderboard,
+)
 
 
 class SalesDashboardChartView(TemplateView):
@@ -40,37 +46,8 @@ class SalesDashboardChartView(TemplateView):
         first_day_of_month = today.replace(day=1)
         
         try:
-            # Daily metrics
-            context['today_sales'] = self.get_today_sales()
-            context['today_deliveries'] = self.get_today_deliveries()
-            context['today_invoices'] = self.get_today_invoices()
-            context['today_returns'] = self.get_today_returns()
-            context['today_quotations'] = self.get_today_quotations()
-            context['new_orders'] = self.get_new_orders()
-            
-            # Monthly metrics
-            context['monthly_sales'] = self.get_monthly_sales()
-            context['monthly_deliveries'] = self.get_monthly_deliveries()
-            context['monthly_invoices'] = self.get_monthly_invoices()
-            context['monthly_returns'] = self.get_monthly_returns()
-            context['monthly_quotations'] = self.get_monthly_quotations()
-            context['monthly_orders'] = self.get_monthly_orders()
-            
-            # Top products
-            context['top_products_daily'] = self.get_top_products(today, today)
-            context['top_products_monthly'] = self.get_top_products(first_day_of_month, today)
-            
-            # Top customers
-            context['top_customers_daily'] = self.get_top_customers(today, today)
-            context['top_customers_monthly'] = self.get_top_customers(first_day_of_month, today)
-            
-            # Sales employee orders
-            context['sales_employee_orders'] = self.get_sales_employee_orders(today, today)
-            context['sales_employee_orders_monthly'] = self.get_sales_employee_orders(first_day_of_month, today)
-            
-            # Delivery employee deliveries
-            context['delivery_employee_deliveries'] = self.get_delivery_employee_deliveries(today, today)
-            context['delivery_employee_deliveries_monthly'] = self.get_delivery_employee_deliveries(first_day_of_month, today)
+            # Aggregates and charts come from the daily sales rollup and are cached
+            context.update(self.get_dashboard_data(period))
             
             # Today's orders
             context['todays_orders'] = self.get_todays_orders()
@@ -88,14 +65,6 @@ class SalesDashboardChartView(TemplateView):
             context['monthly_returns_list'] = self.get_monthly_returns_list()
             context['monthly_invoices_list'] = self.get_monthly_invoices_list()
             
-            # Chart data
-            context['daily_sales_chart_data'] = self.get_daily_sales_chart_data()
-            context['monthly_sales_chart_data'] = self.get_monthly_sales_chart_data()
-            context['top_products_chart_data'] = self.get_top_products_chart_data(period)
-            context['top_customers_chart_data'] = self.get_top_customers_chart_data(period)
-            context['sales_vs_returns_chart_data'] = self.get_sales_vs_returns_chart_data(period)
-            context['employee_performance_chart_data'] = self.get_employee_performance_chart_data(period)
-            
         except Exception as e:
             # Log the error and provide empty data to prevent template rendering issues
             print(f"Error fetching dashboard data: {str(e)}")
@@ -139,39 +108,63 @@ class SalesDashboardChartView(TemplateView):
         
         return context
 
+    def get_dashboard_data(self, period):
+        """Get cached metrics and chart data; the cache is invalidated whenever the sales rollup changes"""
+        today = timezone.now().date()
+        return get_cached_dashboard_data(
+            'page', {'period': period, 'today': today}, lambda: self.build_dashboard_data(period),
+            user=self.request.user,
+        )
+
+    def build_dashboard_data(self, period):
+        """Compute metrics and chart data"""
+        today = timezone.now().date()
+        first_day_of_month = today.replace(day=1)
+        return {
+            # Daily metrics
+            'today_sales': self.get_today_sales(),
+            'today_deliveries': self.get_today_deliveries(),
+            'today_invoices': self.get_today_invoices(),
+            'today_returns': self.get_today_returns(),
+            'today_quotations': self.get_today_quotations(),
+            'new_orders': self.get_new_orders(),
+            # Monthly metrics
+            'monthly_sales': self.get_monthly_sales(),
+            'monthly_deliveries': self.get_monthly_deliveries(),
+            'monthly_invoices': self.get_monthly_invoices(),
+            'monthly_returns': self.get_monthly_returns(),
+            'monthly_quotations': self.get_monthly_quotations(),
+            'monthly_orders': self.get_monthly_orders(),
+            # Top products and customers
+            'top_products_daily': self.get_top_products(today, today),
+            'top_products_monthly': self.get_top_products(first_day_of_month, today),
+            'top_customers_daily': self.get_top_customers(today, today),
+            'top_customers_monthly': self.get_top_customers(first_day_of_month, today),
+            # Sales and delivery employees
+            'sales_employee_orders': self.get_sales_employee_orders(today, today),
+            'sales_employee_orders_monthly': self.get_sales_employee_orders(first_day_of_month, today),
+            'delivery_employee_deliveries': self.get_delivery_employee_deliveries(today, today),
+            'delivery_employee_deliveries_monthly': self.get_delivery_employee_deliveries(first_day_of_month, today),
+            # Chart data
+            'daily_sales_chart_data': self.get_daily_sales_chart_data(),
+            'monthly_sales_chart_data': self.get_monthly_sales_chart_data(),
+            'top_products_chart_data': self.get_top_products_chart_data(period),
+            'top_customers_chart_data': self.get_top_customers_chart_data(period),
+            'sales_vs_returns_chart_data': self.get_sales_vs_returns_chart_data(period),
+            'employee_performance_chart_data': self.get_employee_performance_chart_data(period),
+        }
+
     def get_daily_sales_chart_data(self):
         """Get sales data for the last 7 days for chart visualization"""
         today = timezone.now().date()
         start_date = today - timedelta(days=6)  # Last 7 days including today
-        
-        # Get daily sales data
-        daily_sales = SalesOrder.objects.filter(
-            document_date__gte=start_date,
-            document_date__lte=today
-        ).annotate(
-            day=TruncDay('document_date')
-        ).values('day').annotate(
-            total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField())),
-            count=Count('id')
-        ).order_by('day')
-        
-        # Create a dictionary to store sales by day
-        sales_by_day = {day.strftime('%Y-%m-%d'): 0 for day in [start_date + timedelta(days=i) for i in range(7)]}
-        
-        # Fill in the actual sales data
-        for entry in daily_sales:
-            day_str = entry['day'].strftime('%Y-%m-%d')
-            sales_by_day[day_str] = float(entry['total'])
-        
-        # Format for Chart.js
-        labels = [day for day in sales_by_day.keys()]
-        data = [sales_by_day[day] for day in labels]
-        
-        # Format dates for display
-        display_labels = [(datetime.strptime(day, '%Y-%m-%d')).strftime('%b %d') for day in labels]
-        
+        days = [start_date + timedelta(days=i) for i in range(7)]
+
+        series = get_rollup_series(start_date, today)
+        data = [float(series.get(day, {}).get('sales', 0)) for day in days]
+
         return {
-            'labels': display_labels,
+            'labels': [day.strftime('%b %d') for day in days],
             'datasets': [{
                 'label': 'Daily Sales',
                 'data': data,
@@ -185,44 +178,13 @@ class SalesDashboardChartView(TemplateView):
     def get_monthly_sales_chart_data(self):
         """Get sales data for the last 6 months for chart visualization"""
         today = timezone.now().date()
-        start_date = (today.replace(day=1) - timedelta(days=1)).replace(day=1)  # First day of 6 months ago
-        start_date = start_date - timedelta(days=5*30)  # Approximate 5 months back
-        
-        # Get monthly sales data
-        monthly_sales = SalesOrder.objects.filter(
-            document_date__gte=start_date,
-            document_date__lte=today
-        ).annotate(
-            month=TruncMonth('document_date')
-        ).values('month').annotate(
-            total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField())),
-            count=Count('id')
-        ).order_by('month')
-        
-        # Create a list of the last 6 months
-        months = []
-        for i in range(5, -1, -1):
-            month = today.replace(day=1) - timedelta(days=i*30)  # Approximate
-            months.append(month.replace(day=1))
-        
-        # Create a dictionary to store sales by month
-        sales_by_month = {month.strftime('%Y-%m'): 0 for month in months}
-        
-        # Fill in the actual sales data
-        for entry in monthly_sales:
-            month_str = entry['month'].strftime('%Y-%m')
-            if month_str in sales_by_month:
-                sales_by_month[month_str] = float(entry['total'])
-        
-        # Format for Chart.js
-        labels = [month for month in sales_by_month.keys()]
-        data = [sales_by_month[month] for month in labels]
-        
-        # Format dates for display
-        display_labels = [(datetime.strptime(month, '%Y-%m')).strftime('%b %Y') for month in labels]
-        
+        months = get_month_starts(today, 6)
+
+        series = get_rollup_series(months[0], today, period='monthly')
+        data = [float(series.get(month, {}).get('sales', 0)) for month in months]
+
         return {
-            'labels': display_labels,
+            'labels': [month.strftime('%b %Y') for month in months],
             'datasets': [{
                 'label': 'Monthly Sales',
                 'data': data,
@@ -314,112 +276,23 @@ class SalesDashboardChartView(TemplateView):
     def get_sales_vs_returns_chart_data(self, period):
         """Get sales vs returns data for chart visualization"""
         today = timezone.now().date()
-        
+
         if period == 'daily':
-            # Get data for the last 7 days
-            start_date = today - timedelta(days=6)
-            date_range = [start_date + timedelta(days=i) for i in range(7)]
-            
-            # Get daily sales data
-            daily_sales = SalesOrder.objects.filter(
-                document_date__gte=start_date,
-                document_date__lte=today
-            ).annotate(
-                day=TruncDay('document_date')
-            ).values('day').annotate(
-                total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField()))
-            ).order_by('day')
-            
-            # Get daily returns data
-            daily_returns = Return.objects.filter(
-                document_date__gte=start_date,
-                document_date__lte=today
-            ).annotate(
-                day=TruncDay('document_date')
-            ).values('day').annotate(
-                total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField()))
-            ).order_by('day')
-            
-            # Create dictionaries to store data by day
-            sales_by_day = {day.strftime('%Y-%m-%d'): 0 for day in date_range}
-            returns_by_day = {day.strftime('%Y-%m-%d'): 0 for day in date_range}
-            
-            # Fill in the actual data
-            for entry in daily_sales:
-                day_str = entry['day'].strftime('%Y-%m-%d')
-                if day_str in sales_by_day:
-                    sales_by_day[day_str] = float(entry['total'])
-            
-            for entry in daily_returns:
-                day_str = entry['day'].strftime('%Y-%m-%d')
-                if day_str in returns_by_day:
-                    returns_by_day[day_str] = float(entry['total'])
-            
-            # Format for Chart.js
-            labels = [day for day in sales_by_day.keys()]
-            sales_data = [sales_by_day[day] for day in labels]
-            returns_data = [returns_by_day[day] for day in labels]
-            
-            # Format dates for display
-            display_labels = [(datetime.strptime(day, '%Y-%m-%d')).strftime('%b %d') for day in labels]
+            # Last 7 days
+            buckets = [today - timedelta(days=6 - i) for i in range(7)]
+            series = get_rollup_series(buckets[0], today)
+            display_labels = [day.strftime('%b %d') for day in buckets]
             chart_title = 'Sales vs Returns (Last 7 Days)'
-            
         else:
-            # Get data for the last 6 months
-            today = timezone.now().date()
-            start_date = (today.replace(day=1) - timedelta(days=1)).replace(day=1)  # First day of 6 months ago
-            start_date = start_date - timedelta(days=5*30)  # Approximate 5 months back
-            
-            # Create a list of the last 6 months
-            months = []
-            for i in range(5, -1, -1):
-                month = today.replace(day=1) - timedelta(days=i*30)  # Approximate
-                months.append(month.replace(day=1))
-            
-            # Get monthly sales data
-            monthly_sales = SalesOrder.objects.filter(
-                document_date__gte=start_date,
-                document_date__lte=today
-            ).annotate(
-                month=TruncMonth('document_date')
-            ).values('month').annotate(
-                total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField()))
-            ).order_by('month')
-            
-            # Get monthly returns data
-            monthly_returns = Return.objects.filter(
-                document_date__gte=start_date,
-                document_date__lte=today
-            ).annotate(
-                month=TruncMonth('document_date')
-            ).values('month').annotate(
-                total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField()))
-            ).order_by('month')
-            
-            # Create dictionaries to store data by month
-            sales_by_month = {month.strftime('%Y-%m'): 0 for month in months}
-            returns_by_month = {month.strftime('%Y-%m'): 0 for month in months}
-            
-            # Fill in the actual data
-            for entry in monthly_sales:
-                month_str = entry['month'].strftime('%Y-%m')
-                if month_str in sales_by_month:
-                    sales_by_month[month_str] = float(entry['total'])
-            
-            for entry in monthly_returns:
-                month_str = entry['month'].strftime('%Y-%m')
-                if month_str in returns_by_month:
-                    returns_by_month[month_str] = float(entry['total'])
-            
-            # Format for Chart.js
-            labels = [month for month in sales_by_month.keys()]
-            sales_data = [sales_by_month[month] for month in labels]
-            returns_data = [returns_by_month[month] for month in labels]
-            
-            # Format dates for display
-            display_labels = [(datetime.strptime(month, '%Y-%m')).strftime('%b %Y') for month in labels]
+            # Last 6 months
+            buckets = get_month_starts(today, 6)
+            series = get_rollup_series(buckets[0], today, period='monthly')
+            display_labels = [month.strftime('%b %Y') for month in buckets]
             chart_title = 'Sales vs Returns (Last 6 Months)'
-        
+
+        sales_data = [float(series.get(bucket, {}).get('sales', 0)) for bucket in buckets]
+        returns_data = [float(series.get(bucket, {}).get('returns', 0)) for bucket in buckets]
+
         return {
             'labels': display_labels,
             'datasets': [
@@ -525,13 +398,7 @@ class SalesDashboardChartView(TemplateView):
     def get_today_sales(self):
         """Get today's sales data"""
         today = timezone.now().date()
-        sales_data = SalesOrder.objects.filter(
-            document_date=today
-        ).aggregate(
-            total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField())),
-            count=Count('id')
-        )
-        return sales_data
+        return get_rollup_totals(today, today)['orders']
 
     def get_today_deliveries(self):
         """Get today's deliveries data"""
@@ -558,13 +425,7 @@ class SalesDashboardChartView(TemplateView):
     def get_today_returns(self):
         """Get today's returns data"""
         today = timezone.now().date()
-        return_data = Return.objects.filter(
-            document_date=today
-        ).aggregate(
-            total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField())),
-            count=Count('id')
-        )
-        return return_data
+        return get_rollup_totals(today, today)['returns']
 
     def get_today_quotations(self):
         """Get today's quotations data"""
@@ -592,15 +453,7 @@ class SalesDashboardChartView(TemplateView):
     def get_monthly_sales(self):
         """Get monthly sales data"""
         today = timezone.now().date()
-        first_day_of_month = today.replace(day=1)
-        sales_data = SalesOrder.objects.filter(
-            document_date__gte=first_day_of_month,
-            document_date__lte=today
-        ).aggregate(
-            total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField())),
-            count=Count('id')
-        )
-        return sales_data
+        return get_rollup_totals(today.replace(day=1), today)['orders']
 
     def get_monthly_deliveries(self):
         """Get monthly deliveries data"""
@@ -631,15 +484,7 @@ class SalesDashboardChartView(TemplateView):
     def get_monthly_returns(self):
         """Get monthly returns data"""
         today = timezone.now().date()
-        first_day_of_month = today.replace(day=1)
-        return_data = Return.objects.filter(
-            document_date__gte=first_day_of_month,
-            document_date__lte=today
-        ).aggregate(
-            total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField())),
-            count=Count('id')
-        )
-        return return_data
+        return get_rollup_totals(today.replace(day=1), today)['returns']
 
     def get_monthly_quotations(self):
         """Get monthly quotations data"""
@@ -656,67 +501,20 @@ class SalesDashboardChartView(TemplateView):
 
     def get_monthly_orders(self):
         """Get monthly orders data"""
-        today = timezone.now().date()
-        first_day_of_month = today.replace(day=1)
-        orders_data = SalesOrder.objects.filter(
-            document_date__gte=first_day_of_month,
-            document_date__lte=today
-        ).aggregate(
-            total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField())),
-            count=Count('id')
-        )
-        return orders_data
+        return self.get_monthly_sales()
 
     def get_top_products(self, start_date, end_date):
         """Get top products by sales for a date range"""
         try:
-            # Create a proper expression with output_field for the multiplication
-            total_sales_expr = ExpressionWrapper(
-                F('quantity') * F('unit_price'), 
-                output_field=DecimalField(max_digits=18, decimal_places=6)
-            )
-            
-            # Get all order lines for orders in the date range
-            top_products = SalesOrderLine.objects.filter(
-                order__document_date__gte=start_date,
-                order__document_date__lte=end_date
-            ).values('item_name').annotate(
-                total_quantity=Sum('quantity'),
-                total_sales=Sum(total_sales_expr),
-                avg_price=ExpressionWrapper(
-                    Sum(total_sales_expr) / Sum('quantity'),
-                    output_field=DecimalField(max_digits=18, decimal_places=6)
-                )
-            ).order_by('-total_sales')[:5]
-            
-            return top_products
+            return get_rollup_top_products(start_date, end_date)
         except Exception as e:
             print(f"Error in get_top_products: {str(e)}")
             return []
 
-    def get_top_customers(self):
-        try:
-            # Your code logic to get top customers goes here
-            pass
-        except Exception as e:
-            print(f"Error in get_top_customers: {str(e)}")
-            return []
-
     def get_top_customers(self, start_date, end_date):
         """Get top customers by sales for a date range"""
         try:
-            top_customers = SalesOrder.objects.filter(
-                document_date__gte=start_date,
-                document_date__lte=end_date,
-                customer__isnull=False  # Ensure customer exists
-            ).values('customer__id', 'customer__name').annotate(
-                customer_name=F('customer__name'),  # Explicit annotation
-                order_count=Count('id'),
-                invoice_count=Count('invoices', distinct=True),  # Use distinct to avoid duplicates
-                total_sales=Sum('total_amount')
-            ).order_by('-total_sales')[:5]
-            
-            return top_customers
+            return get_rollup_top_customers(start_date, end_date)
         except Exception as e:
             print(f"Error in get_top_customers: {str(e)}")
             return []
@@ -724,42 +522,7 @@ class SalesDashboardChartView(TemplateView):
     def get_sales_employee_orders(self, start_date, end_date):
         """Get sales employee performance for a date range - all orders without status filtering"""
         try:
-            # Get all sales employees
-            all_employees = SalesEmployee.objects.all()
-            employee_data = []
-            
-            for employee in all_employees:
-                # Get all orders for this employee in the date range
-                orders = SalesOrder.objects.filter(
-                    document_date__gte=start_date,
-                    document_date__lte=end_date,
-                    sales_employee=employee
-                )
-                
-                # Calculate metrics
-                order_count = orders.count()
-                total_amount = orders.aggregate(
-                    total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField()))
-                )['total']
-                
-                # Calculate average order value
-                avg_order = 0
-                if order_count > 0:
-                    avg_order = total_amount / order_count
-                
-                # Add to results if they have any orders in this period
-                if order_count > 0:
-                    employee_data.append({
-                        'employee_id': employee.id,
-                        'employee_name': employee.name,
-                        'order_count': order_count,
-                        'total_amount': total_amount,
-                        'avg_order': avg_order
-                    })
-            
-            # Sort by total amount descending
-            employee_data = sorted(employee_data, key=lambda x: x['total_amount'], reverse=True)
-            return employee_data
+            return get_sales_employee_leaderboard(start_date, end_date)
         except Exception as e:
             print(f"Error in get_sales_employee_orders: {str(e)}")
             return []
@@ -771,45 +534,7 @@ class SalesDashboardChartView(TemplateView):
     def get_delivery_employee_deliveries(self, start_date, end_date):
         """Get delivery employee performance for a date range - all deliveries without status filtering"""
         try:
-            # Get all unique delivery employees
-            all_delivery_employees = Delivery.objects.filter(
-                document_date__gte=start_date,
-                document_date__lte=end_date,
-                deliveryemployee__isnull=False
-            ).values_list('deliveryemployee', flat=True).distinct()
-            
-            employee_data = []
-            
-            for employee_name in all_delivery_employees:
-                # Get all deliveries for this employee in the date range
-                deliveries = Delivery.objects.filter(
-                    document_date__gte=start_date,
-                    document_date__lte=end_date,
-                    deliveryemployee=employee_name
-                )
-                
-                # Calculate metrics
-                delivery_count = deliveries.count()
-                total_amount = deliveries.aggregate(
-                    total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField()))
-                )['total']
-                
-                # Calculate average delivery value
-                avg_delivery = 0
-                if delivery_count > 0:
-                    avg_delivery = total_amount / delivery_count
-                
-                # Add to results
-                employee_data.append({
-                    'delivery_employee_name': employee_name,
-                    'delivery_count': delivery_count,
-                    'total_amount': total_amount,
-                    'avg_delivery': avg_delivery
-                })
-            
-            # Sort by total amount descending
-            employee_data = sorted(employee_data, key=lambda x: x['total_amount'], reverse=True)
-            return employee_data
+            return get_delivery_employee_leaderboard(start_date, end_date)
         except Exception as e:
             print(f"Error in get_delivery_employee_deliveries: {str(e)}")
             return []
@@ -885,4 +610,29 @@ class SalesDashboardChartView(TemplateView):
             return invoices
         except Exception as e:
             print(f"Error in get_monthly_invoices_list: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+
+
+class SalesDashboardChartDataView(LoginRequiredMixin, SalesDashboardChartView):
+    """
+    JSON endpoint for a single dashboard chart, served from the daily sales rollup
+    through the short-lived dashboard cache.
+    """
+    charts = {
+        'daily-sales': lambda view, period: view.get_daily_sales_chart_data(),
+        'monthly-sales': lambda view, period: view.get_monthly_sales_chart_data(),
+        'top-products': lambda view, period: view.get_top_products_chart_data(period),
+        'top-customers': lambda view, period: view.get_top_customers_chart_data(period),
+        'sales-vs-returns': lambda view, period: view.get_sales_vs_returns_chart_data(period),
+        'employee-performance': lambda view, period: view.get_employee_performance_chart_data(period),
+    }
+
+    def get(self, request, chart, *args, **kwargs):
+        if chart not in self.charts:
+            raise Http404("Unknown chart")
+        period = 'monthly' if request.GET.get('period') == 'monthly' else 'daily'
+        today = timezone.now().date()
+        data = get_cached_dashboard_data(
+            chart, {'period': period, 'today': today}, lambda: self.charts[chart](self, period), user=request.user,
+        )
+        return JsonResponse(data)
@@ -12,6 +12,7 @@ from Sales.models import (
 )
 from Inventory.models import Item, Warehouse
 from BusinessPartnerMasterData.models import BusinessPartner
+from Sales.utils import get_sales_employee_leaderboard, get_delivery_employee_leaderboard
 
 
 class SalesDashboardView(TemplateView):
@@ -357,42 +358,7 @@ class SalesDashboardView(TemplateView):
     def get_sales_employee_orders(self, start_date, end_date):
         """Get sales employee performance for a date range - all orders without status filtering"""
         try:
-            # Get all sales employees
-            all_employees = SalesEmployee.objects.all()
-            employee_data = []
-            
-            for employee in all_employees:
-                # Get all orders for this employee in the date range
-                orders = SalesOrder.objects.filter(
-                    document_date__gte=start_date,
-                    document_date__lte=end_date,
-                    sales_employee=employee
-                )
-                
-                # Calculate metrics
-                order_count = orders.count()
-                total_amount = orders.aggregate(
-                    total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField()))
-                )['total']
-                
-                # Calculate average order value
-                avg_order = 0
-                if order_count > 0:
-                    avg_order = total_amount / order_count
-                
-                # Add to results if they have any orders in this period
-                if order_count > 0:
-                    employee_data.append({
-                        'employee_id': employee.id,
-                        'employee_name': employee.name,
-                        'order_count': order_count,
-                        'total_amount': total_amount,
-                        'avg_order': avg_order
-                    })
-            
-            # Sort by total amount descending
-            employee_data = sorted(employee_data, key=lambda x: x['total_amount'], reverse=True)
-            return employee_data
+            return get_sales_employee_leaderboard(start_date, end_date)
         except Exception as e:
             print(f"Error in get_sales_employee_orders: {str(e)}")
             return []
@@ -400,45 +366,7 @@ class SalesDashboardView(TemplateView):
     def get_delivery_employee_deliveries(self, start_date, end_date):
         """Get delivery employee performance for a date range - all deliveries without status filtering"""
         try:
-            # Get all unique delivery employees
-            all_delivery_employees = Delivery.objects.filter(
-                document_date__gte=start_date,
-                document_date__lte=end_date,
-                deliveryemployee__isnull=False
-            ).values_list('deliveryemployee', flat=True).distinct()
-            
-            employee_data = []
-            
-            for employee_name in all_delivery_employees:
-                # Get all deliveries for this employee in the date range
-                deliveries = Delivery.objects.filter(
-                    document_date__gte=start_date,
-                    document_date__lte=end_date,
-                    deliveryemployee=employee_name
-                )
-                
-                # Calculate metrics
-                delivery_count = deliveries.count()
-                total_amount = deliveries.aggregate(
-                    total=Coalesce(Sum('total_amount'), Value(0, output_field=DecimalField()))
-                )['total']
-                
-                # Calculate average delivery value
-                avg_delivery = 0
-                if delivery_count > 0:
-                    avg_delivery = total_amount / delivery_count
-                
-                # Add to results
-                employee_data.append({
-                    'delivery_employee_name': employee_name,
-                    'delivery_count': delivery_count,
-                    'total_amount': total_amount,
-                    'avg_delivery': avg_delivery
-                })
-            
-            # Sort by total amount descending
-            employee_data = sorted(employee_data, key=lambda x: x['total_amount'], reverse=True)
-            return employee_data
+            return get_delivery_employee_leaderboard(start_date, end_date)
         except Exception as e:
             print(f"Error in get_delivery_employee_deliveries: {str(e)}")
             return []
@@ -6,8 +6,9 @@ from datetime import timedelta
 from datetime import date
 from django.db.models import Sum
 from Sales.models import SalesOrder, SalesEmployee
+from config.db_router import ReadReplicaMixin
 
-class SalesEmployeeSalesReportView(TemplateView):
+class SalesEmployeeSalesReportView(ReadReplicaMixin, TemplateView):
     template_name = "sales/sales_employee_sales_report.html"
 
     def get_context_data(self, **kwargs):
@@ -11,6 +11,7 @@ from ..models import SalesOrder, SalesOrderLine, Delivery, DeliveryLine
 from ..forms.sales_order_forms import SalesOrderForm, SalesOrderExtraInfoForm, SalesOrderLineFormSet, SalesOrderFilterForm,SalesOrderLineForm
 
 from config.views import GenericFilterView, GenericDeleteView, BaseExportView, BaseBulkDeleteConfirmView
+from BusinessPartnerMasterData.open_items import CreditLimitExceeded, check_credit_limit
 
 class SalesOrderListView(GenericFilterView):
     model = SalesOrder
@@ -138,25 +139,34 @@ class SalesOrderCreateView(CreateView):
         extra_form = context['extra_form']
 
         if formset.is_valid() and extra_form.is_valid():
-            with transaction.atomic():
-                self.object = form.save(commit=False)
+            try:
+                with transaction.atomic():
+                    self.object = form.save(commit=False)
 
-                if hasattr(self, 'prefill_quotation'):
-                    self.object.quotation_id = self.prefill_quotation
+                    if hasattr(self, 'prefill_quotation'):
+                        self.object.quotation_id = self.prefill_quotation
 
-                for field, value in extra_form.cleaned_data.items():
-                    if hasattr(self.object, field):
-                        setattr(self.object, field, value)
+                    for field, value in extra_form.cleaned_data.items():
+                        if hasattr(self.object, field):
+                            setattr(self.object, field, value)
 
-                self.object.save()
+                    self.object.save()
 
-                formset.instance = self.object
-                formset.save()
+                    formset.instance = self.object
+                    formset.save()
 
-                if hasattr(self, 'prefill_quotation'):
-                    quotation = SalesQuotation.objects.get(pk=self.prefill_quotation)
-                    quotation.status = 'Converted'
-                    quotation.save(update_fields=['status'])
+                    # Line saves recompute the totals, the check reads them back
+                    self.object.refresh_from_db(fields=['status', 'due_amount'])
+                    check_credit_limit(self.object)
+
+                    if hasattr(self, 'prefill_quotation'):
+                        quotation = SalesQuotation.objects.get(pk=self.prefill_quotation)
+                        quotation.status = 'Converted'
+                        quotation.save(update_fields=['status'])
+            except CreditLimitExceeded as error:
+                self.object = None
+                form.add_error(None, error)
+                return self.form_invalid(form)
 
             messages.success(self.request, f"Sales Order {self.object.pk} created successfully.")
             return HttpResponseRedirect(self.get_success_url())
@@ -207,19 +217,27 @@ class SalesOrderUpdateView(UpdateView):
         extra_form = context['extra_form']
         
         if formset.is_valid() and extra_form.is_valid():
-            with transaction.atomic():
-                # Save the main form
-                self.object = form.save()
-                
-                # Update with extra form data
-                for field in extra_form.cleaned_data:
-                    if hasattr(self.object, field):
-                        setattr(self.object, field, extra_form.cleaned_data[field])
-                self.object.save()
-                
-                # Save the formset
-                formset.instance = self.object
-                formset.save()
+            try:
+                with transaction.atomic():
+                    # Save the main form
+                    self.object = form.save()
+                    
+                    # Update with extra form data
+                    for field in extra_form.cleaned_data:
+                        if hasattr(self.object, field):
+                            setattr(self.object, field, extra_form.cleaned_data[field])
+                    self.object.save()
+                    
+                    # Save the formset
+                    formset.instance = self.object
+                    formset.save()
+
+                    # Line saves recompute the totals, the check reads them back
+                    self.object.refresh_from_db(fields=['status', 'due_amount'])
+                    check_credit_limit(self.object)
+            except CreditLimitExceeded as error:
+                form.add_error(None, error)
+                return self.form_invalid(form)
             
             messages.success(self.request, f'Sales Order {self.object.pk} updated successfully.')
             return HttpResponseRedirect(self.get_success_url())
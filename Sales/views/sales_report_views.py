@@ -1,11 +1,15 @@
 from django.views.generic import ListView, TemplateView
-from django.db.models import Sum, Q, Count
+from django.db.models import Sum, Q, Count, F, Value, Case, When, Subquery, OuterRef, DecimalField, ExpressionWrapper, Prefetch
+from django.db.models.functions import Coalesce
 from decimal import Decimal
 from django.utils import timezone
 from Sales.models import SalesQuotation, SalesQuotationLine, SalesOrder, SalesEmployee, SalesOrderLine, Delivery, DeliveryLine, Return, ReturnLine, ARInvoice, ARInvoiceLine
 from BusinessPartnerMasterData.models import BusinessPartner
 from Inventory.models import Item
 from config.views import GenericFilterView
+from config.db_router import ReadReplicaMixin
+from config.report_cache import get_cached_report
+from Sales.utils import get_sales_report_tag
 from ..forms.sales_report_forms import SalesReportFilterForm
 import logging
 
@@ -19,7 +23,52 @@ class SalesReportListView(TemplateView):
         context['page_title'] = 'Sales Reports'
         return context
 
-class SalesQuotationReportView(GenericFilterView):
+class CachedReportTotalsMixin:
+    """
+    Report totals over the whole filtered queryset, computed with one aggregate query
+    and kept in the report cache per filter set and permission scope, so paging through
+    a large report does not recompute them.
+    """
+    total_fields = ('total_amount', 'payable_amount', 'paid_amount', 'due_amount')
+
+    def compute_report_totals(self, queryset):
+        aggregates = {f'sum_{field}': Sum(field) for field in self.total_fields}
+        totals = queryset.order_by().aggregate(record_count=Count('pk'), **aggregates)
+        result = {field: totals[f'sum_{field}'] or Decimal('0') for field in self.total_fields}
+        result['count'] = totals['record_count']
+        return result
+
+    def get_report_totals(self):
+        if not hasattr(self, '_report_totals'):
+            queryset = self.object_list
+            self._report_totals = get_cached_report(
+                f'sales.{self.model._meta.model_name}.totals', self.request.GET,
+                lambda: self.compute_report_totals(queryset),
+                tags=[get_sales_report_tag(self.model)], user=self.request.user,
+            )
+        return self._report_totals
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, orphans, allow_empty_first_page, **kwargs)
+        # Reuse the cached row count instead of running COUNT(*) for every page
+        paginator.count = self.get_report_totals()['count']
+        return paginator
+
+    def get_report_totals_context(self, count_key, avg_key=None):
+        totals = self.get_report_totals()
+        count = totals['count']
+        context = {
+            'total_amount': "{:.2f}".format(totals['total_amount']),
+            'total_payable': "{:.2f}".format(totals['payable_amount']),
+            'total_paid': "{:.2f}".format(totals['paid_amount']),
+            'total_due': "{:.2f}".format(totals['due_amount']),
+            count_key: count,
+        }
+        if avg_key:
+            context[avg_key] = "{:.2f}".format(totals['total_amount'] / count) if count else "0.00"
+        return context
+
+class SalesQuotationReportView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = SalesQuotation
     template_name = 'sales/reports/sales_quotation_report.html'
     context_object_name = 'sales_quotations'
@@ -27,26 +76,13 @@ class SalesQuotationReportView(GenericFilterView):
     permission_required = 'Sales.view_salesquotation'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            # Check if any filter is applied
-            if any(cleaned_data.get(key) for key in ['search', 'start_date', 'end_date', 'customer', 'sales_employee', 'valid_from', 'valid_until']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
-
     def get_queryset(self):
         queryset = SalesQuotation.objects.select_related('customer', 'sales_employee')
-        logger.debug(f"Initial Sales Quotation queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered Sales Quotation count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
                 # Show default 10 records if no valid filters
@@ -123,20 +159,7 @@ class SalesQuotationReportView(GenericFilterView):
         context['all_customers'] = BusinessPartner.objects.filter(bp_type='C')
         context['all_sales_employees'] = SalesEmployee.objects.all()
         
-        quotations = context['sales_quotations']
-        total_amount = sum(quotation.total_amount or 0 for quotation in quotations)
-        total_payable = sum(quotation.payable_amount or 0 for quotation in quotations)
-        total_paid = sum(quotation.paid_amount or 0 for quotation in quotations)
-        total_due = sum(quotation.due_amount or 0 for quotation in quotations)
-        
-        context.update({
-            'total_amount': "{:.2f}".format(total_amount),
-            'total_payable': "{:.2f}".format(total_payable),
-            'total_paid': "{:.2f}".format(total_paid),
-            'total_due': "{:.2f}".format(total_due),
-            'total_quotations': len(quotations),
-            'avg_quotation_value': "{:.2f}".format(total_amount / len(quotations)) if quotations else "0.00",
-        })
+        context.update(self.get_report_totals_context('total_quotations', 'avg_quotation_value'))
         
         # Build filter summary
         filter_summary = []
@@ -162,10 +185,10 @@ class SalesQuotationReportView(GenericFilterView):
                 filter_summary.append(f"Search: '{filters['search']}'")
                 
         context['filter_summary'] = filter_summary
-        logger.debug(f"Sales Quotation context: {len(quotations)} quotations, Total Amount: {context['total_amount']}")
+        logger.debug(f"Sales Quotation context: {context['total_quotations']} quotations, Total Amount: {context['total_amount']}")
         return context
 
-class SalesQuotationReportDetailsView(GenericFilterView):
+class SalesQuotationReportDetailsView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = SalesQuotation
     template_name = 'sales/reports/sales_quotation_report_details.html'
     context_object_name = 'sales_quotations'
@@ -173,25 +196,13 @@ class SalesQuotationReportDetailsView(GenericFilterView):
     permission_required = 'Sales.view_salesquotation'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            if any(cleaned_data.get(key) for key in ['search', 'start_date', 'end_date', 'customer', 'sales_employee', 'valid_from', 'valid_until']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
-
     def get_queryset(self):
         queryset = SalesQuotation.objects.select_related('customer', 'sales_employee').prefetch_related('lines')
-        logger.debug(f"Initial Sales Quotation Details queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered Sales Quotation Details count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
@@ -267,10 +278,6 @@ class SalesQuotationReportDetailsView(GenericFilterView):
         context['all_sales_employees'] = SalesEmployee.objects.all()
         
         quotations = context['sales_quotations']
-        total_amount = sum(quotation.total_amount or 0 for quotation in quotations)
-        total_payable = sum(quotation.payable_amount or 0 for quotation in quotations)
-        total_paid = sum(quotation.paid_amount or 0 for quotation in quotations)
-        total_due = sum(quotation.due_amount or 0 for quotation in quotations)
         
         # Format line items
         for quotation in quotations:
@@ -280,14 +287,7 @@ class SalesQuotationReportDetailsView(GenericFilterView):
                 line.total_amount = "{:.2f}".format(line.total_amount) if line.total_amount else "0.00"
                 line.uom = line.uom or "N/A"
                 
-        context.update({
-            'total_amount': "{:.2f}".format(total_amount),
-            'total_payable': "{:.2f}".format(total_payable),
-            'total_paid': "{:.2f}".format(total_paid),
-            'total_due': "{:.2f}".format(total_due),
-            'total_quotations': len(quotations),
-            'avg_quotation_value': "{:.2f}".format(total_amount / len(quotations)) if quotations else "0.00",
-        })
+        context.update(self.get_report_totals_context('total_quotations', 'avg_quotation_value'))
         
         # Build filter summary
         filter_summary = []
@@ -313,10 +313,10 @@ class SalesQuotationReportDetailsView(GenericFilterView):
                 filter_summary.append(f"Search: '{filters['search']}'")
                 
         context['filter_summary'] = filter_summary
-        logger.debug(f"Sales Quotation Details context: {len(quotations)} quotations, Total Amount: {context['total_amount']}")
+        logger.debug(f"Sales Quotation Details context: {context['total_quotations']} quotations, Total Amount: {context['total_amount']}")
         return context
 
-class SalesReportView(GenericFilterView):
+class SalesReportView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = SalesOrder
     template_name = 'sales/reports/sales_report.html'
     context_object_name = 'sales_orders'
@@ -324,25 +324,13 @@ class SalesReportView(GenericFilterView):
     permission_required = 'Sales.view_salesorder'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            if any(cleaned_data.get(key) for key in ['search', 'start_date', 'end_date', 'customer', 'sales_employee']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
-
     def get_queryset(self):
         queryset = SalesOrder.objects.select_related('customer', 'sales_employee').prefetch_related('lines')
-        logger.debug(f"Initial Sales Order queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered Sales Order count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
@@ -401,20 +389,7 @@ class SalesReportView(GenericFilterView):
         context['all_customers'] = BusinessPartner.objects.filter(bp_type='C')
         context['all_sales_employees'] = SalesEmployee.objects.all()
         
-        orders = context['sales_orders']
-        total_amount = sum(order.total_amount or 0 for order in orders)
-        total_payable = sum(order.payable_amount or 0 for order in orders)
-        total_paid = sum(getattr(order, 'paid_amount', 0) or 0 for order in orders)
-        total_due = sum(getattr(order, 'due_amount', 0) or 0 for order in orders)
-        
-        context.update({
-            'total_amount': "{:.2f}".format(total_amount),
-            'total_payable': "{:.2f}".format(total_payable),
-            'total_paid': "{:.2f}".format(total_paid),
-            'total_due': "{:.2f}".format(total_due),
-            'total_orders': len(orders),
-            'avg_order_value': "{:.2f}".format(total_amount / len(orders)) if orders else "0.00",
-        })
+        context.update(self.get_report_totals_context('total_orders', 'avg_order_value'))
         
         # Build filter summary
         filter_summary = []
@@ -434,10 +409,10 @@ class SalesReportView(GenericFilterView):
                 filter_summary.append(f"Search: '{filters['search']}'")
                 
         context['filter_summary'] = filter_summary
-        logger.debug(f"Sales Report context: {len(orders)} orders, Total Amount: {context['total_amount']}")
+        logger.debug(f"Sales Report context: {context['total_orders']} orders, Total Amount: {context['total_amount']}")
         return context
 
-class SalesReportDetailsView(GenericFilterView):
+class SalesReportDetailsView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = SalesOrder
     template_name = 'sales/reports/sales_report_details.html'
     context_object_name = 'sales_orders'
@@ -445,25 +420,41 @@ class SalesReportDetailsView(GenericFilterView):
     permission_required = 'Sales.view_salesorder'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            if any(cleaned_data.get(key) for key in ['search', 'item_filter', 'start_date', 'end_date', 'customer', 'sales_employee']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
+    def get_line_queryset(self):
+        """Order lines with purchase price, purchase amount and profit percentage computed in the database"""
+        amount_field = DecimalField(max_digits=18, decimal_places=6)
+        purchase_price = Subquery(Item.objects.filter(code=OuterRef('item_code')).values('purchase_price')[:1])
+        return SalesOrderLine.objects.annotate(
+            purchase_price=Coalesce(purchase_price, Value(Decimal('0')), output_field=amount_field),
+        ).annotate(
+            purchase_amount=ExpressionWrapper(F('quantity') * F('purchase_price'), output_field=amount_field),
+            profit_percentage=Case(
+                When(purchase_price__gt=0, then=ExpressionWrapper(
+                    (F('unit_price') - F('purchase_price')) * 100 / F('purchase_price'), output_field=amount_field
+                )),
+                default=Value(Decimal('0')),
+                output_field=amount_field,
+            ),
+        )
+
+    def compute_report_totals(self, queryset):
+        totals = super().compute_report_totals(queryset)
+        # Total amount is the sum of the order lines, as shown in the line table
+        line_totals = SalesOrderLine.objects.filter(order__in=queryset.values('pk')).aggregate(
+            lines_amount=Sum(ExpressionWrapper(F('quantity') * F('unit_price'), output_field=DecimalField(max_digits=18, decimal_places=6)))
+        )
+        totals['total_amount'] = line_totals['lines_amount'] or Decimal('0')
+        return totals
 
     def get_queryset(self):
-        queryset = SalesOrder.objects.select_related('customer', 'sales_employee')
-        logger.debug(f"Initial Sales Order Details queryset: {queryset.count()} records")
+        queryset = SalesOrder.objects.select_related('customer', 'sales_employee').prefetch_related(
+            Prefetch('lines', queryset=self.get_line_queryset())
+        )
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered Sales Order Details count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
@@ -528,48 +519,7 @@ class SalesReportDetailsView(GenericFilterView):
         context['all_customers'] = BusinessPartner.objects.filter(bp_type='C')
         context['all_sales_employees'] = SalesEmployee.objects.all()
         
-        orders = context['sales_orders']
-
-        # Fetch all item codes and their purchase prices from Item model
-        item_codes = set(line.item_code for order in orders for line in order.lines.all())
-        items = Item.objects.filter(code__in=item_codes).values('code', 'purchase_price')
-        item_price_map = {item['code']: Decimal(item['purchase_price'] or 0) for item in items}
-
-        # Enhance sales order lines with purchase price, purchase amount, and profit percentage
-        for order in orders:
-            for line in order.lines.all():
-                line.purchase_price = item_price_map.get(line.item_code, Decimal('0.00'))
-                line.purchase_amount = Decimal(line.quantity) * line.purchase_price
-                line.total_amount = Decimal(line.quantity) * Decimal(line.unit_price)
-                line.profit_percentage = (
-                    ((Decimal(line.unit_price) - line.purchase_price) / line.purchase_price * 100)
-                    if line.purchase_price > 0 else Decimal('0.00')
-                )
-                # Format fields for display
-                line.quantity = "{:.2f}".format(line.quantity) if line.quantity else "0.00"
-                line.unit_price = "{:.2f}".format(line.unit_price) if line.unit_price else "0.00"
-                line.purchase_price = "{:.2f}".format(line.purchase_price)
-                line.purchase_amount = "{:.2f}".format(line.purchase_amount)
-                line.total_amount = "{:.2f}".format(line.total_amount)
-                line.profit_percentage = "{:.2f}".format(line.profit_percentage)
-                line.uom = line.uom or ""
-
-        total_amount = sum(
-            Decimal(line.quantity) * Decimal(line.unit_price)
-            for order in orders for line in order.lines.all()
-        )
-        total_payable = sum(order.payable_amount or 0 for order in orders)
-        total_paid = sum(getattr(order, 'paid_amount', 0) or 0 for order in orders)
-        total_due = sum(getattr(order, 'due_amount', 0) or 0 for order in orders)
-
-        context.update({
-            'total_amount': "{:.2f}".format(total_amount),
-            'total_payable': "{:.2f}".format(total_payable),
-            'total_paid': "{:.2f}".format(total_paid),
-            'total_due': "{:.2f}".format(total_due),
-            'total_orders': len(orders),
-            'avg_order_value': "{:.2f}".format(total_amount / len(orders)) if orders else "0.00",
-        })
+        context.update(self.get_report_totals_context('total_orders', 'avg_order_value'))
 
         # Build filter summary
         filter_summary = []
@@ -591,10 +541,10 @@ class SalesReportDetailsView(GenericFilterView):
                 filter_summary.append(f"Item: '{filters['item_filter']}'")
                 
         context['filter_summary'] = filter_summary
-        logger.debug(f"Sales Report Details context: {len(orders)} orders, Total Amount: {context['total_amount']}")
+        logger.debug(f"Sales Report Details context: {context['total_orders']} orders, Total Amount: {context['total_amount']}")
         return context
 
-class DeliveryReportView(GenericFilterView):
+class DeliveryReportView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = Delivery
     template_name = 'sales/reports/delivery_report.html'
     context_object_name = 'deliveries'
@@ -602,25 +552,13 @@ class DeliveryReportView(GenericFilterView):
     permission_required = 'Sales.view_delivery'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            if any(cleaned_data.get(key) for key in ['search', 'start_date', 'end_date', 'customer', 'sales_employee']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
-
     def get_queryset(self):
         queryset = Delivery.objects.select_related('customer', 'sales_employee')
-        logger.debug(f"Initial Delivery queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered Delivery count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
@@ -678,21 +616,11 @@ class DeliveryReportView(GenericFilterView):
             context['selected_customer'] = self.filter_form.cleaned_data.get('customer', None)
             context['selected_employee'] = self.filter_form.cleaned_data.get('sales_employee', None)
 
-        total = self.object_list.aggregate(
-            total_amount=Sum('total_amount'),
-            total_payable=Sum('payable_amount'),
-            total_paid=Sum('paid_amount'),
-            total_due=Sum('due_amount')
-        )
-        context['total_amount'] = "{:.2f}".format(total['total_amount'] or 0)
-        context['total_payable'] = "{:.2f}".format(total['total_payable'] or 0)
-        context['total_paid'] = "{:.2f}".format(total['total_paid'] or 0)
-        context['total_due'] = "{:.2f}".format(total['total_due'] or 0)
-        context['delivery_count'] = self.object_list.count()
+        context.update(self.get_report_totals_context('delivery_count'))
         logger.debug(f"Delivery context: {context['delivery_count']} deliveries, Total Amount: {context['total_amount']}")
         return context
     
-class DeliveryReportDetailsView(GenericFilterView):
+class DeliveryReportDetailsView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = Delivery
     template_name = 'sales/reports/delivery_report_details.html'
     context_object_name = 'deliveries'
@@ -700,25 +628,13 @@ class DeliveryReportDetailsView(GenericFilterView):
     permission_required = 'Sales.view_delivery'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            if any(cleaned_data.get(key) for key in ['search', 'start_date', 'end_date', 'customer', 'sales_employee']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
-
     def get_queryset(self):
         queryset = Delivery.objects.select_related('customer', 'sales_employee', 'sales_order').prefetch_related('lines')
-        logger.debug(f"Initial Delivery Details queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered Delivery Details count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
@@ -778,10 +694,6 @@ class DeliveryReportDetailsView(GenericFilterView):
         context['all_sales_employees'] = SalesEmployee.objects.all()
         
         deliveries = context['deliveries']
-        total_amount = sum(delivery.total_amount or 0 for delivery in deliveries)
-        total_payable = sum(delivery.payable_amount or 0 for delivery in deliveries)
-        total_paid = sum(delivery.paid_amount or 0 for delivery in deliveries)
-        total_due = sum(delivery.due_amount or 0 for delivery in deliveries)
         
         # Format line items
         for delivery in deliveries:
@@ -791,14 +703,7 @@ class DeliveryReportDetailsView(GenericFilterView):
                 line.total_amount = "{:.2f}".format(line.total_amount) if line.total_amount else "0.00"
                 line.uom = line.uom or "N/A"
                 
-        context.update({
-            'total_amount': "{:.2f}".format(total_amount),
-            'total_payable': "{:.2f}".format(total_payable),
-            'total_paid': "{:.2f}".format(total_paid),
-            'total_due': "{:.2f}".format(total_due),
-            'total_orders': len(deliveries),
-            'avg_order_value': "{:.2f}".format(total_amount / len(deliveries)) if deliveries else "0.00",
-        })
+        context.update(self.get_report_totals_context('total_orders', 'avg_order_value'))
         
         # Build filter summary
         filter_summary = []
@@ -818,10 +723,10 @@ class DeliveryReportDetailsView(GenericFilterView):
                 filter_summary.append(f"Search: '{filters['search']}'")
                 
         context['filter_summary'] = filter_summary
-        logger.debug(f"Delivery Details context: {len(deliveries)} deliveries, Total Amount: {context['total_amount']}")
+        logger.debug(f"Delivery Details context: {context['total_orders']} deliveries, Total Amount: {context['total_amount']}")
         return context
 
-class ReturnReportView(GenericFilterView):
+class ReturnReportView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = Return
     template_name = 'sales/reports/return_report.html'
     context_object_name = 'returns'
@@ -829,25 +734,13 @@ class ReturnReportView(GenericFilterView):
     permission_required = 'Sales.view_return'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            if any(cleaned_data.get(key) for key in ['search', 'start_date', 'end_date', 'customer', 'sales_employee']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
-
     def get_queryset(self):
         queryset = Return.objects.select_related('customer', 'sales_employee')
-        logger.debug(f"Initial Return queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered Return count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
@@ -906,20 +799,7 @@ class ReturnReportView(GenericFilterView):
         context['all_customers'] = BusinessPartner.objects.filter(bp_type='C')
         context['all_sales_employees'] = SalesEmployee.objects.all()
         
-        returns = context['returns']
-        total_amount = sum(return_obj.total_amount or 0 for return_obj in returns)
-        total_payable = sum(return_obj.payable_amount or 0 for return_obj in returns)
-        total_paid = sum(return_obj.paid_amount or 0 for return_obj in returns)
-        total_due = sum(return_obj.due_amount or 0 for return_obj in returns)
-        
-        context.update({
-            'total_amount': "{:.2f}".format(total_amount),
-            'total_payable': "{:.2f}".format(total_payable),
-            'total_paid': "{:.2f}".format(total_paid),
-            'total_due': "{:.2f}".format(total_due),
-            'total_orders': len(returns),
-            'avg_order_value': "{:.2f}".format(total_amount / len(returns)) if returns else "0.00",
-        })
+        context.update(self.get_report_totals_context('total_orders', 'avg_order_value'))
         
         # Build filter summary
         filter_summary = []
@@ -941,7 +821,7 @@ class ReturnReportView(GenericFilterView):
         context['filter_summary'] = filter_summary
         return context
 
-class ReturnReportDetailsView(GenericFilterView):
+class ReturnReportDetailsView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = Return
     template_name = 'sales/reports/return_report_details.html'
     context_object_name = 'returns'
@@ -949,25 +829,13 @@ class ReturnReportDetailsView(GenericFilterView):
     permission_required = 'Sales.view_return'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            if any(cleaned_data.get(key) for key in ['search', 'start_date', 'end_date', 'customer', 'sales_employee']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
-
     def get_queryset(self):
         queryset = Return.objects.select_related('customer', 'sales_employee').prefetch_related('lines')
-        logger.debug(f"Initial Return Details queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered Return Details count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
@@ -1027,10 +895,6 @@ class ReturnReportDetailsView(GenericFilterView):
         context['all_sales_employees'] = SalesEmployee.objects.all()
         
         returns = context['returns']
-        total_amount = sum(return_obj.total_amount or 0 for return_obj in returns)
-        total_payable = sum(return_obj.payable_amount or 0 for return_obj in returns)
-        total_paid = sum(return_obj.paid_amount or 0 for return_obj in returns)
-        total_due = sum(return_obj.due_amount or 0 for return_obj in returns)
         
         # Format line items
         for return_obj in returns:
@@ -1040,14 +904,7 @@ class ReturnReportDetailsView(GenericFilterView):
                 line.total_amount = "{:.2f}".format(line.total_amount) if line.total_amount else "0.00"
                 line.uom = line.uom or ""
                 
-        context.update({
-            'total_amount': "{:.2f}".format(total_amount),
-            'total_payable': "{:.2f}".format(total_payable),
-            'total_paid': "{:.2f}".format(total_paid),
-            'total_due': "{:.2f}".format(total_due),
-            'total_orders': len(returns),
-            'avg_order_value': "{:.2f}".format(total_amount / len(returns)) if returns else "0.00",
-        })
+        context.update(self.get_report_totals_context('total_orders', 'avg_order_value'))
         
         # Build filter summary
         filter_summary = []
@@ -1069,7 +926,7 @@ class ReturnReportDetailsView(GenericFilterView):
         context['filter_summary'] = filter_summary
         return context
 
-class ARInvoiceReportView(GenericFilterView):
+class ARInvoiceReportView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = ARInvoice
     template_name = 'sales/reports/ar_invoice_report.html'
     context_object_name = 'ar_invoices'
@@ -1077,25 +934,13 @@ class ARInvoiceReportView(GenericFilterView):
     permission_required = 'Sales.view_arinvoice'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            if any(cleaned_data.get(key) for key in ['search', 'start_date', 'end_date', 'due_start_date', 'due_end_date', 'customer', 'sales_employee']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
-
     def get_queryset(self):
         queryset = ARInvoice.objects.select_related('customer', 'sales_employee', 'sales_order')
-        logger.debug(f"Initial AR Invoice queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered AR Invoice count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
@@ -1170,20 +1015,7 @@ class ARInvoiceReportView(GenericFilterView):
         context['all_customers'] = BusinessPartner.objects.filter(bp_type='C')
         context['all_sales_employees'] = SalesEmployee.objects.all()
         
-        invoices = context['ar_invoices']
-        total_amount = sum(invoice.total_amount or 0 for invoice in invoices)
-        total_payable = sum(invoice.payable_amount or 0 for invoice in invoices)
-        total_paid = sum(invoice.paid_amount or 0 for invoice in invoices)
-        total_due = sum(invoice.due_amount or 0 for invoice in invoices)
-        
-        context.update({
-            'total_amount': "{:.2f}".format(total_amount),
-            'total_payable': "{:.2f}".format(total_payable),
-            'total_paid': "{:.2f}".format(total_paid),
-            'total_due': "{:.2f}".format(total_due),
-            'total_invoices': len(invoices),
-            'avg_invoice_value': "{:.2f}".format(total_amount / len(invoices)) if invoices else "0.00",
-        })
+        context.update(self.get_report_totals_context('total_invoices', 'avg_invoice_value'))
         
         # Build filter summary
         filter_summary = []
@@ -1209,10 +1041,10 @@ class ARInvoiceReportView(GenericFilterView):
                 filter_summary.append(f"Search: '{filters['search']}'")
                 
         context['filter_summary'] = filter_summary
-        logger.debug(f"AR Invoice context: {len(invoices)} invoices, Total Amount: {context['total_amount']}")
+        logger.debug(f"AR Invoice context: {context['total_invoices']} invoices, Total Amount: {context['total_amount']}")
         return context
 
-class ARInvoiceReportDetailsView(GenericFilterView):
+class ARInvoiceReportDetailsView(ReadReplicaMixin, CachedReportTotalsMixin, GenericFilterView):
     model = ARInvoice
     template_name = 'sales/reports/ar_invoice_report_details.html'
     context_object_name = 'ar_invoices'
@@ -1220,25 +1052,13 @@ class ARInvoiceReportDetailsView(GenericFilterView):
     permission_required = 'Sales.view_arinvoice'
     paginate_by = 10  # Default to 10 items
 
-    def get_paginate_by(self, queryset):
-        """Show 10 records by default, all records when filters are applied"""
-        if hasattr(self, 'filter_form') and self.filter_form and self.filter_form.is_valid():
-            cleaned_data = self.filter_form.cleaned_data
-            if any(cleaned_data.get(key) for key in ['search', 'start_date', 'end_date', 'due_start_date', 'due_end_date', 'customer', 'sales_employee']):
-                logger.debug("Filters applied, showing all records")
-                return None  # Show all records
-        logger.debug("No filters applied, using default pagination of 10")
-        return self.paginate_by
-
     def get_queryset(self):
         queryset = ARInvoice.objects.select_related('customer', 'sales_employee', 'sales_order').prefetch_related('lines')
-        logger.debug(f"Initial AR Invoice Details queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered AR Invoice Details count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
@@ -1314,10 +1134,6 @@ class ARInvoiceReportDetailsView(GenericFilterView):
         context['all_sales_employees'] = SalesEmployee.objects.all()
         
         invoices = context['ar_invoices']
-        total_amount = sum(invoice.total_amount or 0 for invoice in invoices)
-        total_payable = sum(invoice.payable_amount or 0 for invoice in invoices)
-        total_paid = sum(invoice.paid_amount or 0 for invoice in invoices)
-        total_due = sum(invoice.due_amount or 0 for invoice in invoices)
         
         # Format line items
         for invoice in invoices:
@@ -1327,14 +1143,7 @@ class ARInvoiceReportDetailsView(GenericFilterView):
                 line.total_amount = "{:.2f}".format(line.total_amount) if line.total_amount else "0.00"
                 line.uom = line.uom or "N/A"
                 
-        context.update({
-            'total_amount': "{:.2f}".format(total_amount),
-            'total_payable': "{:.2f}".format(total_payable),
-            'total_paid': "{:.2f}".format(total_paid),
-            'total_due': "{:.2f}".format(total_due),
-            'total_invoices': len(invoices),
-            'avg_invoice_value': "{:.2f}".format(total_amount / len(invoices)) if invoices else "0.00",
-        })
+        context.update(self.get_report_totals_context('total_invoices', 'avg_invoice_value'))
         
         # Build filter summary
         filter_summary = []
@@ -1360,11 +1169,11 @@ class ARInvoiceReportDetailsView(GenericFilterView):
                 filter_summary.append(f"Search: '{filters['search']}'")
                 
         context['filter_summary'] = filter_summary
-        logger.debug(f"AR Invoice Details context: {len(invoices)} invoices, Total Amount: {context['total_amount']}")
+        logger.debug(f"AR Invoice Details context: {context['total_invoices']} invoices, Total Amount: {context['total_amount']}")
         return context
 
 # Additional view for Sales Employee Summary (if needed)
-class SalesEmployeeSummaryView(GenericFilterView):
+class SalesEmployeeSummaryView(ReadReplicaMixin, GenericFilterView):
     model = SalesEmployee
     template_name = 'sales/reports/sales_employee_summary.html'
     context_object_name = 'sales_employees'
@@ -1384,13 +1193,11 @@ class SalesEmployeeSummaryView(GenericFilterView):
 
     def get_queryset(self):
         queryset = SalesEmployee.objects.all()
-        logger.debug(f"Initial Sales Employee queryset: {queryset.count()} records")
         
         if self.filter_form_class:
             self.filter_form = self.filter_form_class(self.request.GET)
             if self.filter_form.is_valid():
                 queryset = self.apply_filters(queryset)
-                logger.debug(f"Filtered Sales Employee count: {queryset.count()}")
             else:
                 logger.warning(f"Filter form is invalid: {self.filter_form.errors}")
         else:
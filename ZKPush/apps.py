@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class ZkpushConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'ZKPush'
+    verbose_name = 'ZKTeco Push Receiver'
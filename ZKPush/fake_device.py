@@ -0,0 +1,76 @@
+"""
+A fake push-mode ZKTeco device for exercising the iclock receiver locally,
+either against a running server over HTTP or in-process through Django's test
+client.
+"""
+import random
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+
+from .protocol import TIMESTAMP_FORMAT
+
+
+class FakeDevice:
+    """Speaks the device side of the ADMS protocol: options handshake, heartbeats and ATTLOG uploads."""
+
+    def __init__(self, serial_number, base_url=None, client=None, timeout=10):
+        if base_url is None and client is None:
+            from django.test import Client
+            client = Client()
+        self.serial_number = serial_number
+        self.base_url = base_url.rstrip('/') if base_url else ''
+        self.client = client
+        self.timeout = timeout
+        self.stamp = 0
+
+    def request(self, method, endpoint, params=None, body=''):
+        """(status, text) of one request to /iclock/<endpoint>."""
+        query = urllib.parse.urlencode({'SN': self.serial_number, **(params or {})})
+        path = f'/iclock/{endpoint}?{query}'
+        if self.client is not None:
+            if method == 'POST':
+                response = self.client.post(path, data=body, content_type='text/plain')
+            else:
+                response = self.client.get(path)
+            return response.status_code, response.content.decode('utf-8')
+
+        data = body.encode('utf-8') if method == 'POST' else None
+        http_request = urllib.request.Request(
+            self.base_url + path, data=data, method=method, headers={'Content-Type': 'text/plain'},
+        )
+        try:
+            with urllib.request.urlopen(http_request, timeout=self.timeout) as response:
+                return response.status, response.read().decode('utf-8')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8', errors='replace')
+
+    def handshake(self):
+        return self.request('GET', 'cdata', {'options': 'all', 'pushver': '2.4.1'})
+
+    def heartbeat(self):
+        return self.request('GET', 'getrequest')
+
+    def upload(self, punches):
+        """Uploads (user_id, timestamp, state, verify) tuples as one ATTLOG batch."""
+        self.stamp += 1
+        body = '\n'.join(
+            f'{user_id}\t{timestamp.strftime(TIMESTAMP_FORMAT)}\t{state}\t{verify}\t0\t0\t0'
+            for user_id, timestamp, state, verify in punches
+        )
+        return self.request('POST', 'cdata', {'table': 'ATTLOG', 'Stamp': self.stamp}, body)
+
+    @staticmethod
+    def generate_punches(user_ids, start_date, days, seed=1):
+        """Deterministic check-in/check-out pairs for each user and day, in time order."""
+        generator = random.Random(seed)
+        punches = []
+        for offset in range(days):
+            day = datetime.combine(start_date + timedelta(days=offset), datetime.min.time())
+            for user_id in user_ids:
+                check_in = day + timedelta(hours=8, minutes=generator.randint(30, 90), seconds=generator.randint(0, 59))
+                check_out = day + timedelta(hours=17, minutes=generator.randint(0, 90), seconds=generator.randint(0, 59))
+                punches.append((user_id, check_in, 0, 1))
+                punches.append((user_id, check_out, 1, 1))
+        return sorted(punches, key=lambda punch: punch[1])
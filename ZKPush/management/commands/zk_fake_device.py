@@ -0,0 +1,54 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ZKPush.fake_device import FakeDevice
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a push-mode ZKTeco device: handshake, then upload generated punches to /iclock/ in ATTLOG "
+        "batches with heartbeats in between. Without --url the requests go through the in-process test client."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sn', default='FAKE0001', help="Device serial number; must match a ZKDevice.device_id.")
+        parser.add_argument('--url', help="Base URL of a running server, e.g. http://127.0.0.1:8000.")
+        parser.add_argument('--users', type=int, default=20, help="Device user IDs 1..N. Default 20.")
+        parser.add_argument('--days', type=int, default=1, help="Days of punches ending today. Default 1.")
+        parser.add_argument('--batch', type=int, default=100, help="Punches per upload. Default 100.")
+        parser.add_argument('--resend', action='store_true', help="Upload every batch twice, as a device retrying would.")
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options['batch'] < 1:
+            raise CommandError("--batch must be at least 1.")
+        device = FakeDevice(options['sn'], base_url=options['url'])
+        status, reply = device.handshake()
+        if status != 200:
+            raise CommandError(f"Handshake refused ({status}): {reply.strip()}")
+        self.stderr.write(reply.strip())
+
+        start_date = timezone.localdate() - timedelta(days=options['days'] - 1)
+        punches = device.generate_punches(
+            [str(user_id) for user_id in range(1, options['users'] + 1)], start_date, options['days'], options['seed'],
+        )
+
+        start = time.perf_counter()
+        acknowledged = 0
+        for index in range(0, len(punches), options['batch']):
+            batch = punches[index:index + options['batch']]
+            for _ in range(2 if options['resend'] else 1):
+                status, reply = device.upload(batch)
+                if status != 200:
+                    raise CommandError(f"Upload refused ({status}): {reply.strip()}")
+                acknowledged += int(reply.split(':')[-1])
+            device.heartbeat()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Uploaded {len(punches)} punches ({acknowledged} acknowledged) in {elapsed:.2f}s "
+            f"({len(punches) / elapsed if elapsed else 0:.0f} punches/s)"
+        ))
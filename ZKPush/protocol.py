@@ -0,0 +1,123 @@
+"""
+Parsing and replies of the ZKTeco ADMS ("iclock") push protocol.
+
+A push-mode device identifies itself by its serial number (SN), fetches its
+options with GET /iclock/cdata, uploads tab-separated records with
+POST /iclock/cdata?table=ATTLOG&Stamp=..., and polls GET /iclock/getrequest as
+its heartbeat. An ATTLOG line is:
+
+    PIN <tab> YYYY-MM-DD HH:MM:SS <tab> state <tab> verify <tab> workcode <tab> reserved...
+"""
+import logging
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'AUTO_REGISTER': False,      # create a ZKDevice for an unknown serial number
+    'DELAY': 10,                 # seconds between device heartbeats
+    'ERROR_DELAY': 30,           # seconds a device waits after a failed request
+    'TRANS_INTERVAL': 1,         # minutes between batched uploads when not in real time
+    'REALTIME': True,            # devices push each punch as it happens
+    'TIMEZONE': 0,               # device clock offset from UTC, in hours
+    'HEARTBEAT_WRITE_INTERVAL': 60,  # seconds between heartbeat writes to ZKDevice
+    'DEVICE_CACHE_TIMEOUT': 60,
+}
+
+# Attendance state codes, as mapped by the pull sync
+PUNCH_TYPES = {
+    0: 'Check In',
+    1: 'Check Out',
+    2: 'Break Out',
+    3: 'Break In',
+    4: 'Overtime In',
+    5: 'Overtime Out',
+}
+
+VERIFY_TYPES = {
+    0: 'Password',
+    1: 'Fingerprint',
+    2: 'Card',
+    9: 'Other',
+    15: 'Face',
+    25: 'Palm',
+}
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def get_push_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'ZK_PUSH', {})}
+
+
+def get_punch_type(state):
+    """Punch type of a state code; never empty, so the unique key always deduplicates."""
+    try:
+        return PUNCH_TYPES.get(int(state), f'Unknown ({state})')
+    except (TypeError, ValueError):
+        return f'Unknown ({state})'
+
+
+def get_verify_type(verify):
+    try:
+        return VERIFY_TYPES.get(int(verify), str(verify))
+    except (TypeError, ValueError):
+        return verify or None
+
+
+def parse_attlog(body):
+    """
+    Parses an ATTLOG upload into (records, rejected). Each record is a dict of
+    ZKAttendanceLog field values; malformed lines are counted in rejected.
+    """
+    records, rejected = [], 0
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        fields = line.split('\t')
+        if len(fields) < 2 or not fields[0].strip():
+            rejected += 1
+            continue
+        try:
+            timestamp = datetime.strptime(fields[1].strip(), TIMESTAMP_FORMAT)
+        except ValueError:
+            rejected += 1
+            continue
+        state = fields[2].strip() if len(fields) > 2 and fields[2].strip() else '0'
+        verify = fields[3].strip() if len(fields) > 3 else ''
+        records.append({
+            'user_id': fields[0].strip(),
+            'timestamp': timezone.make_aware(timestamp),
+            'punch_type': get_punch_type(state),
+            'status': state,
+            'verify_type': get_verify_type(verify) if verify else None,
+            'work_code': fields[4].strip() or None if len(fields) > 4 else None,
+            'reserved': '\t'.join(fields[5:]).strip() or None if len(fields) > 5 else None,
+        })
+    if rejected:
+        logger.warning("Rejected %s malformed ATTLOG lines", rejected)
+    return records, rejected
+
+
+def build_options(device):
+    """Option block a device reads on start-up; ATTLOGStamp makes it resume after the last stored upload."""
+    options = get_push_settings()
+    lines = [
+        f'GET OPTION FROM: {device.device_id}',
+        f'ATTLOGStamp={device.attlog_stamp or 0}',
+        'OPERLOGStamp=9999',
+        'ATTPHOTOStamp=None',
+        f"ErrorDelay={options['ERROR_DELAY']}",
+        f"Delay={options['DELAY']}",
+        'TransTimes=00:00;14:05',
+        f"TransInterval={options['TRANS_INTERVAL']}",
+        'TransFlag=TransData AttLog',
+        f"TimeZone={options['TIMEZONE']}",
+        f"Realtime={1 if options['REALTIME'] else 0}",
+        'Encrypt=None',
+    ]
+    return '\n'.join(lines) + '\n'
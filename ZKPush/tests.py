@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+
+from Hrm.models import ZKAttendanceLog, ZKDevice
+
+ATTLOG = "1\t2026-10-01 08:59:00\t0\t1\t0\n2\t2026-10-01 09:01:00\t0\t1\t0\n1\t2026-10-01 18:02:00\t1\t1\t0\n"
+
+
+class PushUploadTests(TestCase):
+    def setUp(self):
+        self.device = ZKDevice.objects.create(name='Gate', ip_address='10.0.0.5', device_id='SN001')
+
+    def upload(self, body=ATTLOG, stamp='100'):
+        return self.client.post(
+            f'/iclock/cdata?SN=SN001&table=ATTLOG&Stamp={stamp}', data=body, content_type='text/plain',
+        )
+
+    def test_upload_is_stored_before_it_is_acknowledged(self):
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode(), 'OK: 3')
+        self.assertEqual(ZKAttendanceLog.objects.filter(device=self.device).count(), 3)
+        self.device.refresh_from_db()
+        self.assertEqual(self.device.attlog_stamp, '100')
+        self.assertIsNotNone(self.device.last_push)
+
+    def test_resent_and_repeated_punches_are_stored_once(self):
+        self.upload()
+        response = self.upload(ATTLOG + ATTLOG, stamp='101')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ZKAttendanceLog.objects.filter(device=self.device).count(), 3)
+
+    def test_failed_write_is_not_acknowledged(self):
+        with mock.patch.object(ZKAttendanceLog.objects, 'bulk_create', side_effect=DatabaseError('down')):
+            response = self.upload()
+
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(ZKAttendanceLog.objects.exists())
+        self.device.refresh_from_db()
+        self.assertIsNone(self.device.attlog_stamp)
+
+    def test_unknown_device_is_refused(self):
+        response = self.client.post('/iclock/cdata?SN=OTHER&table=ATTLOG', data=ATTLOG, content_type='text/plain')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ZKAttendanceLog.objects.exists())
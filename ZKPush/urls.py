@@ -0,0 +1,12 @@
+from django.urls import re_path
+
+from . import views
+
+app_name = 'zkpush'
+
+# Devices request these paths without a trailing slash, and some firmware appends .aspx
+urlpatterns = [
+    re_path(r'^cdata(?:\.aspx)?/?$', views.cdata, name='cdata'),
+    re_path(r'^getrequest(?:\.aspx)?/?$', views.getrequest, name='getrequest'),
+    re_path(r'^devicecmd(?:\.aspx)?/?$', views.devicecmd, name='devicecmd'),
+]
@@ -0,0 +1,113 @@
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from Hrm.models import ZKDevice
+
+from .protocol import build_options, get_push_settings, parse_attlog
+from .writer import write_punches
+
+logger = logging.getLogger(__name__)
+
+# device pk -> monotonic time of the last heartbeat written to ZKDevice
+_heartbeats_written = {}
+
+
+def text_response(content, status=200):
+    return HttpResponse(content, status=status, content_type='text/plain')
+
+
+def get_device_cache_key(serial_number):
+    return f'zkpush:device:{serial_number}'
+
+
+def get_push_device(request):
+    """
+    The active ZKDevice whose device_id is the request's SN, or None. Lookups are
+    cached briefly since every heartbeat and upload needs one.
+    """
+    serial_number = request.GET.get('SN', '').strip()
+    if not serial_number:
+        return None
+    options = get_push_settings()
+    cache_key = get_device_cache_key(serial_number)
+    device = cache.get(cache_key)
+    if device is None:
+        device = ZKDevice.objects.filter(device_id=serial_number).first()
+        if device is None and options['AUTO_REGISTER']:
+            device = ZKDevice.objects.create(
+                name=f'ZK {serial_number}',
+                ip_address=request.META.get('REMOTE_ADDR') or '0.0.0.0',
+                device_id=serial_number,
+            )
+            logger.info(f"Registered push device {serial_number}")
+        if device is None:
+            logger.warning(f"Push request from unknown device {serial_number}")
+            return None
+        cache.set(cache_key, device, options['DEVICE_CACHE_TIMEOUT'])
+    return device if device.is_active else None
+
+
+def record_heartbeat(device):
+    """Writes the heartbeat, at most once per HEARTBEAT_WRITE_INTERVAL per device."""
+    options = get_push_settings()
+    now = time.monotonic()
+    if now - _heartbeats_written.get(device.pk, 0) < options['HEARTBEAT_WRITE_INTERVAL']:
+        return
+    _heartbeats_written[device.pk] = now
+    ZKDevice.objects.filter(pk=device.pk).update(last_heartbeat=timezone.now())
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def cdata(request):
+    """Options on GET; record uploads on POST, acknowledged as 'OK: <count>' once they are stored."""
+    device = get_push_device(request)
+    if device is None:
+        return text_response('UNKNOWN DEVICE', status=403)
+
+    if request.method == 'GET':
+        record_heartbeat(device)
+        device.refresh_from_db(fields=['attlog_stamp'])
+        return text_response(build_options(device))
+
+    table = request.GET.get('table', '').upper()
+    body = request.body.decode('utf-8', errors='replace')
+    if table != 'ATTLOG':
+        # Operation logs, photos and user records are not stored; acknowledge them so the device moves on
+        return text_response(f'OK: {len([line for line in body.splitlines() if line.strip()])}')
+
+    records, rejected = parse_attlog(body)
+    try:
+        write_punches(device, records, stamp=request.GET.get('Stamp'))
+    except DatabaseError:
+        # Not acknowledged, so the device keeps its stamp and sends the batch again
+        logger.exception(f"Could not store {len(records)} pushed punches from {device.device_id}")
+        return text_response('ERROR', status=500)
+    return text_response(f'OK: {len(records) + rejected}')
+
+
+@csrf_exempt
+@require_http_methods(['GET'])
+def getrequest(request):
+    """Heartbeat; no commands are queued for devices, so the reply is always 'OK'."""
+    device = get_push_device(request)
+    if device is None:
+        return text_response('UNKNOWN DEVICE', status=403)
+    record_heartbeat(device)
+    return text_response('OK')
+
+
+@csrf_exempt
+@require_http_methods(['POST'])
+def devicecmd(request):
+    """Command results reported by a device."""
+    if get_push_device(request) is None:
+        return text_response('UNKNOWN DEVICE', status=403)
+    return text_response('OK')
@@ -0,0 +1,73 @@
+"""
+Writer for pushed punches.
+
+An ATTLOG upload is already a batch, so each one is written in the request
+that carries it: punches are deduplicated on the ZKAttendanceLog unique key
+(within the upload and against what is stored), inserted with one bulk insert
+and the device's upload stamp is recorded in the same transaction. The device
+is acknowledged only after that transaction commits; if it fails the device
+gets an error and re-sends the batch.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from config.pagination import adjust_row_count
+from config.report_cache import attendance_tag, invalidate_report_tags
+from Hrm.attendance_exceptions import evaluate_punch_days
+from Hrm.models import ZKAttendanceLog, ZKDevice
+from Hrm.signals.report_cache_signals import get_log_date
+
+logger = logging.getLogger(__name__)
+
+
+def get_existing_keys(device_id, rows):
+    """Unique keys among rows already stored for device_id, read in one range query."""
+    timestamps = [row['timestamp'] for row in rows]
+    existing = ZKAttendanceLog.objects.filter(
+        device_id=device_id,
+        timestamp__range=(min(timestamps), max(timestamps)),
+        user_id__in={row['user_id'] for row in rows},
+    ).values_list('user_id', 'timestamp', 'punch_type')
+    return set(existing)
+
+
+def write_punches(device, records, stamp=None):
+    """
+    Writes the parsed ATTLOG records of device that are not stored yet in one
+    bulk insert and records the upload on the device, in one transaction.
+    Returns the number of rows inserted. Database errors propagate, so the
+    upload is not acknowledged.
+    """
+    rows = {}
+    for record in records:
+        key = (record['user_id'], record['timestamp'], record['punch_type'])
+        rows[key] = {**record, 'device_id': device.pk, 'device_serial_no': device.device_id}
+
+    with transaction.atomic():
+        new_rows = []
+        if rows:
+            existing = get_existing_keys(device.pk, list(rows.values()))
+            new_rows = [row for key, row in rows.items() if key not in existing]
+            # ignore_conflicts covers rows another request inserted since the check
+            ZKAttendanceLog.objects.bulk_create(
+                [ZKAttendanceLog(**row) for row in new_rows], batch_size=500, ignore_conflicts=True,
+            )
+
+        updates = {'last_push': timezone.now()}
+        if stamp:
+            updates['attlog_stamp'] = stamp
+        ZKDevice.objects.filter(pk=device.pk).update(**updates)
+
+        # bulk_create sends no signals, so cached reports, the row counter and exceptions are updated here
+        inserted = len(new_rows)
+        if new_rows:
+            tags = {attendance_tag(get_log_date(row['timestamp'])) for row in new_rows}
+            transaction.on_commit(lambda: invalidate_report_tags(*tags))
+            transaction.on_commit(lambda: adjust_row_count(ZKAttendanceLog, inserted))
+            punch_days = {(row['user_id'], get_log_date(row['timestamp'])) for row in new_rows}
+            transaction.on_commit(lambda: evaluate_punch_days(punch_days))
+
+    logger.info("Wrote %s of %s pushed punches from %s", inserted, len(records), device.device_id)
+    return inserted
@@ -1,3 +1,67 @@
 from django.contrib import admin
+from django.http import JsonResponse
+from django.urls import path
 
-# Register your models here.
+from .instrumentation import RANKING_ORDERS, get_instrumentation_settings, get_view_rankings
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Raw request profiles, with the per-view p95 / queries ranking shown above the list."""
+    change_list_template = 'admin/adminpanel/requestprofile/change_list.html'
+    list_display = ('created_at', 'method', 'view_name', 'status_code', 'duration_ms', 'query_count', 'duplicate_queries')
+    list_filter = ('method', 'status_code')
+    search_fields = ('view_name', 'path')
+    date_hierarchy = 'created_at'
+    readonly_fields = [field.name for field in RequestProfile._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_ranking_params(self, request):
+        try:
+            hours = max(1, min(int(request.GET.get('hours', 24)), 24 * 30))
+        except ValueError:
+            hours = 24
+        order_by = request.GET.get('order_by', 'p95_ms')
+        return hours, order_by if order_by in RANKING_ORDERS else 'p95_ms'
+
+    def get_urls(self):
+        return [
+            path(
+                'rankings/',
+                self.admin_site.admin_view(self.rankings_view),
+                name='adminpanel_requestprofile_rankings',
+            ),
+        ] + super().get_urls()
+
+    def rankings_view(self, request):
+        if not self.has_view_permission(request):
+            return JsonResponse({'detail': 'Permission denied'}, status=403)
+        hours, order_by = self.get_ranking_params(request)
+        return JsonResponse({
+            'enabled': get_instrumentation_settings()['ENABLED'],
+            'hours': hours,
+            'order_by': order_by,
+            'views': get_view_rankings(hours=hours, order_by=order_by),
+        })
+
+    def changelist_view(self, request, extra_context=None):
+        # Ranking options are not model fields, keep them away from the changelist filters
+        hours, order_by = self.get_ranking_params(request)
+        request.GET = request.GET.copy()
+        for param in ('hours', 'order_by'):
+            request.GET.pop(param, None)
+        extra_context = {
+            **(extra_context or {}),
+            'rankings': get_view_rankings(hours=hours, order_by=order_by, limit=20),
+            'ranking_hours': hours,
+            'ranking_order_by': order_by,
+            'ranking_orders': RANKING_ORDERS,
+            'instrumentation_enabled': get_instrumentation_settings()['ENABLED'],
+        }
+        return super().changelist_view(request, extra_context=extra_context)
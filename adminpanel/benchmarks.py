@@ -0,0 +1,403 @@
+"""
+Synthetic data generators and timed scenarios for the `benchmark` command.
+
+Datasets are deterministic for a given seed and scale: every random choice comes
+from a Random seeded with (seed, dataset name), dates are anchored at
+BENCHMARK_START_DATE, and every generated row carries the BENCHMARK_PREFIX so it
+can be cleared again. Rows are written with bulk_create in fixed-size batches.
+"""
+import contextlib
+import io
+import random
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from config.report_cache import get_report_cache
+from .instrumentation import QueryRecorder
+
+BENCHMARK_PREFIX = 'BM'
+BENCHMARK_START_DATE = date(2024, 1, 1)
+BENCHMARK_BATCH_SIZE = 5000
+
+# Dataset sizes at --scale 1.0
+FULL_SCALE_SIZES = {
+    'employees': 5000,
+    'items': 100000,
+    'gl_lines': 1000000,
+    'sales_orders': 200000,
+}
+
+DATASETS = {}
+SCENARIOS = {}
+
+
+def register_dataset(name):
+    def decorator(func):
+        DATASETS[name] = func
+        return func
+    return decorator
+
+
+def register_scenario(name):
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+def get_dataset_sizes(scale, days):
+    sizes = {key: max(1, int(value * scale)) for key, value in FULL_SCALE_SIZES.items()}
+    sizes['days'] = days
+    return sizes
+
+
+def get_rng(seed, name):
+    return random.Random(f'{seed}-{name}')
+
+
+def bulk_insert(model, rows, batch_size=BENCHMARK_BATCH_SIZE):
+    """bulk_create from a generator without materialising it. Returns the row count."""
+    count, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            count, batch = count + len(batch), []
+    if batch:
+        model.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def benchmark_dates(days):
+    return [BENCHMARK_START_DATE + timedelta(days=offset) for offset in range(days)]
+
+
+# ----------------------------------------------------------------------
+# Datasets
+# ----------------------------------------------------------------------
+@register_dataset('hrm')
+def generate_hrm(sizes, seed):
+    """Employees on one shift with two ZK punches per working day (Friday/Saturday weekend)."""
+    from Hrm.models import Department, Designation, Shift, ZKDevice, Employee, ZKAttendanceLog
+
+    rng = get_rng(seed, 'hrm')
+    departments = Department.objects.bulk_create([
+        Department(name=f'Benchmark Department {n}', code=f'{BENCHMARK_PREFIX}-D{n}') for n in range(1, 11)
+    ])
+    designations = Designation.objects.bulk_create([
+        Designation(name=f'Benchmark Designation {department.code}', department=department) for department in departments
+    ])
+    shift = Shift.objects.create(name=f'{BENCHMARK_PREFIX} General', start_time=dt_time(9), end_time=dt_time(18))
+    device = ZKDevice.objects.create(name=f'{BENCHMARK_PREFIX} Device', ip_address='10.0.0.1', device_id=f'{BENCHMARK_PREFIX}-ZK1')
+
+    employee_ids = [f'{BENCHMARK_PREFIX}{n:06d}' for n in range(1, sizes['employees'] + 1)]
+    employees = bulk_insert(Employee, (
+        Employee(
+            employee_id=employee_id, first_name='Bench', last_name=employee_id, name=f'Bench {employee_id}',
+            gender=rng.choice('MF'), date_of_birth=date(1980 + n % 20, 1 + n % 12, 1 + n % 28),
+            marital_status=rng.choice('SM'), phone=f'01{n:09d}',
+            department=departments[n % len(departments)], designation=designations[n % len(designations)],
+            joining_date=BENCHMARK_START_DATE - timedelta(days=365 + n % 1000),
+            basic_salary=Decimal(20000 + rng.randrange(0, 80000, 500)), default_shift=shift,
+        )
+        for n, employee_id in enumerate(employee_ids)
+    ))
+
+    def punches():
+        for day in benchmark_dates(sizes['days']):
+            if day.weekday() in (4, 5):
+                continue
+            for employee_id in employee_ids:
+                if rng.random() < 0.08:
+                    continue
+                check_in = datetime.combine(day, dt_time(8, 40)) + timedelta(minutes=rng.randint(0, 50))
+                check_out = datetime.combine(day, dt_time(17, 30)) + timedelta(minutes=rng.randint(0, 120))
+                for stamp, punch_type in ((check_in, 'Check In'), (check_out, 'Check Out')):
+                    yield ZKAttendanceLog(
+                        device=device, device_serial_no=device.device_id, user_id=employee_id,
+                        timestamp=timezone.make_aware(stamp), punch_type=punch_type,
+                    )
+
+    return {'employees': employees, 'zk_logs': bulk_insert(ZKAttendanceLog, punches())}
+
+
+@register_dataset('inventory')
+def generate_inventory(sizes, seed):
+    """Items in one group and warehouse, each with an ItemWarehouseInfo row."""
+    from Inventory.models import UnitOfMeasure, ItemGroup, Warehouse, Item, ItemWarehouseInfo
+
+    rng = get_rng(seed, 'inventory')
+    uom = UnitOfMeasure.objects.create(code=f'{BENCHMARK_PREFIX}-EA', name='Benchmark Each')
+    group = ItemGroup.objects.create(code=f'{BENCHMARK_PREFIX}-G', name='Benchmark Items')
+    warehouse = Warehouse.objects.create(code=f'{BENCHMARK_PREFIX}-W1', name='Benchmark Warehouse')
+
+    items = bulk_insert(Item, (
+        Item(
+            code=f'{BENCHMARK_PREFIX}-I{n:07d}', name=f'Benchmark Item {n}', item_group=group,
+            inventory_uom=uom, purchase_uom=uom, sales_uom=uom, default_warehouse=warehouse,
+            unit_price=Decimal(rng.randint(10, 5000)), purchase_price=Decimal(rng.randint(5, 4000)),
+        )
+        for n in range(1, sizes['items'] + 1)
+    ))
+    item_ids = Item.objects.filter(code__startswith=f'{BENCHMARK_PREFIX}-I').values_list('id', flat=True).iterator()
+    infos = bulk_insert(ItemWarehouseInfo, (
+        ItemWarehouseInfo(item_id=item_id, warehouse=warehouse, in_stock=stock, available=stock)
+        for item_id in item_ids
+        for stock in [Decimal(rng.randint(0, 500))]
+    ))
+    return {'items': items, 'item_warehouse_info': infos}
+
+
+@register_dataset('finance')
+def generate_finance(sizes, seed):
+    """Balanced two-line journal entries spread over the benchmark days, posted to the GL."""
+    from global_settings.models import Currency
+    from Finance.models import AccountType, ChartOfAccounts, JournalEntry, GeneralLedger
+
+    rng = get_rng(seed, 'finance')
+    currency = Currency.objects.create(name='Benchmark Currency', code=BENCHMARK_PREFIX, symbol='B', exchange_rate=1)
+    account_types = AccountType.objects.bulk_create([
+        AccountType(code=f'{BENCHMARK_PREFIX}-{code}', name=name, is_debit=is_debit)
+        for code, name, is_debit in (('A', 'Assets', True), ('L', 'Liabilities', False), ('R', 'Revenue', False), ('E', 'Expenses', True))
+    ])
+    accounts = ChartOfAccounts.objects.bulk_create([
+        ChartOfAccounts(code=f'{BENCHMARK_PREFIX}{n:04d}', name=f'Benchmark Account {n}',
+                        account_type=account_types[n % len(account_types)], currency=currency)
+        for n in range(1, 201)
+    ])
+
+    entry_count = max(1, sizes['gl_lines'] // 2)
+    days = benchmark_dates(sizes['days'])
+    amounts = [Decimal(rng.randint(100, 1000000)) / 100 for _ in range(entry_count)]
+    postings = [rng.choice(days) for _ in range(entry_count)]
+    entries = bulk_insert(JournalEntry, (
+        JournalEntry(doc_num=f'{BENCHMARK_PREFIX}J{n:08d}', posting_date=postings[n], currency=currency,
+                     is_posted=True, total_debit=amounts[n], total_credit=amounts[n])
+        for n in range(entry_count)
+    ))
+
+    def ledger_lines():
+        rows = JournalEntry.objects.filter(doc_num__startswith=f'{BENCHMARK_PREFIX}J').order_by('doc_num').values_list('id', flat=True)
+        for n, entry_id in enumerate(rows.iterator()):
+            debit_account, credit_account = rng.sample(accounts, 2)
+            yield GeneralLedger(account=debit_account, posting_date=postings[n], journal_entry_id=entry_id,
+                                debit_amount=amounts[n], balance=amounts[n], currency=currency)
+            yield GeneralLedger(account=credit_account, posting_date=postings[n], journal_entry_id=entry_id,
+                                credit_amount=amounts[n], balance=-amounts[n], currency=currency)
+
+    return {'journal_entries': entries, 'gl_lines': bulk_insert(GeneralLedger, ledger_lines())}
+
+
+@register_dataset('sales')
+def generate_sales(sizes, seed):
+    """Open sales orders with one to three lines over the benchmark items, plus the daily rollup."""
+    from BusinessPartnerMasterData.models import BusinessPartner
+    from Inventory.models import Item
+    from Sales.models import SalesOrder, SalesOrderLine
+    from Sales.utils import rebuild_sales_rollup
+
+    rng = get_rng(seed, 'sales')
+    customers = BusinessPartner.objects.bulk_create([
+        BusinessPartner(code=f'{BENCHMARK_PREFIX}-C{n:05d}', name=f'Benchmark Customer {n}', bp_type='C')
+        for n in range(1, 501)
+    ])
+    items = list(Item.objects.filter(code__startswith=f'{BENCHMARK_PREFIX}-I').order_by('code').values_list('code', 'name')[:1000])
+    if not items:
+        raise ValueError("The sales dataset needs the inventory dataset")
+
+    days = benchmark_dates(sizes['days'])
+    order_lines = []
+    for _ in range(sizes['sales_orders']):
+        order_lines.append([
+            (*rng.choice(items), Decimal(rng.randint(1, 20)), Decimal(rng.randint(10, 5000)))
+            for _line in range(rng.randint(1, 3))
+        ])
+    totals = [sum(quantity * price for _code, _name, quantity, price in lines) for lines in order_lines]
+    orders = bulk_insert(SalesOrder, (
+        SalesOrder(document_no=f'{BENCHMARK_PREFIX}SO{n:08d}', document_date=rng.choice(days),
+                   customer=rng.choice(customers), status='Open', total_amount=totals[n],
+                   payable_amount=totals[n], due_amount=totals[n])
+        for n in range(len(order_lines))
+    ))
+
+    def lines():
+        rows = SalesOrder.objects.filter(document_no__startswith=f'{BENCHMARK_PREFIX}SO').order_by('document_no').values_list('id', flat=True)
+        for n, order_id in enumerate(rows.iterator()):
+            for code, name, quantity, price in order_lines[n]:
+                yield SalesOrderLine(order_id=order_id, item_code=code, item_name=name, quantity=quantity,
+                                     unit_price=price, total_amount=quantity * price)
+
+    line_count = bulk_insert(SalesOrderLine, lines())
+    rebuild_sales_rollup(start_date=days[0], end_date=days[-1])
+    return {'sales_orders': orders, 'sales_order_lines': line_count}
+
+
+def clear_benchmark_data():
+    """Deletes everything the generators created, children first."""
+    from Hrm.models import Department, Shift, ZKDevice, Employee, ZKAttendanceLog
+    from Inventory.models import UnitOfMeasure, ItemGroup, Warehouse, Item, InventoryTransaction
+    from Finance.models import AccountType, ChartOfAccounts, JournalEntry
+    from global_settings.models import Currency
+    from BusinessPartnerMasterData.models import BusinessPartner
+    from Sales.models import SalesOrder
+    from Sales.utils import bulk_line_write, rebuild_sales_rollup
+
+    prefix = f'{BENCHMARK_PREFIX}-'
+    order_dates = SalesOrder.objects.filter(document_no__startswith=f'{BENCHMARK_PREFIX}SO').aggregate(
+        first_date=Min('document_date'), last_date=Max('document_date'),
+    )
+    # Generated orders never posted stock or payments, so the line signals must not reverse any
+    with bulk_line_write():
+        SalesOrder.objects.filter(document_no__startswith=f'{BENCHMARK_PREFIX}SO').delete()
+    if order_dates['first_date']:
+        rebuild_sales_rollup(start_date=order_dates['first_date'], end_date=order_dates['last_date'])
+    BusinessPartner.objects.filter(code__startswith=prefix).delete()
+    JournalEntry.objects.filter(doc_num__startswith=f'{BENCHMARK_PREFIX}J').delete()
+    ChartOfAccounts.objects.filter(account_type__code__startswith=prefix).delete()
+    AccountType.objects.filter(code__startswith=prefix).delete()
+    Currency.objects.filter(code=BENCHMARK_PREFIX).delete()
+    InventoryTransaction.objects.filter(item_code__startswith=f'{prefix}I').delete()
+    Item.objects.filter(code__startswith=f'{prefix}I').delete()
+    Warehouse.objects.filter(code__startswith=prefix).delete()
+    ItemGroup.objects.filter(code__startswith=prefix).delete()
+    UnitOfMeasure.objects.filter(code__startswith=prefix).delete()
+    ZKAttendanceLog.objects.filter(device__device_id=f'{prefix}ZK1').delete()
+    ZKDevice.objects.filter(device_id=f'{prefix}ZK1').delete()
+    Employee.objects.filter(employee_id__startswith=BENCHMARK_PREFIX, department__code__startswith=prefix).delete()
+    Department.objects.filter(code__startswith=prefix).delete()
+    Shift.objects.filter(name=f'{BENCHMARK_PREFIX} General').delete()
+
+
+# ----------------------------------------------------------------------
+# Scenarios
+# ----------------------------------------------------------------------
+def get_benchmark_user():
+    from django.contrib.auth.models import User
+
+    user, _created = User.objects.get_or_create(
+        username=f'{BENCHMARK_PREFIX.lower()}-benchmark', defaults={'is_staff': True, 'is_superuser': True},
+    )
+    return user
+
+
+def get_client():
+    from django.test import Client
+
+    client = Client()
+    client.force_login(get_benchmark_user())
+    return client
+
+
+def check_response(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    content = getattr(response, 'content', b'')
+    return {'bytes': len(content)}
+
+
+@register_scenario('attendance_summary')
+def scenario_attendance_summary(sizes):
+    """UnifiedAttendanceProcessor over every active employee for the benchmark days."""
+    from Hrm.views.zktico.attendance_summary_report import AttendanceSummaryReportForm, AttendanceSummaryReportView
+
+    form_data = {name: field.initial for name, field in AttendanceSummaryReportForm.base_fields.items()}
+    form_data.update({
+        'start_date': BENCHMARK_START_DATE,
+        'end_date': BENCHMARK_START_DATE + timedelta(days=sizes['days'] - 1),
+        'employee_filter': 'all',
+    })
+    report = AttendanceSummaryReportView()._generate_attendance_summary_report(form_data)
+    return {'employees': len(report['employee_summaries'])}
+
+
+@register_scenario('trial_balance')
+def scenario_trial_balance(sizes):
+    return check_response(get_client().get('/finance/reports/trial-balance/'))
+
+
+@register_scenario('stock_posting')
+def scenario_stock_posting(sizes):
+    """Receipts and issues through InventoryTransaction.save() and its signals, rolled back afterwards."""
+    from Inventory.models import Item, InventoryTransaction
+
+    rng = get_rng(0, 'stock_posting')
+    items = list(
+        Item.objects.filter(code__startswith=f'{BENCHMARK_PREFIX}-I').order_by('code')
+        .values_list('code', 'name', 'default_warehouse_id')[:200]
+    )
+    posted = 0
+    with transaction.atomic():
+        for code, name, warehouse_id in items:
+            for transaction_type, quantity in (('RECEIPT', 10), ('ISSUE', -4)):
+                InventoryTransaction.objects.create(
+                    item_code=code, item_name=name, warehouse_id=warehouse_id, transaction_type=transaction_type,
+                    quantity=Decimal(quantity), unit_price=Decimal(rng.randint(10, 100)), reference=f'{BENCHMARK_PREFIX}-POST',
+                )
+                posted += 1
+        transaction.set_rollback(True)
+    return {'transactions': posted}
+
+
+@register_scenario('sales_report')
+def scenario_sales_report(sizes):
+    end_date = BENCHMARK_START_DATE + timedelta(days=sizes['days'] - 1)
+    return check_response(get_client().get('/sales/reports/sales/', {
+        'start_date': BENCHMARK_START_DATE.isoformat(), 'end_date': end_date.isoformat(),
+    }))
+
+
+@register_scenario('item_api')
+def scenario_item_api(sizes):
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(get_benchmark_user())
+    url = reverse('Inventory:inventory_api:item-list')
+    pages = [client.get(url, {'page': page}) for page in (1, 2, 3)]
+    for response in pages:
+        check_response(response)
+    return {'pages': len(pages)}
+
+
+def run_scenario(name, sizes, trace_memory=True):
+    """
+    Runs one scenario with a cold cache and returns wall time, query count/time
+    and (with trace_memory) peak Python memory. Scenario stdout is discarded.
+    """
+    cache.clear()
+    get_report_cache().clear()
+    recorder = QueryRecorder()
+    result = {'name': name}
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack, contextlib.redirect_stdout(io.StringIO()):
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            result['detail'] = SCENARIOS[name](sizes)
+        result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f'{type(e).__name__}: {e}'
+    result['wall_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    if trace_memory:
+        result['peak_memory_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    summary = recorder.get_summary()
+    result.update({
+        'queries': summary['query_count'],
+        'query_ms': round(summary['query_time_ms'], 1),
+        'duplicate_queries': summary['duplicate_queries'],
+    })
+    return result
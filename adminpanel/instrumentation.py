@@ -0,0 +1,183 @@
+"""
+Per-request query and timing instrumentation.
+
+QueryRecorder is installed as a database execute wrapper for the duration of a
+request; finished profiles are buffered in-process and written to RequestProfile
+in batches, so the requests being measured only pay for a list append.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 1.0,
+    'FLUSH_SIZE': 50,
+    'FLUSH_INTERVAL': 30,
+    'RETENTION_DAYS': 7,
+    'EXCLUDE_PATHS': ('/static/', '/media/', '/favicon.ico'),
+}
+
+RANKING_ORDERS = ('p95_ms', 'avg_ms', 'avg_queries', 'p95_queries', 'max_duplicates', 'requests')
+
+SQL_MAX_LENGTH = 2000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_buffer = []
+_buffer_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def get_instrumentation_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'QUERY_INSTRUMENTATION', {})}
+
+
+def fingerprint_sql(sql):
+    """SQL with literals and IN (...) lists collapsed, so N+1 variants share one fingerprint."""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(?)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Database execute wrapper counting and timing every query of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.time_ms = 0.0
+        self.fingerprints = Counter()
+        self.slowest_ms = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.time_ms += elapsed
+            self.fingerprints[fingerprint_sql(sql)] += 1
+            if elapsed > self.slowest_ms:
+                self.slowest_ms, self.slowest_sql = elapsed, sql
+
+    def get_summary(self):
+        duplicates = sum(count - 1 for count in self.fingerprints.values() if count > 1)
+        top_duplicate, top_count = '', 0
+        if duplicates:
+            top_duplicate, top_count = self.fingerprints.most_common(1)[0]
+        return {
+            'query_count': self.count,
+            'query_time_ms': round(self.time_ms, 3),
+            'duplicate_queries': duplicates,
+            'top_duplicate': top_duplicate[:SQL_MAX_LENGTH],
+            'top_duplicate_count': top_count,
+            'slowest_sql': self.slowest_sql[:SQL_MAX_LENGTH],
+            'slowest_sql_ms': round(self.slowest_ms, 3),
+        }
+
+
+# ----------------------------------------------------------------------
+# Rolling store
+# ----------------------------------------------------------------------
+def record_profile(profile):
+    """Buffers one request profile and flushes the buffer when it is full or stale."""
+    options = get_instrumentation_settings()
+    with _buffer_lock:
+        _buffer.append(profile)
+        due = len(_buffer) >= options['FLUSH_SIZE'] or time.monotonic() - _last_flush >= options['FLUSH_INTERVAL']
+    if due:
+        flush_profiles()
+
+
+def flush_profiles():
+    """Writes buffered profiles in one bulk insert and prunes rows older than the retention window."""
+    global _last_flush
+    from .models import RequestProfile
+
+    with _buffer_lock:
+        pending = _buffer[:]
+        _buffer.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+
+    options = get_instrumentation_settings()
+    try:
+        RequestProfile.objects.bulk_create([RequestProfile(**profile) for profile in pending])
+        cutoff = timezone.now() - timedelta(days=options['RETENTION_DAYS'])
+        RequestProfile.objects.filter(created_at__lt=cutoff).delete()
+    except DatabaseError:
+        logger.exception("Could not write %s request profiles", len(pending))
+        return 0
+    return len(pending)
+
+
+# ----------------------------------------------------------------------
+# Rankings
+# ----------------------------------------------------------------------
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def get_view_rankings(hours=24, order_by='p95_ms', limit=50):
+    """
+    Per-view latency and query statistics over the last `hours`, worst first by
+    `order_by` (one of RANKING_ORDERS). Includes profiles not yet flushed.
+    """
+    from .models import RequestProfile
+
+    flush_profiles()
+    if order_by not in RANKING_ORDERS:
+        order_by = 'p95_ms'
+
+    samples = defaultdict(list)
+    rows = RequestProfile.objects.filter(created_at__gte=timezone.now() - timedelta(hours=hours)).values_list(
+        'view_name', 'duration_ms', 'query_count', 'duplicate_queries',
+        'top_duplicate', 'top_duplicate_count', 'slowest_sql', 'slowest_sql_ms',
+    )
+    for row in rows.iterator():
+        samples[row[0]].append(row[1:])
+
+    rankings = []
+    for view_name, view_samples in samples.items():
+        durations = sorted(sample[0] for sample in view_samples)
+        queries = sorted(sample[1] for sample in view_samples)
+        worst_duplicate = max(view_samples, key=lambda sample: sample[4])
+        slowest = max(view_samples, key=lambda sample: sample[6])
+        rankings.append({
+            'view_name': view_name,
+            'requests': len(view_samples),
+            'avg_ms': round(sum(durations) / len(durations), 1),
+            'p50_ms': round(percentile(durations, 0.5), 1),
+            'p95_ms': round(percentile(durations, 0.95), 1),
+            'max_ms': round(durations[-1], 1),
+            'avg_queries': round(sum(queries) / len(queries), 1),
+            'p95_queries': percentile(queries, 0.95),
+            'max_queries': queries[-1],
+            'max_duplicates': max(sample[2] for sample in view_samples),
+            'top_duplicate': worst_duplicate[3],
+            'top_duplicate_count': worst_duplicate[4],
+            'slowest_sql': slowest[5],
+            'slowest_sql_ms': round(slowest[6], 1),
+        })
+    rankings.sort(key=lambda row: row[order_by], reverse=True)
+    return rankings[:limit]
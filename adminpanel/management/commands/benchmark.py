@@ -0,0 +1,122 @@
+import json
+import platform
+import sys
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from adminpanel.benchmarks import (
+    BENCHMARK_PREFIX, DATASETS, SCENARIOS, clear_benchmark_data, get_dataset_sizes, run_scenario,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate deterministic synthetic data and time the hot paths (attendance processing, trial balance, "
+        "stock posting, sales report, item API). Prints query counts, wall time and peak memory as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--generate', action='store_true', help="Create the synthetic datasets before running.")
+        parser.add_argument('--clear', action='store_true', help=f"Delete previously generated '{BENCHMARK_PREFIX}' data first.")
+        parser.add_argument('--scale', type=float, default=0.02,
+                            help="Fraction of full scale (5k employees, 100k items, 1M GL lines, 200k sales orders). Default 0.02.")
+        parser.add_argument('--days', type=int, default=90, help="Days of punches, GL postings and orders. Default 90.")
+        parser.add_argument('--seed', type=int, default=1, help="Random seed; same seed and scale give the same data.")
+        parser.add_argument('--datasets', default=','.join(DATASETS), help=f"Comma-separated subset of: {', '.join(DATASETS)}.")
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Comma-separated subset of: {', '.join(SCENARIOS)}.")
+        parser.add_argument('--no-run', action='store_true', help="Only clear/generate data.")
+        parser.add_argument('--repeat', type=int, default=1, help="Runs per scenario; every run is reported.")
+        parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc (it slows Python-heavy scenarios).")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+        parser.add_argument('--compare', help="Baseline JSON report to print per-scenario deltas against.")
+        parser.add_argument('--force', action='store_true', help="Allow writing synthetic data when DEBUG is off.")
+
+    def parse_names(self, value, registry, label):
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in registry]
+        if unknown:
+            raise CommandError(f"Unknown {label}: {', '.join(unknown)}")
+        return names
+
+    def handle(self, *args, **options):
+        datasets = self.parse_names(options['datasets'], DATASETS, 'datasets')
+        scenarios = self.parse_names(options['scenarios'], SCENARIOS, 'scenarios')
+        sizes = get_dataset_sizes(options['scale'], options['days'])
+
+        if (options['generate'] or options['clear']) and not settings.DEBUG and not options['force']:
+            raise CommandError("Refusing to write synthetic data with DEBUG off; pass --force on a benchmark database.")
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'seed': options['seed'],
+                'scale': options['scale'],
+                'sizes': sizes,
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'memory_traced': not options['no_memory'],
+            },
+            'generated': {},
+            'scenarios': [],
+        }
+
+        if options['clear']:
+            self.stderr.write("Clearing benchmark data...")
+            with transaction.atomic():
+                clear_benchmark_data()
+
+        if options['generate']:
+            for name in datasets:
+                self.stderr.write(f"Generating {name}...")
+                start = time.perf_counter()
+                with transaction.atomic():
+                    counts = DATASETS[name](sizes, options['seed'])
+                report['generated'][name] = {**counts, 'seconds': round(time.perf_counter() - start, 2)}
+
+        if not options['no_run']:
+            for name in scenarios:
+                for run in range(1, options['repeat'] + 1):
+                    self.stderr.write(f"Running {name} ({run}/{options['repeat']})...")
+                    result = run_scenario(name, sizes, trace_memory=not options['no_memory'])
+                    result['run'] = run
+                    report['scenarios'].append(result)
+
+        output = json.dumps(report, indent=2, default=str)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            self.print_comparison(options['compare'], report['scenarios'])
+
+    def print_comparison(self, path, scenarios):
+        try:
+            with open(path) as handle:
+                baseline = {result['name']: result for result in json.load(handle)['scenarios'] if result.get('run', 1) == 1}
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Could not read baseline {path}: {e}")
+
+        self.stderr.write(f"{'scenario':<22}{'wall ms':>22}{'queries':>20}{'peak KB':>24}")
+        for result in scenarios:
+            before = baseline.get(result['name'])
+            if result.get('run', 1) != 1 or not before:
+                continue
+            columns = []
+            for key in ('wall_ms', 'queries', 'peak_memory_kb'):
+                old, new = before.get(key), result.get(key)
+                if old is None or new is None:
+                    columns.append('-')
+                    continue
+                change = f"{(new - old) / old * 100:+.0f}%" if old else 'n/a'
+                columns.append(f"{old}->{new} ({change})")
+            self.stderr.write(f"{result['name']:<22}{columns[0]:>22}{columns[1]:>20}{columns[2]:>24}")
+        sys.stderr.flush()
@@ -0,0 +1,32 @@
+import os
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from config.db_router import get_replica_alias, get_sqlite_path
+
+
+class Command(BaseCommand):
+    help = "Copy the SQLite primary database into the SQLite file standing in for the read replica"
+
+    def handle(self, *args, **options):
+        alias = get_replica_alias()
+        if alias is None:
+            raise CommandError("No read replica is configured; set DATABASE_REPLICA_NAME.")
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite' or connections[alias].vendor != 'sqlite':
+            raise CommandError("sync_replica only copies SQLite files; a server replica is fed by replication.")
+
+        primary_path = get_sqlite_path(settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'])
+        replica_path = get_sqlite_path(settings.DATABASES[alias]['NAME'])
+        source = sqlite3.connect(primary_path)
+        target = sqlite3.connect(replica_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        # The replica's lag is measured from its modification time
+        os.utime(replica_path)
+        self.stdout.write(self.style.SUCCESS(f"Copied {primary_path} to {replica_path}."))
@@ -0,0 +1,49 @@
+import random
+import time
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+from .instrumentation import QueryRecorder, get_instrumentation_settings, record_profile
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Opt-in profiler: records wall time, query count, duplicate-query fingerprints
+    (N+1 patterns) and the slowest query of each request, grouped by URL name.
+    Enabled with QUERY_INSTRUMENTATION['ENABLED']; otherwise Django drops it at startup.
+    """
+
+    def __init__(self, get_response):
+        options = get_instrumentation_settings()
+        if not options['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = options['SAMPLE_RATE']
+        self.exclude_paths = tuple(options['EXCLUDE_PATHS'])
+
+    def __call__(self, request):
+        if request.path.startswith(self.exclude_paths) or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        record_profile({
+            'view_name': (match.view_name or match._func_path) if match else '<unresolved>',
+            'method': request.method,
+            'path': request.path[:500],
+            'status_code': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+            'created_at': timezone.now(),
+            **recorder.get_summary(),
+        })
+        return response
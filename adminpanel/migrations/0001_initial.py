@@ -0,0 +1,39 @@
+# Generated by Django 4.2.20 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=200, verbose_name='View')),
+                ('method', models.CharField(max_length=10, verbose_name='Method')),
+                ('path', models.CharField(max_length=500, verbose_name='Path')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Status Code')),
+                ('duration_ms', models.FloatField(verbose_name='Duration (ms)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='Queries')),
+                ('query_time_ms', models.FloatField(verbose_name='Query Time (ms)')),
+                ('duplicate_queries', models.PositiveIntegerField(default=0, verbose_name='Duplicate Queries')),
+                ('top_duplicate', models.TextField(blank=True, verbose_name='Most Repeated Query')),
+                ('top_duplicate_count', models.PositiveIntegerField(default=0, verbose_name='Most Repeated Count')),
+                ('slowest_sql', models.TextField(blank=True, verbose_name='Slowest Query')),
+                ('slowest_sql_ms', models.FloatField(default=0, verbose_name='Slowest Query (ms)')),
+                ('created_at', models.DateTimeField(db_index=True, verbose_name='Recorded At')),
+            ],
+            options={
+                'verbose_name': 'Request Profile',
+                'verbose_name_plural': 'Request Profiles',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['view_name', 'created_at'], name='adminpanel__view_na_f798bc_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,29 @@
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class RequestProfile(models.Model):
+    """One instrumented request, written in batches by QueryInstrumentationMiddleware."""
+
+    view_name = models.CharField(_("View"), max_length=200)
+    method = models.CharField(_("Method"), max_length=10)
+    path = models.CharField(_("Path"), max_length=500)
+    status_code = models.PositiveSmallIntegerField(_("Status Code"))
+    duration_ms = models.FloatField(_("Duration (ms)"))
+    query_count = models.PositiveIntegerField(_("Queries"))
+    query_time_ms = models.FloatField(_("Query Time (ms)"))
+    duplicate_queries = models.PositiveIntegerField(_("Duplicate Queries"), default=0)
+    top_duplicate = models.TextField(_("Most Repeated Query"), blank=True)
+    top_duplicate_count = models.PositiveIntegerField(_("Most Repeated Count"), default=0)
+    slowest_sql = models.TextField(_("Slowest Query"), blank=True)
+    slowest_sql_ms = models.FloatField(_("Slowest Query (ms)"), default=0)
+    created_at = models.DateTimeField(_("Recorded At"), db_index=True)
+
+    class Meta:
+        verbose_name = _("Request Profile")
+        verbose_name_plural = _("Request Profiles")
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['view_name', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.method} {self.view_name} ({self.duration_ms:.0f} ms, {self.query_count} queries)"
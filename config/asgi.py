@@ -2,6 +2,8 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serving it with an ASGI server (uvicorn, daphne) keeps notification streams
+(global_settings.views.notification_stream) open instead of falling back to polling.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
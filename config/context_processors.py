@@ -276,21 +276,9 @@ def notification_processor(request):
     unread_notification_count = 0
     
     if request.user.is_authenticated and apps.is_installed('global_settings'):
-        # Import Notification model from global_settings app
-        Notification = apps.get_model('global_settings', 'Notification')
-        
-        # Count unread notifications for the current user or all users
-        user_notifications = Notification.objects.filter(
-            is_read=False,
-            recipient=request.user
-        ).count()
-        
-        all_user_notifications = Notification.objects.filter(
-            is_read=False, 
-            all_users=True
-        ).count()
-        
-        unread_notification_count = user_notifications + all_user_notifications
+        # Cached per user, own and broadcast notifications (global_settings/notifications.py)
+        from global_settings.notifications import get_unread_count
+        unread_notification_count = get_unread_count(request.user)
     
     return {
         'unread_notification_count': unread_notification_count
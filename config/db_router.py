@@ -0,0 +1,299 @@
+"""
+Read/write database routing with a read replica for reports and exports.
+
+Every write, and every read outside a report, goes to 'default'. Report and
+export views opt in with ReadReplicaMixin (or the read_replica decorator), and
+their reads then go to the replica alias of settings.READ_REPLICA, unless:
+
+  - the replica is missing, unreachable or lags more than MAX_LAG_SECONDS,
+  - the request wrote something itself (first write pins the rest of it),
+  - the browser wrote through the app less than PIN_SECONDS ago, which
+    PrimaryPinMiddleware remembers in a cookie (read-your-writes),
+  - the query runs inside a transaction on 'default',
+  - the model belongs to PRIMARY_ONLY_APPS (sessions, auth, ...).
+
+Locally a second SQLite file stands in for the replica (DATABASE_REPLICA_NAME)
+and `python manage.py sync_replica` copies the primary into it; its lag is the
+time since the copy when the primary has been written after it.
+"""
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import StreamingHttpResponse
+from django.template.response import SimpleTemplateResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ALIAS': 'replica',
+    'MAX_LAG_SECONDS': 30,       # reports fall back to the primary above this
+    'LAG_CHECK_SECONDS': 10,     # how long a measured lag is trusted per process
+    'PIN_SECONDS': 30,           # reads stay on the primary this long after a write
+    'PIN_COOKIE': 'primary_pin',
+    'PRIMARY_ONLY_APPS': ['sessions', 'auth', 'contenttypes', 'admin', 'authtoken'],
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def get_replica_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'READ_REPLICA', {})}
+
+
+def get_replica_alias():
+    """The configured replica alias, or None when DATABASES has no replica."""
+    alias = get_replica_settings()['ALIAS']
+    return alias if alias in settings.DATABASES else None
+
+
+class RoutingState:
+    """Routing decisions of one request (or one use_read_replica() block)."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned   # reads must see the primary
+        self.wrote = False     # this request wrote to the primary
+        self.alias = None      # replica used for reads, when allowed
+
+
+_routing_state = ContextVar('db_routing_state', default=None)
+
+
+def get_routing_state():
+    return _routing_state.get()
+
+
+def reads_from_replica():
+    """True when reads of the current request or block are routed to the replica."""
+    state = get_routing_state()
+    return state is not None and state.alias is not None and not state.pinned
+
+
+# ------------------------------------------
+# Replica lag
+# ------------------------------------------
+_lag_checks = {}  # alias -> (checked_at, lag in seconds or None when unavailable)
+
+
+def get_sqlite_path(name):
+    path = str(name)
+    if path.startswith('file:'):
+        path = path[len('file:'):].split('?', 1)[0]
+    return path
+
+
+def measure_replica_lag(alias):
+    """Seconds the replica is behind the primary, or None when it cannot be read."""
+    replica = settings.DATABASES[alias]
+    vendor = connections[alias].vendor
+    if vendor == 'sqlite':
+        replica_path = get_sqlite_path(replica['NAME'])
+        primary_path = get_sqlite_path(settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'])
+        if not os.path.exists(replica_path):
+            return None
+        copied_at = os.path.getmtime(replica_path)
+        if os.path.exists(primary_path) and os.path.getmtime(primary_path) > copied_at:
+            return time.time() - copied_at
+        return 0.0
+
+    with connections[alias].cursor() as cursor:
+        if vendor == 'postgresql':
+            cursor.execute(
+                "SELECT CASE WHEN pg_is_in_recovery() "
+                "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+            )
+            return float(cursor.fetchone()[0])
+        if vendor == 'mysql':
+            cursor.execute("SHOW REPLICA STATUS")
+            row = cursor.fetchone()
+            if row is None:
+                return 0.0  # not a replica, e.g. the same server under another alias
+            columns = [column[0] for column in cursor.description]
+            status = dict(zip(columns, row))
+            lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+            return None if lag is None else float(lag)
+    return 0.0
+
+
+def get_replica_lag(alias):
+    """measure_replica_lag() cached per process for LAG_CHECK_SECONDS."""
+    options = get_replica_settings()
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    if checked is not None and now - checked[0] < options['LAG_CHECK_SECONDS']:
+        return checked[1]
+    try:
+        lag = measure_replica_lag(alias)
+    except Exception as e:
+        logger.warning(f"Read replica '{alias}' is unavailable, reports use the primary: {e}")
+        lag = None
+    _lag_checks[alias] = (now, lag)
+    return lag
+
+
+def get_readable_replica():
+    """The replica alias when it is configured and close enough to the primary, else None."""
+    alias = get_replica_alias()
+    if alias is None:
+        return None
+    lag = get_replica_lag(alias)
+    if lag is None:
+        return None
+    max_lag = get_replica_settings()['MAX_LAG_SECONDS']
+    if lag > max_lag:
+        logger.info(f"Read replica '{alias}' lags {lag:.0f}s (max {max_lag}s), reports use the primary")
+        return None
+    return alias
+
+
+# ------------------------------------------
+# Router
+# ------------------------------------------
+class ReadReplicaRouter:
+    """Sends reads of replica-enabled code to the replica and everything else to 'default'."""
+
+    def is_primary_only(self, model):
+        return model._meta.app_label in get_replica_settings()['PRIMARY_ONLY_APPS']
+
+    def db_for_read(self, model, **hints):
+        state = get_routing_state()
+        if state is None or state.alias is None or state.pinned:
+            return DEFAULT_DB_ALIAS
+        if self.is_primary_only(model) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = get_routing_state()
+        if state is not None and not self.is_primary_only(model):
+            # Whatever this request reads from now on must see its own writes
+            state.wrote = True
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary
+        if db == get_replica_alias():
+            return False
+        return None
+
+
+@contextmanager
+def use_read_replica():
+    """Reads in the block go to the replica when get_readable_replica() allows it."""
+    state = get_routing_state()
+    token = None
+    if state is None:
+        state = RoutingState()
+        token = _routing_state.set(state)
+    previous_alias = state.alias
+    if not state.pinned:
+        state.alias = get_readable_replica()
+    try:
+        yield state
+    finally:
+        state.alias = previous_alias
+        if token is not None:
+            _routing_state.reset(token)
+
+
+def iter_with_state(content, state):
+    """Iterates streaming content with state active, since it is consumed after the view returns."""
+    iterator = iter(content)
+    while True:
+        token = _routing_state.set(state)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _routing_state.reset(token)
+        yield chunk
+
+
+def run_on_read_replica(view, request, *args, **kwargs):
+    with use_read_replica() as state:
+        response = view(request, *args, **kwargs)
+        if isinstance(response, SimpleTemplateResponse):
+            # Querysets handed to the template are evaluated while it renders
+            response.render()
+        elif isinstance(response, StreamingHttpResponse) and not response.is_async:
+            replica_state = RoutingState(pinned=state.pinned)
+            replica_state.alias = state.alias
+            response.streaming_content = iter_with_state(response.streaming_content, replica_state)
+    return response
+
+
+def read_replica(methods=SAFE_METHODS):
+    """Decorator sending the reads of a function view to the replica for the given HTTP methods."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return view(request, *args, **kwargs)
+            return run_on_read_replica(view, request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ReadReplicaMixin:
+    """
+    Runs a report or export view against the read replica. Views whose POST
+    only submits a filter form add 'POST' to read_replica_methods.
+    """
+    read_replica_methods = SAFE_METHODS
+
+    def should_use_read_replica(self, request):
+        return request.method in self.read_replica_methods
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.should_use_read_replica(request):
+            return super().dispatch(request, *args, **kwargs)
+        return run_on_read_replica(super().dispatch, request, *args, **kwargs)
+
+
+# ------------------------------------------
+# Read-your-writes across requests
+# ------------------------------------------
+class PrimaryPinMiddleware:
+    """
+    Pins a browser's reads to the primary for PIN_SECONDS after a request of it
+    wrote, so a report opened right after posting shows the posted document.
+    Dropped at startup when no replica is configured.
+    """
+
+    def __init__(self, get_response):
+        if get_replica_alias() is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = get_replica_settings()
+        try:
+            pinned_until = float(request.COOKIES.get(options['PIN_COOKIE'], 0))
+        except ValueError:
+            pinned_until = 0
+        state = RoutingState(pinned=pinned_until > time.time())
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                options['PIN_COOKIE'], str(time.time() + options['PIN_SECONDS']),
+                max_age=options['PIN_SECONDS'], httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,433 @@
+"""
+Bulk import framework for master data and opening balances.
+
+Rows are streamed from CSV or XLSX, validated a batch at a time, foreign keys
+are resolved through per-batch lookup maps and new rows are written with
+bulk_create. bulk_create/bulk_update do not send model signals, so the stock
+and GL side effects the per-row save() path would trigger are skipped; each
+importer rebuilds its derived tables once in after_import() instead.
+
+Importers live in an ``importers.py`` module of each app and register
+themselves with @register_importer.
+"""
+import csv
+import datetime
+import io
+import os
+import re
+import zipfile
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from xml.etree.ElementTree import fromstring, iterparse
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+IMPORTERS = {}
+
+XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+XLSX_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+XLSX_PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+XLSX_EPOCH = datetime.date(1899, 12, 30)
+CELL_COLUMN = re.compile(r'([A-Z]+)')
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 't')
+FALSE_VALUES = ('0', 'false', 'no', 'n', 'f')
+
+
+class BulkImportError(Exception):
+    """Raised to abort an import; everything written so far is rolled back."""
+
+
+# ------------------------------------------
+# ✅ Readers
+# ------------------------------------------
+def normalize_header(value):
+    return re.sub(r'\W+', '_', str(value or '').strip().lower()).strip('_')
+
+
+def read_csv_rows(file):
+    """Yield one dict per CSV data row, keyed by the normalized header."""
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    header = [normalize_header(column) for column in next(reader, [])]
+    for values in reader:
+        if any(value.strip() for value in values):
+            yield dict(zip(header, values))
+
+
+def _xlsx_column_index(reference):
+    index = 0
+    for letter in CELL_COLUMN.match(reference).group(1):
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _xlsx_first_sheet(archive):
+    """Resolve the path of the first worksheet through the workbook relationships."""
+    sheet = fromstring(archive.read('xl/workbook.xml')).find(f'{XLSX_NS}sheets/{XLSX_NS}sheet')
+    relation_id = sheet.get(f'{XLSX_REL_NS}id')
+    relations = fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for relation in relations.iter(f'{XLSX_PACKAGE_REL_NS}Relationship'):
+        if relation.get('Id') == relation_id:
+            target = relation.get('Target').lstrip('/')
+            return target if target.startswith('xl/') else f'xl/{target}'
+    return 'xl/worksheets/sheet1.xml'
+
+
+def _xlsx_shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as source:
+        for event, element in iterparse(source):
+            if element.tag == f'{XLSX_NS}si':
+                strings.append(''.join(text.text or '' for text in element.iter(f'{XLSX_NS}t')))
+                element.clear()
+    return strings
+
+
+def read_xlsx_rows(file):
+    """
+    Yield one dict per row of the first worksheet. The sheet is parsed with
+    iterparse and every row element is cleared once read, so memory stays flat
+    regardless of the sheet size.
+    """
+    with zipfile.ZipFile(file) as archive:
+        shared_strings = _xlsx_shared_strings(archive)
+        header = None
+        with archive.open(_xlsx_first_sheet(archive)) as source:
+            for event, element in iterparse(source):
+                if element.tag != f'{XLSX_NS}row':
+                    continue
+                values = {}
+                for position, cell in enumerate(element.iter(f'{XLSX_NS}c')):
+                    reference = cell.get('r')
+                    index = _xlsx_column_index(reference) if reference else position
+                    cell_type = cell.get('t')
+                    if cell_type == 'inlineStr':
+                        value = ''.join(text.text or '' for text in cell.iter(f'{XLSX_NS}t'))
+                    else:
+                        raw = cell.find(f'{XLSX_NS}v')
+                        value = raw.text if raw is not None and raw.text is not None else ''
+                        if cell_type == 's' and value:
+                            value = shared_strings[int(value)]
+                    values[index] = value
+                element.clear()
+
+                row = [values.get(index, '') for index in range(max(values) + 1)] if values else []
+                if header is None:
+                    header = [normalize_header(column) for column in row]
+                elif any(str(value).strip() for value in row):
+                    yield dict(zip(header, row))
+
+
+def read_rows(file, filename):
+    """Pick a reader from the file extension."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.xlsx':
+        return read_xlsx_rows(file)
+    if extension in ('.csv', '.txt'):
+        return read_csv_rows(file)
+    raise BulkImportError(f"Unsupported file type '{extension}'. Upload a .csv or .xlsx file.")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ------------------------------------------
+# ✅ Registry
+# ------------------------------------------
+def register_importer(importer_class):
+    IMPORTERS[importer_class.name] = importer_class
+    return importer_class
+
+
+def get_importers():
+    autodiscover_modules('importers')
+    return dict(sorted(IMPORTERS.items()))
+
+
+def get_importer(name):
+    importers = get_importers()
+    if name not in importers:
+        raise BulkImportError(f"Unknown importer '{name}'. Available: {', '.join(importers)}")
+    return importers[name]
+
+
+# ------------------------------------------
+# ✅ Importer base class
+# ------------------------------------------
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errors = []
+        self.messages = []
+
+    def add_error(self, row_number, message):
+        self.errors.append(f"Row {row_number}: {message}" if row_number else message)
+
+    @property
+    def summary(self):
+        return (
+            f"{self.rows} rows read, {self.created} created, {self.updated} updated, "
+            f"{self.skipped} skipped, {len(self.errors)} errors"
+        )
+
+
+class BulkImporter:
+    """
+    Base class for a bulk importer.
+
+    name            registry key used by the command and the admin form
+    model           model the rows are written to
+    fields          {column: model field}; columns missing from the file are left at their default
+    required        columns that must have a value
+    key_field       natural key used to skip (or, with update=True, update) existing rows
+    extra_columns   columns read by the importer itself rather than mapped to a field
+    foreign_keys    {column: (model, lookup field)} resolved to primary keys per batch.
+                    A foreign key to the importer's own model (e.g. parent) is resolved
+                    after all rows are written, so parents may appear anywhere in the file.
+    """
+    name = None
+    verbose_name = None
+    model = None
+    fields = {}
+    required = ()
+    key_field = 'code'
+    extra_columns = ()
+    foreign_keys = {}
+
+    def __init__(self, batch_size=1000, update=False, dry_run=False):
+        self.batch_size = batch_size
+        self.update = update
+        self.dry_run = dry_run
+        self.result = ImportResult()
+        self.lookups = {column: {} for column in self.foreign_keys}
+        self.seen_keys = set()
+        self.deferred_links = []
+        self.written_pks = []
+
+    @classmethod
+    def get_columns(cls):
+        return list(cls.fields) + list(cls.extra_columns)
+
+    # ---------- Field conversion ----------
+    def get_model_field(self, column):
+        return self.model._meta.get_field(self.fields[column])
+
+    def to_python(self, field, value):
+        if isinstance(field, models.BooleanField):
+            text = str(value).strip().lower()
+            if text in TRUE_VALUES:
+                return True
+            if text in FALSE_VALUES:
+                return False
+            raise ValidationError(f"'{value}' is not a yes/no value")
+        if isinstance(field, models.DateField) and re.fullmatch(r'\d+(\.\d+)?', str(value)):
+            # XLSX stores dates as serial day numbers
+            day = XLSX_EPOCH + datetime.timedelta(days=float(value))
+            if isinstance(field, models.DateTimeField):
+                day = datetime.datetime.combine(day, datetime.time())
+                return timezone.make_aware(day) if settings.USE_TZ else day
+            return day
+        if isinstance(field, models.DecimalField):
+            try:
+                value = Decimal(str(value).replace(',', ''))
+            except InvalidOperation:
+                raise ValidationError(f"'{value}' is not a number")
+            return round(value, field.decimal_places)
+        value = field.to_python(value)
+        if isinstance(value, datetime.datetime) and settings.USE_TZ and timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        field.run_validators(value)
+        if field.choices and value not in dict(field.flatchoices):
+            raise ValidationError(f"'{value}' is not one of {', '.join(str(choice) for choice in dict(field.flatchoices))}")
+        return value
+
+    # ---------- Per-batch lookups ----------
+    def prefetch(self, rows):
+        """Load the lookup maps needed by one batch with one query per foreign key."""
+        for column, (related_model, lookup_field) in self.foreign_keys.items():
+            if related_model is self.model:
+                continue
+            cache = self.lookups[column]
+            missing = {str(row.get(column) or '').strip() for row in rows} - set(cache) - {''}
+            if missing:
+                cache.update(
+                    (str(value), pk) for value, pk in
+                    related_model.objects.filter(**{f'{lookup_field}__in': missing}).values_list(lookup_field, 'pk')
+                )
+
+    def get_existing(self, keys):
+        if not self.key_field or not keys:
+            return {}
+        return self.model.objects.in_bulk(keys, field_name=self.key_field)
+
+    # ---------- Row handling ----------
+    def clean_row(self, row):
+        """Return a dict of model field values, or raise ValidationError."""
+        errors = []
+        for column in self.required:
+            if not str(row.get(column) or '').strip():
+                errors.append(f"'{column}' is required")
+
+        data = {}
+        for column in self.fields:
+            if column not in row:
+                continue
+            value = str(row[column]).strip() if row[column] is not None else ''
+            if column in self.foreign_keys:
+                related_model, lookup_field = self.foreign_keys[column]
+                if not value:
+                    data[f'{self.fields[column]}_id'] = None
+                elif related_model is self.model:
+                    continue
+                elif value in self.lookups[column]:
+                    data[f'{self.fields[column]}_id'] = self.lookups[column][value]
+                else:
+                    errors.append(f"{related_model._meta.verbose_name} '{value}' does not exist")
+                continue
+
+            field = self.get_model_field(column)
+            if not value:
+                if field.null:
+                    data[field.attname] = None
+                elif field.has_default():
+                    data[field.attname] = field.get_default()
+                elif isinstance(field, (models.CharField, models.TextField)):
+                    data[field.attname] = ''
+                elif column not in self.required:
+                    errors.append(f"'{column}' is required")
+                continue
+            try:
+                data[field.attname] = self.to_python(field, value)
+            except ValidationError as error:
+                errors.append(f"{column}: {'; '.join(error.messages)}")
+
+        if errors:
+            raise ValidationError(errors)
+        return data
+
+    def build_instance(self, data):
+        return self.model(**data)
+
+    def prepare_instance(self, instance, row):
+        """Hook to fill derived fields the model's save() would normally set."""
+
+    def after_import(self):
+        """Hook to rebuild derived tables once every row has been written."""
+
+    # ---------- Run ----------
+    def run(self, file, filename):
+        try:
+            with transaction.atomic():
+                for batch_number, rows in enumerate(chunked(read_rows(file, filename), self.batch_size)):
+                    self.import_batch(rows, batch_number * self.batch_size + 2)
+                self.link_deferred()
+                self.after_import()
+                if self.dry_run:
+                    transaction.set_rollback(True)
+        except BulkImportError as error:
+            self.result.add_error(None, str(error))
+            self.result.created = self.result.updated = 0
+        return self.result
+
+    def import_batch(self, rows, first_row_number):
+        self.result.rows += len(rows)
+        self.prefetch(rows)
+
+        cleaned = []
+        for row_number, row in enumerate(rows, start=first_row_number):
+            try:
+                data = self.clean_row(row)
+            except ValidationError as error:
+                self.result.add_error(row_number, '; '.join(error.messages))
+                continue
+
+            key = data.get(self.key_field) if self.key_field else None
+            if key is not None:
+                if key in self.seen_keys:
+                    self.result.add_error(row_number, f"duplicate {self.key_field} '{key}' in file")
+                    continue
+                self.seen_keys.add(key)
+            cleaned.append((row_number, row, data, key))
+
+        existing = self.get_existing([key for *_, key in cleaned if key is not None])
+        to_create, to_update, update_fields = [], [], set()
+        for row_number, row, data, key in cleaned:
+            instance = existing.get(key)
+            if instance is None:
+                instance = self.build_instance(data)
+                to_create.append(instance)
+            elif self.update:
+                for attname, value in data.items():
+                    setattr(instance, attname, value)
+                update_fields.update(data)
+                to_update.append(instance)
+            else:
+                self.result.skipped += 1
+                continue
+            self.prepare_instance(instance, row)
+            self.defer_self_links(instance, row)
+
+        self.model.objects.bulk_create(to_create, batch_size=self.batch_size)
+        self.resolve_created_pks(to_create)
+        if to_update:
+            if any(field.attname == 'updated_at' for field in self.model._meta.concrete_fields):
+                update_fields.add('updated_at')
+            update_fields = [field.name for field in self.model._meta.concrete_fields if field.attname in update_fields]
+            self.model.objects.bulk_update(to_update, update_fields, batch_size=self.batch_size)
+        self.result.created += len(to_create)
+        self.result.updated += len(to_update)
+        self.written_pks.extend(instance.pk for instance in to_create + to_update if instance.pk is not None)
+
+    def resolve_created_pks(self, instances):
+        """
+        Read back the primary keys of new rows by natural key. bulk_create only
+        sets them on backends that return rows from a bulk insert, which MySQL
+        does not, and written_pks and link_deferred() need them.
+        """
+        missing = [instance for instance in instances if instance.pk is None]
+        if not missing or not self.key_field:
+            return
+        keys = [getattr(instance, self.key_field) for instance in missing]
+        pks = dict(self.model.objects.filter(**{f'{self.key_field}__in': keys}).values_list(self.key_field, 'pk'))
+        for instance in missing:
+            instance.pk = pks[getattr(instance, self.key_field)]
+            instance._state.adding = False
+
+    def defer_self_links(self, instance, row):
+        for column, (related_model, lookup_field) in self.foreign_keys.items():
+            value = str(row.get(column) or '').strip()
+            if related_model is self.model and value:
+                self.deferred_links.append((instance, self.fields[column], lookup_field, value))
+
+    def link_deferred(self):
+        """Resolve self-referencing foreign keys (e.g. parent) now that every row exists."""
+        if not self.deferred_links:
+            return
+        lookup_values = {value for *_, value in self.deferred_links}
+        lookup_field = self.deferred_links[0][2]
+        pks = dict(self.model.objects.filter(**{f'{lookup_field}__in': lookup_values}).values_list(lookup_field, 'pk'))
+        linked = []
+        for instance, field_name, lookup_field, value in self.deferred_links:
+            if value not in pks:
+                self.result.add_error(None, f"{instance}: {self.model._meta.verbose_name} '{value}' does not exist")
+                continue
+            setattr(instance, f'{field_name}_id', pks[value])
+            linked.append(instance)
+        field_names = sorted({field_name for _, field_name, *_ in self.deferred_links})
+        self.model.objects.bulk_update(linked, field_names, batch_size=self.batch_size)
@@ -0,0 +1,236 @@
+"""
+Keyset (seek) pagination and cheap row counts for large tables.
+
+Pages are addressed by a cursor holding the ordering values of the row a page
+starts after (or ends before) instead of an OFFSET, so every page is one index
+range scan however deep it is. Totals come from a per-table counter for lists
+over the whole table, and from a COUNT capped at KEYSET_COUNT_LIMIT rows for
+any narrower queryset.
+
+The counter is kept up to date by post_save for inserts, and for deletes by
+RowCountQuerySet (queryset deletes) and RowCountModelMixin (instance deletes),
+cascades included. There are deliberately no delete receivers: they would
+make every queryset delete fall back to loading and deleting row by row. Rows
+removed any other way, e.g. by a cascade from an untracked model, drift until
+the counter is recounted.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.apps import apps
+from django.db import models, router, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+
+from config.report_cache import get_report_cache
+
+KEYSET_COUNT_LIMIT = 10000
+ROW_COUNT_TIMEOUT = 60 * 60 * 6  # seconds; the counter is recounted after this to correct drift
+
+
+# ------------------------------------------
+# Maintained row counters
+# ------------------------------------------
+def get_row_count_key(model):
+    return f'row_count:{model._meta.label_lower}'
+
+
+def get_row_count(model):
+    """Row count of a whole table from its counter, counted once when the counter is missing."""
+    row_cache = get_report_cache()
+    count = row_cache.get(get_row_count_key(model))
+    if count is None:
+        count = model._default_manager.count()
+        row_cache.set(get_row_count_key(model), count, ROW_COUNT_TIMEOUT)
+    return count
+
+
+def adjust_row_count(model, delta):
+    try:
+        get_report_cache().incr(get_row_count_key(model), delta)
+    except ValueError:  # not counted yet; the next read counts
+        pass
+
+
+def reset_row_count(model):
+    """Drops the counter after bulk writes, which do not send the signals that maintain it."""
+    get_report_cache().delete(get_row_count_key(model))
+
+
+def count_created_row(sender, created=False, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: adjust_row_count(sender, 1))
+
+
+def track_row_count(*models):
+    """Counts rows created through save(); deletes are counted by RowCountQuerySet and RowCountModelMixin."""
+    for model in models:
+        label = model._meta.label_lower
+        post_save.connect(count_created_row, sender=model, dispatch_uid=f'row_count_save_{label}')
+
+
+def count_deleted_rows(per_model, using):
+    """Takes the {label: count} result of a delete off the counters once it commits."""
+    counts = {apps.get_model(label): -count for label, count in per_model.items() if count}
+    if counts:
+        transaction.on_commit(
+            lambda: [adjust_row_count(model, delta) for model, delta in counts.items()], using=using,
+        )
+
+
+class RowCountQuerySet(models.QuerySet):
+    """
+    Takes the rows a queryset delete removed, cascades included, off their
+    tables' counters. Use as the default manager of a counted model.
+    """
+
+    def delete(self):
+        deleted, per_model = super().delete()
+        count_deleted_rows(per_model, self.db)
+        return deleted, per_model
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class RowCountModelMixin:
+    """Takes an instance delete, cascades included, off the counters. Put it before the model base."""
+
+    def delete(self, using=None, keep_parents=False):
+        deleted, per_model = super().delete(using=using, keep_parents=keep_parents)
+        count_deleted_rows(per_model, using or router.db_for_write(type(self), instance=self))
+        return deleted, per_model
+
+    delete.alters_data = True
+
+
+def is_whole_table(queryset):
+    """True when queryset selects every row of its model, so the table counter is its count."""
+    query = queryset.query
+    return not (query.where or query.distinct or query.combinator or query.is_sliced or query.group_by is not None)
+
+
+# ------------------------------------------
+# Keyset paginator
+# ------------------------------------------
+class KeysetPage:
+    """One page of a KeysetPaginator; iterates like a list of objects."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def next_cursor(self):
+        return self.paginator.encode_cursor(self.object_list[-1]) if self.has_next and self.object_list else None
+
+    @property
+    def previous_cursor(self):
+        return self.paginator.encode_cursor(self.object_list[0]) if self.has_previous and self.object_list else None
+
+
+class KeysetPaginator:
+    """
+    Seeks through queryset in the given ordering, e.g. ('-timestamp', '-id').
+    The primary key is appended when missing so the ordering is total. Ordering
+    fields must be concrete fields of the model, ideally covered by an index.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.filtered = not is_whole_table(queryset)
+        ordering = list(ordering)
+        pk_name = queryset.model._meta.pk.name
+        if not any(name.lstrip('-') in (pk_name, 'pk') for name in ordering):
+            ordering.append(f"{'-' if ordering and ordering[0].startswith('-') else ''}{pk_name}")
+        self.ordering = [name.replace('pk', pk_name) if name.lstrip('-') == 'pk' else name for name in ordering]
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+    # ---------- Cursors ----------
+    @staticmethod
+    def encode_value(value):
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def encode_cursor(self, obj):
+        values = [self.encode_value(getattr(obj, field.attname)) for field in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Ordering values of a cursor, or None if it is malformed."""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if len(values) != len(self.fields):
+                return None
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (ValueError, TypeError, ValidationError, FieldDoesNotExist):
+            return None
+
+    # ---------- Queries ----------
+    def seek_filter(self, values, reverse=False):
+        """
+        Rows strictly after values in the ordering (before when reverse), built as
+        (a > x) OR (a = x AND b > y) ... so the leading column can use its index.
+        """
+        condition = Q()
+        for index, (name, value) in enumerate(zip(self.ordering, values)):
+            descending = name.startswith('-') != reverse
+            lookup = f"{name.lstrip('-')}__{'lt' if descending else 'gt'}"
+            equal = {field_name.lstrip('-'): field_value for field_name, field_value in zip(self.ordering[:index], values[:index])}
+            condition |= Q(**equal, **{lookup: value})
+        return condition
+
+    @staticmethod
+    def reverse_ordering(ordering):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+    def get_page(self, after=None, before=None):
+        """
+        The page following the after cursor, preceding the before cursor, or the
+        first page. One query of per_page + 1 rows tells whether another page exists.
+        """
+        after_values = self.decode_cursor(after)
+        before_values = None if after_values else self.decode_cursor(before)
+
+        if before_values:
+            rows = list(
+                self.queryset.filter(self.seek_filter(before_values, reverse=True))
+                .order_by(*self.reverse_ordering(self.ordering))[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            return KeysetPage(list(reversed(rows[:self.per_page])), self, has_next=True, has_previous=has_previous)
+
+        queryset = self.queryset
+        if after_values:
+            queryset = queryset.filter(self.seek_filter(after_values))
+        rows = list(queryset.order_by(*self.ordering)[:self.per_page + 1])
+        return KeysetPage(rows[:self.per_page], self, has_next=len(rows) > self.per_page, has_previous=bool(after_values))
+
+    # ---------- Counts ----------
+    def get_count(self):
+        """
+        (count, is_estimate). A queryset over the whole table reads the table's
+        counter; any other counts at most KEYSET_COUNT_LIMIT + 1 rows.
+        """
+        if not self.filtered:
+            return get_row_count(self.queryset.model), True
+        count = self.queryset.order_by()[:KEYSET_COUNT_LIMIT + 1].count()
+        return min(count, KEYSET_COUNT_LIMIT), count > KEYSET_COUNT_LIMIT
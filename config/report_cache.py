@@ -0,0 +1,184 @@
+"""
+Report result cache with dependency-tag invalidation.
+
+A cached result is keyed by the report name, its normalized filter parameters,
+the user's permission scope and the current version of every tag it depends on.
+Writers never delete results: signals bump tag versions ('finance:gl',
+'attendance:2024-05-01', ...), which changes the key of every dependent report,
+and the stale entries simply expire.
+
+Results built from the read replica are returned but not stored: the replica
+may not have applied a write whose tag bump the key already reflects, and a
+stale result stored under the new key would outlive the lag.
+"""
+import functools
+import hashlib
+import logging
+import pickle
+import time
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Model, QuerySet
+
+from config.db_router import reads_from_replica
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_ALIAS = 'reports'
+REPORT_CACHE_TIMEOUT = 60 * 30  # seconds
+
+# Request parameters that change what is shown or how, but not the computed result
+IGNORED_REPORT_PARAMS = frozenset({'page', 'page_size', 'export', 'format', 'print', 'csrfmiddlewaretoken'})
+
+# Dependency tags
+FINANCE_GL_TAG = 'finance:gl'
+INVENTORY_STOCK_TAG = 'inventory:stock'
+HRM_MASTER_TAG = 'hrm:master'  # employees, shifts, rosters, departments
+SALES_ROLLUP_TAG = 'sales:rollup'  # daily sales summaries
+
+
+def get_report_cache():
+    return caches[REPORT_CACHE_ALIAS if REPORT_CACHE_ALIAS in settings.CACHES else 'default']
+
+
+def attendance_tag(day):
+    return f'attendance:{day:%Y-%m-%d}'
+
+
+def get_attendance_tags(start_date, end_date):
+    """Tags for every day of [start_date, end_date] plus the HRM master data."""
+    if isinstance(start_date, datetime):
+        start_date = start_date.date()
+    if isinstance(end_date, datetime):
+        end_date = end_date.date()
+    days = (end_date - start_date).days + 1
+    return [HRM_MASTER_TAG] + [attendance_tag(start_date + timedelta(days=n)) for n in range(max(days, 0))]
+
+
+def get_attendance_report_tags(form_data):
+    """Tags of an attendance report filtered by start/end date or a single report_date."""
+    start_date = form_data.get('start_date') or form_data['report_date']
+    end_date = form_data.get('end_date') or start_date
+    # Overnight shifts pair punches with the neighbouring days
+    return get_attendance_tags(start_date - timedelta(days=1), end_date + timedelta(days=1))
+
+
+def get_tag_version_key(tag):
+    return f'report_tag:{tag}'
+
+
+def get_tag_versions(tags):
+    """
+    Current version of each tag. Missing versions start at the current time rather
+    than 1, so an evicted version can never come back to a value it had before.
+    """
+    report_cache = get_report_cache()
+    keys = [get_tag_version_key(tag) for tag in tags]
+    versions = report_cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        report_cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_report_tags(*tags):
+    """Bumps the version of each tag so every report depending on it is recomputed."""
+    report_cache = get_report_cache()
+    for tag in set(tags):
+        try:
+            report_cache.incr(get_tag_version_key(tag))
+        except ValueError:
+            report_cache.set(get_tag_version_key(tag), time.time_ns(), None)
+
+
+def normalize_report_value(value):
+    if isinstance(value, Model):
+        return str(value.pk)
+    if isinstance(value, (QuerySet, list, tuple, set, frozenset)):
+        return sorted(normalize_report_value(item) for item in value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if value is None:
+        return ''
+    return str(value)
+
+
+def normalize_report_params(params):
+    """
+    Sorted (name, value) pairs of a QueryDict or cleaned_data, without empty values
+    and parameters that do not change the result (page, export, ...).
+    """
+    if hasattr(params, 'lists'):
+        items = ((name, values if len(values) > 1 else values[0]) for name, values in params.lists())
+    else:
+        items = params.items()
+    normalized = []
+    for name, value in items:
+        if name in IGNORED_REPORT_PARAMS:
+            continue
+        value = normalize_report_value(value)
+        if value in ('', []):
+            continue
+        normalized.append((name, value))
+    return sorted(normalized)
+
+
+def get_permission_scope(user):
+    """Users with the same permissions see the same report, so they share cache entries."""
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    if user.is_superuser:
+        return 'superuser'
+    permissions = ','.join(sorted(user.get_all_permissions()))
+    return hashlib.md5(permissions.encode('utf-8')).hexdigest()
+
+
+def get_cached_report(name, params, builder, tags=(), user=None, timeout=REPORT_CACHE_TIMEOUT):
+    """
+    Returns builder() from the report cache. The key covers the report name, its
+    normalized parameters, the user's permission scope and the versions of tags.
+    Results read from the replica are not stored.
+    """
+    report_cache = get_report_cache()
+    tags = list(tags)
+    digest = hashlib.md5(repr((
+        normalize_report_params(params), get_permission_scope(user), tags, get_tag_versions(tags),
+    )).encode('utf-8')).hexdigest()
+    cache_key = f'report:{name}:{digest}'
+
+    data = report_cache.get(cache_key)
+    if data is not None:
+        return data
+    from_replica = reads_from_replica()
+    data = builder()
+    if from_replica:
+        return data
+    try:
+        report_cache.set(cache_key, data, timeout)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        logger.warning(f"Report {name} result is not cacheable: {e}")
+    return data
+
+
+def cached_report(tags=lambda form_data: ()):
+    """
+    Caches a view's report builder method, called as method(self, form_data).
+
+    tags(form_data) lists the dependency tags of the result. Preview and export
+    build from the same cleaned form data, so an export after a preview is a hit.
+    """
+    def decorator(method):
+        name = f'{method.__module__}.{method.__qualname__}'
+
+        @functools.wraps(method)
+        def wrapper(self, form_data):
+            request = getattr(self, 'request', None)
+            return get_cached_report(
+                name, form_data, lambda: method(self, form_data),
+                tags=tags(form_data), user=getattr(request, 'user', None),
+            )
+        return wrapper
+    return decorator
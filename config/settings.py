@@ -4,6 +4,7 @@ pymysql.install_as_MySQLdb()
 
 
 import os
+import tempfile
 # from decouple import config, Csv 
 from pathlib import Path
 from django.utils.translation import gettext_lazy as _
@@ -59,6 +60,7 @@ INSTALLED_APPS = [
     'Finance',
     'Hrm',
     'Banking',
+    'ZKPush',
 
 ]
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
@@ -67,6 +69,8 @@ MIDDLEWARE = [
 
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'adminpanel.middleware.QueryInstrumentationMiddleware',
+    'config.db_router.PrimaryPinMiddleware',
 
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,6 +82,90 @@ MIDDLEWARE = [
 
 ]
 
+# Per-request timing / query profiling (adminpanel). Off by default; results under
+# Admin > Request Profiles and admin/adminpanel/requestprofile/rankings/ (JSON).
+QUERY_INSTRUMENTATION = {
+    'ENABLED': os.environ.get('QUERY_INSTRUMENTATION', '') == '1',
+    'SAMPLE_RATE': 1.0,          # fraction of requests profiled
+    'FLUSH_SIZE': 50,            # profiles buffered in-process before one bulk insert
+    'FLUSH_INTERVAL': 30,        # seconds before a partial buffer is flushed
+    'RETENTION_DAYS': 7,
+    'EXCLUDE_PATHS': ['/static/', '/media/', '/favicon.ico'],
+}
+
+# ZKTeco push (ADMS/iclock) receiver; devices point their server address at /iclock/
+ZK_PUSH = {
+    'AUTO_REGISTER': os.environ.get('ZK_PUSH_AUTO_REGISTER', '') == '1',
+    'DELAY': 10,                 # seconds between device heartbeats
+    'TIMEZONE': 0,               # device clock offset from UTC, in hours
+}
+
+# ZKAttendanceLog archival (Hrm/attendance_archive.py); run `manage.py archive_attendance_logs` nightly
+ATTENDANCE_ARCHIVE = {
+    'HOT_MONTHS': 3,             # closed months kept in the live table besides the current one
+    'COMPACT_AFTER_MONTHS': None,  # e.g. 36 to keep only daily summaries of older months
+    'BATCH_SIZE': 5000,          # rows moved per transaction
+}
+
+# Live attendance exceptions (Hrm/attendance_exceptions.py); run `manage.py evaluate_attendance_exceptions`
+# every few minutes so missing punches are raised as shift windows close
+ATTENDANCE_EXCEPTIONS = {
+    'LOOKBACK_DAYS': 1,          # older punches (imports, late syncs) do not raise exceptions
+    'MISSING_IN_AFTER_MINUTES': 60,
+    'WINDOW_CLOSE_MINUTES': 120,
+    'WEEKEND_DAYS': [4],         # date.weekday() numbers; 4 = Friday
+}
+
+# Batch payslip PDFs (Hrm/payslip_batch.py); batches started from the payslip report render
+# in a background thread, or set RUN_IN_BACKGROUND False and run `manage.py generate_payslips --pending`
+PAYSLIP_BATCH = {
+    'WORKERS': int(os.environ.get('PAYSLIP_WORKERS', min(4, os.cpu_count() or 1))),  # render processes
+    'CHUNK_SIZE': 25,            # payslips sent to a worker at a time
+    'RUN_IN_BACKGROUND': True,
+    'STALE_AFTER': 2 * 60 * 60,  # seconds before a batch left running by a dead process is run again
+}
+
+# Income tax projection (Hrm/income_tax.py); EmployeeTax is re-projected as salaries, structures,
+# investments and slabs change, and `manage.py project_income_tax` projects everyone
+INCOME_TAX = {
+    'TAX_COMPONENT_CODES': ['TAX'],  # deduction components that record withheld tax
+    'ALLOWANCE_PLAN': None,          # AllowanceCalculationPlan name; None uses every plan
+    'INVESTMENT_ALLOWANCE_RATE': 20,
+    'INVESTMENT_REBATE_RATE': 15,
+}
+
+# Advance installment schedules and payroll postings (Hrm/payroll_recovery.py); a payroll month is
+# posted when its salaries are marked generated, or with `manage.py post_payroll_month`
+PAYROLL_RECOVERY = {
+    'FIRST_DUE_AFTER_MONTHS': 1,   # first installment due at the end of the month after approval
+    'PF_BASE': 'basic_salary',     # or 'gross_salary'
+    'POST_ON_GENERATE': True,
+    'ADVANCE_COMPONENT_CODES': ['ADV'],  # deduction components that record advance recoveries
+    'RECOVER_OVERDUE': False,      # True lets a deduction also settle installments overdue from earlier months
+}
+
+# Bank statement import and auto-reconciliation (Banking/reconciliation.py)
+BANK_RECONCILIATION = {
+    'BANK_ACCOUNT': '1100',          # default bank GL account of imported statements
+    'DATE_WINDOW_DAYS': 3,
+    'DIFFERENCE_TOLERANCE': '5.00',
+    'DIFFERENCE_ACCOUNT': None,      # e.g. a bank charges account code to post small differences
+}
+
+# Business partner open items, balances, credit limits and aging (BusinessPartnerMasterData/open_items.py)
+OPEN_ITEMS = {
+    'CHECK_CREDIT_LIMIT': True,      # block sales orders that take a customer above its credit limit
+    'AGING_BUCKETS': [30, 60, 90],
+}
+
+# Notification unread counts and Server-Sent Events (global_settings/notifications.py).
+# Streams stay open only when served by config/asgi.py; under WSGI browsers reconnect every POLL_RETRY_MS.
+NOTIFICATIONS = {
+    'STREAM_POLL_SECONDS': 2,
+    'STREAM_MAX_SECONDS': 300,
+    'POLL_RETRY_MS': 30000,
+}
+
 CORS_ALLOW_ALL_ORIGINS = True  # Not recommended for production
 # or for specific origins:
 # CORS_ALLOWED_ORIGINS = [
@@ -161,6 +249,44 @@ DATABASES = {
     }
 }
 
+# Read replica for report and export views (config/db_router.py). Locally a second SQLite
+# file stands in for it: DATABASE_REPLICA_NAME=replica.sqlite3, refreshed from the primary
+# with `python manage.py sync_replica`. mode=ro makes SQLite refuse any write to it.
+if os.environ.get('DATABASE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"file:{BASE_DIR / os.environ['DATABASE_REPLICA_NAME']}?mode=ro",
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['config.db_router.ReadReplicaRouter']
+READ_REPLICA = {
+    'ALIAS': 'replica',
+    'MAX_LAG_SECONDS': int(os.environ.get('REPLICA_MAX_LAG_SECONDS', 30)),
+    'PIN_SECONDS': 30,
+}
+
+# 'default' holds short-lived per-process data (dashboard charts, lookups). 'reports' holds
+# computed report results and their dependency-tag versions; it is file based so every
+# worker on the host sees the same invalidations. REPORT_CACHE_BACKEND=locmem keeps it
+# in-process (single worker / development), REPORT_CACHE_BACKEND=dummy turns it off.
+REPORT_CACHE_BACKENDS = {
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'uniworld-default',
+    },
+    'reports': {
+        'BACKEND': REPORT_CACHE_BACKENDS[os.environ.get('REPORT_CACHE_BACKEND', 'file')],
+        'LOCATION': os.environ.get('REPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'uniworld_report_cache')),
+        'TIMEOUT': 60 * 30,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.mysql',
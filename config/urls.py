@@ -151,6 +151,7 @@ urlpatterns = [
     path('hrm/', include('Hrm.urls')),  
     path('banking/', include('Banking.urls',namespace='banking')),  
     path('production/', include('Production.urls')),
+    path('iclock/', include('ZKPush.urls')),
 ]
 
 # Serve static files in development
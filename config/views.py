@@ -45,9 +45,56 @@ class GenericDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView)
 
 
 from django.views.generic import ListView
-class GenericFilterView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+from config.pagination import KeysetPaginator
+
+
+class KeysetPaginationMixin:
+    """
+    Seek pagination for list views over large tables, enabled by setting
+    keyset_ordering, e.g. ('-timestamp', '-id'). Pages follow ?after=/?before=
+    cursors instead of ?page=, so deep pages cost the same as the first one and
+    no COUNT(*) runs over the whole table.
+    """
+    keyset_ordering = None
+    keyset_params = ('after', 'before', 'page')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_ordering:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, self.keyset_ordering, page_size)
+        page = paginator.get_page(after=self.request.GET.get('after'), before=self.request.GET.get('before'))
+        self.keyset_page = page
+        # is_paginated stays False so numbered pagination templates render nothing
+        return paginator, page, page.object_list, False
+
+    def get_keyset_query(self, **cursor):
+        params = self.request.GET.copy()
+        for key in self.keyset_params:
+            params.pop(key, None)
+        params.update({key: value for key, value in cursor.items() if value})
+        return params.urlencode()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = getattr(self, 'keyset_page', None)
+        if page is not None:
+            count, is_estimate = page.paginator.get_count()
+            context.update({
+                'keyset_page': page,
+                'keyset_count': count,
+                'keyset_count_is_estimate': is_estimate,
+                'keyset_count_capped': page.paginator.filtered and is_estimate,
+                'keyset_first_query': self.get_keyset_query(),
+                'keyset_next_query': self.get_keyset_query(after=page.next_cursor),
+                'keyset_previous_query': self.get_keyset_query(before=page.previous_cursor),
+            })
+        return context
+
+
+class GenericFilterView(KeysetPaginationMixin, LoginRequiredMixin, PermissionRequiredMixin, ListView):
     """
     A reusable filter view for any model that supports filtering using a form.
+    Set keyset_ordering to page large tables by cursor instead of page number.
     """
     model = None  # Set this in the subclass
     template_name = None  # Set this in the subclass
@@ -98,18 +145,36 @@ class GenericFilterView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
         return context
 
 
-import csv
-from django.http import HttpResponse
+import logging
+from django.core.exceptions import FieldDoesNotExist
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views import View
-class BaseExportView(LoginRequiredMixin, PermissionRequiredMixin, View):
+from config.exporters import stream_csv, stream_xlsx, gzip_stream
+from config.db_router import ReadReplicaMixin
+
+logger = logging.getLogger(__name__)
+
+class BaseExportView(ReadReplicaMixin, LoginRequiredMixin, PermissionRequiredMixin, View):
     """
-    Base export view to export any model's data to CSV.
+    Base export view to stream any model's data as CSV or XLSX.
+
+    Rows are read with values_list().iterator() in chunks and written straight
+    into a StreamingHttpResponse, so memory stays flat for large tables.
+    Reads go to the read replica when one is configured (config/db_router.py).
+    Query parameters:
+        columns=<path>,<path>  export only the listed columns
+        export_format=xlsx     XLSX instead of CSV
+        compress=gzip          gzip the file
     """
     model = None  # Define in subclass
     filename = "export.csv"
     permission_required = ""
     field_names = []  # Define field names manually in subclass
+    export_fields = None  # Optional list of (label, lookup path) tuples; overrides field_names
     queryset_filter = None  # Optional queryset filtering method
+    chunk_size = 2000
+    # Fields tried, in order, when a column points at a related object
+    related_display_fields = ('name', 'code', 'document_number', 'username', 'title')
 
     def get_queryset(self, request):
         """
@@ -120,22 +185,110 @@ class BaseExportView(LoginRequiredMixin, PermissionRequiredMixin, View):
             queryset = self.queryset_filter(request, queryset)
         return queryset
 
-    def get(self, request, *args, **kwargs):
+    def get_export_fields(self):
         """
-        Generates and returns CSV file.
+        Returns (label, lookup path) pairs. field_names labels map to paths the
+        same way they always have: lower-cased with spaces as underscores. A view
+        setting neither exports every concrete field of the model.
         """
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = f'attachment; filename="{self.filename}"'
+        if self.export_fields:
+            return list(self.export_fields)
+        if self.field_names:
+            return [(name, name.lower().replace(" ", "_")) for name in self.field_names]
+        return [(str(field.verbose_name), field.attname) for field in self.model._meta.concrete_fields]
 
-        writer = csv.writer(response)
-        writer.writerow(self.field_names)  # Write header row
+    def resolve_lookup(self, path):
+        """
+        Validates a lookup path against the model. A path ending on a relation is
+        extended to a readable field of the related model so it is fetched by join.
+        Returns None for paths that do not exist.
+        """
+        model = self.model
+        parts = path.split("__")
+        for index, part in enumerate(parts):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            is_last = index == len(parts) - 1
+            if field.is_relation and part != field.name:
+                # A foreign key's attname (e.g. department_id) is the raw key column
+                return path if is_last else None
+            if field.is_relation:
+                if field.many_to_many or field.one_to_many:
+                    return None
+                model = field.related_model
+                if is_last:
+                    for display_field in self.related_display_fields:
+                        try:
+                            model._meta.get_field(display_field)
+                            return f"{path}__{display_field}"
+                        except FieldDoesNotExist:
+                            continue
+                    return path
+            elif not is_last:
+                return None
+        return path
+
+    def get_columns(self, request):
+        """
+        Returns the exported (label, lookup) pairs, limited to ?columns= when given.
+        """
+        columns = []
+        for label, path in self.get_export_fields():
+            lookup = self.resolve_lookup(path)
+            if lookup is None:
+                logger.warning(f"{self.__class__.__name__}: skipping unknown export column '{label}'")
+                continue
+            columns.append((label, path, lookup))
+
+        requested = [c.strip() for c in request.GET.get("columns", "").split(",") if c.strip()]
+        if requested:
+            columns = [column for column in columns if column[0] in requested or column[1] in requested]
+        return [(label, lookup) for label, path, lookup in columns]
+
+    def iter_row_chunks(self, queryset, lookups):
+        """
+        Yields lists of up to chunk_size value tuples.
+        """
+        chunk = []
+        for row in queryset.values_list(*lookups).iterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
-        queryset = self.get_queryset(request)
-        data = queryset.values_list(*[field.lower().replace(" ", "_") for field in self.field_names])
+    def get(self, request, *args, **kwargs):
+        """
+        Streams the export file.
+        """
+        columns = self.get_columns(request)
+        if not columns:
+            return HttpResponse("No exportable columns selected.", status=400, content_type="text/plain")
+
+        header = [label for label, lookup in columns]
+        lookups = [lookup for label, lookup in columns]
+        rows = self.iter_row_chunks(self.get_queryset(request), lookups)
+
+        basename = self.filename.rsplit(".", 1)[0]
+        if request.GET.get("export_format") == "xlsx":
+            stream = stream_xlsx(header, rows, sheet_name=str(self.model._meta.verbose_name_plural).title())
+            content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            filename = f"{basename}.xlsx"
+        else:
+            stream = stream_csv(header, rows)
+            content_type = "text/csv"
+            filename = self.filename
 
-        for row in data:
-            writer.writerow(row)
+        if request.GET.get("compress") == "gzip":
+            stream = gzip_stream(stream)
+            content_type = "application/gzip"
+            filename = f"{filename}.gz"
 
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
 
 
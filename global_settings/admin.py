@@ -1,4 +1,4 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import (
     Currency,
     PaymentTerms,
@@ -12,7 +12,9 @@ from .models import (
     BackupSettings,
     GeneralSettings,
     Notification,
+    BulkImportLog,
 )
+from .forms import BulkImportForm
 
 @admin.register(Currency)
 class CurrencyAdmin(admin.ModelAdmin):
@@ -63,3 +65,54 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = ("title", "notification_type", "is_read", "created_at", "all_users")
     list_filter = ("notification_type", "is_read", "all_users", "created_at")
     search_fields = ("title", "message", "recipient__username")
+
+
+@admin.register(BulkImportLog)
+class BulkImportLogAdmin(admin.ModelAdmin):
+    """
+    Adding a log entry uploads and runs a bulk import; the saved entry records the outcome.
+    """
+    list_display = ("importer", "file_name", "status", "rows", "created", "updated", "skipped", "error_count", "uploaded_by", "created_at")
+    list_filter = ("importer", "status", "created_at")
+    search_fields = ("file_name", "uploaded_by__username")
+    readonly_fields = (
+        "importer", "file_name", "uploaded_by", "update_existing", "dry_run", "status",
+        "rows", "created", "updated", "skipped", "error_count", "errors", "messages", "created_at",
+    )
+
+    def get_form(self, request, obj=None, **kwargs):
+        if obj is None:
+            kwargs['form'] = BulkImportForm
+            kwargs['fields'] = None
+        return super().get_form(request, obj, **kwargs)
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.readonly_fields if obj else ()
+
+    def get_fields(self, request, obj=None):
+        if obj is None:
+            return ['importer', 'file', 'batch_size', 'update_existing', 'dry_run']
+        return self.readonly_fields
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        importer_class = form.importers[form.cleaned_data['importer']]
+        upload = form.cleaned_data['file']
+        importer = importer_class(
+            batch_size=form.cleaned_data['batch_size'],
+            update=obj.update_existing,
+            dry_run=obj.dry_run,
+        )
+        result = importer.run(upload, upload.name)
+
+        obj.file_name = upload.name
+        obj.uploaded_by = request.user
+        obj.apply_result(result)
+        super().save_model(request, obj, form, change)
+
+        level = messages.SUCCESS if obj.status in ('success', 'dry_run') else messages.WARNING
+        self.message_user(request, f"{obj.get_status_display()}: {result.summary}", level)
+        for message in result.messages:
+            self.message_user(request, message, messages.INFO)
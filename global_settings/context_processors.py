@@ -27,22 +27,9 @@ def global_settings_context(request):
         request.user.has_perm('global_settings.view_generalsettings'),
     ])
 
-    # Notification count logic
+    # Notification count logic, cached per user (global_settings/notifications.py)
     if apps.is_installed('global_settings'):
-        # Import Notification model from global_settings app
-        Notification = apps.get_model('global_settings', 'Notification')
-        
-        # Count unread notifications for the current user or all users
-        user_notifications = Notification.objects.filter(
-            is_read=False,
-            recipient=request.user
-        ).count()
-        
-        all_user_notifications = Notification.objects.filter(
-            is_read=False, 
-            all_users=True
-        ).count()
-        
-        context['unread_notification_count'] = user_notifications + all_user_notifications
+        from global_settings.notifications import get_unread_count
+        context['unread_notification_count'] = get_unread_count(request.user)
 
     return context
\ No newline at end of file
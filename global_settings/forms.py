@@ -2,7 +2,7 @@ from django import forms
 from .models import (
     Currency, PaymentTerms, CompanyInfo, Localization, Accounting,
     UserSettings, EmailSettings, TaxSettings, PaymentSettings,
-    BackupSettings, GeneralSettings,Notification
+    BackupSettings, GeneralSettings,Notification, BulkImportLog
 )
 
 class CurrencyForm(forms.ModelForm):
@@ -303,4 +303,31 @@ class NotificationForm(forms.ModelForm):
         fields = ['recipient', 'all_users', 'title', 'message', 'notification_type', 'is_read']
         widgets = {
             'message': forms.Textarea(attrs={'rows': 3}),
-        }        
\ No newline at end of file
+        }
+
+
+class BulkImportForm(forms.ModelForm):
+    file = forms.FileField(help_text="CSV or XLSX file; the first row holds the column names.")
+    batch_size = forms.IntegerField(initial=1000, min_value=1, max_value=10000)
+
+    class Meta:
+        model = BulkImportLog
+        fields = ['importer', 'file', 'batch_size', 'update_existing', 'dry_run']
+
+    def __init__(self, *args, **kwargs):
+        from config.importers import get_importers
+
+        super().__init__(*args, **kwargs)
+        self.importers = get_importers()
+        self.fields['importer'] = forms.ChoiceField(
+            choices=[(name, f"{importer.verbose_name} ({name})") for name, importer in self.importers.items()],
+            help_text="Columns: " + " | ".join(
+                f"{name}: {', '.join(importer.get_columns())}" for name, importer in self.importers.items()
+            ),
+        )
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError("Upload a .csv or .xlsx file.")
+        return file
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from config.importers import BulkImportError, get_importer, get_importers
+from global_settings.models import BulkImportLog
+
+
+class Command(BaseCommand):
+    help = "Bulk import master data or opening balances from a CSV/XLSX file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('importer', nargs='?', help="Importer name, e.g. items, opening_stock, business_partners")
+        parser.add_argument('file', nargs='?', help="Path to a .csv or .xlsx file")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--update', action='store_true', help="Update rows whose key already exists instead of skipping them")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and write inside a transaction that is rolled back")
+        parser.add_argument('--list', action='store_true', help="List available importers")
+
+    def handle(self, *args, **options):
+        if options['list'] or not options['importer']:
+            for name, importer_class in get_importers().items():
+                self.stdout.write(f"{name:<25} {importer_class.verbose_name}: {', '.join(importer_class.get_columns())}")
+            return
+        if not options['file']:
+            raise CommandError("A file path is required")
+
+        try:
+            importer_class = get_importer(options['importer'])
+        except BulkImportError as error:
+            raise CommandError(str(error))
+
+        importer = importer_class(batch_size=options['batch_size'], update=options['update'], dry_run=options['dry_run'])
+        with open(options['file'], 'rb') as file:
+            result = importer.run(file, options['file'])
+
+        log = BulkImportLog(
+            importer=importer_class.name,
+            file_name=options['file'],
+            update_existing=options['update'],
+            dry_run=options['dry_run'],
+        )
+        log.apply_result(result)
+        log.save()
+
+        for error in result.errors[:50]:
+            self.stderr.write(error)
+        if len(result.errors) > 50:
+            self.stderr.write(f"... {len(result.errors) - 50} more errors, see bulk import log #{log.pk}")
+        for message in result.messages:
+            self.stdout.write(message)
+        style = self.style.SUCCESS if log.status in ('success', 'dry_run') else self.style.WARNING
+        self.stdout.write(style(f"{log.get_status_display()}: {result.summary}"))
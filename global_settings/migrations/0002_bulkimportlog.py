@@ -0,0 +1,39 @@
+# Generated by Django 4.2.20 on 2026-10-19 13:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('global_settings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkImportLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('importer', models.CharField(max_length=50)),
+                ('file_name', models.CharField(max_length=255)),
+                ('update_existing', models.BooleanField(default=False)),
+                ('dry_run', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('partial', 'Completed with errors'), ('failed', 'Failed'), ('dry_run', 'Dry run')], default='success', max_length=10)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.TextField(blank=True)),
+                ('messages', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bulk_imports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -175,6 +175,7 @@ class Notification(models.Model):
     title = models.CharField(max_length=255)
     message = models.TextField()
     notification_type = models.CharField(max_length=10, choices=NOTIFICATION_TYPES, default='info')
+    # Read state of a recipient's own notification; broadcasts are read per user (NotificationRead)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -184,4 +185,81 @@ class Notification(models.Model):
         return f"{self.title} - {self.recipient.username if self.recipient else 'All Users'}"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'is_read', 'id'], name='notification_recipient_idx'),
+            models.Index(fields=['all_users', 'id'], name='notification_broadcast_idx'),
+        ]
+
+
+class NotificationReadState(models.Model):
+    """
+    A user's read cursor: every notification up to read_until_id is read.
+    updated_at moves on every read, which is how open streams learn of it.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_read_state')
+    read_until_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.user.username} read until #{self.read_until_id}"
+
+
+class NotificationRead(models.Model):
+    """A broadcast notification above the user's cursor that the user has read."""
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='reads')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_reads')
+    read_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'user'], name='notification_read_unique_user'),
+        ]
+
+# Bulk Import Log
+class BulkImportLog(models.Model):
+    STATUS_CHOICES = [
+        ('success', 'Success'),
+        ('partial', 'Completed with errors'),
+        ('failed', 'Failed'),
+        ('dry_run', 'Dry run'),
+    ]
+
+    importer = models.CharField(max_length=50)
+    file_name = models.CharField(max_length=255)
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='bulk_imports')
+    update_existing = models.BooleanField(default=False)
+    dry_run = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='success')
+    rows = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.TextField(blank=True)
+    messages = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.importer} - {self.file_name}"
+
+    def apply_result(self, result):
+        """Copy an ImportResult onto the log; only the first 1000 errors are kept."""
+        self.rows = result.rows
+        self.created = result.created
+        self.updated = result.updated
+        self.skipped = result.skipped
+        self.error_count = len(result.errors)
+        self.errors = "\n".join(result.errors[:1000])
+        self.messages = "\n".join(result.messages)
+        if self.dry_run:
+            self.status = 'dry_run'
+        elif not result.errors:
+            self.status = 'success'
+        elif result.created or result.updated:
+            self.status = 'partial'
+        else:
+            self.status = 'failed'
+
+    class Meta:
+        ordering = ['-created_at']
@@ -0,0 +1,124 @@
+"""
+Server-Sent Events for notifications, served by the async notification_stream
+view on the ASGI application (config/asgi.py).
+
+Open streams do not query the database themselves. One NotificationHub per
+process polls for new notifications and moved read cursors every
+STREAM_POLL_SECONDS and wakes only the streams of the users concerned (every
+stream for a broadcast), which then read their cached unread count. A stream is
+closed after STREAM_MAX_SECONDS and the browser's EventSource reconnects with
+Last-Event-ID, so dropped clients are released even when the server does not
+report the disconnect.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from .notifications import (
+    get_last_notification_id, get_notification_settings, get_stream_changes, get_unread_count,
+    get_unread_notifications, serialize_notification,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationHub:
+    """Fans the changes found by one poll out to the open streams of this process."""
+
+    def __init__(self):
+        self.queues = defaultdict(set)  # user_id -> one queue per open stream
+        self.task = None
+        self.last_id = None
+        self.checked_at = None
+
+    def subscribe(self, user_id):
+        # A single pending wake-up is enough, the stream reads the current state
+        queue = asyncio.Queue(maxsize=1)
+        self.queues[user_id].add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.watch())
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self.queues.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.queues[user_id]
+
+    def wake(self, user_ids):
+        for user_id in user_ids:
+            for queue in list(self.queues.get(user_id, ())):
+                if queue.empty():
+                    queue.put_nowait(True)
+
+    async def watch(self):
+        options = get_notification_settings()
+        self.last_id = await sync_to_async(get_last_notification_id)()
+        self.checked_at = timezone.now()
+        while self.queues:
+            await asyncio.sleep(options['STREAM_POLL_SECONDS'])
+            try:
+                self.last_id, self.checked_at, created, read_user_ids = await sync_to_async(get_stream_changes)(
+                    self.last_id, self.checked_at,
+                )
+            except Exception:
+                logger.exception("Could not check for new notifications")
+                continue
+            if any(all_users for _, _, all_users in created):
+                self.wake(list(self.queues))
+                continue
+            self.wake({recipient_id for _, recipient_id, _ in created if recipient_id} | read_user_ids)
+
+
+hub = NotificationHub()
+
+
+def format_event(data, event_id=None, event='notifications'):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def build_event(user, after_id, last_count):
+    """
+    The event telling user's tabs its unread count and the notifications newer
+    than after_id, or None when neither changed. Returns (event, last_id, count).
+    """
+    count = get_unread_count(user)
+    notifications = get_unread_notifications(user, after_id=after_id)
+    if not notifications and count == last_count:
+        return None, after_id, count
+    last_id = max([after_id] + [notification.id for notification in notifications])
+    data = {'count': count, 'notifications': [serialize_notification(notification) for notification in notifications]}
+    return format_event(data, event_id=last_id), last_id, count
+
+
+async def stream_notifications(user, last_event_id=0):
+    """Async iterator of the SSE messages of one open tab of user."""
+    options = get_notification_settings()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + options['STREAM_MAX_SECONDS']
+    queue = hub.subscribe(user.pk)
+    try:
+        yield f"retry: {options['STREAM_RETRY_MS']}\n\n"
+        last_id, last_count = last_event_id, None
+        while loop.time() < deadline:
+            event, last_id, last_count = await sync_to_async(build_event)(user, last_id, last_count)
+            if event:
+                yield event
+            try:
+                await asyncio.wait_for(
+                    queue.get(), timeout=min(options['STREAM_HEARTBEAT_SECONDS'], max(deadline - loop.time(), 0)),
+                )
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+    finally:
+        hub.unsubscribe(user.pk, queue)
@@ -0,0 +1,164 @@
+"""
+Notification delivery and per-user read state.
+
+A notification is one row per recipient, or a single all_users row that is
+fanned out on read: nothing is copied per user. Each user has a read cursor
+(NotificationReadState.read_until_id) below which everything is read, plus a
+NotificationRead row for each broadcast read above it. "Mark all as read" only
+moves the cursor.
+
+Unread counts are cached in the shared report cache under the versions of two
+tags, the user's own and the broadcast one, so a new broadcast invalidates
+every user's count with a single version bump. Open browser tabs are kept up to
+date over Server-Sent Events by global_settings/notification_stream.py.
+Settings come from settings.NOTIFICATIONS.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Q
+from django.utils import timezone
+
+from config.report_cache import get_report_cache, get_tag_versions, invalidate_report_tags
+from .models import Notification, NotificationRead, NotificationReadState
+
+DEFAULT_SETTINGS = {
+    'UNREAD_COUNT_TIMEOUT': 60 * 10,   # seconds a cached unread count is kept
+    'LIST_LIMIT': 10,                  # notifications in the header sheet
+    'STREAM_POLL_SECONDS': 2,          # how often each process checks for new notifications
+    'STREAM_HEARTBEAT_SECONDS': 15,
+    'STREAM_MAX_SECONDS': 300,         # a stream is closed after this and the browser reconnects
+    'STREAM_RETRY_MS': 3000,           # reconnect delay sent to the browser
+    'POLL_RETRY_MS': 30000,            # reconnect delay when served by WSGI, which cannot hold streams open
+}
+
+BROADCAST_TAG = 'notifications:all'
+
+
+def get_notification_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'NOTIFICATIONS', {})}
+
+
+def user_tag(user_id):
+    return f'notifications:user:{user_id}'
+
+
+def invalidate_unread_counts(notifications):
+    """Invalidates the cached counts of the recipients of notifications once they are committed."""
+    tags = {BROADCAST_TAG if notification.all_users else user_tag(notification.recipient_id)
+            for notification in notifications if notification.all_users or notification.recipient_id}
+    if tags:
+        transaction.on_commit(lambda: invalidate_report_tags(*tags))
+
+
+# ------------------------------------------
+# Reading
+# ------------------------------------------
+def get_read_until(user):
+    return NotificationReadState.objects.filter(user=user).values_list('read_until_id', flat=True).first() or 0
+
+
+def get_unread_queryset(user, read_until=None):
+    """Unread notifications of user: its own unread rows and broadcasts it has not read."""
+    if read_until is None:
+        read_until = get_read_until(user)
+    read_by_user = NotificationRead.objects.filter(notification=OuterRef('pk'), user=user)
+    return Notification.objects.filter(id__gt=read_until).filter(
+        Q(recipient=user, is_read=False) | Q(all_users=True) & ~Exists(read_by_user)
+    )
+
+
+def get_unread_count(user):
+    """Unread count of user from the cache, counted on a miss."""
+    if not user.is_authenticated:
+        return 0
+    options = get_notification_settings()
+    versions = get_tag_versions([BROADCAST_TAG, user_tag(user.pk)])
+    cache_key = f'notifications:unread:{user.pk}:{versions[0]}:{versions[1]}'
+    report_cache = get_report_cache()
+    count = report_cache.get(cache_key)
+    if count is None:
+        count = get_unread_queryset(user).count()
+        report_cache.set(cache_key, count, options['UNREAD_COUNT_TIMEOUT'])
+    return count
+
+
+def get_unread_notifications(user, limit=None, after_id=0):
+    """The newest unread notifications of user, newest first."""
+    limit = limit or get_notification_settings()['LIST_LIMIT']
+    read_until = max(get_read_until(user), after_id)
+    return list(get_unread_queryset(user, read_until).order_by('-id')[:limit])
+
+
+def serialize_notification(notification, is_read=False):
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'type': notification.notification_type,
+        'created_at': notification.created_at.strftime('%Y-%m-%d %H:%M'),
+        'is_read': is_read,
+    }
+
+
+# ------------------------------------------
+# Marking read
+# ------------------------------------------
+def touch_read_state(user, **values):
+    state, created = NotificationReadState.objects.get_or_create(user=user, defaults=values)
+    if not created:
+        for name, value in values.items():
+            setattr(state, name, value)
+        state.save()
+    transaction.on_commit(lambda: invalidate_report_tags(user_tag(user.pk)))
+    return state
+
+
+def mark_read(user, notification):
+    """Marks notification read for user. Returns False when it is not the user's."""
+    if notification.all_users:
+        with transaction.atomic():
+            if notification.pk > get_read_until(user):
+                NotificationRead.objects.get_or_create(notification=notification, user=user)
+            touch_read_state(user)
+        return True
+    if notification.recipient_id != user.pk:
+        return False
+    with transaction.atomic():
+        Notification.objects.filter(pk=notification.pk).update(is_read=True)
+        notification.is_read = True
+        touch_read_state(user)
+    return True
+
+
+def mark_all_read(user):
+    """Moves user's cursor past every notification; per-broadcast reads below it are dropped."""
+    with transaction.atomic():
+        read_until = Notification.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        Notification.objects.filter(recipient=user, is_read=False, id__lte=read_until).update(is_read=True)
+        NotificationRead.objects.filter(user=user, notification_id__lte=read_until).delete()
+        touch_read_state(user, read_until_id=read_until)
+    return read_until
+
+
+# ------------------------------------------
+# Stream changes
+# ------------------------------------------
+def get_last_notification_id():
+    return Notification.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+
+
+def get_stream_changes(after_id, since):
+    """
+    What changed since the previous check of a process: notifications created
+    after after_id as (id, recipient_id, all_users), and the ids of users whose
+    read state moved after since. Returns (last_id, checked_at, created, read_user_ids).
+    """
+    checked_at = timezone.now()
+    created = list(
+        Notification.objects.filter(id__gt=after_id).order_by('id').values_list('id', 'recipient_id', 'all_users')
+    )
+    read_user_ids = set(
+        NotificationReadState.objects.filter(updated_at__gt=since).values_list('user_id', flat=True)
+    )
+    last_id = created[-1][0] if created else after_id
+    return last_id, checked_at, created, read_user_ids
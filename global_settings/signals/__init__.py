@@ -0,0 +1 @@
+from .notification_signals import *
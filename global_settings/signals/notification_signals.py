@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from global_settings.models import Notification
+from global_settings.notifications import invalidate_unread_counts
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_notification_unread_counts(sender, instance, **kwargs):
+    """A new, edited or deleted notification changes its recipients' unread counts."""
+    invalidate_unread_counts([instance])
@@ -102,6 +102,8 @@ urlpatterns = [
     
     # Mark notification as read
     path('notification/<int:pk>/mark-read/', views.mark_notification_read, name='mark_notification_read'),
+    path('notification/mark-all-read/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
         # API endpoint for notifications
     path('api/notifications/', views.get_user_notifications, name='get_user_notifications'),
+    path('api/notifications/stream/', views.notification_stream, name='notification_stream'),
 ]
\ No newline at end of file
@@ -4,12 +4,20 @@ from django.urls import reverse_lazy
 from django.contrib import messages
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
 
 from .models import (
     Currency, PaymentTerms, CompanyInfo, Localization, Accounting,
     UserSettings, EmailSettings, TaxSettings, PaymentSettings,
     BackupSettings, GeneralSettings, Notification
 )
+from .notifications import (
+    get_notification_settings, get_unread_count, get_unread_notifications, mark_all_read, mark_read,
+    serialize_notification,
+)
+from .notification_stream import build_event, stream_notifications
 from .forms import (
     CurrencyForm, PaymentTermsForm, CompanyInfoForm, LocalizationForm, AccountingForm,
     UserSettingsForm, EmailSettingsForm, TaxSettingsForm, PaymentSettingsForm,
@@ -358,10 +366,8 @@ class NotificationCrudView(BaseCrudView):
     def detail(self, request, pk):
         obj = get_object_or_404(self.model, pk=pk)
         
-        # Mark notification as read when viewed
-        if not obj.is_read:
-            obj.is_read = True
-            obj.save()
+        # Mark notification as read for the viewer when viewed
+        mark_read(request.user, obj)
         
         form = self.form_class(instance=obj)
         context = {
@@ -381,10 +387,9 @@ class NotificationCrudView(BaseCrudView):
 def mark_notification_read(request, pk):
     notification = get_object_or_404(Notification, pk=pk)
     
-    # Check if the user has permission to mark this notification as read
-    if notification.all_users or (notification.recipient and notification.recipient == request.user):
-        notification.is_read = True
-        notification.save()
+    # Only the recipient can mark a notification as read; broadcasts are marked for the current user
+    if request.user.is_authenticated:
+        mark_read(request.user, notification)
     
     # Redirect back to the referring page or notification list
     referer = request.META.get('HTTP_REFERER')
@@ -394,6 +399,15 @@ def mark_notification_read(request, pk):
         return HttpResponseRedirect(reverse('global_settings:notification_list'))
 
 
+def mark_all_notifications_read(request):
+    if request.user.is_authenticated:
+        mark_all_read(request.user)
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'count': 0})
+    referer = request.META.get('HTTP_REFERER')
+    return HttpResponseRedirect(referer or reverse('global_settings:notification_list'))
+
+
 from django.http import JsonResponse, HttpResponseRedirect
 from django.urls import reverse
 
@@ -404,33 +418,39 @@ def get_user_notifications(request):
     if not request.user.is_authenticated:
         return JsonResponse({'notifications': [], 'count': 0})
     
-    # Get unread notifications for the current user or all users
-    user_notifications = Notification.objects.filter(
-        is_read=False,
-        recipient=request.user
-    ).order_by('-created_at')[:10]  # ইউজারের জন্য সর্বোচ্চ ১০টি নটিফিকেশন
-
-    global_notifications = Notification.objects.filter(
-        is_read=False, 
-        all_users=True
-    ).order_by('-created_at')[:10]  # সবার জন্য সর্বোচ্চ ১০টি নটিফিকেশন
-
-    # দুইটি queryset merge করে Python লেভেলে লিমিট করুন
-    notifications = list(user_notifications) + list(global_notifications)
-    notifications = sorted(notifications, key=lambda x: x.created_at, reverse=True)[:10]  # সর্বশেষ ১০টি নটিফিকেশন নিন
-    # Format notifications for JSON response
-    notification_data = []
-    for notification in notifications:
-        notification_data.append({
-            'id': notification.id,
-            'title': notification.title,
-            'message': notification.message,
-            'type': notification.notification_type,
-            'created_at': notification.created_at.strftime('%Y-%m-%d %H:%M'),
-            'is_read': notification.is_read,
-        })
-    
+    # Newest unread notifications of the user, own and broadcast, with the cached unread count
+    notifications = get_unread_notifications(request.user)
     return JsonResponse({
-        'notifications': notification_data,
-        'count': len(notification_data)
-    })        
\ No newline at end of file
+        'notifications': [serialize_notification(notification) for notification in notifications],
+        'count': get_unread_count(request.user)
+    })
+
+
+def get_stream_user(request):
+    user = request.user
+    return user if user.is_authenticated else None
+
+
+async def notification_stream(request):
+    """
+    Server-Sent Events with the user's unread count and new notifications.
+    Under WSGI a long-lived response would hold a worker, so one event is sent
+    and the browser reconnects after POLL_RETRY_MS instead.
+    """
+    user = await sync_to_async(get_stream_user)(request)
+    if user is None:
+        return HttpResponse(status=401)
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_id') or 0)
+    except ValueError:
+        last_event_id = 0
+
+    if not isinstance(request, ASGIRequest):
+        options = get_notification_settings()
+        event, _, _ = await sync_to_async(build_event)(user, last_event_id, None)
+        response = HttpResponse(f"retry: {options['POLL_RETRY_MS']}\n\n{event or ''}", content_type='text/event-stream')
+    else:
+        response = StreamingHttpResponse(stream_notifications(user, last_event_id), content_type='text/event-stream')
+        response['X-Accel-Buffering'] = 'no'  # let nginx pass events through unbuffered
+    response['Cache-Control'] = 'no-cache'
+    return response